@@ -0,0 +1,72 @@
+# -*- coding: utf-8 -*-
+"""Benchmark the startup time of creating many agents from the same model
+config, with shared and unshared model wrappers.
+
+Usage:
+
+    python scripts/benchmark/agent_startup_benchmark.py --num-agents 1000
+"""
+import argparse
+import os
+import tempfile
+import time
+
+from agentscope.agents import DialogAgent
+from agentscope.models import clear_model_configs, read_model_configs
+from agentscope.utils import MonitorFactory
+
+
+def _create_agents(num_agents: int, shared: bool) -> float:
+    """Create `num_agents` agents and return the time cost in seconds."""
+    read_model_configs(
+        {
+            "config_name": "benchmark",
+            "model_type": "openai_chat",
+            "model_name": "gpt-4",
+            "api_key": "xxx",
+            "budget": 100.0,
+            "shared": shared,
+        },
+        clear_existing=True,
+    )
+
+    start = time.perf_counter()
+    for i in range(num_agents):
+        DialogAgent(
+            name=f"agent_{i}",
+            sys_prompt="You're a helpful assistant.",
+            model_config_name="benchmark",
+        )
+    cost = time.perf_counter() - start
+
+    clear_model_configs()
+    return cost
+
+
+def main() -> None:
+    """Run the benchmark."""
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--num-agents", type=int, default=1000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        # use a fresh sqlite monitor as the default one
+        MonitorFactory.flush()
+        MonitorFactory.get_monitor(
+            db_path=os.path.join(tmp_dir, "monitor.db"),
+        )
+
+        print(f"Create {args.num_agents} agents:")
+        for shared in [False, True]:
+            cost = _create_agents(args.num_agents, shared)
+            print(
+                f"    {'shared' if shared else 'unshared':<12}"
+                f"{cost:>10.3f} s"
+                f"{cost / args.num_agents * 1000:>10.3f} ms/agent",
+            )
+
+        MonitorFactory.flush()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,68 @@
+# -*- coding: utf-8 -*-
+"""Benchmark the memory footprint and the retrieval latency of embeddings
+stored as nested lists versus a contiguous NumPy array, i.e. with and
+without `embedding_dtype` in the model config.
+
+Usage:
+
+    python scripts/benchmark/embedding_benchmark.py --num 100000 --dim 256
+"""
+import argparse
+import time
+import tracemalloc
+from typing import Any, Callable, Tuple
+
+import numpy as np
+
+from agentscope.service import retrieve_from_list, cos_sim
+
+
+def _measure(create: Callable[[], Any]) -> Tuple[Any, float]:
+    """Create the embeddings, and return them together with the traced
+    memory in MB."""
+    tracemalloc.start()
+    embeddings = create()
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return embeddings, size / 1024**2
+
+
+def main() -> None:
+    """Run the benchmark."""
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--num", type=int, default=100000)
+    parser.add_argument("--dim", type=int, default=256)
+    parser.add_argument("--top-k", type=int, default=5)
+    args = parser.parse_args()
+
+    source = np.random.default_rng(0).random((args.num, args.dim))
+    query = source[0].tolist()
+
+    lists, lists_mb = _measure(source.tolist)
+    array, array_mb = _measure(
+        lambda: np.ascontiguousarray(source, dtype="float32"),
+    )
+    print(f"{args.num} embeddings of dim {args.dim}:")
+    print(f"    lists:         {lists_mb:>9.1f} MB")
+    print(f"    float32 array: {array_mb:>9.1f} MB")
+
+    start = time.perf_counter()
+    retrieve_from_list(
+        query,
+        lists,
+        lambda a, b: cos_sim(a, b).content,
+        top_k=args.top_k,
+    )
+    lists_cost = time.perf_counter() - start
+
+    start = time.perf_counter()
+    retrieve_from_list(query, array, "cosine", top_k=args.top_k)
+    array_cost = time.perf_counter() - start
+
+    print(f"Top-{args.top_k} cosine retrieval:")
+    print(f"    lists + cos_sim:  {lists_cost * 1000:>9.1f} ms")
+    print(f"    array + batched:  {array_cost * 1000:>9.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,78 @@
+# -*- coding: utf-8 -*-
+"""Benchmark the per-turn cost of formatting the prompt with a growing
+dialogue history, with and without the cached lines of the history.
+
+Usage:
+
+    python scripts/benchmark/format_benchmark.py --lengths 100 1000 5000
+"""
+import argparse
+import time
+
+from agentscope.message import Msg
+from agentscope.models import OllamaChatWrapper
+
+
+def _create_history(length: int) -> list:
+    """Create a dialogue history with both string and dict contents."""
+    history = []
+    for i in range(length):
+        if i % 2 == 0:
+            content = f"This is the message {i} about the weather today."
+        else:
+            content = {"turn": i, "thought": "sunny", "speak": f"Hi {i}"}
+        history.append(Msg(f"agent_{i % 4}", content, role="assistant"))
+    return history
+
+
+def _format_turns(
+    model: OllamaChatWrapper,
+    history: list,
+    num_turns: int,
+    cached: bool,
+) -> float:
+    """Format the prompt for `num_turns` turns, each of which appends a
+    new message, and return the average cost per turn in milliseconds."""
+    # pylint: disable=protected-access
+    sys_prompt = Msg("system", "You're a helpful assistant.", role="system")
+    history = list(history)
+    model._dialogue_lines.clear()
+    model.format(sys_prompt, history)
+
+    start = time.perf_counter()
+    for i in range(num_turns):
+        if not cached:
+            model._dialogue_lines.clear()
+        history.append(Msg("user", f"New message {i}", role="user"))
+        model.format(sys_prompt, history)
+    return (time.perf_counter() - start) / num_turns * 1000
+
+
+def main() -> None:
+    """Run the benchmark."""
+    parser = argparse.ArgumentParser()
+    parser.add_argument(
+        "--lengths",
+        type=int,
+        nargs="+",
+        default=[100, 1000, 5000],
+        help="The lengths of the dialogue history.",
+    )
+    parser.add_argument("--num-turns", type=int, default=20)
+    args = parser.parse_args()
+
+    model = OllamaChatWrapper(config_name="benchmark", model_name="llama2")
+
+    print(f"Format cost per turn (average of {args.num_turns} turns):")
+    for length in args.lengths:
+        history = _create_history(length)
+        uncached = _format_turns(model, history, args.num_turns, False)
+        cached = _format_turns(model, history, args.num_turns, True)
+        print(
+            f"    {length:>6} messages: uncached {uncached:>8.3f} ms, "
+            f"cached {cached:>8.3f} ms, speedup {uncached / cached:.1f}x",
+        )
+
+
+if __name__ == "__main__":
+    main()
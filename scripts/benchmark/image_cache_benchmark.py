@@ -0,0 +1,69 @@
+# -*- coding: utf-8 -*-
+"""Benchmark the per-turn cost of formatting a dialogue history with
+local images for the OpenAI vision models, with and without the cache of
+the encoded images.
+
+Usage:
+
+    python scripts/benchmark/image_cache_benchmark.py --num-images 20
+"""
+import argparse
+import os
+import tempfile
+import time
+
+from PIL import Image
+
+from agentscope.message import Msg
+from agentscope.models import OpenAIChatWrapper
+from agentscope.utils.image_cache import ImageCache
+
+
+def main() -> None:
+    """Run the benchmark."""
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--num-images", type=int, default=20)
+    parser.add_argument("--side", type=int, default=2048)
+    parser.add_argument("--num-turns", type=int, default=10)
+    args = parser.parse_args()
+
+    model = OpenAIChatWrapper(
+        config_name="benchmark",
+        model_name="gpt-4o",
+        api_key="xxx",
+    )
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        history = []
+        for i in range(args.num_images):
+            path = os.path.join(tmp_dir, f"image_{i}.jpg")
+            Image.effect_noise((args.side, args.side), 64).convert(
+                "RGB",
+            ).save(path)
+            history.append(Msg("user", f"Image {i}", "user", url=path))
+
+        for label, cache in [
+            ("uncached", None),
+            ("cached", ImageCache()),
+            ("cached + max_side=1024", ImageCache(max_side=1024)),
+        ]:
+            start = time.perf_counter()
+            for _ in range(args.num_turns):
+                # a new cache per turn is equivalent to no cache
+                model.image_cache = ImageCache() if cache is None else cache
+                messages = model.format(history)
+            cost = (time.perf_counter() - start) / args.num_turns
+            payload = sum(
+                len(part["image_url"]["url"])
+                for msg in messages
+                for part in msg["content"]
+                if part["type"] == "image_url"
+            )
+            print(
+                f"{label:<24} {cost * 1000:>9.1f} ms/turn, "
+                f"{payload / 1024**2:>7.1f} MB of images",
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,70 @@
+# -*- coding: utf-8 -*-
+"""Benchmark the import time of AgentScope by `python -X importtime`,
+which shows the total time and the slowest modules, e.g. to check that the
+SDKs of the model providers are not imported with the package.
+
+Usage:
+
+    python scripts/benchmark/import_time_benchmark.py --repeats 5
+"""
+import argparse
+import statistics
+import subprocess
+import sys
+from typing import Dict, Tuple
+
+_STATEMENTS = {
+    "import agentscope": "import agentscope",
+    "+ openai_chat wrapper": (
+        "import agentscope.models as m; m._get_model_wrapper('openai_chat')"
+    ),
+}
+
+
+def _import_time(statement: str) -> Tuple[float, Dict[str, float]]:
+    """Run the statement in a new interpreter, and return the total time
+    and the cumulative time of each module in milliseconds."""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", statement],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    total, modules = 0.0, {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line[len("import time:") :].split("|")
+        modules[name.strip()] = int(cumulative) / 1000
+        # the nested imports are indented by two more spaces
+        if not name.startswith("   "):
+            total += int(cumulative) / 1000
+    return total, modules
+
+
+def main() -> None:
+    """Run the benchmark."""
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--repeats", type=int, default=5)
+    parser.add_argument("--top", type=int, default=10)
+    args = parser.parse_args()
+
+    for label, statement in _STATEMENTS.items():
+        totals = [_import_time(statement)[0] for _ in range(args.repeats)]
+        print(
+            f"{label}: median {statistics.median(totals):.1f} ms "
+            f"over {args.repeats} runs",
+        )
+
+    print("Slowest modules of `import agentscope` (cumulative, ms):")
+    _, modules = _import_time("import agentscope")
+    for name, cost in sorted(
+        modules.items(),
+        key=lambda _: _[1],
+        reverse=True,
+    )[: args.top]:
+        print(f"    {cost:>9.1f}  {name}")
+
+
+if __name__ == "__main__":
+    main()
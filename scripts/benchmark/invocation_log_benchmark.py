@@ -0,0 +1,72 @@
+# -*- coding: utf-8 -*-
+"""Benchmark the cost of recording the api invocations on the calling
+thread, as separate JSON files versus the append-only logs written in the
+background, and the disk usage of each format.
+
+Usage:
+
+    python scripts/benchmark/invocation_log_benchmark.py --num 10000
+"""
+import argparse
+import os
+import tempfile
+import time
+
+from agentscope.file_manager import file_manager
+
+
+def _record(index: int) -> dict:
+    """Create an invocation record of a typical chat call."""
+    return {
+        "model_class": "OpenAIChatWrapper",
+        "timestamp": "20241018-120000",
+        "arguments": {
+            "model": "gpt-4o",
+            "messages": [
+                {"role": "system", "content": "You're a helpful assistant."},
+                {"role": "user", "content": f"Question {index} " * 20},
+            ],
+        },
+        "response": {"choices": [{"message": {"content": "Answer " * 50}}]},
+    }
+
+
+def _disk_usage(directory: str) -> int:
+    """The total size of the files in the directory in bytes."""
+    return sum(
+        os.path.getsize(os.path.join(root, _))
+        for root, _dirs, files in os.walk(directory)
+        for _ in files
+    )
+
+
+def main() -> None:
+    """Run the benchmark."""
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--num", type=int, default=10000)
+    args = parser.parse_args()
+
+    records = [_record(i) for i in range(args.num)]
+    for save_api_invoke in [True, "jsonl", "jsonl.gz"]:
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            file_manager.init(tmp_dir, save_api_invoke)
+
+            start = time.perf_counter()
+            for record in records:
+                file_manager.save_api_invocation("model", record)
+            cost = time.perf_counter() - start
+
+            # wait for the background writer
+            file_manager._close_invocation_log()  # pylint: disable=W0212
+            total = time.perf_counter() - start
+
+            print(
+                f"{str(save_api_invoke):<10} "
+                f"{cost / args.num * 1e6:>8.1f} us/record on the caller, "
+                f"{total:>6.2f} s in total, "
+                f"{_disk_usage(tmp_dir) / 1024**2:>7.2f} MB on disk",
+            )
+
+
+if __name__ == "__main__":
+    main()
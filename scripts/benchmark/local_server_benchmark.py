@@ -0,0 +1,146 @@
+# -*- coding: utf-8 -*-
+"""Load test of the Flask model service in `scripts/flask_transformers`,
+which shows the throughput of concurrent requests with different batch
+windows. It runs on CPU with a tiny model.
+
+Usage:
+
+    pip install flask torch transformers
+    python scripts/benchmark/local_server_benchmark.py \
+        --model_name_or_path sshleifer/tiny-gpt2 --windows 0 5 20 50
+"""
+import argparse
+import importlib.util
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import transformers
+
+from agentscope.utils.batching import DynamicBatcher
+
+_SERVICE_PATH = os.path.join(
+    os.path.dirname(os.path.abspath(__file__)),
+    "..",
+    "flask_transformers",
+    "setup_hf_service.py",
+)
+
+# a minimal chat template for the models without one
+_CHAT_TEMPLATE = (
+    "{% for message in messages %}"
+    "{{ message['role'] }}: {{ message['content'] }}\n"
+    "{% endfor %}assistant:"
+)
+
+
+def _load_service(model_name_or_path: str) -> object:
+    """Import the service module and load the model into it."""
+    spec = importlib.util.spec_from_file_location("service", _SERVICE_PATH)
+    if spec is None or spec.loader is None:
+        raise ImportError(f"Cannot load the service from {_SERVICE_PATH}.")
+    service = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(service)
+
+    service.model = transformers.AutoModelForCausalLM.from_pretrained(
+        model_name_or_path,
+    )
+    tokenizer = transformers.AutoTokenizer.from_pretrained(model_name_or_path)
+    tokenizer.padding_side = "left"
+    if tokenizer.pad_token is None:
+        tokenizer.pad_token = tokenizer.eos_token
+    if getattr(tokenizer, "chat_template", None) is None:
+        tokenizer.chat_template = _CHAT_TEMPLATE
+    service.tokenizer = tokenizer
+    return service
+
+
+def _run(
+    service: object,
+    num_requests: int,
+    concurrency: int,
+    max_batch_size: int,
+    max_wait_ms: float,
+    max_new_tokens: int,
+) -> float:
+    """Send the requests concurrently and return the throughput in
+    requests per second."""
+    service.batcher = DynamicBatcher(
+        service.generate_batch,
+        max_batch_size=max_batch_size,
+        max_wait_ms=max_wait_ms,
+    )
+
+    def send(i: int) -> None:
+        client = service.app.test_client()
+        response = client.post(
+            "/llm/",
+            json={
+                "inputs": [
+                    {
+                        "role": "user",
+                        "name": "user",
+                        "content": f"Tell me a story about number {i}.",
+                    },
+                ],
+                "max_new_tokens": max_new_tokens,
+                "do_sample": False,
+            },
+        )
+        assert response.status_code == 200
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        list(executor.map(send, range(num_requests)))
+    cost = time.perf_counter() - start
+
+    service.batcher.close()
+    return num_requests / cost
+
+
+def main() -> None:
+    """Run the benchmark."""
+    parser = argparse.ArgumentParser()
+    parser.add_argument(
+        "--model_name_or_path",
+        type=str,
+        default="sshleifer/tiny-gpt2",
+    )
+    parser.add_argument("--num_requests", type=int, default=64)
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--max_batch_size", type=int, default=16)
+    parser.add_argument("--max_new_tokens", type=int, default=16)
+    parser.add_argument(
+        "--windows",
+        type=float,
+        nargs="+",
+        default=[0, 5, 20, 50],
+        help="The batch windows (max_wait_ms) to test.",
+    )
+    args = parser.parse_args()
+
+    service = _load_service(args.model_name_or_path)
+
+    print(
+        f"{args.num_requests} requests with concurrency "
+        f"{args.concurrency}:",
+    )
+    # batch size 1 is the unbatched baseline
+    settings = [(1, 0.0)] + [(args.max_batch_size, _) for _ in args.windows]
+    for max_batch_size, window in settings:
+        throughput = _run(
+            service,
+            args.num_requests,
+            args.concurrency,
+            max_batch_size,
+            window,
+            args.max_new_tokens,
+        )
+        print(
+            f"    batch size {max_batch_size:<4} window {window:>6.1f} ms"
+            f"{throughput:>10.2f} req/s",
+        )
+
+
+if __name__ == "__main__":
+    main()
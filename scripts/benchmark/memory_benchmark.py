@@ -0,0 +1,102 @@
+# -*- coding: utf-8 -*-
+"""Benchmark the delete and lookup operations of TemporaryMemory.
+
+Usage:
+
+    python scripts/benchmark/memory_benchmark.py --num-msgs 100000
+"""
+import argparse
+import time
+from typing import Callable
+
+from agentscope.memory import TemporaryMemory
+from agentscope.message import Msg
+
+
+def _build_memory(num_msgs: int, num_speakers: int) -> TemporaryMemory:
+    """Build a memory with `num_msgs` messages from `num_speakers`
+    speakers."""
+    memory = TemporaryMemory()
+    memory.add(
+        [
+            Msg(
+                f"agent_{i % num_speakers}",
+                f"message {i}",
+                role="user" if i % 2 == 0 else "assistant",
+            )
+            for i in range(num_msgs)
+        ],
+    )
+    return memory
+
+
+def _timeit(
+    func: Callable[[TemporaryMemory], None],
+    memory: TemporaryMemory,
+    repeat: int,
+) -> float:
+    """Return the average time cost of `func` on `memory` in
+    milliseconds."""
+    start = time.perf_counter()
+    for _ in range(repeat):
+        func(memory)
+    return (time.perf_counter() - start) / repeat * 1000
+
+
+def _delete_by_rebuild(memory: TemporaryMemory) -> None:
+    """The previous implementation of `delete`, which only rebuilds the
+    list and leaves the indices stale."""
+    index = {memory.size() // 2}
+    memory._content = [  # pylint: disable=protected-access
+        _ for i, _ in enumerate(memory.get_memory()) if i not in index
+    ]
+
+
+def _delete_first_speaker(memory: TemporaryMemory) -> None:
+    """Delete all messages from the speaker of the first message."""
+    name = memory.get_memory()[0].name
+    memory.delete_where(lambda i, _: _.name == name)
+
+
+def main() -> None:
+    """Run the benchmark."""
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--num-msgs", type=int, default=100000)
+    parser.add_argument("--num-speakers", type=int, default=100)
+    parser.add_argument("--repeat", type=int, default=100)
+    args = parser.parse_args()
+
+    cases = {
+        "delete one (rebuild list)": _delete_by_rebuild,
+        "delete one": lambda memory: memory.delete(memory.size() // 2),
+        "delete_range (10 items)": lambda memory: memory.delete_range(0, 10),
+        "get_memory(filter_func) by name": lambda memory: memory.get_memory(
+            filter_func=lambda i, _: _.name == "agent_7",
+        ),
+        "get_memory_by(name)": lambda memory: memory.get_memory_by(
+            name="agent_7",
+        ),
+        "get_memory_by(name, role)": lambda memory: memory.get_memory_by(
+            name="agent_7",
+            role="assistant",
+        ),
+        "delete_where by name": _delete_first_speaker,
+    }
+
+    results = {}
+    for name, func in cases.items():
+        # build a fresh memory for each case, so that the deletions in one
+        # case don't affect the measurements of the following ones
+        memory = _build_memory(args.num_msgs, args.num_speakers)
+        repeat = args.repeat
+        if func is _delete_first_speaker:
+            repeat = min(repeat, args.num_speakers)
+        results[name] = _timeit(func, memory, repeat)
+
+    print(f"TemporaryMemory with {args.num_msgs} messages:")
+    for name, cost in results.items():
+        print(f"    {name:<36}{cost:>10.3f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+# -*- coding: utf-8 -*-
+"""Benchmark the metric updates per second of the sqlite monitor from
+concurrent threads, connecting for every operation in the rollback journal
+mode versus the persistent connections in WAL mode.
+
+Usage:
+
+    python scripts/benchmark/monitor_benchmark.py --threads 32 --num 200
+"""
+import argparse
+import os
+import tempfile
+import threading
+import time
+from contextlib import contextmanager
+from typing import Generator
+
+from agentscope.utils.monitor import (
+    SqliteMonitor,
+    sqlite_cursor,
+    sqlite_transaction,
+)
+
+
+class PerCallSqliteMonitor(SqliteMonitor):
+    """The sqlite monitor connecting for every operation as before."""
+
+    @contextmanager
+    def _transaction(self) -> Generator:
+        with sqlite_transaction(self.db_path) as cursor:
+            yield cursor
+
+    @contextmanager
+    def _cursor(self) -> Generator:
+        with sqlite_cursor(self.db_path) as cursor:
+            yield cursor
+
+
+def _run(monitor: SqliteMonitor, threads: int, num: int) -> float:
+    """Update the metrics of a model call from the threads, and return the
+    updates per second."""
+    monitor.register("call_counter")
+    monitor.register("prompt_tokens")
+    monitor.register("completion_tokens")
+    values = {"call_counter": 1, "prompt_tokens": 100, "completion_tokens": 50}
+
+    def work() -> None:
+        for _ in range(num):
+            monitor.update(values)
+
+    workers = [threading.Thread(target=work) for _ in range(threads)]
+    start = time.perf_counter()
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+    cost = time.perf_counter() - start
+
+    assert monitor.get_value("call_counter") == threads * num
+    return threads * num / cost
+
+
+def main() -> None:
+    """Run the benchmark."""
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--threads", type=int, default=32)
+    parser.add_argument("--num", type=int, default=200)
+    args = parser.parse_args()
+
+    for monitor_class in [PerCallSqliteMonitor, SqliteMonitor]:
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            monitor = monitor_class(os.path.join(tmp_dir, "monitor.db"))
+            throughput = _run(monitor, args.threads, args.num)
+            monitor.close()
+            print(
+                f"{monitor_class.__name__:<22} "
+                f"{throughput:>10.1f} updates/s from {args.threads} threads",
+            )
+
+
+if __name__ == "__main__":
+    main()
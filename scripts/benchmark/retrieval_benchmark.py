@@ -0,0 +1,105 @@
+# -*- coding: utf-8 -*-
+"""Benchmark the indexing throughput and query latency of the BM25 and
+hybrid retrievers on a synthetic corpus.
+
+Usage:
+
+    python scripts/benchmark/retrieval_benchmark.py --num-docs 1000000
+"""
+import argparse
+import time
+
+import numpy as np
+
+from agentscope.service import BM25Index, EmbeddingIndex, hybrid_search
+
+
+def _synthetic_corpus(
+    num_docs: int,
+    vocab_size: int,
+    doc_len: int,
+    seed: int,
+) -> tuple:
+    """Generate documents with Zipf-distributed words."""
+    rng = np.random.default_rng(seed)
+    vocab = np.array([f"w{i}" for i in range(vocab_size)])
+    word_ids = np.minimum(
+        rng.zipf(1.2, size=(num_docs, doc_len)) - 1,
+        vocab_size - 1,
+    )
+    docs = [" ".join(vocab[ids]) for ids in word_ids]
+    queries = [
+        " ".join(vocab[ids])
+        for ids in np.minimum(rng.zipf(1.2, size=(100, 3)) + 9, vocab_size - 1)
+    ]
+    return docs, queries, rng
+
+
+def _percentiles(costs: list) -> str:
+    """Format the p50/p99 latency in milliseconds."""
+    p50, p99 = np.percentile(np.array(costs) * 1000, [50, 99])
+    return f"p50 {p50:.2f} ms, p99 {p99:.2f} ms"
+
+
+def main() -> None:
+    """Run the benchmark."""
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--num-docs", type=int, default=1000000)
+    parser.add_argument("--vocab-size", type=int, default=50000)
+    parser.add_argument("--doc-len", type=int, default=20)
+    parser.add_argument("--dim", type=int, default=64)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    docs, queries, rng = _synthetic_corpus(
+        args.num_docs,
+        args.vocab_size,
+        args.doc_len,
+        args.seed,
+    )
+
+    bm25_index = BM25Index()
+    start = time.perf_counter()
+    bm25_index.add_documents(docs)
+    cost = time.perf_counter() - start
+    print(
+        f"BM25 indexing: {args.num_docs} docs in {cost:.1f} s "
+        f"({args.num_docs / cost:.0f} docs/s)",
+    )
+
+    costs = []
+    for query in queries:
+        start = time.perf_counter()
+        bm25_index.search(query, top_k=10)
+        costs.append(time.perf_counter() - start)
+    print(f"BM25 query: {_percentiles(costs)}")
+
+    embedding_index = EmbeddingIndex()
+    embeddings = rng.standard_normal((args.num_docs, args.dim))
+    start = time.perf_counter()
+    for doc_id, embedding in enumerate(embeddings):
+        embedding_index.add(doc_id, embedding)
+    # the first search builds the embedding matrix
+    embedding_index.search(embeddings[0])
+    cost = time.perf_counter() - start
+    print(
+        f"Embedding indexing: {args.num_docs} docs in {cost:.1f} s "
+        f"({args.num_docs / cost:.0f} docs/s)",
+    )
+
+    costs = []
+    for query in queries:
+        start = time.perf_counter()
+        hybrid_search(
+            query,
+            bm25_index,
+            embedding_index,
+            query_embedding=rng.standard_normal(args.dim),
+            top_k=10,
+        )
+        costs.append(time.perf_counter() - start)
+    print(f"Hybrid query: {_percentiles(costs)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,64 @@
+# -*- coding: utf-8 -*-
+"""Benchmark the batched similarity kernels against scoring the corpus
+pair by pair with `cos_sim`.
+
+Usage:
+
+    python scripts/benchmark/similarity_benchmark.py --num-corpus 100000
+"""
+import argparse
+import time
+
+import numpy as np
+
+from agentscope.service import (
+    cos_sim,
+    prepare_corpus,
+    top_k_similarity,
+)
+
+
+def main() -> None:
+    """Run the benchmark."""
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--num-corpus", type=int, default=100000)
+    parser.add_argument("--num-queries", type=int, default=32)
+    parser.add_argument("--dim", type=int, default=256)
+    parser.add_argument("--chunk-size", type=int, default=16384)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(args.seed)
+    corpus = rng.normal(size=(args.num_corpus, args.dim)).astype(np.float32)
+    queries = rng.normal(size=(args.num_queries, args.dim)).astype(np.float32)
+
+    # the pairwise baseline is measured on a single query and extrapolated
+    corpus_list = corpus.tolist()
+    start = time.perf_counter()
+    for emb in corpus_list:
+        cos_sim(queries[0], emb)
+    pairwise = (time.perf_counter() - start) * args.num_queries
+    print(
+        f"Pairwise cos_sim: {args.num_queries} queries x {args.num_corpus} "
+        f"in {pairwise:.2f} s (extrapolated from one query)",
+    )
+
+    for dtype in ["float32", "float16"]:
+        prepared = prepare_corpus(corpus, dtype=dtype)
+        start = time.perf_counter()
+        top_k_similarity(
+            queries,
+            prepared,
+            top_k=10,
+            chunk_size=args.chunk_size,
+            normalized=True,
+        )
+        cost = time.perf_counter() - start
+        print(
+            f"Batched top-k ({dtype}, {prepared.nbytes / 2**20:.0f} MiB): "
+            f"{cost * 1000:.1f} ms, {pairwise / cost:.0f}x faster",
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -2,11 +2,13 @@
 """Set up a local language model service."""
 import datetime
 import argparse
+from typing import List, Optional
 
 from flask import Flask
 from flask import request
 
 import transformers
+from agentscope.utils.batching import DynamicBatcher
 from agentscope.utils.tools import reform_dialogue
 
 
@@ -15,6 +17,46 @@ def create_timestamp(format_: str = "%Y-%m-%d %H:%M:%S") -> str:
     return datetime.datetime.now().strftime(format_)
 
 
+def generate_batch(requests: list) -> list:
+    """Generate the responses for a batch of (prompt, generation arguments)
+    requests, where the prompts with the same generation arguments are
+    padded and generated together."""
+    groups: dict = {}
+    for i, (_, kwargs) in enumerate(requests):
+        groups.setdefault(str(sorted(kwargs.items())), []).append(i)
+
+    results: List[Optional[dict]] = [None] * len(requests)
+    for indices in groups.values():
+        prompts = [requests[i][0] for i in indices]
+        kwargs = requests[indices[0]][1]
+
+        # the prompts are padded on the left for generation
+        inputs = tokenizer(prompts, return_tensors="pt", padding=True).to(
+            model.device,
+        )
+        output_ids = model.generate(
+            inputs.input_ids,
+            attention_mask=inputs.attention_mask,
+            **{"pad_token_id": tokenizer.pad_token_id, **kwargs},
+        )
+        new_ids = output_ids[:, inputs.input_ids.shape[1] :]
+        responses = tokenizer.batch_decode(
+            new_ids,
+            skip_special_tokens=True,
+            clean_up_tokenization_spaces=False,
+        )
+
+        for k, i in enumerate(indices):
+            results[i] = {
+                "response": responses[k],
+                "prompt_tokens": int(inputs.attention_mask[k].sum()),
+                "completion_tokens": int(
+                    (new_ids[k] != tokenizer.pad_token_id).sum(),
+                ),
+            }
+    return results
+
+
 app = Flask(__name__)
 
 
@@ -25,8 +67,6 @@ def get_response() -> dict:
 
     inputs = json.pop("inputs")
 
-    global model, tokenizer
-
     inputs = reform_dialogue(inputs)
 
     if hasattr(tokenizer, "apply_chat_template"):
@@ -46,30 +86,20 @@ def get_response() -> dict:
     print("=" * 80)
     print(f"[PROMPT]:\n{prompt}")
 
-    prompt_tokenized = tokenizer(prompt, return_tensors="pt").to(model.device)
-    prompt_tokens_input_ids = prompt_tokenized.input_ids[0]
-
-    response_ids = model.generate(
-        prompt_tokenized.input_ids,
-        **json,
-    )
-
-    new_response_ids = response_ids[:, len(prompt_tokens_input_ids) :]
-
-    response = tokenizer.batch_decode(
-        new_response_ids,
-        skip_special_tokens=True,
-        clean_up_tokenization_spaces=False,
-    )[0]
+    # the concurrent requests are generated together in batches
+    result = batcher((prompt, json))
+    response = result["response"]
+    prompt_tokens = result["prompt_tokens"]
+    completion_tokens = result["completion_tokens"]
 
     print(f"[RESPONSE]:\n{response}")
     print("=" * 80)
 
     return {
         "data": {
-            "completion_tokens": len(response_ids[0]),
+            "completion_tokens": completion_tokens,
             "messages": {},
-            "prompt_tokens": len(prompt_tokens_input_ids),
+            "prompt_tokens": prompt_tokens,
             "response": {
                 "choices": [
                     {
@@ -83,18 +113,12 @@ def get_response() -> dict:
                 "model": "flask_model",
                 "object": "text_completion",
                 "usage": {
-                    "completion_tokens": len(response_ids[0]),
-                    "prompt_tokens": len(prompt_tokens_input_ids),
-                    "total_tokens": len(response_ids[0])
-                    + len(
-                        prompt_tokens_input_ids,
-                    ),
+                    "completion_tokens": completion_tokens,
+                    "prompt_tokens": prompt_tokens,
+                    "total_tokens": completion_tokens + prompt_tokens,
                 },
             },
-            "total_tokens": len(response_ids[0])
-            + len(
-                prompt_tokens_input_ids,
-            ),
+            "total_tokens": completion_tokens + prompt_tokens,
             "username": "",
         },
     }
@@ -105,9 +129,11 @@ if __name__ == "__main__":
     parser.add_argument("--model_name_or_path", type=str, required=True)
     parser.add_argument("--device", type=str, default="auto")
     parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--max_batch_size", type=int, default=8)
+    parser.add_argument("--max_wait_ms", type=float, default=10.0)
     args = parser.parse_args()
 
-    global model, tokenizer
+    global model, tokenizer, batcher
 
     model = transformers.AutoModelForCausalLM.from_pretrained(
         args.model_name_or_path,
@@ -117,5 +143,14 @@ if __name__ == "__main__":
         args.model_name_or_path,
         use_fast=False,
     )
+    tokenizer.padding_side = "left"
+    if tokenizer.pad_token is None:
+        tokenizer.pad_token = tokenizer.eos_token
+
+    batcher = DynamicBatcher(
+        generate_batch,
+        max_batch_size=args.max_batch_size,
+        max_wait_ms=args.max_wait_ms,
+    )
 
-    app.run(port=args.port)
+    app.run(port=args.port, threaded=True)
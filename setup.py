@@ -102,7 +102,10 @@ setuptools.setup(
     keywords=["deep-learning", "multi agents", "agents"],
     package_dir={"": "src"},
     packages=setuptools.find_packages("src"),
-    package_data={"agentscope.web": ["static/**/*"]},
+    package_data={
+        "agentscope.web": ["static/**/*"],
+        "agentscope.utils": ["model_metadata.json"],
+    },
     install_requires=minimal_requires,
     extras_require={
         "distribute": distribute_requires,
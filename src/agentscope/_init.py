@@ -25,7 +25,7 @@ def init(
     save_dir: str = _DEFAULT_DIR,
     save_log: bool = True,
     save_code: bool = True,
-    save_api_invoke: bool = False,
+    save_api_invoke: Union[bool, str] = False,
     use_monitor: bool = True,
     logger_level: LOG_LEVEL = _DEFAULT_LOG_LEVEL,
     runtime_id: Optional[str] = None,
@@ -53,9 +53,12 @@ def init(
             Whether to save logs locally.
         save_code (`bool`, defaults to `False`):
             Whether to save codes locally.
-        save_api_invoke (`bool`, defaults to `False`):
+        save_api_invoke (`Union[bool, str]`, defaults to `False`):
             Whether to save api invocations locally, including model and web
-            search invocation.
+            search invocation. If `True`, each invocation is saved as a JSON
+            file. If "jsonl", "jsonl.gz" or "jsonl.zst", they're appended to
+            a (compressed) JSON lines log in the background, which can be
+            read by `agentscope.utils.invocation_log.read_invocations`.
         use_monitor (`bool`, defaults to `True`):
             Whether to activate the monitor.
         logger_level (`LOG_LEVEL`, defaults to `"INFO"`):
@@ -124,7 +127,7 @@ def init_process(
     name: Optional[str] = None,
     runtime_id: Optional[str] = None,
     save_dir: str = _DEFAULT_DIR,
-    save_api_invoke: bool = False,
+    save_api_invoke: Union[bool, str] = False,
     save_log: bool = False,
     use_monitor: bool = True,
     logger_level: LOG_LEVEL = _DEFAULT_LOG_LEVEL,
@@ -142,9 +145,12 @@ def init_process(
             The directory to save logs, files, codes, and api invocations.
             If `dir` is `None`, when saving logs, files, codes, and api
             invocations, the default directory `./runs` will be created.
-        save_api_invoke (`bool`, defaults to `False`):
+        save_api_invoke (`Union[bool, str]`, defaults to `False`):
             Whether to save api invocations locally, including model and web
-            search invocation.
+            search invocation. If `True`, each invocation is saved as a JSON
+            file. If "jsonl", "jsonl.gz" or "jsonl.zst", they're appended to
+            a (compressed) JSON lines log in the background, which can be
+            read by `agentscope.utils.invocation_log.read_invocations`.
         model_configs (`Optional[Sequence]`, defaults to `None`):
             A sequence of pre-init model configs.
         save_log (`bool`, defaults to `False`):
@@ -12,7 +12,12 @@ import uuid
 from loguru import logger
 
 from agentscope.agents.operator import Operator
-from agentscope.models import load_model_by_config_name
+from agentscope.message import Msg
+from agentscope.models import (
+    ModelResponse,
+    load_model_by_config_name,
+    release_model,
+)
 from agentscope.memory import TemporaryMemory
 
 
@@ -191,6 +196,7 @@ class AgentBase(Operator, metaclass=_AgentMeta):
             self.sys_prompt = sys_prompt
 
         # TODO: support to receive a ModelWrapper instance
+        self._model_config_name = model_config_name
         if model_config_name is not None:
             self.model = load_model_by_config_name(model_config_name)
 
@@ -288,6 +294,15 @@ class AgentBase(Operator, metaclass=_AgentMeta):
     def load_memory(self, memory: Sequence[dict]) -> None:
         r"""Load input memory."""
 
+    def close(self) -> None:
+        """Release the reference of the agent to the shared model wrapper,
+        which is removed from the registry when no agent uses it. The agent
+        shouldn't call the model after closing."""
+        config_name = getattr(self, "_model_config_name", None)
+        if config_name is not None:
+            release_model(config_name, getattr(self, "model", None))
+            self._model_config_name = None
+
     def __call__(self, *args: Any, **kwargs: Any) -> dict:
         """Calling the reply function, and broadcast the generated
         response to all audiences if needed."""
@@ -301,9 +316,29 @@ class AgentBase(Operator, metaclass=_AgentMeta):
 
     def speak(
         self,
-        content: Union[str, dict],
+        content: Union[str, dict, ModelResponse],
     ) -> None:
-        """Speak out the content generated by the agent."""
+        """Speak out the content generated by the agent.
+
+        Args:
+            content (`Union[str, dict, ModelResponse]`):
+                The content to speak. A message whose content is an iterator
+                of text deltas, or a `ModelResponse` in stream mode, is
+                printed incrementally as the tokens are generated. After
+                that, the message content (or the response text) holds the
+                whole text. An asynchronous stream, e.g. from `acall`,
+                can't be printed here and should be consumed by the caller.
+        """
+        if isinstance(content, ModelResponse):
+            content = Msg(self.name, content.stream, role="assistant")
+        if isinstance(content, dict) and hasattr(
+            content.get("content", None),
+            "__aiter__",
+        ):
+            raise TypeError(
+                "Cannot speak an asynchronous stream, iterate it with "
+                "`async for` and speak the text instead.",
+            )
         logger.chat(content)
 
     def observe(self, x: Union[dict, Sequence[dict]]) -> None:
@@ -362,6 +362,7 @@ async def setup_rpc_agent_server_async(
         await server.stop(10.0)
     else:
         await server.wait_for_termination()
+    servicer.close()
     logger.info(
         f"rpc server at port [{port}] stopped successfully",
     )
@@ -636,9 +637,17 @@ class AgentPlatform(RpcAgentServicer):
         """
         with self.agent_id_lock:
             if agent_id in self.agent_pool:
-                self.agent_pool.pop(agent_id)
+                self.agent_pool.pop(agent_id).close()
                 logger.info(f"delete agent instance [{agent_id}]")
 
+    def close(self) -> None:
+        """Close and delete all the agent instances, which is called when
+        the server is stopped."""
+        with self.agent_id_lock:
+            for agent in self.agent_pool.values():
+                agent.close()
+            self.agent_pool.clear()
+
     def call_func(  # pylint: disable=W0236
         self,
         request: RpcMsg,
@@ -41,6 +41,15 @@ You need to keep all the key information of the text in the summary.
 _DEFAULT_TOKEN_LIMIT_PROMPT = """
 Summarize the text after TEXT in less than {} tokens:
 """
+# for summary memory
+_DEFAULT_ROLLING_SUMMARY_PROMPT = """## Previous Summary
+{summary}
+
+## New Dialogue
+{dialogue}
+
+Update the previous summary with the new dialogue."""
+_DEFAULT_SUMMARY_MEMORY_TEMPLATE = "Summary of the earlier dialogue: {summary}"
 
 # typing
 Embedding = list[Number]
@@ -2,11 +2,16 @@
 """Manage the file system for saving files, code and logs."""
 import json
 import os
+import threading
 from typing import Any, Union, Optional
 
 import numpy as np
 
 from agentscope._runtime import _runtime
+from agentscope.utils.invocation_log import (
+    INVOCATION_LOG_FORMATS,
+    InvocationLogWriter,
+)
 from agentscope.utils.tools import _download_file, _get_timestamp
 from agentscope.utils.tools import _generate_random_code
 from agentscope.constants import (
@@ -19,6 +24,9 @@ from agentscope.constants import (
     _DEFAULT_CFG_NAME,
 )
 
+# the lock to create and close the invocation log
+_INVOCATION_LOG_LOCK = threading.Lock()
+
 
 class _FileManager:
     """A singleton class for managing the file system for saving files,
@@ -29,8 +37,12 @@ class _FileManager:
     dir: str = _DEFAULT_DIR
     """The directory for saving files, code and logs."""
 
-    save_api_invoke: bool = False
-    """Whether to save api invocation locally."""
+    save_api_invoke: Union[bool, str] = False
+    """Whether to save api invocation locally, as separate JSON files if
+    `True`, or in an append-only log of the given format, i.e. "jsonl",
+    "jsonl.gz" or "jsonl.zst"."""
+
+    _invocation_log: Optional[InvocationLogWriter] = None
 
     def __new__(cls, *args: Any, **kwargs: Any) -> Any:
         """Create a singleton instance."""
@@ -84,12 +96,26 @@ class _FileManager:
         """The path to the sqlite db file."""
         return self._get_file_path(_DEFAULT_SQLITE_DB_PATH)
 
-    def init(self, save_dir: str, save_api_invoke: bool = False) -> None:
+    def init(
+        self,
+        save_dir: str,
+        save_api_invoke: Union[bool, str] = False,
+    ) -> None:
         """Set the directory for saving files."""
+        if (
+            isinstance(save_api_invoke, str)
+            and save_api_invoke not in INVOCATION_LOG_FORMATS
+        ):
+            raise ValueError(
+                f"Unsupported format of api invocations [{save_api_invoke}], "
+                f"expected one of {INVOCATION_LOG_FORMATS}.",
+            )
+
         self.dir = save_dir
         runtime_dir = os.path.join(save_dir, _runtime.runtime_id)
         os.makedirs(runtime_dir, exist_ok=True)
 
+        self.close_invocation_log()
         self.save_api_invoke = save_api_invoke
 
         # Save the project and name to the runtime directory
@@ -116,6 +142,8 @@ class _FileManager:
         record: dict,
     ) -> Union[None, str]:
         """Save api invocation locally."""
+        if isinstance(self.save_api_invoke, str):
+            return self._append_invocation_log(record)
         if self.save_api_invoke:
             filename = f"{prefix}_{_generate_random_code()}.json"
             path_save = os.path.join(str(self.dir_invoke), filename)
@@ -126,6 +154,27 @@ class _FileManager:
         else:
             return None
 
+    def _append_invocation_log(self, record: dict) -> str:
+        """Append the api invocation to the log of this process, which is
+        written in the background."""
+        with _INVOCATION_LOG_LOCK:
+            if self._invocation_log is None:
+                filename = f"invocations_{os.getpid()}.{self.save_api_invoke}"
+                self._invocation_log = InvocationLogWriter(
+                    os.path.join(str(self.dir_invoke), filename),
+                )
+            invocation_log = self._invocation_log
+        invocation_log.write(record)
+        return os.path.basename(invocation_log.path)
+
+    def close_invocation_log(self) -> None:
+        """Write the remaining api invocations and close the log, which is
+        reopened by the next invocation."""
+        with _INVOCATION_LOG_LOCK:
+            if self._invocation_log is not None:
+                self._invocation_log.close()
+                self._invocation_log = None
+
     def save_image(
         self,
         image: Union[str, np.ndarray],
@@ -169,6 +218,7 @@ class _FileManager:
         Flush the file_manager singleton.
         """
         global file_manager
+        file_manager.close_invocation_log()
         file_manager = _FileManager()
 
 
@@ -6,8 +6,10 @@ import al memory related modules
 
 from .memory import MemoryBase
 from .temporary_memory import TemporaryMemory
+from .summary_memory import SummaryMemory
 
 __all__ = [
     "MemoryBase",
     "TemporaryMemory",
+    "SummaryMemory",
 ]
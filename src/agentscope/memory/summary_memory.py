@@ -0,0 +1,354 @@
+# -*- coding: utf-8 -*-
+"""
+Memory module that summarizes the evicted messages incrementally
+"""
+
+import threading
+from concurrent import futures
+from typing import Callable, Iterable, Optional, Sequence, Union
+
+from loguru import logger
+
+from .temporary_memory import TemporaryMemory
+from ..constants import (
+    _DEFAULT_ROLLING_SUMMARY_PROMPT,
+    _DEFAULT_SUMMARY_MEMORY_TEMPLATE,
+)
+from ..message import MessageBase, Msg
+from ..models import ModelWrapperBase, load_model_by_config_name
+from ..service.service_status import ServiceExecStatus
+from ..service.text_processing.summarization import summarization
+from ..utils.tools import _convert_to_str
+
+_SUMMARY_EXECUTOR = None
+_SUMMARY_EXECUTOR_LOCK = threading.Lock()
+
+
+def _get_summary_executor() -> futures.ThreadPoolExecutor:
+    """Get the thread pool shared by all summary memories, which is created
+    on the first use."""
+    global _SUMMARY_EXECUTOR
+    with _SUMMARY_EXECUTOR_LOCK:
+        if _SUMMARY_EXECUTOR is None:
+            _SUMMARY_EXECUTOR = futures.ThreadPoolExecutor(
+                thread_name_prefix="summary_memory",
+            )
+    return _SUMMARY_EXECUTOR
+
+
+def _approximate_token_count(text: str) -> int:
+    """A rough token count that assumes 4 characters per token."""
+    return len(text) // 4 + 1
+
+
+class SummaryMemory(TemporaryMemory):
+    """
+    In-memory memory module that maintains a rolling summary of the evicted
+    messages. When the un-summarized messages exceed `max_tokens`, the
+    oldest ones are summarized into the rolling summary in a background
+    thread, so that `get_memory` returns the summary followed by the
+    recent messages with bounded size, without blocking the reply.
+    """
+
+    def __init__(
+        self,
+        model: Union[str, ModelWrapperBase],
+        config: Optional[dict] = None,
+        max_tokens: int = 2000,
+        keep_tokens: Optional[int] = None,
+        summary_tokens: int = 500,
+        token_counter: Optional[Callable[[str], int]] = None,
+        embedding_model: Union[str, Callable] = None,
+    ) -> None:
+        """
+        Summary memory module for conversation.
+        Args:
+            model (Union[str, ModelWrapperBase]):
+                the model (or its config name) used to summarize the
+                evicted messages.
+            config (dict):
+                configuration of the memory
+            max_tokens (int, defaults to `2000`):
+                the summarization is triggered when the un-summarized
+                messages exceed this number of tokens.
+            keep_tokens (Optional[int], defaults to `None`):
+                the number of tokens of the recent messages kept verbatim
+                after summarization. Defaults to half of `max_tokens`.
+            summary_tokens (int, defaults to `500`):
+                the token limit of the summary, which is passed to the
+                summarization prompt.
+            token_counter (Optional[Callable[[str], int]]):
+                the function to count tokens of a string. A rough
+                character-based estimation is used if not provided.
+            embedding_model (Union[str, Callable])
+                if the temporary memory needs to be embedded,
+                then either pass the name of embedding model or
+                the embedding model itself.
+        """
+        super().__init__(config=config, embedding_model=embedding_model)
+
+        if isinstance(model, str):
+            self.model = load_model_by_config_name(model)
+        else:
+            self.model = model
+
+        self.max_tokens = max_tokens
+        self.keep_tokens = (
+            max_tokens // 2 if keep_tokens is None else keep_tokens
+        )
+        self.summary_tokens = summary_tokens
+        self.token_counter = token_counter or _approximate_token_count
+
+        self.summary = None
+        self._summary_msg = None
+        self._token_counts = {}
+        self._pending = None
+        # bumped by `clear`, so that the summarization submitted before
+        # clearing is discarded
+        self._generation = 0
+        self._lock = threading.RLock()
+
+    def add(
+        self,
+        memories: Union[Sequence[dict], dict, None],
+        embed: bool = False,
+    ) -> None:
+        """
+        Adding new memory fragment, and trigger the summarization in
+        background if the un-summarized messages are too long.
+        Args:
+            memories (Union[Sequence[dict], dict, None]):
+                memories to be added. If the memory is not in MessageBase,
+                it will first be converted into a message type.
+            embed (bool):
+                whether to generate embedding for the new added memories
+        """
+        with self._lock:
+            super().add(memories, embed=embed)
+            self._maybe_summarize()
+
+    def get_memory(
+        self,
+        recent_n: Optional[int] = None,
+        filter_func: Optional[Callable[[int, dict], bool]] = None,
+    ) -> list:
+        """Retrieve memory, where the rolling summary (if any) is placed
+        after the leading system messages.
+
+        Args:
+            recent_n (`Optional[int]`, default `None`):
+                The last number of memories to return.
+            filter_func
+                (`Callable[[int, dict], bool]`, default to `None`):
+                The function to filter memories, which take the index and
+                memory unit as input, and return a boolean value.
+        """
+        with self._lock:
+            memories = list(self._content)
+            if self._summary_msg is not None:
+                n_system = 0
+                while (
+                    n_system < len(memories)
+                    and memories[n_system].role == "system"
+                ):
+                    n_system += 1
+                memories.insert(n_system, self._summary_msg)
+
+        if recent_n is not None:
+            memories = memories[-recent_n:]
+
+        if filter_func is not None:
+            memories = [_ for i, _ in enumerate(memories) if filter_func(i, _)]
+
+        return memories
+
+    def delete(self, index: Union[Iterable, int]) -> None:
+        """
+        Delete memory fragments by their indices, and drop their cached
+        token counts.
+        Args:
+            index (Union[Iterable, int]):
+                indices of the memory fragments to delete
+        """
+        with self._lock:
+            super().delete(index)
+            self._prune_token_counts()
+
+    def delete_where(
+        self,
+        predicate: Callable[[int, dict], bool],
+    ) -> int:
+        """Delete all memory fragments satisfying the predicate, and drop
+        their cached token counts.
+
+        Args:
+            predicate (`Callable[[int, dict], bool]`):
+                The function to decide which memories should be deleted,
+                taking the index and memory unit as input, and return True
+                (delete this memory) or False (keep it).
+
+        Returns:
+            `int`: The number of deleted memory fragments.
+        """
+        with self._lock:
+            num_deleted = super().delete_where(predicate)
+            self._prune_token_counts()
+            return num_deleted
+
+    def delete_range(
+        self,
+        start: Optional[int] = None,
+        end: Optional[int] = None,
+    ) -> int:
+        """Delete the memory fragments in range [`start`, `end`), and drop
+        their cached token counts.
+
+        Args:
+            start (`Optional[int]`, defaults to `None`):
+                The start index of the deleted range.
+            end (`Optional[int]`, defaults to `None`):
+                The end index (exclusive) of the deleted range.
+
+        Returns:
+            `int`: The number of deleted memory fragments.
+        """
+        with self._lock:
+            num_deleted = super().delete_range(start, end)
+            self._prune_token_counts()
+            return num_deleted
+
+    def load(
+        self,
+        memories: Union[str, list[MessageBase], MessageBase],
+        overwrite: bool = False,
+    ) -> None:
+        """
+        Load memory from file or messages, where clearing (if `overwrite`)
+        and adding happen atomically with respect to the background
+        summarization.
+        Args:
+            memories (Union[str, list[MessageBase], MessageBase]):
+                memories to be loaded, see `TemporaryMemory.load`.
+            overwrite (bool):
+                if True, clear the current memory and the rolling summary
+                before loading the new ones.
+        """
+        with self._lock:
+            super().load(memories, overwrite=overwrite)
+
+    def clear(self) -> None:
+        """Clean memory and the rolling summary."""
+        with self._lock:
+            super().clear()
+            self.summary = None
+            self._summary_msg = None
+            self._token_counts = {}
+            self._pending = None
+            self._generation += 1
+
+    def flush(self, timeout: Optional[float] = None) -> None:
+        """Wait for the pending summarizations to finish.
+
+        Args:
+            timeout (`Optional[float]`, defaults to `None`):
+                The maximum number of seconds to wait for each summarization.
+        """
+        pending = self._pending
+        while pending is not None:
+            done, _ = futures.wait([pending], timeout=timeout)
+            if len(done) == 0 or self._pending is pending:
+                break
+            pending = self._pending
+
+    def _count_tokens(self, memory_unit: MessageBase) -> int:
+        """Count the tokens of a memory unit with cache."""
+        if memory_unit.id not in self._token_counts:
+            self._token_counts[memory_unit.id] = self.token_counter(
+                f"{memory_unit.name}: {_convert_to_str(memory_unit.content)}",
+            )
+        return self._token_counts[memory_unit.id]
+
+    def _prune_token_counts(self) -> None:
+        """Drop the cached token counts of the deleted memories."""
+        self._token_counts = {
+            memory_id: count
+            for memory_id, count in self._token_counts.items()
+            if memory_id in self._ids
+        }
+
+    def _maybe_summarize(self) -> None:
+        """Submit a summarization job if the un-summarized messages exceed
+        the token threshold and no job is running."""
+        if self._pending is not None:
+            return
+
+        candidates = [_ for _ in self._content if _.role != "system"]
+        counts = [self._count_tokens(_) for _ in candidates]
+        total = sum(counts)
+        if total <= self.max_tokens:
+            return
+
+        # evict the oldest messages until the rest fit in `keep_tokens`
+        evicted = []
+        for memory_unit, count in zip(candidates, counts):
+            if total <= self.keep_tokens:
+                break
+            evicted.append(memory_unit)
+            total -= count
+
+        self._pending = _get_summary_executor().submit(
+            self._summarize,
+            self.summary,
+            evicted,
+            self._generation,
+        )
+
+    def _summarize(
+        self,
+        summary: Optional[str],
+        evicted: list,
+        generation: int,
+    ) -> None:
+        """Merge the evicted messages into the rolling summary, and remove
+        them from the memory."""
+        try:
+            dialogue = "\n".join(
+                f"{_.name}: {_convert_to_str(_.content)}" for _ in evicted
+            )
+            response = summarization(
+                self.model,
+                _DEFAULT_ROLLING_SUMMARY_PROMPT.format(
+                    summary=summary or "",
+                    dialogue=dialogue,
+                ),
+                max_return_token=self.summary_tokens,
+            )
+        except Exception as e:
+            logger.warning(f"Fail to summarize the memory: {e}")
+            response = None
+
+        with self._lock:
+            if generation != self._generation:
+                return
+            self._pending = None
+            if (
+                response is not None
+                and response.status == ServiceExecStatus.SUCCESS
+            ):
+                evicted_ids = set(_.id for _ in evicted)
+                self.delete_where(lambda i, _: _.id in evicted_ids)
+                self.summary = response.content
+                self._summary_msg = Msg(
+                    "system",
+                    _DEFAULT_SUMMARY_MEMORY_TEMPLATE.format(
+                        summary=self.summary,
+                    ),
+                    role="system",
+                )
+                # the messages added during summarization may exceed the
+                # threshold again
+                self._maybe_summarize()
+            elif response is not None:
+                logger.warning(
+                    f"Fail to summarize the memory: {response.content}",
+                )
@@ -5,11 +5,13 @@ Memory module for conversation
 
 import json
 import os
+from collections import defaultdict
 from typing import Iterable, Sequence
 from typing import Optional
 from typing import Union
 from typing import Callable
 
+import numpy as np
 from loguru import logger
 
 from .memory import MemoryBase
@@ -35,6 +37,7 @@ class TemporaryMemory(MemoryBase):
         self,
         config: Optional[dict] = None,
         embedding_model: Union[str, Callable] = None,
+        compaction_ratio: float = 0.5,
     ) -> None:
         """
         Temporary memory module for conversation.
@@ -45,11 +48,30 @@ class TemporaryMemory(MemoryBase):
                 if the temporary memory needs to be embedded,
                 then either pass the name of embedding model or
                 the embedding model itself.
+            compaction_ratio (float, defaults to `0.5`):
+                the secondary indices by `name` and `role` are cleaned up
+                lazily. Deleted memories are kept as tombstones until their
+                number exceeds `compaction_ratio` times the number of
+                memories, then the indices are compacted.
         """
         super().__init__(config)
 
         self._content = []
 
+        # ids of the memories in `_content`, used to skip duplicates
+        self._ids = set()
+
+        # secondary indices from name/role to memories in insertion order,
+        # where the deleted memories are recorded as tombstones by their ids
+        self._name_index = defaultdict(list)
+        self._role_index = defaultdict(list)
+        self._tombstones = set()
+        self.compaction_ratio = compaction_ratio
+
+        # the stacked embeddings of all memories, which is reset once the
+        # memories are added or deleted
+        self._embedding_matrix: Optional[np.ndarray] = None
+
         # prepare embedding model if needed
         if isinstance(embedding_model, str):
             self.embedding_model = load_model_by_config_name(embedding_model)
@@ -79,8 +101,6 @@ class TemporaryMemory(MemoryBase):
         else:
             record_memories = memories
 
-        # if memory doesn't have id attribute, we skip the checking
-        memories_idx = set(_.id for _ in self._content if hasattr(_, "id"))
         for memory_unit in record_memories:
             if not issubclass(type(memory_unit), MessageBase):
                 try:
@@ -104,10 +124,7 @@ class TemporaryMemory(MemoryBase):
                 memory_unit = Msg(**memory_unit)
 
             # add to memory if it's new
-            if (
-                not hasattr(memory_unit, "id")
-                or memory_unit.id not in memories_idx
-            ):
+            if memory_unit.id not in self._ids:
                 if embed:
                     if self.embedding_model:
                         # TODO: embed only content or its string representation
@@ -118,6 +135,7 @@ class TemporaryMemory(MemoryBase):
                     else:
                         raise RuntimeError("Embedding model is not provided.")
                 self._content.append(memory_unit)
+                self._index(memory_unit)
 
     def delete(self, index: Union[Iterable, int]) -> None:
         """
@@ -137,7 +155,7 @@ class TemporaryMemory(MemoryBase):
         if isinstance(index, int):
             index = [index]
 
-        if isinstance(index, list):
+        if isinstance(index, (list, tuple, set)):
             index = set(index)
 
             invalid_index = [_ for _ in index if _ >= self.size() or _ < 0]
@@ -146,15 +164,71 @@ class TemporaryMemory(MemoryBase):
                     f"Skip delete operation for the invalid "
                     f"index {invalid_index}",
                 )
-
-            self._content = [
-                _ for i, _ in enumerate(self._content) if i not in index
-            ]
+                index.difference_update(invalid_index)
+
+            if len(index) * 8 < self.size():
+                # deleting a few items in place is cheaper than rebuilding
+                # the whole list
+                for i in sorted(index, reverse=True):
+                    self._tombstone(self._content[i])
+                    del self._content[i]
+                self._maybe_compact()
+            else:
+                self._rebuild(
+                    [_ for i, _ in enumerate(self._content) if i not in index],
+                )
         else:
             raise NotImplementedError(
                 "index type only supports {None, int, list}",
             )
 
+    def delete_where(
+        self,
+        predicate: Callable[[int, dict], bool],
+    ) -> int:
+        """Delete all memory fragments satisfying the predicate in a single
+        pass.
+
+        Args:
+            predicate (`Callable[[int, dict], bool]`):
+                The function to decide which memories should be deleted,
+                taking the index and memory unit as input, and return True
+                (delete this memory) or False (keep it).
+
+        Returns:
+            `int`: The number of deleted memory fragments.
+        """
+        kept = [_ for i, _ in enumerate(self._content) if not predicate(i, _)]
+        num_deleted = self.size() - len(kept)
+        if num_deleted > 0:
+            self._rebuild(kept)
+        return num_deleted
+
+    def delete_range(
+        self,
+        start: Optional[int] = None,
+        end: Optional[int] = None,
+    ) -> int:
+        """Delete the memory fragments in range [`start`, `end`), which
+        follows the slicing semantic of python list, e.g. `delete_range(
+        end=-10)` keeps the most recent 10 memories only.
+
+        Args:
+            start (`Optional[int]`, defaults to `None`):
+                The start index of the deleted range.
+            end (`Optional[int]`, defaults to `None`):
+                The end index (exclusive) of the deleted range.
+
+        Returns:
+            `int`: The number of deleted memory fragments.
+        """
+        deleted = self._content[start:end]
+        for memory_unit in deleted:
+            self._tombstone(memory_unit)
+        del self._content[start:end]
+        self._maybe_compact()
+        return len(deleted)
+
     def export(
         self,
         file_path: Optional[str] = None,
@@ -236,7 +310,7 @@ class TemporaryMemory(MemoryBase):
 
     def clear(self) -> None:
         """Clean memory, depending on how the memory are stored"""
-        self._content = []
+        self._rebuild([])
 
     def size(self) -> int:
         """Returns the number of memory segments in memory."""
@@ -245,7 +319,7 @@ class TemporaryMemory(MemoryBase):
     def retrieve_by_embedding(
         self,
         query: Union[str, Embedding],
-        metric: Callable[[Embedding, Embedding], float],
+        metric: Union[Callable[[Embedding, Embedding], float], str],
         top_k: int = 1,
         preserve_order: bool = True,
         embedding_model: Callable[[Union[str, dict]], Embedding] = None,
@@ -259,6 +333,8 @@ class TemporaryMemory(MemoryBase):
                 A metric to compute the relevance between embeddings of query
                 and memory. In default, higher relevance means better match,
                 and you can set `reverse` to `True` to reverse the order.
+                A metric name ("cosine", "dot" or "l2") scores all the
+                memory units in one batch.
             top_k (`int`, defaults to `1`):
                 The number of memory units to retrieve.
             preserve_order (`bool`, defaults to `True`):
@@ -276,7 +352,10 @@ class TemporaryMemory(MemoryBase):
 
         retrieved_items = retrieve_from_list(
             query,
-            self.get_embeddings(embedding_model or self.embedding_model),
+            self.get_embeddings(
+                embedding_model or self.embedding_model,
+                as_array=isinstance(metric, str),
+            ),
             metric,
             top_k,
             self.embedding_model,
@@ -299,7 +378,8 @@ class TemporaryMemory(MemoryBase):
     def get_embeddings(
         self,
         embedding_model: Callable[[Union[str, dict]], Embedding] = None,
-    ) -> list:
+        as_array: bool = False,
+    ) -> Union[list, np.ndarray]:
         """Get embeddings of all memory units. If `embedding_model` is
         provided, the memory units that doesn't have `embedding` attribute
         will be embedded. Otherwise, its embedding will be `None`.
@@ -309,10 +389,18 @@ class TemporaryMemory(MemoryBase):
                 (`Callable[[Union[str, dict]], Embedding]`, defaults to
                 `None`):
                 Embedding model or embedding vector.
+            as_array (`bool`, defaults to `False`):
+                Whether to stack the embeddings into one array in shape
+                [n, dim], which requires all memory units to be embedded.
 
         Returns:
-            `list[Union[Embedding, None]]`: List of embeddings or None.
+            `Union[list[Union[Embedding, None]], np.ndarray]`: List of
+            embeddings or None, or the stacked array, which is cached until
+            the memories are added or deleted and should not be modified.
         """
+        if as_array and self._embedding_matrix is not None:
+            return self._embedding_matrix
+
         embeddings = []
         for memory_unit in self._content:
             if memory_unit.embedding is None and embedding_model is not None:
@@ -320,6 +408,17 @@ class TemporaryMemory(MemoryBase):
                 # TODO: embed only content or its string representation
                 memory_unit.embedding = embedding_model(memory_unit)
             embeddings.append(memory_unit.embedding)
+
+        if as_array:
+            if any(_ is None for _ in embeddings):
+                raise ValueError(
+                    "Cannot stack the embeddings into an array, since some "
+                    "memory units are not embedded.",
+                )
+            matrix = np.stack(embeddings) if embeddings else np.empty((0, 0))
+            matrix.flags.writeable = False
+            self._embedding_matrix = matrix
+            return matrix
         return embeddings
 
     def get_memory(
@@ -356,3 +455,93 @@ class TemporaryMemory(MemoryBase):
             memories = [_ for i, _ in enumerate(memories) if filter_func(i, _)]
 
         return memories
+
+    def get_memory_by(
+        self,
+        name: Optional[str] = None,
+        role: Optional[str] = None,
+        recent_n: Optional[int] = None,
+    ) -> list:
+        """Retrieve memories sent by the given name and/or role with the
+        secondary indices, which avoids scanning the whole memory.
+
+        Args:
+            name (`Optional[str]`, defaults to `None`):
+                The name of the sender.
+            role (`Optional[str]`, defaults to `None`):
+                The role of the sender, e.g. "user", "assistant" or "system".
+            recent_n (`Optional[int]`, defaults to `None`):
+                The last number of matched memories to return.
+
+        Returns:
+            `list`: The matched memories in their original order.
+        """
+        if name is None and role is None:
+            return self.get_memory(recent_n=recent_n)
+
+        if name is None:
+            candidates = self._role_index.get(role, [])
+        elif role is None:
+            candidates = self._name_index.get(name, [])
+        else:
+            by_name = self._name_index.get(name, [])
+            by_role = self._role_index.get(role, [])
+            if len(by_name) <= len(by_role):
+                candidates = [_ for _ in by_name if _.role == role]
+            else:
+                candidates = [_ for _ in by_role if _.name == name]
+
+        if len(self._tombstones) > 0:
+            candidates = [
+                _ for _ in candidates if _.id not in self._tombstones
+            ]
+
+        if recent_n is not None:
+            return candidates[-recent_n:] if recent_n > 0 else []
+        return list(candidates)
+
+    def _index(self, memory_unit: MessageBase) -> None:
+        """Record a newly added memory unit in the secondary indices."""
+        self._embedding_matrix = None
+        if memory_unit.id in self._tombstones:
+            # the memory was deleted before, rebuild the indices from the
+            # content (which already contains it) to drop the stale entries
+            self._compact()
+            return
+        self._ids.add(memory_unit.id)
+        self._name_index[memory_unit.get("name")].append(memory_unit)
+        self._role_index[memory_unit.get("role")].append(memory_unit)
+
+    def _tombstone(self, memory_unit: MessageBase) -> None:
+        """Mark a memory unit as deleted in the secondary indices."""
+        self._embedding_matrix = None
+        self._ids.discard(memory_unit.id)
+        self._tombstones.add(memory_unit.id)
+
+    def _rebuild(self, content: list) -> None:
+        """Replace the content with the given memories and rebuild the
+        secondary indices."""
+        self._content = content
+        self._embedding_matrix = None
+        self._compact()
+
+    def _maybe_compact(self) -> None:
+        """Compact the secondary indices if there are too many
+        tombstones."""
+        if len(self._tombstones) > self.compaction_ratio * max(
+            self.size(),
+            1,
+        ):
+            self._compact()
+
+    def _compact(self) -> None:
+        """Rebuild the secondary indices from the content and drop all
+        tombstones."""
+        self._ids = set()
+        self._name_index = defaultdict(list)
+        self._role_index = defaultdict(list)
+        self._tombstones = set()
+        for memory_unit in self._content:
+            self._ids.add(memory_unit.id)
+            self._name_index[memory_unit.get("name")].append(memory_unit)
+            self._role_index[memory_unit.get("role")].append(memory_unit)
@@ -1,49 +1,69 @@
 # -*- coding: utf-8 -*-
 """ Import modules in models package."""
+import importlib
 import json
-from typing import Union, Type
+import threading
+from functools import partial
+from typing import TYPE_CHECKING, Any, Callable, Optional, Union, Type
 
 from loguru import logger
 
 from .config import _ModelConfig
+from .cache import ResponseCache
+from .coalescing import SingleFlight
+from .hedging import HedgingPolicy
+from .rate_limiter import RateLimiter
+from .retry import RetryPolicy
+from .truncation import ContextTruncator
+from ..utils.image_cache import ImageCache
 from .model import ModelWrapperBase
 from .response import ModelResponse
 from .post_model import (
     PostAPIModelWrapperBase,
     PostAPIChatWrapper,
 )
-from .openai_model import (
-    OpenAIWrapperBase,
-    OpenAIChatWrapper,
-    OpenAIDALLEWrapper,
-    OpenAIEmbeddingWrapper,
-)
-from .dashscope_model import (
-    DashScopeChatWrapper,
-    DashScopeImageSynthesisWrapper,
-    DashScopeTextEmbeddingWrapper,
-    DashScopeMultiModalWrapper,
-)
-from .ollama_model import (
-    OllamaChatWrapper,
-    OllamaEmbeddingWrapper,
-    OllamaGenerationWrapper,
-)
-from .gemini_model import (
-    GeminiChatWrapper,
-    GeminiEmbeddingWrapper,
-)
-from .zhipu_model import (
-    ZhipuAIChatWrapper,
-    ZhipuAIEmbeddingWrapper,
-)
-from .litellm_model import (
-    LiteLLMChatWrapper,
-)
+from .router_model import RouterModelWrapper
+from ..utils.model_metadata import register_model_metadata
 
+if TYPE_CHECKING:
+    # the provider wrappers are imported lazily by `__getattr__` below
+    from .openai_model import (
+        OpenAIWrapperBase,
+        OpenAIChatWrapper,
+        OpenAIDALLEWrapper,
+        OpenAIEmbeddingWrapper,
+    )
+    from .dashscope_model import (
+        DashScopeChatWrapper,
+        DashScopeImageSynthesisWrapper,
+        DashScopeTextEmbeddingWrapper,
+        DashScopeMultiModalWrapper,
+    )
+    from .ollama_model import (
+        OllamaChatWrapper,
+        OllamaEmbeddingWrapper,
+        OllamaGenerationWrapper,
+    )
+    from .gemini_model import (
+        GeminiChatWrapper,
+        GeminiEmbeddingWrapper,
+    )
+    from .zhipu_model import (
+        ZhipuAIChatWrapper,
+        ZhipuAIEmbeddingWrapper,
+    )
+    from .litellm_model import (
+        LiteLLMChatWrapper,
+    )
 
 __all__ = [
     "ModelWrapperBase",
+    "ResponseCache",
+    "RateLimiter",
+    "RetryPolicy",
+    "HedgingPolicy",
+    "ContextTruncator",
+    "SingleFlight",
     "ModelResponse",
     "PostAPIModelWrapperBase",
     "PostAPIChatWrapper",
@@ -63,13 +83,77 @@ __all__ = [
     "ZhipuAIChatWrapper",
     "ZhipuAIEmbeddingWrapper",
     "LiteLLMChatWrapper",
+    "RouterModelWrapper",
     "load_model_by_config_name",
+    "release_model",
     "read_model_configs",
     "clear_model_configs",
 ]
 
+# the model wrappers of the providers, whose modules (and SDKs) are
+# imported on first use rather than at package import
+_LAZY_WRAPPERS = {
+    "OpenAIWrapperBase": "openai_model",
+    "OpenAIChatWrapper": "openai_model",
+    "OpenAIDALLEWrapper": "openai_model",
+    "OpenAIEmbeddingWrapper": "openai_model",
+    "DashScopeChatWrapper": "dashscope_model",
+    "DashScopeImageSynthesisWrapper": "dashscope_model",
+    "DashScopeTextEmbeddingWrapper": "dashscope_model",
+    "DashScopeMultiModalWrapper": "dashscope_model",
+    "OllamaChatWrapper": "ollama_model",
+    "OllamaEmbeddingWrapper": "ollama_model",
+    "OllamaGenerationWrapper": "ollama_model",
+    "GeminiChatWrapper": "gemini_model",
+    "GeminiEmbeddingWrapper": "gemini_model",
+    "ZhipuAIChatWrapper": "zhipu_model",
+    "ZhipuAIEmbeddingWrapper": "zhipu_model",
+    "LiteLLMChatWrapper": "litellm_model",
+}
+
+# the model types (including the deprecated ones) of the lazy wrappers
+_LAZY_MODEL_TYPES = {
+    "openai_chat": "openai_model",
+    "openai": "openai_model",
+    "openai_dall_e": "openai_model",
+    "openai_embedding": "openai_model",
+    "dashscope_chat": "dashscope_model",
+    "tongyi_chat": "dashscope_model",
+    "dashscope_image_synthesis": "dashscope_model",
+    "dashscope_text_embedding": "dashscope_model",
+    "dashscope_multimodal": "dashscope_model",
+    "ollama_chat": "ollama_model",
+    "ollama_embedding": "ollama_model",
+    "ollama_generate": "ollama_model",
+    "gemini_chat": "gemini_model",
+    "gemini_embedding": "gemini_model",
+    "zhipuai_chat": "zhipu_model",
+    "zhipuai_embedding": "zhipu_model",
+    "litellm_chat": "litellm_model",
+}
+
+
+def __getattr__(name: str) -> Any:
+    """Import the lazy model wrappers on first access."""
+    if name in _LAZY_WRAPPERS:
+        module = importlib.import_module(f".{_LAZY_WRAPPERS[name]}", __name__)
+        return getattr(module, name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
 _MODEL_CONFIGS: dict[str, dict] = {}
 
+_MODEL_CACHES: dict[str, ResponseCache] = {}
+_MODEL_RATE_LIMITERS: dict[str, RateLimiter] = {}
+_MODEL_SINGLE_FLIGHTS: dict[str, SingleFlight] = {}
+
+# the shared model wrappers and their reference counts by config name
+_MODEL_INSTANCES: dict[str, ModelWrapperBase] = {}
+_MODEL_REF_COUNTS: dict[str, int] = {}
+_MODEL_LOCK = threading.RLock()
+# the locks to create the shared model wrapper of each config only once
+_MODEL_CREATION_LOCKS: dict[str, threading.Lock] = {}
+
 
 def _get_model_wrapper(model_type: str) -> Type[ModelWrapperBase]:
     """Get the specific type of model wrapper
@@ -80,6 +164,11 @@ def _get_model_wrapper(model_type: str) -> Type[ModelWrapperBase]:
     Returns:
         `Type[ModelWrapperBase]`: The corresponding model wrapper class.
     """
+    # the wrappers are registered when their modules are imported
+    module = _LAZY_MODEL_TYPES.get(model_type, _LAZY_WRAPPERS.get(model_type))
+    if module is not None:
+        importlib.import_module(f".{module}", __name__)
+
     wrapper = ModelWrapperBase.get_wrapper(model_type=model_type)
     if wrapper is None:
         logger.warning(
@@ -90,8 +179,86 @@ def _get_model_wrapper(model_type: str) -> Type[ModelWrapperBase]:
     return wrapper
 
 
-def load_model_by_config_name(config_name: str) -> ModelWrapperBase:
-    """Load the model by config name."""
+def load_model_by_config_name(
+    config_name: str,
+    shared: Optional[bool] = None,
+) -> ModelWrapperBase:
+    """Load the model by config name.
+
+    Args:
+        config_name (`str`):
+            The name of the model config.
+        shared (`Optional[bool]`, defaults to `None`):
+            Whether to return the model wrapper shared by all callers
+            loading the same config, which is reference-counted and can be
+            released by `release_model`, e.g. when an agent is closed. If
+            `None`, it's decided by the `"shared"` field of the model
+            config, which defaults to `True`.
+
+    Returns:
+        `ModelWrapperBase`: The model wrapper.
+    """
+    with _MODEL_LOCK:
+        if shared is None:
+            config = _MODEL_CONFIGS.get(config_name, None)
+            shared = config is None or config.get("shared", True)
+        creation_lock = _MODEL_CREATION_LOCKS.setdefault(
+            config_name,
+            threading.Lock(),
+        )
+
+    # the wrappers are created outside the global lock, since a slow
+    # constructor (e.g. with network access) shouldn't block loading the
+    # other configs
+    if not shared:
+        return _create_model(config_name)
+
+    with creation_lock:
+        with _MODEL_LOCK:
+            if config_name in _MODEL_INSTANCES:
+                _MODEL_REF_COUNTS[config_name] += 1
+                return _MODEL_INSTANCES[config_name]
+
+        model = _create_model(config_name)
+        with _MODEL_LOCK:
+            _MODEL_INSTANCES[config_name] = model
+            _MODEL_REF_COUNTS[config_name] = 1
+        return model
+
+
+def release_model(
+    config_name: str,
+    model: Optional[ModelWrapperBase] = None,
+) -> bool:
+    """Release a reference to the shared model wrapper of the config, which
+    is removed when no reference is left.
+
+    Args:
+        config_name (`str`):
+            The name of the model config.
+        model (`Optional[ModelWrapperBase]`, defaults to `None`):
+            The model wrapper to release. If given, the reference is only
+            released when it's the shared one, e.g. not a model wrapper
+            loaded with `shared=False`.
+
+    Returns:
+        `bool`: Whether the shared model wrapper is removed.
+    """
+    with _MODEL_LOCK:
+        if config_name not in _MODEL_INSTANCES:
+            return False
+        if model is not None and _MODEL_INSTANCES[config_name] is not model:
+            return False
+        _MODEL_REF_COUNTS[config_name] -= 1
+        if _MODEL_REF_COUNTS[config_name] > 0:
+            return False
+        del _MODEL_INSTANCES[config_name]
+        del _MODEL_REF_COUNTS[config_name]
+        return True
+
+
+def _create_model(config_name: str) -> ModelWrapperBase:
+    """Create a new model wrapper by config name."""
     if len(_MODEL_CONFIGS) == 0:
         raise ValueError(
             "No model configs loaded, please call "
@@ -112,14 +279,164 @@ def load_model_by_config_name(config_name: str) -> ModelWrapperBase:
 
     model_type = config.model_type
 
-    kwargs = {k: v for k, v in config.items() if k != "model_type"}
+    kwargs = {k: v for k, v in config.items() if k not in _NON_WRAPPER_ARGS}
+
+    # register the metadata before the wrapper uses it, e.g. for the budget
+    metadata = config.get("metadata", None)
+    if metadata:
+        register_model_metadata(
+            config.get("model_name", None) or config_name,
+            **metadata,
+        )
+
+    model = _get_model_wrapper(model_type=model_type)(**kwargs)
+    for key, setup in _FEATURE_SETUPS.items():
+        if config.get(key, None) is not None:
+            setup(model, config_name, config[key])
+    return model
+
+
+def _as_kwargs(value: Any) -> dict:
+    """The keyword arguments of a feature in model config, which can be
+    enabled by `True` with the default arguments."""
+    return {} if value is True else value
+
+
+def _get_shared(
+    registry: dict,
+    config_name: str,
+    create: Callable[[], Any],
+) -> Any:
+    """Get the component shared by the models loaded from the same config,
+    which is created on first use."""
+    with _MODEL_LOCK:
+        if config_name not in registry:
+            registry[config_name] = create()
+        return registry[config_name]
+
+
+def _set_cache(model: ModelWrapperBase, config_name: str, value: Any) -> None:
+    """Set the response cache shared by the models of the config."""
+    if value:
+        model.set_cache(
+            _get_shared(
+                _MODEL_CACHES,
+                config_name,
+                partial(ResponseCache, **_as_kwargs(value)),
+            ),
+        )
+
+
+def _set_rate_limiter(
+    model: ModelWrapperBase,
+    config_name: str,
+    value: Any,
+) -> None:
+    """Set the rate limiter shared by the models of the config."""
+    if value:
+        model.set_rate_limiter(
+            _get_shared(
+                _MODEL_RATE_LIMITERS,
+                config_name,
+                partial(RateLimiter, **_as_kwargs(value)),
+            ),
+        )
+
+
+def _set_retry_policy(
+    model: ModelWrapperBase,
+    config_name: str,  # pylint: disable=W0613
+    value: Any,
+) -> None:
+    """Set the retry policy, where `False` disables the default one of the
+    model wrapper."""
+    model.set_retry_policy(
+        RetryPolicy(**_as_kwargs(value)) if value is not False else None,
+    )
+
+
+def _set_hedging_policy(
+    model: ModelWrapperBase,
+    config_name: str,  # pylint: disable=W0613
+    value: Any,
+) -> None:
+    """Set the hedging policy."""
+    if value:
+        model.set_hedging_policy(HedgingPolicy(**_as_kwargs(value)))
+
+
+def _set_truncator(
+    model: ModelWrapperBase,
+    config_name: str,  # pylint: disable=W0613
+    value: Any,
+) -> None:
+    """Set the truncator of the prompts exceeding the context window."""
+    if value:
+        model.set_truncator(ContextTruncator(**_as_kwargs(value)))
+
+
+def _set_embedding_dtype(
+    model: ModelWrapperBase,
+    config_name: str,  # pylint: disable=W0613
+    value: Any,
+) -> None:
+    """Set the data type of the returned embeddings."""
+    model.embedding_dtype = value
+
+
+def _set_image_cache(
+    model: ModelWrapperBase,
+    config_name: str,  # pylint: disable=W0613
+    value: Any,
+) -> None:
+    """Set the cache of the encoded local images."""
+    if value:
+        model.image_cache = ImageCache(**_as_kwargs(value))
+
+
+def _set_coalescing(
+    model: ModelWrapperBase,
+    config_name: str,
+    value: Any,
+) -> None:
+    """Coalesce the concurrent identical calls of the models of the
+    config."""
+    if value:
+        model.set_coalescing(
+            _get_shared(_MODEL_SINGLE_FLIGHTS, config_name, SingleFlight),
+        )
+
+
+# the fields of model config to set up the features of the model wrappers,
+# mapped to the functions taking the wrapper, the config name and the value
+_FEATURE_SETUPS: dict[
+    str,
+    Callable[[ModelWrapperBase, str, Any], None],
+] = {
+    "cache": _set_cache,
+    "rate_limit": _set_rate_limiter,
+    "retry": _set_retry_policy,
+    "hedging": _set_hedging_policy,
+    "truncation": _set_truncator,
+    "embedding_dtype": _set_embedding_dtype,
+    "image_cache": _set_image_cache,
+    "coalesce": _set_coalescing,
+}
 
-    return _get_model_wrapper(model_type=model_type)(**kwargs)
+# the fields of model config handled by the registry instead of the wrappers
+_NON_WRAPPER_ARGS = ["model_type", "shared", "metadata", *_FEATURE_SETUPS]
 
 
 def clear_model_configs() -> None:
-    """Clear the loaded model configs."""
+    """Clear the loaded model configs and the shared model wrappers."""
+    with _MODEL_LOCK:
+        _MODEL_INSTANCES.clear()
+        _MODEL_REF_COUNTS.clear()
+        _MODEL_CREATION_LOCKS.clear()
     _MODEL_CONFIGS.clear()
+    _MODEL_CACHES.clear()
+    _MODEL_RATE_LIMITERS.clear()
+    _MODEL_SINGLE_FLIGHTS.clear()
 
 
 def read_model_configs(
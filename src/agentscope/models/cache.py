@@ -0,0 +1,254 @@
+# -*- coding: utf-8 -*-
+"""The cache of model responses, which replays the responses of identical
+model calls from memory or disk."""
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Optional
+
+import numpy as np
+from loguru import logger
+
+from .response import ModelResponse
+from ..utils.tools import _is_json_serializable
+
+
+def _find_temperature(arguments: dict) -> Optional[float]:
+    """Find the sampling temperature in the arguments of a model call,
+    including the nested `options` of Ollama."""
+    if arguments.get("temperature", None) is not None:
+        return arguments["temperature"]
+    options = arguments.get("options", None)
+    if isinstance(options, dict):
+        return options.get("temperature", None)
+    return None
+
+
+def _hash_call(
+    model_type: str,
+    model_name: Optional[str],
+    arguments: dict,
+) -> str:
+    """Hash the canonical JSON of a model call, which ignores the order of
+    the arguments."""
+    canonical = json.dumps(
+        [model_type, model_name, arguments],
+        sort_keys=True,
+        ensure_ascii=False,
+        default=str,
+    )
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+
+class ResponseCache:
+    """A two-tier cache of model responses, with a LRU cache in memory and
+    an optional SQLite database on disk. The responses are keyed by a hash
+    of the model type, model name and the canonical JSON of the call
+    arguments.
+
+    Only deterministic calls are cached: the calls in stream mode, or
+    without a zero `temperature` (in the call arguments, `generate_args` or
+    `options` of the model wrapper), bypass the cache unless `force` is
+    `True`. Note a missing temperature is non-deterministic, since the
+    providers sample with a non-zero temperature by default. The calls of
+    the deterministic models, e.g. the embedding models, are cached
+    regardless of the temperature.
+    """
+
+    def __init__(
+        self,
+        max_size: int = 1024,
+        path: Optional[str] = None,
+        ttl: Optional[float] = None,
+        force: bool = False,
+    ) -> None:
+        """Initialize the response cache.
+
+        Args:
+            max_size (`int`, defaults to `1024`):
+                The maximum number of responses kept in memory.
+            path (`Optional[str]`, defaults to `None`):
+                The path of the SQLite database to persist the responses.
+                The responses are only cached in memory if not provided.
+            ttl (`Optional[float]`, defaults to `None`):
+                The number of seconds before a cached response expires. The
+                responses never expire if `None`.
+            force (`bool`, defaults to `False`):
+                Whether to cache the calls with a non-zero temperature.
+        """
+        self.max_size = max_size
+        self.path = path
+        self.ttl = ttl
+        self.force = force
+
+        self._memory: OrderedDict[str, tuple[float, str]] = OrderedDict()
+        self._lock = threading.Lock()
+
+        self._conn = None
+        if path is not None:
+            if os.path.dirname(path):
+                os.makedirs(os.path.dirname(path), exist_ok=True)
+            self._conn = sqlite3.connect(path, check_same_thread=False)
+            self._conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS model_response_cache (
+                    key TEXT PRIMARY KEY,
+                    value TEXT NOT NULL,
+                    created REAL NOT NULL
+                )
+                """,
+            )
+            self._conn.commit()
+
+    def make_key(
+        self,
+        model_type: str,
+        model_name: Optional[str],
+        arguments: dict,
+        deterministic: bool = False,
+    ) -> Optional[str]:
+        """Generate the cache key of a model call.
+
+        Args:
+            model_type (`str`):
+                The type of the model wrapper.
+            model_name (`Optional[str]`):
+                The name of the model.
+            arguments (`dict`):
+                The arguments of the model call, including the default
+                generation arguments of the model wrapper.
+            deterministic (`bool`, defaults to `False`):
+                Whether the model responds deterministically regardless of
+                the temperature, e.g. an embedding model.
+
+        Returns:
+            `Optional[str]`: The cache key, or `None` if the call should
+            bypass the cache.
+        """
+        if arguments.get("stream", False):
+            return None
+
+        if (
+            not self.force
+            and not deterministic
+            and _find_temperature(arguments) != 0
+        ):
+            return None
+
+        return _hash_call(model_type, model_name, arguments)
+
+    def get(self, key: str) -> Optional[ModelResponse]:
+        """Get the cached response by key.
+
+        Args:
+            key (`str`):
+                The cache key.
+
+        Returns:
+            `Optional[ModelResponse]`: The cached response, or `None` if
+            the key is missing or expired.
+        """
+        now = time.time()
+        with self._lock:
+            entry = self._memory.get(key, None)
+            if entry is not None:
+                self._memory.move_to_end(key)
+            elif self._conn is not None:
+                row = self._conn.execute(
+                    "SELECT created, value FROM model_response_cache "
+                    "WHERE key = ?",
+                    (key,),
+                ).fetchone()
+                if row is not None:
+                    entry = (row[0], row[1])
+                    self._put_memory(key, entry)
+
+            if entry is None:
+                return None
+
+            if self.ttl is not None and now - entry[0] > self.ttl:
+                self._remove(key)
+                return None
+
+        fields = json.loads(entry[1])
+        dtype = fields.pop("embedding_dtype", None)
+        if dtype is not None:
+            fields["embedding"] = np.asarray(fields["embedding"], dtype=dtype)
+        return ModelResponse(**fields)
+
+    def set(self, key: str, response: ModelResponse) -> None:
+        """Cache a response.
+
+        Args:
+            key (`str`):
+                The cache key.
+            response (`ModelResponse`):
+                The response to be cached. The raw field is converted into
+                a string if it's not JSON serializable.
+        """
+        raw = response.raw
+        if not _is_json_serializable(raw):
+            raw = str(raw)
+
+        fields = {
+            "text": response.text,
+            "embedding": response.embedding,
+            "image_urls": response.image_urls,
+            "raw": raw,
+            "parsed": response.parsed,
+        }
+        # the embeddings returned as an array are restored with their type
+        if isinstance(response.embedding, np.ndarray):
+            fields["embedding"] = response.embedding.tolist()
+            fields["embedding_dtype"] = str(response.embedding.dtype)
+
+        try:
+            value = json.dumps(fields, ensure_ascii=False)
+        except TypeError as e:
+            logger.warning(f"Skip caching the unserializable response: {e}")
+            return
+
+        entry = (time.time(), value)
+        with self._lock:
+            self._put_memory(key, entry)
+            if self._conn is not None:
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO model_response_cache "
+                    "(key, value, created) VALUES (?, ?, ?)",
+                    (key, entry[1], entry[0]),
+                )
+                self._conn.commit()
+
+    def clear(self) -> None:
+        """Remove all the cached responses in memory and on disk."""
+        with self._lock:
+            self._memory.clear()
+            if self._conn is not None:
+                self._conn.execute("DELETE FROM model_response_cache")
+                self._conn.commit()
+
+    def __len__(self) -> int:
+        """The number of responses cached in memory."""
+        return len(self._memory)
+
+    def _put_memory(self, key: str, entry: tuple) -> None:
+        """Put an entry into the memory tier, and evict the least recently
+        used ones."""
+        self._memory[key] = entry
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_size:
+            self._memory.popitem(last=False)
+
+    def _remove(self, key: str) -> None:
+        """Remove an entry from both tiers."""
+        self._memory.pop(key, None)
+        if self._conn is not None:
+            self._conn.execute(
+                "DELETE FROM model_response_cache WHERE key = ?",
+                (key,),
+            )
+            self._conn.commit()
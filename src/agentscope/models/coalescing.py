@@ -0,0 +1,101 @@
+# -*- coding: utf-8 -*-
+"""The coalescing of concurrent identical model calls, which sends only one
+request for the calls with the same arguments in flight."""
+import asyncio
+import threading
+from typing import Any, Awaitable, Callable, Optional, Tuple
+
+
+class _Flight:
+    """An in-flight call shared by the threads."""
+
+    def __init__(self) -> None:
+        self.done = threading.Event()
+        self.result: Any = None
+        self.error: Optional[BaseException] = None
+
+
+class SingleFlight:
+    """Coalesce the concurrent calls with the same key, so that only the
+    first call (the leader) is executed, and the others wait for it and
+    share its result or exception.
+
+    The calls are coalesced among threads by `do`, and among the coroutines
+    running in the same event loop by `ado`.
+    """
+
+    def __init__(self) -> None:
+        """Initialize the single flight group."""
+        self._lock = threading.Lock()
+        self._flights: dict[str, _Flight] = {}
+        self._futures: dict[tuple, asyncio.Future] = {}
+
+    def do(self, key: str, func: Callable[[], Any]) -> Tuple[Any, bool]:
+        """Execute the function, or wait for the in-flight one with the
+        same key.
+
+        Args:
+            key (`str`):
+                The key identifying the call.
+            func (`Callable[[], Any]`):
+                The function to execute.
+
+        Returns:
+            `Tuple[Any, bool]`: The result, and whether it's shared from
+            another call.
+        """
+        with self._lock:
+            shared = self._flights.get(key, None)
+            if shared is None:
+                flight = self._flights[key] = _Flight()
+
+        if shared is not None:
+            shared.done.wait()
+            if shared.error is not None:
+                raise shared.error
+            return shared.result, True
+
+        try:
+            flight.result = func()
+        except BaseException as e:
+            flight.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._flights[key]
+            flight.done.set()
+        return flight.result, False
+
+    async def ado(
+        self,
+        key: str,
+        func: Callable[[], Awaitable[Any]],
+    ) -> Tuple[Any, bool]:
+        """The coroutine version of `do`."""
+        loop = asyncio.get_running_loop()
+        future_key = (loop, key)
+        with self._lock:
+            shared = self._futures.get(future_key, None)
+            if shared is None:
+                future = self._futures[future_key] = loop.create_future()
+
+        if shared is not None:
+            # the waiting follower being cancelled doesn't cancel the leader
+            return await asyncio.shield(shared), True
+
+        try:
+            result = await func()
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except BaseException as e:
+            future.set_exception(e)
+            # mark the exception as retrieved in case of no followers
+            future.exception()
+            raise
+        else:
+            future.set_result(result)
+        finally:
+            with self._lock:
+                del self._futures[future_key]
+        return result, False
@@ -3,10 +3,11 @@
 import os
 from abc import ABC
 from http import HTTPStatus
-from typing import Any, Union, List, Sequence
+from typing import Any, Union, List, Sequence, Optional, Tuple
 from loguru import logger
 
 from ..message import MessageBase
+from ..utils.model_metadata import get_model_max_length
 from ..utils.tools import _convert_to_str, _guess_type_by_extension
 
 try:
@@ -19,6 +20,34 @@ from .model import ModelWrapperBase, ModelResponse
 from ..file_manager import file_manager
 
 
+def _check_dashscope_response(response: Any) -> None:
+    """Raise an error if the DashScope API call fails."""
+    if response.status_code != HTTPStatus.OK:
+        error_msg = (
+            f" Request id: {response.request_id},"
+            f" Status code: {response.status_code},"
+            f" error code: {response.code},"
+            f" error message: {response.message}."
+        )
+
+        raise RuntimeError(error_msg)
+
+
+def _parse_dashscope_chunk(chunk: Any) -> Tuple[str, Optional[dict]]:
+    """Extract the text delta and usage from a chunk of DashScope chat API
+    in stream mode with incremental output."""
+    _check_dashscope_response(chunk)
+    usage = None
+    if chunk.usage:
+        usage = {
+            "prompt_tokens": chunk.usage.get("input_tokens", 0),
+            "completion_tokens": chunk.usage.get("output_tokens", 0),
+            "total_tokens": chunk.usage.get("input_tokens", 0)
+            + chunk.usage.get("output_tokens", 0),
+        }
+    return chunk.output["choices"][0]["message"]["content"], usage
+
+
 class DashScopeWrapperBase(ModelWrapperBase, ABC):
     """The model wrapper for DashScope API."""
 
@@ -59,7 +88,7 @@ class DashScopeWrapperBase(ModelWrapperBase, ABC):
 
         self.api_key = api_key
         dashscope.api_key = self.api_key
-        self.max_length = None
+        self.max_length = get_model_max_length(model_name)
 
         # Set monitor accordingly
         self._register_default_metrics()
@@ -133,7 +162,8 @@ class DashScopeChatWrapper(DashScopeWrapperBase):
         Returns:
             `ModelResponse`:
                 The response text in text field, and the raw response in
-                raw field.
+                raw field. If `stream=True` is given, the text deltas can
+                be consumed from the stream field as they are generated.
 
         Note:
             `parse_func`, `fault_handler` and `max_retries` are reserved for
@@ -167,6 +197,10 @@ class DashScopeChatWrapper(DashScopeWrapperBase):
                 "and 'content' key for DashScope API.",
             )
 
+        # only the new tokens are returned in each chunk in stream mode
+        if kwargs.get("stream", False):
+            kwargs.setdefault("incremental_output", True)
+
         # step3: forward to generate response
         response = dashscope.Generation.call(
             model=self.model_name,
@@ -175,15 +209,16 @@ class DashScopeChatWrapper(DashScopeWrapperBase):
             **kwargs,
         )
 
-        if response.status_code != HTTPStatus.OK:
-            error_msg = (
-                f" Request id: {response.request_id},"
-                f" Status code: {response.status_code},"
-                f" error code: {response.code},"
-                f" error message: {response.message}."
+        if kwargs.get("stream", False):
+            return ModelResponse(
+                stream=self._stream_response(
+                    response,
+                    _parse_dashscope_chunk,
+                    {"model": self.model_name, "messages": messages, **kwargs},
+                ),
             )
 
-            raise RuntimeError(error_msg)
+        _check_dashscope_response(response)
 
         # step4: record the api invocation if needed
         self._save_model_invocation(
@@ -296,9 +331,7 @@ class DashScopeChatWrapper(DashScopeWrapperBase):
                 )
             else:
                 # Merge all messages into a dialogue history prompt
-                dialogue.append(
-                    f"{unit.name}: {_convert_to_str(unit.content)}",
-                )
+                dialogue.append(self._format_dialogue_line(unit))
 
         dialogue_history = "\n".join(dialogue)
 
@@ -423,6 +456,8 @@ class DashScopeTextEmbeddingWrapper(DashScopeWrapperBase):
 
     model_type: str = "dashscope_text_embedding"
 
+    deterministic: bool = True
+
     def _register_default_metrics(self) -> None:
         # Set monitor accordingly
         # TODO: set quota to the following metrics
@@ -507,14 +542,16 @@ class DashScopeTextEmbeddingWrapper(DashScopeWrapperBase):
         # step5: return response
         if len(response.output["embeddings"]) == 0:
             return ModelResponse(
-                embedding=response.output["embedding"][0],
+                embedding=self._format_embedding(
+                    response.output["embedding"][0],
+                ),
                 raw=response,
             )
         else:
             return ModelResponse(
-                embedding=[
-                    _["embedding"] for _ in response.output["embeddings"]
-                ],
+                embedding=self._format_embedding(
+                    [_["embedding"] for _ in response.output["embeddings"]],
+                ),
                 raw=response,
             )
 
@@ -789,9 +826,7 @@ class DashScopeMultiModalWrapper(DashScopeWrapperBase):
                 )
             else:
                 # text message
-                dialogue.append(
-                    f"{unit.name}: {_convert_to_str(unit.content)}",
-                )
+                dialogue.append(self._format_dialogue_line(unit))
                 # image and audio
                 image_or_audio_dicts.extend(self._convert_url(unit.url))
 
@@ -3,12 +3,13 @@
 import os
 from abc import ABC
 from collections.abc import Iterable
-from typing import Sequence, Union, Any, List
+from typing import Sequence, Union, Any, List, Optional, Tuple
 
 from loguru import logger
 
 from agentscope.message import Msg, MessageBase
 from agentscope.models import ModelWrapperBase, ModelResponse
+from agentscope.utils.model_metadata import get_model_max_length
 from agentscope.utils.tools import _convert_to_str
 
 try:
@@ -17,6 +18,20 @@ except ImportError:
     genai = None
 
 
+def _parse_gemini_chunk(chunk: Any) -> Tuple[str, Optional[dict]]:
+    """Extract the text delta and usage from a chunk of Gemini API in stream
+    mode."""
+    usage = None
+    metadata = getattr(chunk, "usage_metadata", None)
+    if metadata:
+        usage = {
+            "prompt_tokens": metadata.prompt_token_count,
+            "completion_tokens": metadata.candidates_token_count,
+            "total_tokens": metadata.total_token_count,
+        }
+    return chunk.text, usage
+
+
 class GeminiWrapperBase(ModelWrapperBase, ABC):
     """The base class for Google Gemini model wrapper."""
 
@@ -54,6 +69,7 @@ class GeminiWrapperBase(ModelWrapperBase, ABC):
         genai.configure(api_key=api_key, **kwargs)
 
         self.model_name = model_name
+        self.max_length = get_model_max_length(model_name)
 
         self._register_default_metrics()
 
@@ -123,7 +139,9 @@ class GeminiChatWrapper(GeminiWrapperBase):
             contents (`Union[Sequence, str]`):
                 The content to generate response.
             stream (`bool`, defaults to `False`):
-                Whether to use stream mode.
+                Whether to use stream mode, where the text deltas can be
+                consumed from the stream field of the response as they are
+                generated.
             **kwargs:
                 The additional arguments for generating response.
 
@@ -142,13 +160,21 @@ class GeminiChatWrapper(GeminiWrapperBase):
             )
 
         # step2: forward to generate response
-        # TODO: support response in stream mode
         response = self.model.generate_content(
             contents,
             stream=stream,
             **kwargs,
         )
 
+        if stream:
+            return ModelResponse(
+                stream=self._stream_response(
+                    response,
+                    _parse_gemini_chunk,
+                    {"contents": contents, "stream": stream, **kwargs},
+                ),
+            )
+
         # step3: record the api invocation if needed
         self._save_model_invocation(
             arguments={
@@ -262,9 +288,7 @@ class GeminiChatWrapper(GeminiWrapperBase):
                 sys_prompt = _convert_to_str(unit.content)
             else:
                 # Merge all messages into a dialogue history prompt
-                dialogue.append(
-                    f"{unit.name}: {_convert_to_str(unit.content)}",
-                )
+                dialogue.append(self._format_dialogue_line(unit))
 
         dialogue_history = "\n".join(dialogue)
 
@@ -300,6 +324,8 @@ class GeminiEmbeddingWrapper(GeminiWrapperBase):
     model_type: str = "gemini_embedding"
     """The type of the model, which is used in model configuration."""
 
+    deterministic: bool = True
+
     _generation_method = "embedContent"
     """The generation method used in `__call__` function."""
 
@@ -357,7 +383,7 @@ class GeminiEmbeddingWrapper(GeminiWrapperBase):
 
         return ModelResponse(
             raw=response,
-            embedding=response["embedding"],
+            embedding=self._format_embedding(response["embedding"]),
         )
 
     def _register_default_metrics(self) -> None:
@@ -0,0 +1,358 @@
+# -*- coding: utf-8 -*-
+"""The hedging policy of model calls, which launches speculative attempts
+instead of waiting for a slow or unparseable response before retrying."""
+import asyncio
+import math
+import threading
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from functools import partial
+from typing import Any, Awaitable, Callable, Iterable, Optional, Tuple
+
+from loguru import logger
+
+from .response import ModelResponse
+from ..exception import ResponseParsingError
+
+
+class HedgingPolicy:
+    """The policy to hedge the model calls whose responses are parsed.
+
+    Up to `max_attempts` attempts (the `max_retries` of the call) are made
+    for a call, and the first response parsed successfully is returned:
+
+    - `parallel` attempts are launched up front.
+    - Another attempt is launched when the latest one hasn't returned
+      within the hedging delay, which is `delay` if given, or the
+      `percentile` of the recent latencies of this model otherwise.
+    - Another attempt is launched immediately when a response fails to be
+      parsed, without waiting before the retry.
+
+    The attempts still running when the call returns are wasted, which are
+    cancelled in async calls, and left to finish in the background in sync
+    calls, where the ones not started yet are dropped.
+    """
+
+    def __init__(
+        self,
+        parallel: int = 1,
+        delay: Optional[float] = None,
+        percentile: float = 95.0,
+        min_samples: int = 10,
+        window: int = 100,
+    ) -> None:
+        """Initialize the hedging policy.
+
+        Args:
+            parallel (`int`, defaults to `1`):
+                The number of attempts launched up front.
+            delay (`Optional[float]`, defaults to `None`):
+                The seconds to wait for an attempt before launching another
+                one. If `None`, it's the `percentile` of the recent
+                latencies.
+            percentile (`float`, defaults to `95.0`):
+                The percentile of the recent latencies as the hedging
+                delay.
+            min_samples (`int`, defaults to `10`):
+                The number of latencies recorded before hedging by the
+                percentile, before which no attempt is launched for slow
+                responses.
+            window (`int`, defaults to `100`):
+                The number of recent latencies kept.
+        """
+        if parallel < 1:
+            raise ValueError(f"parallel should be >= 1, got {parallel}.")
+        self.parallel = parallel
+        self.delay = delay
+        self.percentile = percentile
+        self.min_samples = min_samples
+
+        self._latencies: deque = deque(maxlen=window)
+        self._lock = threading.Lock()
+
+    def record_latency(self, latency: float) -> None:
+        """Record the latency of a finished attempt in seconds."""
+        with self._lock:
+            self._latencies.append(latency)
+
+    def get_delay(self) -> Optional[float]:
+        """The seconds to wait for the latest attempt before launching
+        another one, or `None` if not hedging by time."""
+        if self.delay is not None:
+            return self.delay
+        with self._lock:
+            if len(self._latencies) < max(self.min_samples, 1):
+                return None
+            latencies = sorted(self._latencies)
+        index = math.ceil(self.percentile / 100 * len(latencies)) - 1
+        return latencies[min(max(index, 0), len(latencies) - 1)]
+
+    def call(
+        self,
+        func: Callable[[], Any],
+        parse_func: Callable[[Any], Any],
+        max_attempts: int,
+        on_finish: Optional[Callable[[int, int], None]] = None,
+    ) -> Tuple[Any, Any, Optional[BaseException]]:
+        """Call the function with hedged attempts in threads.
+
+        Args:
+            func (`Callable[[], Any]`):
+                The function making an attempt.
+            parse_func (`Callable[[Any], Any]`):
+                The function to parse the response, which raises
+                `ResponseParsingError` if the response is unacceptable.
+            max_attempts (`int`):
+                The maximum number of attempts.
+            on_finish (`Optional[Callable[[int, int], None]]`, defaults to \
+                `None`):
+                The callback after the call, which takes the number of the
+                attempts launched speculatively, i.e. while another one is
+                running, and the number of the wasted attempts.
+
+        Returns:
+            `Tuple[Any, Any, Optional[BaseException]]`: The response, the
+            parsed result and `None` if succeeded. Otherwise, the last
+            unparseable response, `None` and the parsing error.
+        """
+        max_attempts = max(max_attempts, 1)
+        executor = ThreadPoolExecutor(max_workers=max_attempts)
+        attempts = _Attempts(
+            self,
+            lambda: executor.submit(func),
+            parse_func,
+            max_attempts,
+        )
+        try:
+            attempts.start()
+            while attempts.running:
+                done, _ = wait(
+                    list(attempts.running),
+                    timeout=attempts.timeout(),
+                    return_when=FIRST_COMPLETED,
+                )
+                result = attempts.collect(done)
+                if result is not None:
+                    return result
+        finally:
+            if on_finish is not None:
+                on_finish(attempts.hedged, len(attempts.running))
+            # drop the attempts not started yet, while the running ones
+            # are left to finish in the background
+            executor.shutdown(wait=False, cancel_futures=True)
+        return attempts.failure()
+
+    async def acall(
+        self,
+        func: Callable[[], Awaitable[Any]],
+        parse_func: Callable[[Any], Any],
+        max_attempts: int,
+        on_finish: Optional[Callable[[int, int], None]] = None,
+    ) -> Tuple[Any, Any, Optional[BaseException]]:
+        """The coroutine version of `call`, where the wasted attempts are
+        cancelled."""
+        attempts = _Attempts(
+            self,
+            lambda: asyncio.ensure_future(func()),
+            parse_func,
+            max(max_attempts, 1),
+        )
+        try:
+            attempts.start()
+            while attempts.running:
+                done, _ = await asyncio.wait(
+                    list(attempts.running),
+                    timeout=attempts.timeout(),
+                    return_when=asyncio.FIRST_COMPLETED,
+                )
+                result = attempts.collect(done)
+                if result is not None:
+                    return result
+        finally:
+            if on_finish is not None:
+                on_finish(attempts.hedged, len(attempts.running))
+            for task in attempts.running:
+                task.cancel()
+        return attempts.failure()
+
+
+class _Attempts:
+    """The attempts of a hedged call, which are launched as futures or
+    tasks by `submit`, and collected by `HedgingPolicy.call` or
+    `HedgingPolicy.acall` once done."""
+
+    def __init__(
+        self,
+        policy: HedgingPolicy,
+        submit: Callable[[], Any],
+        parse_func: Callable[[Any], Any],
+        max_attempts: int,
+    ) -> None:
+        self.policy = policy
+        self.submit = submit
+        self.parse_func = parse_func
+        self.max_attempts = max_attempts
+
+        # the running futures (or tasks) -> their start time
+        self.running: dict = {}
+        self.launched = 0
+        self.hedged = 0
+        self.last_response: Any = None
+        self.last_error: Optional[BaseException] = None
+
+    def start(self) -> None:
+        """Launch the attempts up front."""
+        for _ in range(min(self.policy.parallel, self.max_attempts)):
+            self.launch()
+
+    def launch(self) -> None:
+        """Launch another attempt."""
+        if self.running:
+            self.hedged += 1
+        self.launched += 1
+        self.running[self.submit()] = time.time()
+
+    def timeout(self) -> Optional[float]:
+        """The seconds to wait for the running attempts before launching
+        another one, or `None` to wait until one of them is done."""
+        delay = self.policy.get_delay()
+        if delay is None or self.launched >= self.max_attempts:
+            return None
+        latest = max(self.running.values())
+        return max(0.0, latest + delay - time.time())
+
+    def collect(self, done: Iterable) -> Optional[Tuple[Any, Any, None]]:
+        """Collect the finished attempts, and return the first response
+        parsed successfully with its result. Another attempt is launched
+        if none is done (i.e. timed out) or for each failed one."""
+        if not done:
+            self.launch()
+            return None
+
+        for future in done:
+            start = self.running.pop(future)
+            try:
+                response = future.result()
+            except Exception as e:  # pylint: disable=broad-except
+                self.last_error = e
+            else:
+                self.policy.record_latency(time.time() - start)
+                try:
+                    return response, self.parse_func(response), None
+                except ResponseParsingError as e:
+                    self._log_failure(e)
+                    self.last_response, self.last_error = response, e
+
+            if self.launched < self.max_attempts:
+                self.launch()
+        return None
+
+    def failure(self) -> Tuple[Any, None, BaseException]:
+        """Return the last unparseable response and its parsing error after
+        all attempts fail, or raise the error of the last attempt if it
+        fails without a response."""
+        assert self.last_error is not None, "No attempt has finished."
+        if not isinstance(self.last_error, ResponseParsingError):
+            raise self.last_error
+        return self.last_response, None, self.last_error
+
+    def _log_failure(self, error: ResponseParsingError) -> None:
+        """Log an attempt whose response fails to be parsed."""
+        logger.warning(
+            f"Fail to parse response of hedged attempt {self.launched}: "
+            f"{error.__class__.__name__}: {error}",
+        )
+
+
+class HedgingMixin:
+    """The mixin of `ModelWrapperBase` to hedge the calls whose responses
+    are parsed by a `HedgingPolicy`."""
+
+    hedging_policy: Optional[HedgingPolicy] = None
+    """The policy to hedge the calls whose responses are parsed, which is
+    disabled by default."""
+
+    def set_hedging_policy(
+        self,
+        hedging_policy: Optional[HedgingPolicy],
+    ) -> None:
+        """Set the policy to hedge the calls whose responses are parsed, and
+        register the numbers of the speculative and the wasted attempts in
+        the monitor.
+
+        Args:
+            hedging_policy (`Optional[HedgingPolicy]`):
+                The hedging policy. The attempts are made one after another
+                if `None`.
+        """
+        self.hedging_policy = hedging_policy
+        if hedging_policy is not None:
+            self.monitor.register(self._metric("hedged_call"), "times")
+            self.monitor.register(self._metric("wasted_call"), "times")
+
+    def _on_hedging_finish(self, hedged: int, wasted: int) -> None:
+        """Record the speculative and the wasted attempts of a call."""
+        if hedged > 0 or wasted > 0:
+            self.update_monitor(hedged_call=hedged, wasted_call=wasted)
+
+    def _hedged_call(
+        self,
+        model_call: Callable,
+        args: tuple,
+        kwargs: dict,
+        parse_func: Callable[[ModelResponse], Any],
+        fault_handler: Optional[Callable[[ModelResponse], Any]],
+        max_retries: int,
+    ) -> Any:
+        """Call the model with hedged attempts, and return the first
+        parsed response."""
+        key, cached = self._cache_lookup(args, kwargs)
+        if cached is not None:
+            try:
+                return parse_func(cached)
+            except ResponseParsingError:
+                pass
+
+        response, result, error = self.hedging_policy.call(
+            partial(self._invoke, model_call, args, kwargs, coalesce=False),
+            parse_func,
+            max_retries,
+            self._on_hedging_finish,
+        )
+        if error is None:
+            self._cache_store(key, response)
+            return result
+        if fault_handler is not None and callable(fault_handler):
+            return fault_handler(response)
+        raise error
+
+    async def _ahedged_call(
+        self,
+        model_call: Callable,
+        args: tuple,
+        kwargs: dict,
+        parse_func: Callable[[ModelResponse], Any],
+        fault_handler: Optional[Callable[[ModelResponse], Any]],
+        max_retries: int,
+    ) -> Any:
+        """The async version of `_hedged_call`."""
+        key, cached = self._cache_lookup(args, kwargs)
+        if cached is not None:
+            try:
+                return parse_func(cached)
+            except ResponseParsingError:
+                pass
+
+        response, result, error = await self.hedging_policy.acall(
+            partial(self._ainvoke, model_call, args, kwargs, coalesce=False),
+            parse_func,
+            max_retries,
+            self._on_hedging_finish,
+        )
+        if error is None:
+            self._cache_store(key, response)
+            return result
+        if fault_handler is not None and callable(fault_handler):
+            return fault_handler(response)
+        raise error
@@ -5,8 +5,9 @@ from typing import Union, Any, List, Sequence
 
 from loguru import logger
 
-from .model import ModelWrapperBase, ModelResponse
+from .model import ModelWrapperBase, ModelResponse, _parse_openai_chunk
 from ..message import MessageBase
+from ..utils.model_metadata import get_model_max_length
 from ..utils.tools import _convert_to_str
 
 try:
@@ -68,6 +69,7 @@ class LiteLLMWrapperBase(ModelWrapperBase, ABC):
             )
 
         self.model_name = model_name
+        self.max_length = get_model_max_length(model_name)
         self.generate_args = generate_args or {}
         self._register_default_metrics()
 
@@ -137,7 +139,8 @@ class LiteLLMChatWrapper(LiteLLMWrapperBase):
         Returns:
             `ModelResponse`:
                 The response text in text field, and the raw response in
-                raw field.
+                raw field. If `stream=True` is given, the text deltas can
+                be consumed from the stream field as they are generated.
         """
 
         # step1: prepare keyword arguments
@@ -155,6 +158,10 @@ class LiteLLMChatWrapper(LiteLLMWrapperBase):
                 "and 'content' key for LiteLLM API.",
             )
 
+        # request the usage in the last chunk in stream mode
+        if kwargs.get("stream", False):
+            kwargs.setdefault("stream_options", {"include_usage": True})
+
         # step3: forward to generate response
         response = litellm.completion(
             model=self.model_name,
@@ -162,6 +169,15 @@ class LiteLLMChatWrapper(LiteLLMWrapperBase):
             **kwargs,
         )
 
+        if kwargs.get("stream", False):
+            return ModelResponse(
+                stream=self._stream_response(
+                    response,
+                    _parse_openai_chunk,
+                    {"model": self.model_name, "messages": messages, **kwargs},
+                ),
+            )
+
         # step4: record the api invocation if needed
         self._save_model_invocation(
             arguments={
@@ -231,9 +247,7 @@ class LiteLLMChatWrapper(LiteLLMWrapperBase):
                 system_content_template.append(system_prompt)
             else:
                 # Merge all messages into a dialogue history prompt
-                dialogue.append(
-                    f"{unit.name}: {_convert_to_str(unit.content)}",
-                )
+                dialogue.append(self._format_dialogue_line(unit))
 
         if len(dialogue) != 0:
             system_content_template.extend(
@@ -29,7 +29,71 @@ Note:
                 },
                 "generate_args": {
                     # ...
-                }
+                },
+                # optional, cache the responses of identical calls with
+                # a zero `temperature`, or all the calls if `force` is true
+                "cache": {
+                    "max_size": 1024,
+                    "path": "{path_to_sqlite_db, optional}",
+                    "ttl": {seconds_before_expired, optional},
+                },
+                # optional, limit the calls of all models loaded from
+                # this config
+                "rate_limit": {
+                    "requests_per_minute": 60,
+                    "tokens_per_minute": 90000,
+                    "max_concurrency": 8,
+                    "path": "{path_to_share_across_processes, optional}",
+                },
+                # optional, send one request for the concurrent identical
+                # calls of the models loaded from this config
+                "coalesce": True,
+                # optional, defaults to True, where all callers loading this
+                # config share one model wrapper
+                "shared": True,
+                # optional, retry the failed calls with exponential backoff
+                "retry": {
+                    "max_retries": 3,
+                    "base_delay": 1.0,
+                    "deadline": {overall_seconds, optional},
+                    "max_retry_after": {max_seconds_asked, optional},
+                    "rules": {"RateLimitError": {"max_retries": 8}},
+                },
+                # optional, truncate the prompts exceeding the context
+                # window before sending them
+                "truncation": {
+                    "strategy": "drop_oldest" | "condense",
+                    "max_length": {context_window, optional},
+                    "reserved_tokens": 0,
+                },
+                # optional, hedge the calls whose responses are parsed,
+                # i.e. launch another attempt if the latest one is slower
+                # than the percentile of the recent latencies or fails to
+                # be parsed, up to `max_retries` attempts
+                "hedging": {
+                    "parallel": 1,
+                    "delay": {seconds, optional},
+                    "percentile": 95,
+                },
+                # optional, for the multimodal models, the cache of the
+                # encoded local images, which are downscaled to fit in
+                # `max_side` pixels if given
+                "image_cache": {
+                    "max_bytes": 67108864,
+                    "max_side": 1024,
+                },
+                # optional, for the embedding models, return the embeddings
+                # as a NumPy array in shape [n, dim] instead of lists
+                "embedding_dtype": "float32",
+                # optional, the metadata of the model, which overrides the
+                # registered one, e.g. for the budget and truncation
+                "metadata": {
+                    "max_length": 8192,
+                    "pricing": {
+                        "prompt_tokens": 0.00003,
+                        "completion_tokens": 0.00006,
+                    },
+                },
             }
 
 
@@ -54,26 +118,60 @@ Note:
 
 """
 from __future__ import annotations
+import asyncio
+import copy
 import inspect
+import threading
 import time
+import weakref
 from abc import ABCMeta
-from functools import wraps
-from typing import Sequence, Any, Callable, Union, List, Type
-
+from contextlib import asynccontextmanager, contextmanager
+from functools import partial, wraps
+from typing import (
+    Any,
+    AsyncGenerator,
+    AsyncIterable,
+    AsyncIterator,
+    Callable,
+    Dict,
+    Generator,
+    Iterator,
+    Iterable,
+    List,
+    Optional,
+    Sequence,
+    Tuple,
+    Type,
+    Union,
+)
+
+import numpy as np
 from loguru import logger
 
 from agentscope.utils import QuotaExceededError
+from .cache import ResponseCache, _hash_call
+from .coalescing import SingleFlight
+from .hedging import HedgingMixin
+from .rate_limiter import RateLimiter
+from .retry import RetryPolicy
+from .sampling import SamplingMixin
+from .truncation import TruncationMixin
 from .response import ModelResponse
 from ..exception import ResponseParsingError
 
 from ..file_manager import file_manager
 from ..message import MessageBase
 from ..utils import MonitorFactory
+from ..utils.image_cache import ImageCache
 from ..utils.monitor import get_full_name
-from ..utils.tools import _get_timestamp
+from ..utils.token_utils import estimate_token_count
+from ..utils.tools import _convert_to_str, _get_timestamp
 from ..constants import _DEFAULT_MAX_RETRIES
 from ..constants import _DEFAULT_RETRY_INTERVAL
 
+# the maximum number of cached lines of dialogue history per model wrapper
+_MAX_DIALOGUE_LINES = 100000
+
 
 def _response_parse_decorator(
     model_call: Callable,
@@ -106,42 +204,86 @@ def _response_parse_decorator(
 
     @wraps(model_call)
     def checking_wrapper(self: Any, *args: Any, **kwargs: Any) -> dict:
-        # Step1: Extract parse_func and fault_handler
-        parse_func = kwargs.pop("parse_func", None)
-        fault_handler = kwargs.pop("fault_handler", None)
-        max_retries = kwargs.pop("max_retries", None) or _DEFAULT_MAX_RETRIES
+        # pylint: disable=protected-access
+        return self._handle_call(model_call, args, kwargs)
 
-        # Step2: Call the model and parse the response
-        # Return the response directly if parse_func is not provided
-        if parse_func is None:
-            return model_call(self, *args, **kwargs)
+    return checking_wrapper
 
-        # Otherwise, try to parse the response
-        for itr in range(1, max_retries + 1):
-            # Call the model
-            response = model_call(self, *args, **kwargs)
 
-            # Parse the response if needed
-            try:
-                return parse_func(response)
-            except ResponseParsingError as e:
-                if itr < max_retries:
-                    logger.warning(
-                        f"Fail to parse response ({itr}/{max_retries}):\n"
-                        f"{response}.\n"
-                        f"{e.__class__.__name__}: {e}",
-                    )
-                    time.sleep(_DEFAULT_RETRY_INTERVAL * itr)
-                else:
-                    if fault_handler is not None and callable(fault_handler):
-                        return fault_handler(response)
-                    else:
-                        raise
-        return {}
+def _async_response_parse_decorator(
+    model_call: Callable,
+) -> Callable:
+    """The coroutine version of `_response_parse_decorator`, which parses
+    the response of `acall` and retries with the same semantics, but
+    waits between retries without blocking the event loop."""
+
+    parameters = inspect.signature(model_call).parameters
+
+    for name in parameters.keys():
+        if name in ["parse_func", "max_retries"]:
+            logger.warning(
+                f"The argument {name} is used by the decorator, "
+                f"which will not be passed to the model call "
+                f"function.",
+            )
+
+    @wraps(model_call)
+    async def checking_wrapper(self: Any, *args: Any, **kwargs: Any) -> dict:
+        # pylint: disable=protected-access
+        return await self._ahandle_call(model_call, args, kwargs)
 
     return checking_wrapper
 
 
+def _release_after_stream(
+    stream: Union[Iterator, AsyncIterator],
+    release: Callable[[], None],
+) -> Union[Iterator, AsyncIterator]:
+    """Wrap the stream of a response to call `release` once, after the
+    stream is exhausted, closed or garbage collected without being
+    consumed."""
+    lock = threading.Lock()
+    released = False
+
+    def release_once() -> None:
+        nonlocal released
+        with lock:
+            if released:
+                return
+            released = True
+        release()
+
+    if hasattr(stream, "__aiter__"):
+
+        async def agen() -> AsyncGenerator:
+            try:
+                async for item in stream:
+                    yield item
+            finally:
+                release_once()
+
+        wrapped: Union[Iterator, AsyncIterator] = agen()
+    else:
+
+        def gen() -> Generator:
+            try:
+                yield from stream
+            finally:
+                release_once()
+
+        wrapped = gen()
+    weakref.finalize(wrapped, release_once)
+    return wrapped
+
+
+def _parse_openai_chunk(chunk: Any) -> Tuple[str, Optional[dict]]:
+    """Extract the text delta and usage from a chunk of OpenAI compatible
+    chat completions API in stream mode."""
+    delta = chunk.choices[0].delta.content if chunk.choices else None
+    usage = getattr(chunk, "usage", None)
+    return delta or "", usage.model_dump() if usage else None
+
+
 class _ModelWrapperMeta(ABCMeta):
     """A meta call to replace the model wrapper's __call__ function with
     wrapper about error handling."""
@@ -149,6 +291,8 @@ class _ModelWrapperMeta(ABCMeta):
     def __new__(mcs, name: Any, bases: Any, attrs: Any) -> Any:
         if "__call__" in attrs:
             attrs["__call__"] = _response_parse_decorator(attrs["__call__"])
+        if "acall" in attrs:
+            attrs["acall"] = _async_response_parse_decorator(attrs["acall"])
         return super().__new__(mcs, name, bases, attrs)
 
     def __init__(cls, name: Any, bases: Any, attrs: Any) -> None:
@@ -167,7 +311,12 @@ class _ModelWrapperMeta(ABCMeta):
         super().__init__(name, bases, attrs)
 
 
-class ModelWrapperBase(metaclass=_ModelWrapperMeta):
+class ModelWrapperBase(
+    SamplingMixin,
+    HedgingMixin,
+    TruncationMixin,
+    metaclass=_ModelWrapperMeta,
+):
     """The base class for model wrapper."""
 
     model_type: str
@@ -180,6 +329,34 @@ class ModelWrapperBase(metaclass=_ModelWrapperMeta):
     model_name: str
     """The name of the model, which is used in model api calling."""
 
+    cache: Optional[ResponseCache] = None
+    """The cache of the model responses, which is disabled by default."""
+
+    rate_limiter: Optional[RateLimiter] = None
+    """The client-side rate limiter of the model calls, which is disabled by
+    default."""
+
+    single_flight: Optional[SingleFlight] = None
+    """The group to coalesce the concurrent identical calls, which is
+    disabled by default."""
+
+    retry_policy: Optional[RetryPolicy] = None
+    """The policy to retry the failed model calls. The failed calls are not
+    retried by default, except the post api wrappers."""
+
+    image_cache: Optional[ImageCache] = None
+    """The cache of the data URIs of local images in the messages, where the
+    cache shared by all model wrappers is used if `None`."""
+
+    embedding_dtype: Optional[str] = None
+    """The data type of the embeddings returned as a contiguous NumPy array,
+    e.g. `"float32"`. The embeddings are returned as lists if `None`."""
+
+    deterministic: bool = False
+    """Whether the model responds deterministically without sampling, e.g.
+    the embedding models, whose calls are cached without a zero
+    temperature."""
+
     def __init__(
         self,  # pylint: disable=W0613
         config_name: str,
@@ -200,6 +377,9 @@ class ModelWrapperBase(metaclass=_ModelWrapperMeta):
         self.config_name = config_name
         logger.info(f"Initialize model by configuration [{config_name}]")
 
+        # message id -> (content, name, formatted line)
+        self._dialogue_lines: Dict[str, tuple] = {}
+
     @classmethod
     def get_wrapper(cls, model_type: str) -> Type[ModelWrapperBase]:
         """Get the specific model wrapper"""
@@ -225,6 +405,142 @@ class ModelWrapperBase(metaclass=_ModelWrapperMeta):
             f" method.",
         )
 
+    async def acall(self, *args: Any, **kwargs: Any) -> ModelResponse:
+        """Processing input with the model without blocking the event loop.
+
+        The wrappers whose SDK provides an async client override this
+        coroutine with a native implementation. Otherwise, `__call__` is
+        run in the default executor of the running event loop.
+
+        Note:
+            `parse_func`, `fault_handler` and `max_retries` are handled in
+            the same way as `__call__`.
+        """
+        # call the undecorated `__call__`, since the parsing and caching
+        # are done by the decorator of `acall`
+        call = type(self).__call__
+        call = getattr(call, "__wrapped__", call)
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(
+            None,
+            partial(call, self, *args, **kwargs),
+        )
+
+    def _handle_call(
+        self,
+        model_call: Callable,
+        args: tuple,
+        kwargs: dict,
+    ) -> Any:
+        """Handle a call of the model decorated by
+        `_response_parse_decorator`, i.e. truncate the prompt, look up the
+        cache, invoke the model and parse the response with retries or
+        hedged attempts."""
+        # Step1: Extract parse_func and fault_handler
+        parse_func = kwargs.pop("parse_func", None)
+        fault_handler = kwargs.pop("fault_handler", None)
+        max_retries = kwargs.pop("max_retries", None) or _DEFAULT_MAX_RETRIES
+        args, kwargs = self._truncate_prompt(args, kwargs)
+
+        # Step2: Call the model and parse the response
+        # Return the response directly if parse_func is not provided
+        if parse_func is None:
+            key, response = self._cache_lookup(args, kwargs)
+            if response is None:
+                response = self._invoke(model_call, args, kwargs)
+                self._cache_store(key, response)
+            return response
+
+        # Hedge the attempts if configured
+        if self.hedging_policy is not None and not kwargs.get("stream", False):
+            return self._hedged_call(
+                model_call,
+                args,
+                kwargs,
+                parse_func,
+                fault_handler,
+                max_retries,
+            )
+
+        # Otherwise, try to parse the response
+        for itr in range(1, max_retries + 1):
+            # Call the model, where the cache is skipped when retrying
+            key, response = self._cache_lookup(args, kwargs, itr > 1)
+            if response is None:
+                response = self._invoke(model_call, args, kwargs)
+                self._cache_store(key, response)
+
+            # Parse the response if needed
+            try:
+                return parse_func(response)
+            except ResponseParsingError as e:
+                if itr < max_retries:
+                    logger.warning(
+                        f"Fail to parse response ({itr}/{max_retries}):\n"
+                        f"{response}.\n"
+                        f"{e.__class__.__name__}: {e}",
+                    )
+                    time.sleep(self._parse_retry_delay(itr, e))
+                else:
+                    if fault_handler is not None and callable(fault_handler):
+                        return fault_handler(response)
+                    else:
+                        raise
+        return {}
+
+    async def _ahandle_call(
+        self,
+        model_call: Callable,
+        args: tuple,
+        kwargs: dict,
+    ) -> Any:
+        """The async version of `_handle_call`, decorated by
+        `_async_response_parse_decorator`."""
+        parse_func = kwargs.pop("parse_func", None)
+        fault_handler = kwargs.pop("fault_handler", None)
+        max_retries = kwargs.pop("max_retries", None) or _DEFAULT_MAX_RETRIES
+        args, kwargs = self._truncate_prompt(args, kwargs)
+
+        if parse_func is None:
+            key, response = self._cache_lookup(args, kwargs)
+            if response is None:
+                response = await self._ainvoke(model_call, args, kwargs)
+                self._cache_store(key, response)
+            return response
+
+        if self.hedging_policy is not None and not kwargs.get("stream", False):
+            return await self._ahedged_call(
+                model_call,
+                args,
+                kwargs,
+                parse_func,
+                fault_handler,
+                max_retries,
+            )
+
+        for itr in range(1, max_retries + 1):
+            key, response = self._cache_lookup(args, kwargs, itr > 1)
+            if response is None:
+                response = await self._ainvoke(model_call, args, kwargs)
+                self._cache_store(key, response)
+
+            try:
+                return parse_func(response)
+            except ResponseParsingError as e:
+                if itr < max_retries:
+                    logger.warning(
+                        f"Fail to parse response ({itr}/{max_retries}):\n"
+                        f"{response}.\n"
+                        f"{e.__class__.__name__}: {e}",
+                    )
+                    await asyncio.sleep(self._parse_retry_delay(itr, e))
+                else:
+                    if fault_handler is not None and callable(fault_handler):
+                        return fault_handler(response)
+                    else:
+                        raise
+        return {}
+
     def format(
         self,
         *args: Union[MessageBase, Sequence[MessageBase]],
@@ -236,6 +552,37 @@ class ModelWrapperBase(metaclass=_ModelWrapperMeta):
             f" is missing the required `format` method",
         )
 
+    def _format_dialogue_line(self, msg: MessageBase) -> str:
+        """Format a message into a line "{name}: {content}" of the dialogue
+        history.
+
+        The lines are cached by message id, so that only the new messages
+        are converted in each turn. A cached line is invalidated when the
+        name or content of the message is reassigned, while the content
+        modified in place (e.g. a dict) is not detected.
+        """
+        cached = self._dialogue_lines.get(msg.id, None)
+        if (
+            cached is not None
+            and cached[0] is msg.content
+            and cached[1] == msg.name
+        ):
+            return cached[2]
+
+        line = f"{msg.name}: {_convert_to_str(msg.content)}"
+        if len(self._dialogue_lines) >= _MAX_DIALOGUE_LINES:
+            self._dialogue_lines.clear()
+        self._dialogue_lines[msg.id] = (msg.content, msg.name, line)
+        return line
+
+    def _format_embedding(self, embedding: Any) -> Any:
+        """Convert the embedding(s) into a contiguous array in shape
+        `[n, dim]` (or `[dim]` for a single embedding) if `embedding_dtype`
+        is set."""
+        if self.embedding_dtype is None or embedding is None:
+            return embedding
+        return np.ascontiguousarray(embedding, dtype=self.embedding_dtype)
+
     def _save_model_invocation(
         self,
         arguments: dict,
@@ -257,6 +604,351 @@ class ModelWrapperBase(metaclass=_ModelWrapperMeta):
             invocation_record,
         )
 
+    def set_cache(self, cache: Optional[ResponseCache]) -> None:
+        """Set the cache of the model responses, and register the hit and
+        miss counters in the monitor.
+
+        Args:
+            cache (`Optional[ResponseCache]`):
+                The response cache. The cache is disabled if `None`.
+        """
+        self.cache = cache
+        if cache is not None:
+            self.monitor.register(self._metric("cache_hit"), "times")
+            self.monitor.register(self._metric("cache_miss"), "times")
+
+    def _call_arguments(self, args: tuple, kwargs: dict) -> dict:
+        """Merge the arguments of a model call with the default generation
+        arguments of the model wrapper, which identify the call."""
+        arguments = {
+            **(getattr(self, "generate_args", None) or {}),
+            **kwargs,
+            "args": args,
+        }
+        options = getattr(self, "options", None)
+        if options:
+            arguments["options"] = {**options, **(kwargs.get("options") or {})}
+        return arguments
+
+    def _cache_lookup(
+        self,
+        args: tuple,
+        kwargs: dict,
+        refresh: bool = False,
+    ) -> Tuple[Optional[str], Optional[ModelResponse]]:
+        """Look up the response of a model call in the cache.
+
+        Args:
+            args (`tuple`):
+                The positional arguments of the model call.
+            kwargs (`dict`):
+                The keyword arguments of the model call.
+            refresh (`bool`, defaults to `False`):
+                Whether to skip the cached response and call the model
+                again, e.g. when the cached response fails to be parsed.
+
+        Returns:
+            `Tuple[Optional[str], Optional[ModelResponse]]`: The cache key
+            (`None` if the call is not cacheable) and the cached response
+            (`None` if missed).
+        """
+        if self.cache is None:
+            return None, None
+
+        key = self.cache.make_key(
+            getattr(self, "model_type", type(self).__name__),
+            getattr(self, "model_name", None),
+            self._call_arguments(args, kwargs),
+            deterministic=self.deterministic,
+        )
+        if key is None:
+            return None, None
+
+        response = None if refresh else self.cache.get(key)
+        if response is not None:
+            self.update_monitor(cache_hit=1)
+        else:
+            self.update_monitor(cache_miss=1)
+        return key, response
+
+    def _cache_store(self, key: Optional[str], response: Any) -> None:
+        """Store the response of a cacheable model call."""
+        if (
+            key is not None
+            and isinstance(response, ModelResponse)
+            and not response.is_stream
+        ):
+            self.cache.set(key, response)
+
+    def set_coalescing(self, single_flight: Optional[SingleFlight]) -> None:
+        """Set the group to coalesce the concurrent identical calls, and
+        register the counter of coalesced calls in the monitor.
+
+        Args:
+            single_flight (`Optional[SingleFlight]`):
+                The single flight group, which can be shared by multiple
+                model wrappers. The calls are not coalesced if `None`.
+        """
+        self.single_flight = single_flight
+        if single_flight is not None:
+            self.monitor.register(self._metric("coalesced_call"), "times")
+
+    def _coalescing_key(self, args: tuple, kwargs: dict) -> Optional[str]:
+        """The key to coalesce a model call, or `None` if the call should
+        not be coalesced, i.e. in stream mode."""
+        if self.single_flight is None or kwargs.get("stream", False):
+            return None
+        return _hash_call(
+            getattr(self, "model_type", type(self).__name__),
+            getattr(self, "model_name", None),
+            self._call_arguments(args, kwargs),
+        )
+
+    def _invoke(
+        self,
+        model_call: Callable,
+        args: tuple,
+        kwargs: dict,
+        coalesce: bool = True,
+    ) -> Any:
+        """Invoke the undecorated model call under the rate limiter and the
+        retry policy, and share the response with the concurrent identical
+        calls if coalescing is enabled and `coalesce` is `True`. The
+        coalesced calls receive a shallow copy of the response."""
+
+        def attempt() -> Any:
+            with self._rate_limit(args, kwargs) as hold:
+                return hold(model_call(self, *args, **kwargs))
+
+        def call() -> Any:
+            if self.retry_policy is None:
+                return attempt()
+            return self.retry_policy.call(attempt, self._on_retry)
+
+        key = self._coalescing_key(args, kwargs) if coalesce else None
+        if key is None:
+            return call()
+
+        response, shared = self.single_flight.do(key, call)
+        if shared:
+            self.update_monitor(coalesced_call=1)
+            response = copy.copy(response)
+        return response
+
+    async def _ainvoke(
+        self,
+        model_call: Callable,
+        args: tuple,
+        kwargs: dict,
+        coalesce: bool = True,
+    ) -> Any:
+        """The async version of `_invoke`."""
+
+        async def attempt() -> Any:
+            async with self._arate_limit(args, kwargs) as hold:
+                return hold(await model_call(self, *args, **kwargs))
+
+        async def call() -> Any:
+            if self.retry_policy is None:
+                return await attempt()
+            return await self.retry_policy.acall(attempt, self._on_retry)
+
+        key = self._coalescing_key(args, kwargs) if coalesce else None
+        if key is None:
+            return await call()
+
+        response, shared = await self.single_flight.ado(key, call)
+        if shared:
+            self.update_monitor(coalesced_call=1)
+            response = copy.copy(response)
+        return response
+
+    def set_retry_policy(self, retry_policy: Optional[RetryPolicy]) -> None:
+        """Set the policy to retry the failed model calls, and register the
+        number of retries and the time waited before them in the monitor.
+
+        Args:
+            retry_policy (`Optional[RetryPolicy]`):
+                The retry policy. The failed calls are not retried if
+                `None`.
+        """
+        self.retry_policy = retry_policy
+        if retry_policy is not None:
+            self.monitor.register(self._metric("retry"), "times")
+            self.monitor.register(self._metric("retry_backoff"), "s")
+
+    def _on_retry(
+        self,
+        attempt: int,  # pylint: disable=W0613
+        error: Optional[BaseException],  # pylint: disable=W0613
+        delay: float,
+    ) -> None:
+        """Record a retry in the monitor."""
+        self.update_monitor(retry=1, retry_backoff=delay)
+
+    def _parse_retry_delay(
+        self,
+        attempt: int,
+        error: Optional[BaseException],
+    ) -> float:
+        """The delay before retrying a call whose response fails to be
+        parsed, which follows the backoff of the retry policy if set."""
+        if self.retry_policy is None:
+            return _DEFAULT_RETRY_INTERVAL * attempt
+        delay = self.retry_policy.backoff(attempt)
+        self._on_retry(attempt, error, delay)
+        return delay
+
+    def set_rate_limiter(self, rate_limiter: Optional[RateLimiter]) -> None:
+        """Set the rate limiter of the model calls, and register the time
+        waited in the queue in the monitor.
+
+        Args:
+            rate_limiter (`Optional[RateLimiter]`):
+                The rate limiter. The calls are not limited if `None`.
+        """
+        self.rate_limiter = rate_limiter
+        if rate_limiter is not None:
+            self.monitor.register(self._metric("rate_limit_wait"), "s")
+
+    def _estimate_tokens(self, args: tuple, kwargs: dict) -> int:
+        """Estimate the tokens of a model call for rate limiting, including
+        the prompt and the maximum number of generated tokens (of all the
+        `n` choices) if set."""
+        generate_args = getattr(self, "generate_args", None) or {}
+        max_tokens = kwargs.get(
+            "max_tokens",
+            generate_args.get("max_tokens", None),
+        )
+        n = kwargs.get("n", generate_args.get("n", None)) or 1
+        return estimate_token_count([args, kwargs]) + (max_tokens or 0) * n
+
+    @contextmanager
+    def _rate_limit(
+        self,
+        args: tuple,
+        kwargs: dict,
+    ) -> Iterator[Callable[[Any], Any]]:
+        """Wait for the rate limiter (if any) before a model call, and
+        release it after the call. The context yields a function to pass
+        the response through, which hands the release over to the stream
+        of a streaming response, so that the request holds its slot until
+        the stream is exhausted or closed."""
+        if self.rate_limiter is None:
+            yield lambda response: response
+            return
+
+        waited = self.rate_limiter.acquire(self._estimate_tokens(args, kwargs))
+        if waited > 0:
+            self.update_monitor(rate_limit_wait=waited)
+        handed_over = False
+
+        def hold(response: Any) -> Any:
+            nonlocal handed_over
+            handed_over = self._hold_rate_limit(response)
+            return response
+
+        try:
+            yield hold
+        finally:
+            if not handed_over:
+                self.rate_limiter.release()
+
+    @asynccontextmanager
+    async def _arate_limit(
+        self,
+        args: tuple,
+        kwargs: dict,
+    ) -> AsyncIterator[Callable[[Any], Any]]:
+        """The async version of `_rate_limit`."""
+        if self.rate_limiter is None:
+            yield lambda response: response
+            return
+
+        waited = await self.rate_limiter.aacquire(
+            self._estimate_tokens(args, kwargs),
+        )
+        if waited > 0:
+            self.update_monitor(rate_limit_wait=waited)
+        handed_over = False
+
+        def hold(response: Any) -> Any:
+            nonlocal handed_over
+            handed_over = self._hold_rate_limit(response)
+            return response
+
+        try:
+            yield hold
+        finally:
+            if not handed_over:
+                self.rate_limiter.release()
+
+    def _hold_rate_limit(self, response: Any) -> bool:
+        """Hand the release of the rate limiter over to the stream of a
+        streaming response, and return whether it's handed over."""
+        # pylint: disable=protected-access
+        if not isinstance(response, ModelResponse) or response._stream is None:
+            return False
+        response._stream = _release_after_stream(
+            response._stream,
+            self.rate_limiter.release,
+        )
+        return True
+
+    def _stream_response(
+        self,
+        chunks: Iterable,
+        parse_chunk: Callable[[Any], Tuple[str, Optional[dict]]],
+        arguments: dict,
+    ) -> Generator[Tuple[str, Optional[dict]], None, None]:
+        """Convert the chunks returned by a streaming API into the stream of
+        `ModelResponse`. The invocation is recorded and the monitor is
+        updated after the chunks are exhausted.
+
+        Args:
+            chunks (`Iterable`):
+                The chunks returned by the streaming API.
+            parse_chunk (`Callable[[Any], Tuple[str, Optional[dict]]]`):
+                The function to extract the text delta and the usage (if
+                any) from a chunk.
+            arguments (`dict`):
+                The arguments of the API call, which are recorded.
+        """
+        text, usage = "", {}
+        for chunk in chunks:
+            delta, chunk_usage = parse_chunk(chunk)
+            if chunk_usage:
+                usage = chunk_usage
+            if delta:
+                text += delta
+                yield delta, None
+        yield "", self._finish_stream(text, usage, arguments)
+
+    async def _astream_response(
+        self,
+        chunks: AsyncIterable,
+        parse_chunk: Callable[[Any], Tuple[str, Optional[dict]]],
+        arguments: dict,
+    ) -> AsyncGenerator[Tuple[str, Optional[dict]], None]:
+        """The async version of `_stream_response`."""
+        text, usage = "", {}
+        async for chunk in chunks:
+            delta, chunk_usage = parse_chunk(chunk)
+            if chunk_usage:
+                usage = chunk_usage
+            if delta:
+                text += delta
+                yield delta, None
+        yield "", self._finish_stream(text, usage, arguments)
+
+    def _finish_stream(self, text: str, usage: dict, arguments: dict) -> dict:
+        """Record the invocation and update the monitor for an exhausted
+        stream, and return the raw response."""
+        raw = {"text": text, "usage": usage}
+        self._save_model_invocation(arguments=arguments, response=raw)
+        self.update_monitor(call_counter=1, **usage)
+        return raw
+
     def _register_budget(self, model_name: str, budget: float) -> None:
         """Register the budget of the model by model_name."""
         self.monitor.register_budget(
@@ -1,10 +1,11 @@
 # -*- coding: utf-8 -*-
 """Model wrapper for Ollama models."""
 from abc import ABC
-from typing import Sequence, Any, Optional, List, Union
+from typing import Sequence, Any, Optional, List, Union, Tuple
 
 from agentscope.message import MessageBase
 from agentscope.models import ModelWrapperBase, ModelResponse
+from agentscope.utils.model_metadata import get_model_max_length
 from agentscope.utils.tools import _convert_to_str
 
 try:
@@ -13,6 +14,20 @@ except ImportError:
     ollama = None
 
 
+def _parse_ollama_chunk(chunk: Any) -> Tuple[str, Optional[dict]]:
+    """Extract the text delta and usage from a chunk of Ollama chat API in
+    stream mode, where the usage is given in the last chunk."""
+    usage = None
+    if chunk.get("done", False):
+        usage = {
+            "prompt_tokens": chunk.get("prompt_eval_count", 0),
+            "completion_tokens": chunk.get("eval_count", 0),
+            "total_tokens": chunk.get("prompt_eval_count", 0)
+            + chunk.get("eval_count", 0),
+        }
+    return chunk["message"]["content"], usage
+
+
 class OllamaWrapperBase(ModelWrapperBase, ABC):
     """The base class for Ollama model wrappers.
 
@@ -62,11 +77,36 @@ class OllamaWrapperBase(ModelWrapperBase, ABC):
         super().__init__(config_name=config_name)
 
         self.model_name = model_name
+        self.max_length = get_model_max_length(model_name)
         self.options = options
         self.keep_alive = keep_alive
+        # the async client is created on the first `acall`
+        self._async_client = None
 
         self._register_default_metrics()
 
+    @property
+    def async_client(self) -> "ollama.AsyncClient":
+        """The async Ollama client used by `acall`."""
+        if self._async_client is None:
+            self._async_client = ollama.AsyncClient()
+        return self._async_client
+
+    def _prepare_args(
+        self,
+        options: Optional[dict],
+        keep_alive: Optional[str],
+    ) -> Tuple[dict, str]:
+        """Merge the options and keep_alive of this call with the ones
+        input in the constructor."""
+        if options is None:
+            options = self.options
+        else:
+            options = {**self.options, **options}
+
+        keep_alive = keep_alive or self.keep_alive
+        return options, keep_alive
+
 
 class OllamaChatWrapper(OllamaWrapperBase):
     """The model wrapper for Ollama chat API."""
@@ -99,15 +139,12 @@ class OllamaChatWrapper(OllamaWrapperBase):
         Returns:
             `ModelResponse`:
                 The response text in `text` field, and the raw response in
-                `raw` field.
+                `raw` field. If `stream=True` is given, the text deltas
+                can be consumed from the `stream` field as they are
+                generated.
         """
         # step1: prepare parameters accordingly
-        if options is None:
-            options = self.options
-        else:
-            options = {**self.options, **options}
-
-        keep_alive = keep_alive or self.keep_alive
+        options, keep_alive = self._prepare_args(options, keep_alive)
 
         # step2: forward to generate response
         response = ollama.chat(
@@ -118,6 +155,81 @@ class OllamaChatWrapper(OllamaWrapperBase):
             **kwargs,
         )
 
+        if kwargs.get("stream", False):
+            return ModelResponse(
+                stream=self._stream_response(
+                    response,
+                    _parse_ollama_chunk,
+                    {
+                        "model": self.model_name,
+                        "messages": messages,
+                        "options": options,
+                        "keep_alive": keep_alive,
+                        **kwargs,
+                    },
+                ),
+            )
+
+        return self._process_response(
+            messages,
+            options,
+            keep_alive,
+            kwargs,
+            response,
+        )
+
+    async def acall(
+        self,
+        messages: Sequence[dict],
+        options: Optional[dict] = None,
+        keep_alive: Optional[str] = None,
+        **kwargs: Any,
+    ) -> ModelResponse:
+        """The coroutine version of `__call__`, which sends the request by
+        the async Ollama client."""
+        options, keep_alive = self._prepare_args(options, keep_alive)
+
+        response = await self.async_client.chat(
+            model=self.model_name,
+            messages=messages,
+            options=options,
+            keep_alive=keep_alive,
+            **kwargs,
+        )
+
+        if kwargs.get("stream", False):
+            return ModelResponse(
+                stream=self._astream_response(
+                    response,
+                    _parse_ollama_chunk,
+                    {
+                        "model": self.model_name,
+                        "messages": messages,
+                        "options": options,
+                        "keep_alive": keep_alive,
+                        **kwargs,
+                    },
+                ),
+            )
+
+        return self._process_response(
+            messages,
+            options,
+            keep_alive,
+            kwargs,
+            response,
+        )
+
+    def _process_response(
+        self,
+        messages: Sequence[dict],
+        options: dict,
+        keep_alive: str,
+        kwargs: dict,
+        response: Any,
+    ) -> ModelResponse:
+        """Record the invocation, update the monitor and wrap the response
+        of chat API."""
         # step2: record the api invocation if needed
         self._save_model_invocation(
             arguments={
@@ -248,9 +360,7 @@ class OllamaChatWrapper(OllamaWrapperBase):
                 system_content_template.append(system_prompt)
             else:
                 # Merge all messages into a dialogue history prompt
-                dialogue.append(
-                    f"{unit.name}: {_convert_to_str(unit.content)}",
-                )
+                dialogue.append(self._format_dialogue_line(unit))
 
             if unit.url is not None:
                 images.append(unit.url)
@@ -282,6 +392,8 @@ class OllamaEmbeddingWrapper(OllamaWrapperBase):
 
     model_type: str = "ollama_embedding"
 
+    deterministic: bool = True
+
     def __call__(
         self,
         prompt: str,
@@ -310,12 +422,7 @@ class OllamaEmbeddingWrapper(OllamaWrapperBase):
                 response in `raw` field.
         """
         # step1: prepare parameters accordingly
-        if options is None:
-            options = self.options
-        else:
-            options = {**self.options, **options}
-
-        keep_alive = keep_alive or self.keep_alive
+        options, keep_alive = self._prepare_args(options, keep_alive)
 
         # step2: forward to generate response
         response = ollama.embeddings(
@@ -326,6 +433,51 @@ class OllamaEmbeddingWrapper(OllamaWrapperBase):
             **kwargs,
         )
 
+        return self._process_response(
+            prompt,
+            options,
+            keep_alive,
+            kwargs,
+            response,
+        )
+
+    async def acall(
+        self,
+        prompt: str,
+        options: Optional[dict] = None,
+        keep_alive: Optional[str] = None,
+        **kwargs: Any,
+    ) -> ModelResponse:
+        """The coroutine version of `__call__`, which sends the request by
+        the async Ollama client."""
+        options, keep_alive = self._prepare_args(options, keep_alive)
+
+        response = await self.async_client.embeddings(
+            model=self.model_name,
+            prompt=prompt,
+            options=options,
+            keep_alive=keep_alive,
+            **kwargs,
+        )
+
+        return self._process_response(
+            prompt,
+            options,
+            keep_alive,
+            kwargs,
+            response,
+        )
+
+    def _process_response(
+        self,
+        prompt: str,
+        options: dict,
+        keep_alive: str,
+        kwargs: dict,
+        response: Any,
+    ) -> ModelResponse:
+        """Record the invocation, update the monitor and wrap the response
+        of embedding API."""
         # step3: record the api invocation if needed
         self._save_model_invocation(
             arguments={
@@ -343,7 +495,7 @@ class OllamaEmbeddingWrapper(OllamaWrapperBase):
 
         # step5: return response
         return ModelResponse(
-            embedding=response["embedding"],
+            embedding=self._format_embedding(response["embedding"]),
             raw=response,
         )
 
@@ -399,12 +551,7 @@ class OllamaGenerationWrapper(OllamaWrapperBase):
 
         """
         # step1: prepare parameters accordingly
-        if options is None:
-            options = self.options
-        else:
-            options = {**self.options, **options}
-
-        keep_alive = keep_alive or self.keep_alive
+        options, keep_alive = self._prepare_args(options, keep_alive)
 
         # step2: forward to generate response
         response = ollama.generate(
@@ -414,6 +561,50 @@ class OllamaGenerationWrapper(OllamaWrapperBase):
             keep_alive=keep_alive,
         )
 
+        return self._process_response(
+            prompt,
+            options,
+            keep_alive,
+            kwargs,
+            response,
+        )
+
+    async def acall(
+        self,
+        prompt: str,
+        options: Optional[dict] = None,
+        keep_alive: Optional[str] = None,
+        **kwargs: Any,
+    ) -> ModelResponse:
+        """The coroutine version of `__call__`, which sends the request by
+        the async Ollama client."""
+        options, keep_alive = self._prepare_args(options, keep_alive)
+
+        response = await self.async_client.generate(
+            model=self.model_name,
+            prompt=prompt,
+            options=options,
+            keep_alive=keep_alive,
+        )
+
+        return self._process_response(
+            prompt,
+            options,
+            keep_alive,
+            kwargs,
+            response,
+        )
+
+    def _process_response(
+        self,
+        prompt: str,
+        options: dict,
+        keep_alive: str,
+        kwargs: dict,
+        response: Any,
+    ) -> ModelResponse:
+        """Record the invocation, update the monitor and wrap the response
+        of generation API."""
         # step3: record the api invocation if needed
         self._save_model_invocation(
             arguments={
@@ -497,9 +688,7 @@ class OllamaGenerationWrapper(OllamaWrapperBase):
                 sys_prompt = _convert_to_str(unit.content)
             else:
                 # Merge all messages into a dialogue history prompt
-                dialogue.append(
-                    f"{unit.name}: {_convert_to_str(unit.content)}",
-                )
+                dialogue.append(self._format_dialogue_line(unit))
 
         dialogue_history = "\n".join(dialogue)
 
@@ -1,11 +1,21 @@
 # -*- coding: utf-8 -*-
 """Model wrapper for OpenAI models"""
+import base64
 from abc import ABC
-from typing import Union, Any, List, Sequence, Dict
-
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    List,
+    Optional,
+    Sequence,
+    Union,
+)
+
+import numpy as np
 from loguru import logger
 
-from .model import ModelWrapperBase, ModelResponse
+from .model import ModelWrapperBase, ModelResponse, _parse_openai_chunk
 from ..file_manager import file_manager
 from ..message import MessageBase
 from ..utils.tools import _convert_to_str, _to_openai_image_url
@@ -75,6 +85,13 @@ class OpenAIWrapperBase(ModelWrapperBase, ABC):
             organization=organization,
             **(client_args or {}),
         )
+        # the async client is created on the first `acall`
+        self._client_kwargs = {
+            "api_key": api_key,
+            "organization": organization,
+            **(client_args or {}),
+        }
+        self._async_client = None
 
         # Set the max length of OpenAI model
         try:
@@ -89,6 +106,13 @@ class OpenAIWrapperBase(ModelWrapperBase, ABC):
         self._register_budget(model_name, budget)
         self._register_default_metrics()
 
+    @property
+    def async_client(self) -> "openai.AsyncOpenAI":
+        """The async OpenAI client used by `acall`."""
+        if self._async_client is None:
+            self._async_client = openai.AsyncOpenAI(**self._client_kwargs)
+        return self._async_client
+
     def format(
         self,
         *args: Union[MessageBase, Sequence[MessageBase]],
@@ -158,7 +182,8 @@ class OpenAIChatWrapper(OpenAIWrapperBase):
         Returns:
             `ModelResponse`:
                 The response text in text field, and the raw response in
-                raw field.
+                raw field. If `stream=True` is given, the text deltas can
+                be consumed from the stream field as they are generated.
 
         Note:
             `parse_func`, `fault_handler` and `max_retries` are reserved for
@@ -174,6 +199,53 @@ class OpenAIChatWrapper(OpenAIWrapperBase):
                 `max_retries` retries.
         """
 
+        kwargs = self._prepare_kwargs(messages, kwargs)
+
+        # step3: forward to generate response
+        response = self.client.chat.completions.create(
+            model=self.model_name,
+            messages=messages,
+            **kwargs,
+        )
+
+        if kwargs.get("stream", False):
+            return ModelResponse(
+                stream=self._stream_response(
+                    response,
+                    _parse_openai_chunk,
+                    {"model": self.model_name, "messages": messages, **kwargs},
+                ),
+            )
+        return self._process_response(messages, kwargs, response)
+
+    async def acall(
+        self,
+        messages: list,
+        **kwargs: Any,
+    ) -> ModelResponse:
+        """The coroutine version of `__call__`, which sends the request by
+        the async OpenAI client."""
+        kwargs = self._prepare_kwargs(messages, kwargs)
+
+        response = await self.async_client.chat.completions.create(
+            model=self.model_name,
+            messages=messages,
+            **kwargs,
+        )
+
+        if kwargs.get("stream", False):
+            return ModelResponse(
+                stream=self._astream_response(
+                    response,
+                    _parse_openai_chunk,
+                    {"model": self.model_name, "messages": messages, **kwargs},
+                ),
+            )
+        return self._process_response(messages, kwargs, response)
+
+    def _prepare_kwargs(self, messages: list, kwargs: dict) -> dict:
+        """Check the messages and merge the keyword arguments with
+        `generate_args`."""
         # step1: prepare keyword arguments
         kwargs = {**self.generate_args, **kwargs}
 
@@ -189,13 +261,19 @@ class OpenAIChatWrapper(OpenAIWrapperBase):
                 "and 'content' key for OpenAI API.",
             )
 
-        # step3: forward to generate response
-        response = self.client.chat.completions.create(
-            model=self.model_name,
-            messages=messages,
-            **kwargs,
-        )
+        # request the usage in the last chunk in stream mode
+        if kwargs.get("stream", False):
+            kwargs.setdefault("stream_options", {"include_usage": True})
+        return kwargs
 
+    def _process_response(
+        self,
+        messages: list,
+        kwargs: dict,
+        response: Any,
+    ) -> ModelResponse:
+        """Record the invocation, update the monitor and wrap the response
+        of chat completions API."""
         # step4: record the api invocation if needed
         self._save_model_invocation(
             arguments={
@@ -215,6 +293,39 @@ class OpenAIChatWrapper(OpenAIWrapperBase):
             raw=response.model_dump(),
         )
 
+    def _draw_samples(
+        self,
+        model_call: Callable,
+        args: tuple,
+        kwargs: dict,
+        n: int,
+        max_workers: Optional[int] = None,
+    ) -> List[ModelResponse]:
+        """Draw the candidates by the native `n` argument in one call,
+        where the usage of all the candidates is counted once."""
+        if n == 1 or kwargs.get("stream", False):
+            return super()._draw_samples(
+                model_call,
+                args,
+                kwargs,
+                n,
+                max_workers,
+            )
+
+        response = self._invoke(
+            model_call,
+            args,
+            {**kwargs, "n": n},
+            coalesce=False,
+        )
+        return [
+            ModelResponse(
+                text=choice["message"]["content"],
+                raw={**response.raw, "choices": [choice]},
+            )
+            for choice in response.raw["choices"]
+        ]
+
     def _format_msg_with_url(
         self,
         msg: MessageBase,
@@ -245,7 +356,9 @@ class OpenAIChatWrapper(OpenAIWrapperBase):
         checked_urls = []
         for url in urls:
             try:
-                checked_urls.append(_to_openai_image_url(url))
+                checked_urls.append(
+                    _to_openai_image_url(url, self.image_cache),
+                )
             except TypeError:
                 logger.warning(
                     f"The url {url} is not a valid image url for "
@@ -447,6 +560,8 @@ class OpenAIEmbeddingWrapper(OpenAIWrapperBase):
 
     model_type: str = "openai_embedding"
 
+    deterministic: bool = True
+
     def _register_default_metrics(self) -> None:
         # Set monitor accordingly
         # TODO: set quota to the following metrics
@@ -498,7 +613,7 @@ class OpenAIEmbeddingWrapper(OpenAIWrapperBase):
                 `max_retries` retries.
         """
         # step1: prepare keyword arguments
-        kwargs = {**self.generate_args, **kwargs}
+        kwargs = self._embedding_kwargs(kwargs)
 
         # step2: forward to generate response
         response = self.client.embeddings.create(
@@ -507,6 +622,42 @@ class OpenAIEmbeddingWrapper(OpenAIWrapperBase):
             **kwargs,
         )
 
+        return self._process_response(texts, kwargs, response)
+
+    async def acall(
+        self,
+        texts: Union[list[str], str],
+        **kwargs: Any,
+    ) -> ModelResponse:
+        """The coroutine version of `__call__`, which sends the request by
+        the async OpenAI client."""
+        kwargs = self._embedding_kwargs(kwargs)
+
+        response = await self.async_client.embeddings.create(
+            input=texts,
+            model=self.model_name,
+            **kwargs,
+        )
+
+        return self._process_response(texts, kwargs, response)
+
+    def _embedding_kwargs(self, kwargs: dict) -> dict:
+        """Merge the generation arguments, where the embeddings are
+        requested in base64 to be decoded into an array directly if
+        `embedding_dtype` is set."""
+        kwargs = {**self.generate_args, **kwargs}
+        if self.embedding_dtype is not None:
+            kwargs.setdefault("encoding_format", "base64")
+        return kwargs
+
+    def _process_response(
+        self,
+        texts: Union[list[str], str],
+        kwargs: dict,
+        response: Any,
+    ) -> ModelResponse:
+        """Record the invocation, update the monitor and wrap the response
+        of embedding API."""
         # step3: record the model api invocation if needed
         self._save_model_invocation(
             arguments={
@@ -527,8 +678,18 @@ class OpenAIEmbeddingWrapper(OpenAIWrapperBase):
                 embedding=response_json["data"]["embedding"][0],
                 raw=response_json,
             )
-        else:
-            return ModelResponse(
-                embedding=[_["embedding"] for _ in response_json["data"]],
-                raw=response_json,
-            )
+        embeddings = [_["embedding"] for _ in response_json["data"]]
+        if self.embedding_dtype is not None and isinstance(
+            embeddings[0],
+            str,
+        ):
+            # decode the little-endian float32 vectors without creating
+            # the python floats, into a writable buffer
+            embeddings = np.frombuffer(
+                bytearray().join(base64.b64decode(_) for _ in embeddings),
+                dtype="<f4",
+            ).reshape(len(embeddings), -1)
+        return ModelResponse(
+            embedding=self._format_embedding(embeddings),
+            raw=response_json,
+        )
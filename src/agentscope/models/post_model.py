@@ -1,18 +1,21 @@
 # -*- coding: utf-8 -*-
 """Model wrapper for post-based inference apis."""
+import asyncio
 import json
 import time
 from abc import ABC
-from typing import Any, Union, Sequence, List
+from typing import Any, Optional, Union, Sequence, List
 
 import requests
 from loguru import logger
 
 from .model import ModelWrapperBase, ModelResponse
+from .retry import RetryPolicy, parse_retry_after
 from ..constants import _DEFAULT_MAX_RETRIES
 from ..constants import _DEFAULT_MESSAGES_KEY
 from ..constants import _DEFAULT_RETRY_INTERVAL
 from ..message import MessageBase
+from ..utils.http_utils import create_httpx_client, create_requests_session
 from ..utils.tools import _convert_to_str
 
 
@@ -33,6 +36,9 @@ class PostAPIModelWrapperBase(ModelWrapperBase, ABC):
         max_retries: int = _DEFAULT_MAX_RETRIES,
         messages_key: str = _DEFAULT_MESSAGES_KEY,
         retry_interval: int = _DEFAULT_RETRY_INTERVAL,
+        pool_size: int = 10,
+        keepalive_expiry: float = 5.0,
+        http2: bool = False,
         **kwargs: Any,
     ) -> None:
         """Initialize the model wrapper.
@@ -53,12 +59,26 @@ class PostAPIModelWrapperBase(ModelWrapperBase, ABC):
             post_args (`dict`, defaults to `None`):
                 The post arguments of the api. Defaults to None.
             max_retries (`int`, defaults to `3`):
-                The maximum number of retries when the `parse_func` raise an
-                exception.
+                The maximum number of attempts when the request fails with
+                a retryable status code (408, 409, 425, 429 and 5xx).
             messages_key (`str`, defaults to `inputs`):
                 The key of the input messages in the json argument.
             retry_interval (`int`, defaults to `1`):
-                The interval between retries when a request fails.
+                The base delay of the exponential backoff between retries.
+                The default retry policy made of `max_retries` and
+                `retry_interval` is replaced by the `"retry"` field of the
+                model config if given.
+            pool_size (`int`, defaults to `10`):
+                The maximum number of connections kept alive to the api,
+                which are reused across calls and retries.
+            keepalive_expiry (`float`, defaults to `5.0`):
+                The number of seconds an idle connection is kept alive,
+                which takes effect on the `httpx` clients, i.e. in `acall`
+                or with `http2` enabled.
+            http2 (`bool`, defaults to `False`):
+                Whether to use HTTP/2, where the requests are sent by
+                `httpx.Client` instead of `requests.Session`. It requires
+                the `h2` package.
 
         Note:
             When an object of `PostApiModelWrapper` is called, the arguments
@@ -66,7 +86,7 @@ class PostAPIModelWrapperBase(ModelWrapperBase, ABC):
 
             .. code-block:: python
 
-                request.post(
+                session.post(
                     url=api_url,
                     headers=headers,
                     json={
@@ -87,13 +107,34 @@ class PostAPIModelWrapperBase(ModelWrapperBase, ABC):
         self.max_retries = max_retries
         self.messages_key = messages_key
         self.retry_interval = retry_interval
+        self.set_retry_policy(
+            RetryPolicy(
+                max_retries=max_retries - 1,
+                base_delay=retry_interval,
+            ),
+        )
+
+        # the pooled connections are reused across calls and retries
+        self.pool_size = pool_size
+        self.keepalive_expiry = keepalive_expiry
+        self.http2 = http2
+        if http2:
+            self.session = create_httpx_client(
+                pool_size=pool_size,
+                keepalive_expiry=keepalive_expiry,
+                http2=True,
+            )
+        else:
+            self.session = create_requests_session(pool_size=pool_size)
+        # the async client is created on the first `acall`
+        self._async_client = None
 
     def _parse_response(self, response: dict) -> ModelResponse:
         """Parse the response json data into ModelResponse"""
         return ModelResponse(raw=response)
 
     def __call__(self, input_: str, **kwargs: Any) -> ModelResponse:
-        """Calling the model with requests.post.
+        """Calling the model with the post method of the pooled session.
 
         Args:
             input_ (`str`):
@@ -118,45 +159,120 @@ class PostAPIModelWrapperBase(ModelWrapperBase, ABC):
                 `max_retries` retries.
         """
         # step1: prepare keyword arguments
+        request_kwargs = self._prepare_request_kwargs(input_, kwargs)
+
+        # step2: post requests, and retry on the retryable status codes
+        start, attempt = time.time(), 0
+        while True:
+            response = self.session.post(**request_kwargs)
+
+            attempt += 1
+            delay = self._status_retry_delay(attempt, start, response)
+            if delay is None:
+                break
+            time.sleep(delay)
+
+        return self._process_response(
+            request_kwargs,
+            response.status_code,
+            response.json(),
+        )
+
+    async def acall(self, input_: str, **kwargs: Any) -> ModelResponse:
+        """The coroutine version of `__call__`, which sends the request by
+        `httpx.AsyncClient`. Note the `post_args` are passed to
+        `httpx.AsyncClient.post`, whose arguments differ slightly from
+        `requests.post`."""
+        if self._async_client is None:
+            self._async_client = create_httpx_client(
+                pool_size=self.pool_size,
+                keepalive_expiry=self.keepalive_expiry,
+                http2=self.http2,
+                is_async=True,
+            )
+
+        request_kwargs = self._prepare_request_kwargs(input_, kwargs)
+
+        start, attempt = time.time(), 0
+        while True:
+            response = await self._async_client.post(**request_kwargs)
+
+            attempt += 1
+            delay = self._status_retry_delay(attempt, start, response)
+            if delay is None:
+                break
+            await asyncio.sleep(delay)
+
+        return self._process_response(
+            request_kwargs,
+            response.status_code,
+            response.json(),
+        )
+
+    def _status_retry_delay(
+        self,
+        attempt: int,
+        start: float,
+        response: Any,
+    ) -> Optional[float]:
+        """The delay before retrying a request by its status code, or
+        `None` if it should not be retried."""
+        status_code = response.status_code
+        if (
+            status_code == requests.codes.ok
+            or self.retry_policy is None
+            or not self.retry_policy.is_retryable_status(status_code)
+        ):
+            return None
+
+        delay = self.retry_policy.get_delay(
+            attempt,
+            start,
+            retry_after=parse_retry_after(response.headers),
+        )
+        if delay is not None:
+            logger.warning(
+                f"Failed to call the model with status code == "
+                f"{status_code}, retry {attempt}/"
+                f"{self.retry_policy.max_retries} in {delay:.2f}s",
+            )
+            self._on_retry(attempt, None, delay)
+        return delay
+
+    def _prepare_request_kwargs(self, input_: str, kwargs: dict) -> dict:
+        """Prepare the keyword arguments of the post request."""
         post_args = {**self.post_args, **kwargs}
 
-        request_kwargs = {
+        return {
             "url": self.api_url,
             "json": {self.messages_key: input_, **self.json_args},
             "headers": self.headers or {},
             **post_args,
         }
 
-        # step2: prepare post requests
-        for i in range(1, self.max_retries + 1):
-            response = requests.post(**request_kwargs)
-
-            if response.status_code == requests.codes.ok:
-                break
-
-            if i < self.max_retries:
-                logger.warning(
-                    f"Failed to call the model with "
-                    f"requests.codes == {response.status_code}, retry "
-                    f"{i + 1}/{self.max_retries} times",
-                )
-                time.sleep(i * self.retry_interval)
-
+    def _process_response(
+        self,
+        request_kwargs: dict,
+        status_code: int,
+        response_json: dict,
+    ) -> ModelResponse:
+        """Record the invocation and parse the response of the post
+        request."""
         # step3: record model invocation
         # record the model api invocation, which will be skipped if
         # `FileManager.save_api_invocation` is `False`
         self._save_model_invocation(
             arguments=request_kwargs,
-            response=response.json(),
+            response=response_json,
         )
 
         # step4: parse the response
-        if response.status_code == requests.codes.ok:
-            return self._parse_response(response.json())
+        if status_code == requests.codes.ok:
+            return self._parse_response(response_json)
         else:
             logger.error(json.dumps(request_kwargs, indent=4))
             raise RuntimeError(
-                f"Failed to call the model with {response.json()}",
+                f"Failed to call the model with {response_json}",
             )
 
 
@@ -0,0 +1,213 @@
+# -*- coding: utf-8 -*-
+"""The client-side rate limiter of model calls, which throttles the requests
+sent to the model api before they are rejected by the provider."""
+import asyncio
+import json
+import os
+import threading
+import time
+from typing import Optional
+
+from loguru import logger
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
+
+def _wake(future: asyncio.Future) -> None:
+    """Wake up a coroutine waiting for a released request slot."""
+    if not future.done():
+        future.set_result(None)
+
+
+class RateLimiter:
+    """A rate limiter combining token buckets of requests per minute and
+    tokens per minute with a limit of the in-flight requests.
+
+    The buckets are refilled continuously and start full, so that a burst
+    up to the per-minute limits is allowed. By default the state is kept in
+    the current process. If `path` is provided, the buckets are stored in
+    a local file guarded by a file lock and shared by all processes using
+    the same path, while `max_concurrency` is still limited per process.
+    """
+
+    def __init__(
+        self,
+        requests_per_minute: Optional[float] = None,
+        tokens_per_minute: Optional[float] = None,
+        max_concurrency: Optional[int] = None,
+        path: Optional[str] = None,
+    ) -> None:
+        """Initialize the rate limiter.
+
+        Args:
+            requests_per_minute (`Optional[float]`, defaults to `None`):
+                The maximum number of requests per minute. Unlimited if
+                `None`.
+            tokens_per_minute (`Optional[float]`, defaults to `None`):
+                The maximum number of estimated tokens per minute. Unlimited
+                if `None`.
+            max_concurrency (`Optional[int]`, defaults to `None`):
+                The maximum number of in-flight requests. Unlimited if
+                `None`.
+            path (`Optional[str]`, defaults to `None`):
+                The path of the file to share the buckets across processes.
+                Only supported on the platforms with `fcntl`.
+        """
+        self.max_concurrency = max_concurrency
+        self._limits = {
+            "requests": requests_per_minute,
+            "tokens": tokens_per_minute,
+        }
+
+        if path is not None and fcntl is None:
+            logger.warning(
+                "Sharing rate limits across processes requires fcntl, "
+                "fall back to the limits within the current process.",
+            )
+            path = None
+        self.path = path
+        if path is not None and os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+
+        self._lock = threading.Lock()
+        # the threads and coroutines waiting for a released request slot
+        self._released = threading.Condition(self._lock)
+        self._waiters: list = []
+        self._in_flight = 0
+        self._state = self._full_state()
+
+    def acquire(self, tokens: int = 0) -> float:
+        """Block until a request with the estimated number of tokens is
+        allowed. Each successful `acquire` must be paired with a `release`.
+
+        Args:
+            tokens (`int`, defaults to `0`):
+                The estimated number of tokens of the request.
+
+        Returns:
+            `float`: The number of seconds waited in the queue.
+        """
+        start = time.time()
+        waited = False
+        while True:
+            with self._released:
+                wait = self._try_acquire(tokens)
+                while wait is None:
+                    waited = True
+                    self._released.wait()
+                    wait = self._try_acquire(tokens)
+            if wait <= 0:
+                return time.time() - start if waited else 0.0
+            waited = True
+            time.sleep(wait)
+
+    async def aacquire(self, tokens: int = 0) -> float:
+        """The coroutine version of `acquire`, which waits without blocking
+        the event loop."""
+        loop = asyncio.get_running_loop()
+        start = time.time()
+        waited = False
+        while True:
+            with self._lock:
+                wait = self._try_acquire(tokens)
+                if wait is None:
+                    future = loop.create_future()
+                    self._waiters.append((loop, future))
+            if wait is None:
+                waited = True
+                await future
+                continue
+            if wait <= 0:
+                return time.time() - start if waited else 0.0
+            waited = True
+            await asyncio.sleep(wait)
+
+    def release(self) -> None:
+        """Mark an acquired request as finished, and wake up the requests
+        waiting for a slot."""
+        with self._released:
+            self._in_flight = max(0, self._in_flight - 1)
+            self._released.notify_all()
+            waiters, self._waiters = self._waiters, []
+        for loop, future in waiters:
+            try:
+                loop.call_soon_threadsafe(_wake, future)
+            except RuntimeError:
+                # the event loop of the waiter is closed
+                pass
+
+    def _try_acquire(self, tokens: int) -> Optional[float]:
+        """Try to take a request slot and the tokens from the buckets, with
+        the lock held.
+
+        Returns:
+            `Optional[float]`: `0` if acquired, `None` if all the request
+            slots are taken, otherwise the number of seconds to wait for
+            the buckets.
+        """
+        if (
+            self.max_concurrency is not None
+            and self._in_flight >= self.max_concurrency
+        ):
+            return None
+
+        amounts = {"requests": 1, "tokens": tokens}
+        if self.path is None:
+            wait = self._consume(self._state, amounts)
+        else:
+            wait = self._consume_shared(self.path, amounts)
+
+        if wait <= 0:
+            self._in_flight += 1
+        return wait
+
+    def _consume(self, state: dict, amounts: dict) -> float:
+        """Refill the buckets in the state and take the amounts from them
+        if all the buckets are sufficient."""
+        now = time.time()
+        elapsed = max(0.0, now - state["updated"])
+        state["updated"] = now
+
+        wait = 0.0
+        for name, limit in self._limits.items():
+            if limit is None:
+                continue
+            state[name] = min(limit, state[name] + elapsed * limit / 60)
+            # a request larger than the bucket only waits for a full bucket
+            need = min(amounts[name], limit)
+            if state[name] < need:
+                wait = max(wait, (need - state[name]) * 60 / limit)
+
+        if wait <= 0:
+            for name, limit in self._limits.items():
+                if limit is not None:
+                    state[name] -= min(amounts[name], limit)
+        return wait
+
+    def _consume_shared(self, path: str, amounts: dict) -> float:
+        """Take the amounts from the buckets stored in the shared file."""
+        with open(path, "a+", encoding="utf-8") as file:
+            fcntl.flock(file, fcntl.LOCK_EX)
+            try:
+                file.seek(0)
+                content = file.read()
+                state = json.loads(content) if content else self._full_state()
+                wait = self._consume(state, amounts)
+                file.seek(0)
+                file.truncate()
+                json.dump(state, file)
+                file.flush()
+            finally:
+                fcntl.flock(file, fcntl.LOCK_UN)
+        return wait
+
+    def _full_state(self) -> dict:
+        """The state with full buckets."""
+        return {
+            "requests": self._limits["requests"] or 0,
+            "tokens": self._limits["tokens"] or 0,
+            "updated": time.time(),
+        }
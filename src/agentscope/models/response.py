@@ -1,8 +1,19 @@
 # -*- coding: utf-8 -*-
 """Parser for model response."""
 import json
-from typing import Optional, Sequence, Any
+from typing import (
+    Any,
+    AsyncGenerator,
+    AsyncIterator,
+    Generator,
+    Iterator,
+    Optional,
+    Sequence,
+    Tuple,
+    Union,
+)
 
+import numpy as np
 from loguru import logger
 
 from agentscope.utils.tools import _is_json_serializable
@@ -13,9 +24,14 @@ class ModelResponse:
 
     The main purpose of this class is to align the return formats of different
     models and act as a bridge between models and agents.
+
+    A response generated in stream mode carries a stream of text deltas,
+    which can be consumed by iterating `stream` (with `async for` if it's
+    generated by `acall`). The deltas are accumulated into `text`, and
+    `raw` is set to the final text and usage once the stream is exhausted.
+    Accessing `text` before that consumes the rest of a synchronous stream.
     """
 
-    text: Optional[str] = None
     embedding: Optional[Sequence] = None
     raw: Optional[Any] = None
     image_urls: Optional[Sequence[str]] = None
@@ -28,6 +44,9 @@ class ModelResponse:
         image_urls: Sequence[str] = None,
         raw: Any = None,
         parsed: Any = None,
+        stream: Optional[
+            Union[Iterator[Tuple[str, Any]], AsyncIterator[Tuple[str, Any]]]
+        ] = None,
     ) -> None:
         """Initialize the model response.
 
@@ -42,13 +61,84 @@ class ModelResponse:
                 The raw data returned by the model.
             parsed (`Any`, optional):
                 The parsed data returned by the model.
+            stream (`Union[Iterator, AsyncIterator]`, optional):
+                The stream generated by the model wrapper, which yields
+                tuples of (delta, raw), where raw is `None` except for the
+                last one.
         """
-        self.text = text
+        self._text = text
+        self._stream = stream
         self.embedding = embedding
         self.image_urls = image_urls
         self.raw = raw
         self.parsed = parsed
 
+    @property
+    def text(self) -> Optional[str]:
+        """The text field, which waits for the rest of the stream in
+        stream mode."""
+        if self._stream is not None:
+            if hasattr(self._stream, "__aiter__"):
+                raise RuntimeError(
+                    "The text of an async stream response is available "
+                    "after iterating `stream` with `async for`.",
+                )
+            for _ in self._consume_stream():
+                pass
+        return self._text
+
+    @text.setter
+    def text(self, value: Optional[str]) -> None:
+        """Set the text field."""
+        self._text = value
+
+    @property
+    def is_stream(self) -> bool:
+        """Whether the response has a stream that is not exhausted."""
+        return self._stream is not None
+
+    @property
+    def stream(
+        self,
+    ) -> Union[Generator[str, None, None], AsyncGenerator[str, None]]:
+        """The text deltas of the response, which can be iterated only once.
+        For a response that is not (or no longer) streaming, the whole text
+        is yielded at once."""
+        if self._stream is None:
+            return self._replay()
+        if hasattr(self._stream, "__aiter__"):
+            return self._aconsume_stream()
+        return self._consume_stream()
+
+    def _replay(self) -> Generator[str, None, None]:
+        """Yield the whole text."""
+        if self._text:
+            yield self._text
+
+    def _consume_stream(self) -> Generator[str, None, None]:
+        """Consume the synchronous stream."""
+        if self._text is None:
+            self._text = ""
+        for delta, raw in self._stream:
+            if raw is not None:
+                self.raw = raw
+            if delta:
+                self._text += delta
+                yield delta
+        self._stream = None
+
+    async def _aconsume_stream(self) -> AsyncGenerator[str, None]:
+        """Consume the asynchronous stream."""
+        if self._text is None:
+            self._text = ""
+        async for delta, raw in self._stream:
+            if raw is not None:
+                self.raw = raw
+            if delta:
+                self._text += delta
+                yield delta
+        self._stream = None
+
     def __getattribute__(self, item: str) -> Any:
         """Warning for the deprecated json attribute."""
         if item == "json":
@@ -75,9 +165,13 @@ class ModelResponse:
         else:
             raw = str(self.raw)
 
+        embedding = self.embedding
+        if isinstance(embedding, np.ndarray):
+            embedding = embedding.tolist()
+
         serialized_fields = {
             "text": self.text,
-            "embedding": self.embedding,
+            "embedding": embedding,
             "image_urls": self.image_urls,
             "parsed": self.parsed,
             "raw": raw,
@@ -0,0 +1,305 @@
+# -*- coding: utf-8 -*-
+"""The retry policy of model calls, with exponential backoff, full jitter,
+`Retry-After` support and per-error-class rules."""
+import asyncio
+import email.utils
+import random
+import time
+from typing import Any, Awaitable, Callable, Optional
+
+from loguru import logger
+
+# the status codes worth retrying, besides the server errors (5xx)
+_RETRYABLE_STATUS_CODES = {408, 409, 425, 429}
+
+# the error class names worth retrying without a status code
+_RETRYABLE_ERROR_KEYWORDS = [
+    "Timeout",
+    "Connection",
+    "RateLimit",
+    "ServiceUnavailable",
+    "InternalServer",
+]
+
+
+def _get_status_code(error: BaseException) -> Optional[int]:
+    """Get the HTTP status code carried by the error of the SDKs, if
+    any."""
+    status_code = getattr(error, "status_code", None)
+    if status_code is None:
+        response = getattr(error, "response", None)
+        status_code = getattr(response, "status_code", None)
+    return status_code if isinstance(status_code, int) else None
+
+
+def parse_retry_after(headers: Any) -> Optional[float]:
+    """Parse the seconds to wait from the `Retry-After` (in seconds or as
+    an HTTP date) or `Retry-After-Ms` header.
+
+    Args:
+        headers (`Any`):
+            The response headers, which should support `get`.
+
+    Returns:
+        `Optional[float]`: The seconds to wait, or `None` if not given.
+    """
+    if headers is None or not hasattr(headers, "get"):
+        return None
+
+    retry_after_ms = headers.get("retry-after-ms", None)
+    if retry_after_ms is not None:
+        try:
+            return max(0.0, float(retry_after_ms) / 1000)
+        except ValueError:
+            pass
+
+    retry_after = headers.get("retry-after", None)
+    if retry_after is None:
+        return None
+    try:
+        return max(0.0, float(retry_after))
+    except ValueError:
+        pass
+    try:
+        date = email.utils.parsedate_to_datetime(retry_after)
+    except (TypeError, ValueError):
+        return None
+    return max(0.0, date.timestamp() - time.time())
+
+
+class RetryPolicy:
+    """The policy to retry the failed model calls.
+
+    The delay before the n-th retry is drawn uniformly from
+    `[0, min(max_delay, base_delay * multiplier ** (n - 1))]` (the "full
+    jitter" backoff), unless the server asks for a delay by the
+    `Retry-After` header. The retries stop when the error is not retryable,
+    `max_retries` is reached, the server asks for a delay longer than
+    `max_retry_after`, or the next attempt would start after the overall
+    `deadline`.
+
+    By default, the errors with a retryable status code (408, 409, 425,
+    429 and 5xx) or a class name about timeout, connection, rate limit or
+    server errors are retried. The rules keyed by error class name (any
+    class in its MRO) override the defaults, e.g.
+
+    .. code-block:: python
+
+        {
+            "RateLimitError": {"max_retries": 8, "base_delay": 2.0},
+            "AuthenticationError": {"max_retries": 0},
+            "ValueError": {"retry": True},
+        }
+    """
+
+    def __init__(
+        self,
+        max_retries: int = 3,
+        base_delay: float = 1.0,
+        max_delay: float = 60.0,
+        multiplier: float = 2.0,
+        jitter: bool = True,
+        deadline: Optional[float] = None,
+        rules: Optional[dict] = None,
+        max_retry_after: Optional[float] = None,
+    ) -> None:
+        """Initialize the retry policy.
+
+        Args:
+            max_retries (`int`, defaults to `3`):
+                The maximum number of retries after the first attempt.
+            base_delay (`float`, defaults to `1.0`):
+                The delay in seconds before the first retry.
+            max_delay (`float`, defaults to `60.0`):
+                The maximum delay in seconds of the backoff.
+            multiplier (`float`, defaults to `2.0`):
+                The growth factor of the delay between retries.
+            jitter (`bool`, defaults to `True`):
+                Whether to draw the delay randomly from zero to the backoff,
+                which avoids the retries of concurrent calls in lockstep.
+            deadline (`Optional[float]`, defaults to `None`):
+                The overall seconds allowed for a call including all the
+                retries. Unlimited if `None`.
+            rules (`Optional[dict]`, defaults to `None`):
+                The rules by error class name, each of which may override
+                `retry` (whether to retry), `max_retries`, `base_delay` and
+                `max_delay`.
+            max_retry_after (`Optional[float]`, defaults to `None`):
+                The maximum delay in seconds asked by the server, beyond
+                which the call fails instead of waiting. Defaults to the
+                `max_delay` if `None`.
+        """
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.multiplier = multiplier
+        self.jitter = jitter
+        self.deadline = deadline
+        self.rules = rules or {}
+        self.max_retry_after = max_retry_after
+
+    def is_retryable_status(self, status_code: int) -> bool:
+        """Whether the HTTP status code is worth retrying."""
+        return status_code in _RETRYABLE_STATUS_CODES or status_code >= 500
+
+    def backoff(
+        self,
+        attempt: int,
+        base_delay: Optional[float] = None,
+        max_delay: Optional[float] = None,
+    ) -> float:
+        """The delay in seconds before the `attempt`-th retry (from 1)."""
+        base_delay = self.base_delay if base_delay is None else base_delay
+        max_delay = self.max_delay if max_delay is None else max_delay
+        delay = min(max_delay, base_delay * self.multiplier ** (attempt - 1))
+        if self.jitter:
+            delay = random.uniform(0, delay)
+        return delay
+
+    def get_delay(
+        self,
+        attempt: int,
+        start: float,
+        error: Optional[BaseException] = None,
+        retry_after: Optional[float] = None,
+    ) -> Optional[float]:
+        """Decide whether to make the `attempt`-th retry and how long to
+        wait before it.
+
+        Args:
+            attempt (`int`):
+                The index of the retry, from 1.
+            start (`float`):
+                The time when the first attempt started.
+            error (`Optional[BaseException]`, defaults to `None`):
+                The error of the last attempt. If `None`, the last attempt
+                is considered retryable, e.g. for a retryable status code.
+            retry_after (`Optional[float]`, defaults to `None`):
+                The delay asked by the server. If not provided, it's parsed
+                from the response headers carried by the error.
+
+        Returns:
+            `Optional[float]`: The delay in seconds, or `None` if no more
+            retries should be made.
+        """
+        rule = self._match_rule(error) if error is not None else {}
+        if error is not None and not rule.get(
+            "retry",
+            self._is_retryable(error),
+        ):
+            return None
+        if attempt > rule.get("max_retries", self.max_retries):
+            return None
+
+        if retry_after is None and error is not None:
+            response = getattr(error, "response", None)
+            retry_after = parse_retry_after(getattr(response, "headers", None))
+
+        if retry_after is not None:
+            max_retry_after = self.max_retry_after
+            if max_retry_after is None:
+                max_retry_after = rule.get("max_delay", self.max_delay)
+            if retry_after > max_retry_after:
+                logger.warning(
+                    f"The server asks to retry in {retry_after:.2f}s, "
+                    f"exceeding the maximum {max_retry_after:.2f}s, give "
+                    f"up retrying.",
+                )
+                return None
+            delay = retry_after
+        else:
+            delay = self.backoff(
+                attempt,
+                rule.get("base_delay", None),
+                rule.get("max_delay", None),
+            )
+
+        if self.deadline is not None and (
+            time.time() + delay - start > self.deadline
+        ):
+            return None
+        return delay
+
+    def call(
+        self,
+        func: Callable[[], Any],
+        on_retry: Optional[Callable[[int, BaseException, float], None]] = None,
+    ) -> Any:
+        """Call the function and retry it by the policy.
+
+        Args:
+            func (`Callable[[], Any]`):
+                The function to call.
+            on_retry (`Optional[Callable[[int, BaseException, float], \
+                None]]`, defaults to `None`):
+                The callback before each retry, which takes the index of
+                the retry, the error and the delay.
+
+        Returns:
+            `Any`: The return value of the function.
+        """
+        start = time.time()
+        attempt = 0
+        while True:
+            try:
+                return func()
+            except Exception as e:
+                attempt += 1
+                delay = self.get_delay(attempt, start, e)
+                if delay is None:
+                    raise
+                self._log_retry(attempt, e, delay)
+                if on_retry is not None:
+                    on_retry(attempt, e, delay)
+                time.sleep(delay)
+
+    async def acall(
+        self,
+        func: Callable[[], Awaitable[Any]],
+        on_retry: Optional[Callable[[int, BaseException, float], None]] = None,
+    ) -> Any:
+        """The coroutine version of `call`."""
+        start = time.time()
+        attempt = 0
+        while True:
+            try:
+                return await func()
+            except Exception as e:
+                attempt += 1
+                delay = self.get_delay(attempt, start, e)
+                if delay is None:
+                    raise
+                self._log_retry(attempt, e, delay)
+                if on_retry is not None:
+                    on_retry(attempt, e, delay)
+                await asyncio.sleep(delay)
+
+    def _is_retryable(self, error: BaseException) -> bool:
+        """Whether the error is retryable by default."""
+        status_code = _get_status_code(error)
+        if status_code is not None:
+            return self.is_retryable_status(status_code)
+        return any(
+            keyword in cls.__name__
+            for cls in type(error).__mro__
+            for keyword in _RETRYABLE_ERROR_KEYWORDS
+        )
+
+    def _match_rule(self, error: BaseException) -> dict:
+        """Find the rule of the most specific class of the error."""
+        for cls in type(error).__mro__:
+            if cls.__name__ in self.rules:
+                return self.rules[cls.__name__]
+        return {}
+
+    def _log_retry(
+        self,
+        attempt: int,
+        error: BaseException,
+        delay: float,
+    ) -> None:
+        """Log a retry."""
+        logger.warning(
+            f"Model call failed with {error.__class__.__name__}: {error}, "
+            f"retry {attempt} in {delay:.2f}s",
+        )
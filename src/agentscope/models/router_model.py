@@ -0,0 +1,311 @@
+# -*- coding: utf-8 -*-
+"""Model wrapper routing the calls across the backends of the same logical
+model, e.g. an OpenAI model, a vLLM server and an Ollama model."""
+import asyncio
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from typing import Any, List, Optional, Sequence, Union
+
+from loguru import logger
+
+from .model import ModelWrapperBase, ModelResponse
+from ..message import MessageBase
+
+_POLICIES = ["latency", "least_in_flight", "weighted", "failover"]
+
+
+class _BackendStats:
+    """The observed latency and errors of a backend."""
+
+    def __init__(self) -> None:
+        self.latency: Optional[float] = None
+        self.error_rate = 0.0
+        self.last_call: Optional[float] = None
+        self.in_flight = 0
+        self.num_calls = 0
+        self.num_errors = 0
+
+    def to_dict(self) -> dict:
+        """Convert the stats into a dict."""
+        return {
+            "latency": self.latency,
+            "error_rate": self.error_rate,
+            "in_flight": self.in_flight,
+            "num_calls": self.num_calls,
+            "num_errors": self.num_errors,
+        }
+
+
+class RouterModelWrapper(ModelWrapperBase):
+    """The model wrapper routing each call to one of the backend model
+    configs by a policy, and retrying on the next backend when the call
+    fails or times out.
+
+    The supported policies are:
+
+        - `"latency"`: the backend with the lowest latency, which is the
+          exponentially weighted moving average (EWMA) of the observed
+          latencies. The backends never called are tried first.
+        - `"least_in_flight"`: the backend with the fewest in-flight calls.
+        - `"weighted"`: a random backend by the given weights.
+        - `"failover"`: the backends in the given order.
+
+    Except for `"failover"`, the backends whose error rate (also an EWMA)
+    exceeds `max_error_rate`, or which have never succeeded, are only
+    tried after the healthy ones. Such a backend is tried first again by
+    one call (a probe) every `cooldown` seconds, and is considered healthy
+    again once a probe succeeds.
+
+    Note:
+        The prompt is formatted by the first backend, so the backends
+        should accept the same format of input, e.g. the OpenAI-compatible
+        messages of `openai_chat`, `post_api_chat` and `ollama_chat`.
+
+    Example of the model config:
+
+        .. code-block:: python
+
+            {
+                "config_name": "my_router",
+                "model_type": "router",
+                "backends": ["gpt-4", "my_vllm", "my_ollama"],
+                "policy": "latency",
+                "timeout": 30,
+            }
+    """
+
+    model_type: str = "router"
+
+    def __init__(
+        self,
+        config_name: str,
+        backends: List[str],
+        policy: str = "latency",
+        weights: Optional[List[float]] = None,
+        timeout: Optional[float] = None,
+        alpha: float = 0.2,
+        max_error_rate: float = 0.5,
+        cooldown: float = 30.0,
+        **kwargs: Any,
+    ) -> None:
+        """Initialize the router model wrapper.
+
+        Args:
+            config_name (`str`):
+                The name of the model config.
+            backends (`List[str]`):
+                The config names of the backend models, which are loaded on
+                the first call.
+            policy (`str`, defaults to `"latency"`):
+                The routing policy, which is one of `"latency"`,
+                `"least_in_flight"`, `"weighted"` and `"failover"`.
+            weights (`Optional[List[float]]`, defaults to `None`):
+                The weights of the backends for the `"weighted"` policy.
+                Equal weights are used if not provided.
+            timeout (`Optional[float]`, defaults to `None`):
+                The number of seconds before a call is considered failed and
+                retried on the next backend. Note a timed-out synchronous
+                call keeps running in a background thread.
+            alpha (`float`, defaults to `0.2`):
+                The smoothing factor of the EWMA of the latencies and error
+                rates.
+            max_error_rate (`float`, defaults to `0.5`):
+                The error rate above which a backend is deprioritized.
+            cooldown (`float`, defaults to `30.0`):
+                The number of seconds after the last call to a deprioritized
+                backend before probing it again.
+        """
+        super().__init__(config_name=config_name)
+
+        if len(backends) == 0:
+            raise ValueError("At least one backend is required.")
+        if policy not in _POLICIES:
+            raise ValueError(
+                f"Unsupported routing policy [{policy}], expected one of "
+                f"{_POLICIES}.",
+            )
+        if weights is not None and len(weights) != len(backends):
+            raise ValueError(
+                "The number of weights should equal the number of backends.",
+            )
+
+        self.backends = list(backends)
+        self.policy = policy
+        self.weights = weights or [1.0] * len(backends)
+        self.timeout = timeout
+        self.alpha = alpha
+        self.max_error_rate = max_error_rate
+        self.cooldown = cooldown
+
+        self._models: dict[str, ModelWrapperBase] = {}
+        self._stats = {name: _BackendStats() for name in self.backends}
+        self._lock = threading.Lock()
+        self._executor: Optional[ThreadPoolExecutor] = None
+
+    @property
+    def stats(self) -> dict:
+        """The observed stats of each backend."""
+        with self._lock:
+            return {k: v.to_dict() for k, v in self._stats.items()}
+
+    def __call__(self, *args: Any, **kwargs: Any) -> ModelResponse:
+        errors = []
+        for name in self._route():
+            model = self._get_model(name)
+            start = self._start(name)
+            try:
+                if self.timeout is None:
+                    response = model(*args, **kwargs)
+                else:
+                    if self._executor is None:
+                        self._executor = ThreadPoolExecutor(
+                            thread_name_prefix=f"router-{self.config_name}",
+                        )
+                    future = self._executor.submit(model, *args, **kwargs)
+                    response = future.result(timeout=self.timeout)
+            except (Exception, FutureTimeoutError) as e:
+                self._finish(name, start, e)
+                errors.append(e)
+                continue
+            self._finish(name, start)
+            return response
+
+        raise RuntimeError(
+            f"All backends of [{self.config_name}] failed: {errors}",
+        ) from errors[-1]
+
+    async def acall(self, *args: Any, **kwargs: Any) -> ModelResponse:
+        errors = []
+        for name in self._route():
+            model = self._get_model(name)
+            start = self._start(name)
+            try:
+                response = await asyncio.wait_for(
+                    model.acall(*args, **kwargs),
+                    timeout=self.timeout,
+                )
+            except (Exception, asyncio.TimeoutError) as e:
+                self._finish(name, start, e)
+                errors.append(e)
+                continue
+            self._finish(name, start)
+            return response
+
+        raise RuntimeError(
+            f"All backends of [{self.config_name}] failed: {errors}",
+        ) from errors[-1]
+
+    def format(
+        self,
+        *args: Union[MessageBase, Sequence[MessageBase]],
+    ) -> Union[List[dict], str]:
+        """Format the input by the first backend."""
+        return self._get_model(self.backends[0]).format(*args)
+
+    def _get_model(self, name: str) -> ModelWrapperBase:
+        """Get the model wrapper of a backend, which is loaded on the first
+        use."""
+        if name not in self._models:
+            # avoid the circular import
+            from . import load_model_by_config_name
+
+            self._models[name] = load_model_by_config_name(name)
+        return self._models[name]
+
+    def _route(self) -> List[str]:
+        """Order the backends to try by the policy."""
+        with self._lock:
+            if self.policy == "failover":
+                return list(self.backends)
+
+            if self.policy == "weighted":
+                # weighted random order without replacement
+                keys = {
+                    name: random.random() ** (1.0 / max(weight, 1e-9))
+                    for name, weight in zip(self.backends, self.weights)
+                }
+                order = sorted(self.backends, key=lambda _: -keys[_])
+            elif self.policy == "least_in_flight":
+                order = sorted(
+                    self.backends,
+                    key=lambda _: self._stats[_].in_flight,
+                )
+            else:
+                order = sorted(self.backends, key=self._latency_key)
+
+            # probe a degraded backend after the cooldown, and mark it as
+            # called so that the concurrent calls don't probe it again
+            now = time.time()
+            probes = []
+            for name in order:
+                stats = self._stats[name]
+                if (
+                    self._is_degraded(stats)
+                    and stats.last_call is not None
+                    and now - stats.last_call >= self.cooldown
+                ):
+                    stats.last_call = now
+                    probes.append(name)
+
+            # the stable sort keeps the order within the healthy ones
+            return probes + sorted(
+                [_ for _ in order if _ not in probes],
+                key=lambda _: self._is_degraded(self._stats[_]),
+            )
+
+    def _is_degraded(self, stats: _BackendStats) -> bool:
+        """Whether a backend is deprioritized, i.e. its error rate exceeds
+        `max_error_rate`, or it has been called but never succeeded."""
+        return stats.error_rate > self.max_error_rate or (
+            stats.num_calls > 0 and stats.latency is None
+        )
+
+    def _latency_key(self, name: str) -> tuple:
+        """The sort key of a backend by latency, where the backends never
+        called come first."""
+        stats = self._stats[name]
+        return stats.num_calls > 0, stats.latency or 0.0
+
+    def _start(self, name: str) -> float:
+        """Mark a call to the backend as in flight."""
+        start = time.time()
+        with self._lock:
+            self._stats[name].in_flight += 1
+            self._stats[name].last_call = start
+        return start
+
+    def _finish(
+        self,
+        name: str,
+        start: float,
+        error: Optional[BaseException] = None,
+    ) -> None:
+        """Update the stats of the backend after a call."""
+        with self._lock:
+            stats = self._stats[name]
+            stats.in_flight -= 1
+            stats.num_calls += 1
+            if error is None and stats.error_rate > self.max_error_rate:
+                # a successful probe recovers the backend
+                stats.error_rate = 0.0
+            else:
+                stats.error_rate += self.alpha * (
+                    float(error is not None) - stats.error_rate
+                )
+            if error is None:
+                latency = time.time() - start
+                if stats.latency is None:
+                    stats.latency = latency
+                else:
+                    stats.latency += self.alpha * (latency - stats.latency)
+            else:
+                stats.num_errors += 1
+
+        if error is not None:
+            logger.warning(
+                f"Backend [{name}] of [{self.config_name}] failed, try the "
+                f"next one. {error.__class__.__name__}: {error}",
+            )
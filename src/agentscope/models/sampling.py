@@ -0,0 +1,139 @@
+# -*- coding: utf-8 -*-
+"""The best-of-N sampling of model wrappers, which draws multiple candidate
+responses for the same prompt concurrently."""
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, List, Optional
+
+from loguru import logger
+
+from .response import ModelResponse
+from ..constants import _DEFAULT_MAX_RETRIES
+from ..exception import ResponseParsingError
+
+
+class SamplingMixin:
+    """The mixin of `ModelWrapperBase` to draw `n` candidates for a prompt,
+    e.g. for best-of-N selection and voting."""
+
+    def sample(
+        self,
+        *args: Any,
+        n: int,
+        parse_func: Optional[Callable[[ModelResponse], Any]] = None,
+        fault_handler: Optional[Callable[[ModelResponse], Any]] = None,
+        max_retries: Optional[int] = None,
+        max_workers: Optional[int] = None,
+        **kwargs: Any,
+    ) -> List[Any]:
+        """Generate `n` candidate responses for the same prompt
+        concurrently, e.g. for best-of-N selection and voting. The
+        candidates are drawn by the native `n` argument if the API supports
+        it, and by concurrent calls in a thread pool otherwise, so that the
+        latency is about one call rather than `n`.
+
+        The candidates skip the response cache and the coalescing of
+        identical calls, which would return the same response `n` times.
+        The usage of all candidates is recorded in the monitor.
+
+        Args:
+            n (`int`):
+                The number of candidates.
+            parse_func (`Optional[Callable[[ModelResponse], Any]]`, \
+                defaults to `None`):
+                The function to parse each candidate. The candidates
+                failing to be parsed are drawn again together, up to
+                `max_retries` times.
+            fault_handler (`Optional[Callable[[ModelResponse], Any]]`, \
+                defaults to `None`):
+                The function to handle the candidates still failing to be
+                parsed after `max_retries` times.
+            max_retries (`Optional[int]`, defaults to `None`):
+                The maximum number of draws for each candidate.
+            max_workers (`Optional[int]`, defaults to `None`):
+                The maximum number of concurrent calls if the candidates
+                are not drawn natively, defaults to `n`.
+            *args (`Any`), **kwargs (`Any`):
+                The arguments of the model call, e.g. `messages`.
+
+        Returns:
+            `List[Any]`: The `n` candidates, which are the parsed results if
+            `parse_func` is given, and `ModelResponse` objects otherwise.
+        """
+        if n < 1:
+            raise ValueError(f"The number of candidates {n} should be >= 1.")
+
+        model_call = type(self).__call__.__wrapped__
+        max_retries = max_retries or _DEFAULT_MAX_RETRIES
+        args, kwargs = self._truncate_prompt(args, kwargs)
+
+        responses = self._draw_samples(
+            model_call,
+            args,
+            kwargs,
+            n,
+            max_workers,
+        )
+        if parse_func is None:
+            return responses
+
+        results: List[Any] = [None] * n
+        pending = list(range(n))
+        for itr in range(1, max_retries + 1):
+            failed, error = [], None
+            for index, response in zip(pending, responses):
+                try:
+                    results[index] = parse_func(response)
+                except ResponseParsingError as e:
+                    if itr < max_retries:
+                        logger.warning(
+                            f"Fail to parse candidate {index} "
+                            f"({itr}/{max_retries}):\n{response}.\n"
+                            f"{e.__class__.__name__}: {e}",
+                        )
+                        failed.append(index)
+                        error = e
+                    elif fault_handler is not None and callable(fault_handler):
+                        results[index] = fault_handler(response)
+                    else:
+                        raise
+
+            if not failed:
+                break
+            time.sleep(self._parse_retry_delay(itr, error))
+            pending = failed
+            responses = self._draw_samples(
+                model_call,
+                args,
+                kwargs,
+                len(failed),
+                max_workers,
+            )
+        return results
+
+    def _draw_samples(
+        self,
+        model_call: Callable,
+        args: tuple,
+        kwargs: dict,
+        n: int,
+        max_workers: Optional[int] = None,
+    ) -> List[ModelResponse]:
+        """Draw `n` responses by concurrent calls, which can be overridden
+        by the model wrappers whose APIs support drawing multiple
+        candidates in one call."""
+        if n == 1:
+            return [self._invoke(model_call, args, kwargs, coalesce=False)]
+
+        with ThreadPoolExecutor(max_workers=max_workers or n) as executor:
+            futures = [
+                executor.submit(
+                    self._invoke,
+                    model_call,
+                    args,
+                    kwargs,
+                    coalesce=False,
+                )
+                for _ in range(n)
+            ]
+            return [_.result() for _ in futures]
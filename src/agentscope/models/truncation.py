@@ -0,0 +1,261 @@
+# -*- coding: utf-8 -*-
+"""The truncation of the prompts exceeding the context window of models,
+which is done locally before sending the requests."""
+from typing import Callable, List, Optional, Tuple
+
+from loguru import logger
+
+from ..utils.token_utils import count_text_tokens, estimate_token_count
+
+# the header of the dialogue history merged into one message by the
+# `format` functions of the model wrappers
+_DIALOGUE_HISTORY_HEADER = "## Dialogue History\n"
+
+_TRUNCATION_STRATEGIES = ["drop_oldest", "condense"]
+
+# the names of the prompt argument of the chat model wrappers
+_PROMPT_ARGUMENTS = ["messages", "contents"]
+
+
+def _get_text(message: dict) -> str:
+    """Get the text of a message in the format of the chat APIs, where the
+    content is given by "content" (OpenAI, DashScope, ...) or "parts"
+    (Gemini), and the non-text items (e.g. images) are ignored."""
+    content = message.get("content", message.get("parts", ""))
+    if isinstance(content, str):
+        return content
+    if isinstance(content, list):
+        texts = []
+        for item in content:
+            if isinstance(item, str):
+                texts.append(item)
+            elif isinstance(item, dict) and isinstance(item.get("text"), str):
+                texts.append(item["text"])
+        return "\n".join(texts)
+    return ""
+
+
+def _is_text(message: dict) -> bool:
+    """Whether the message contains a single text only, which can be
+    condensed."""
+    if isinstance(message.get("content", None), str):
+        return True
+    parts = message.get("parts", None)
+    return (
+        isinstance(parts, list)
+        and len(parts) == 1
+        and isinstance(parts[0], str)
+    )
+
+
+def _set_text(message: dict, text: str) -> None:
+    """Replace the text of a message with a single text."""
+    if isinstance(message.get("content", None), str):
+        message["content"] = text
+    else:
+        message["parts"] = [text]
+
+
+class ContextTruncator:
+    """Truncate the prompt in the format of the chat APIs (a list of
+    messages) to fit in the context window of the model.
+
+    The system messages and the last message are always kept. The
+    strategies are
+
+    - `"drop_oldest"`: drop the oldest messages, and then condense the
+      remaining ones if still too long.
+    - `"condense"`: keep all the messages, but drop the oldest lines of
+      their texts, including the dialogue history merged into one message
+      by the `format` functions of the non-OpenAI model wrappers, where the
+      system prompt and the latest line are kept.
+    """
+
+    def __init__(
+        self,
+        strategy: str = "drop_oldest",
+        max_length: Optional[int] = None,
+        reserved_tokens: int = 0,
+    ) -> None:
+        """Initialize the truncator.
+
+        Args:
+            strategy (`str`, defaults to `"drop_oldest"`):
+                The strategy to truncate the prompt, `"drop_oldest"` or
+                `"condense"`.
+            max_length (`Optional[int]`, defaults to `None`):
+                The context window of the model in tokens. If `None`, the
+                `max_length` of the model wrapper is used.
+            reserved_tokens (`int`, defaults to `0`):
+                The tokens reserved for the generation, besides the
+                `max_tokens` given in the generation arguments.
+        """
+        if strategy not in _TRUNCATION_STRATEGIES:
+            raise ValueError(
+                f"Unknown truncation strategy [{strategy}], expected one of "
+                f"{_TRUNCATION_STRATEGIES}.",
+            )
+        self.strategy = strategy
+        self.max_length = max_length
+        self.reserved_tokens = reserved_tokens
+
+    def truncate(
+        self,
+        messages: List[dict],
+        max_tokens: int,
+        count_tokens: Callable[[str], int],
+    ) -> Tuple[List[dict], int]:
+        """Truncate the messages to fit in `max_tokens` tokens.
+
+        Args:
+            messages (`List[dict]`):
+                The messages, which are not modified.
+            max_tokens (`int`):
+                The maximum number of tokens of the prompt.
+            count_tokens (`Callable[[str], int]`):
+                The function to count the tokens of a text.
+
+        Returns:
+            `Tuple[List[dict], int]`: The truncated messages, and the
+            number of tokens trimmed, which is `0` if the messages fit.
+        """
+        counts = [count_tokens(_get_text(_)) for _ in messages]
+        total = sum(counts)
+        if total <= max_tokens:
+            return messages, 0
+
+        messages = [dict(_) for _ in messages]
+        trimmed = 0
+
+        if self.strategy == "drop_oldest":
+            index = 0
+            while total > max_tokens and index < len(messages) - 1:
+                if messages[index].get("role", None) == "system":
+                    index += 1
+                    continue
+                total -= counts[index]
+                trimmed += counts[index]
+                del messages[index]
+                del counts[index]
+
+        for index, message in enumerate(messages):
+            if total <= max_tokens:
+                break
+            if not _is_text(message):
+                continue
+
+            text = _get_text(message)
+            position = text.find(_DIALOGUE_HISTORY_HEADER)
+            if position >= 0:
+                # keep the system prompt before the dialogue history
+                position += len(_DIALOGUE_HISTORY_HEADER)
+                head, lines = text[:position], text[position:].split("\n")
+            elif (
+                message.get("role", None) != "system"
+                and index < len(messages) - 1
+            ):
+                head, lines = "", text.split("\n")
+            else:
+                continue
+
+            # drop the oldest lines, but keep the latest one
+            num_dropped = 0
+            while total > max_tokens and num_dropped < len(lines) - 1:
+                count = count_tokens(lines[num_dropped])
+                total -= count
+                trimmed += count
+                num_dropped += 1
+
+            if num_dropped > 0:
+                _set_text(message, head + "\n".join(lines[num_dropped:]))
+
+        return messages, trimmed
+
+
+class TruncationMixin:
+    """The mixin of `ModelWrapperBase` to truncate the prompts exceeding the
+    context window by a `ContextTruncator` before sending them."""
+
+    truncator: Optional[ContextTruncator] = None
+    """The truncator of the prompts exceeding the context window, which is
+    disabled by default."""
+
+    _exact_token_count: bool = True
+    """Whether the tokens are counted by the tokenizer, which is turned off
+    once the tokenizer fails."""
+
+    def set_truncator(self, truncator: Optional[ContextTruncator]) -> None:
+        """Set the truncator of the prompts exceeding the context window,
+        and register the number of trimmed tokens in the monitor.
+
+        Args:
+            truncator (`Optional[ContextTruncator]`):
+                The truncator. The prompts are not truncated if `None`.
+        """
+        self.truncator = truncator
+        if truncator is not None:
+            self.monitor.register(self._metric("truncated_tokens"), "token")
+
+    def _count_tokens(self, text: str) -> int:
+        """Count the tokens of a text for truncation, which falls back to
+        the estimation if the tokenizer is not available, e.g. offline."""
+        if not self._exact_token_count:
+            return estimate_token_count(text)
+        try:
+            return count_text_tokens(text, self.model_name)
+        except Exception as e:  # pylint: disable=broad-except
+            logger.warning(
+                f"Failed to count tokens for {self.model_name}: {e}, "
+                f"the tokens are estimated by the length from now on for "
+                f"all the agents sharing this model wrapper.",
+            )
+            self._exact_token_count = False
+            return estimate_token_count(text)
+
+    def _truncate_prompt(self, args: tuple, kwargs: dict) -> Tuple:
+        """Truncate the prompt, i.e. the first argument of the model call,
+        to fit in the context window before sending it."""
+        if self.truncator is None:
+            return args, kwargs
+        max_length = self.truncator.max_length or getattr(
+            self,
+            "max_length",
+            None,
+        )
+        if not max_length:
+            return args, kwargs
+
+        if args:
+            prompt = args[0]
+        else:
+            name = next(
+                (_ for _ in _PROMPT_ARGUMENTS if _ in kwargs),
+                None,
+            )
+            prompt = kwargs.get(name, None)
+        if not isinstance(prompt, list) or not all(
+            isinstance(_, dict) for _ in prompt
+        ):
+            return args, kwargs
+
+        generate_args = getattr(self, "generate_args", None) or {}
+        max_tokens = kwargs.get(
+            "max_tokens",
+            generate_args.get("max_tokens", None),
+        )
+        messages, trimmed = self.truncator.truncate(
+            prompt,
+            max_length - self.truncator.reserved_tokens - (max_tokens or 0),
+            self._count_tokens,
+        )
+        if trimmed == 0:
+            return args, kwargs
+
+        logger.info(
+            f"Truncate {trimmed} tokens of the prompt to fit in the context "
+            f"window ({max_length} tokens) of {self.model_name}.",
+        )
+        self.update_monitor(truncated_tokens=trimmed)
+        if args:
+            return (messages,) + args[1:], kwargs
+        return args, {**kwargs, name: messages}
@@ -5,8 +5,9 @@ from typing import Union, Any, List, Sequence
 
 from loguru import logger
 
-from .model import ModelWrapperBase, ModelResponse
+from .model import ModelWrapperBase, ModelResponse, _parse_openai_chunk
 from ..message import MessageBase
+from ..utils.model_metadata import get_model_max_length
 from ..utils.tools import _convert_to_str
 
 try:
@@ -60,6 +61,7 @@ class ZhipuAIWrapperBase(ModelWrapperBase, ABC):
             )
 
         self.model_name = model_name
+        self.max_length = get_model_max_length(model_name)
         self.generate_args = generate_args or {}
 
         self.client = zhipuai.ZhipuAI(
@@ -127,7 +129,8 @@ class ZhipuAIChatWrapper(ZhipuAIWrapperBase):
         Returns:
             `ModelResponse`:
                 The response text in text field, and the raw response in
-                raw field.
+                raw field. If `stream=True` is given, the text deltas can
+                be consumed from the stream field as they are generated.
 
         Note:
             `parse_func`, `fault_handler` and `max_retries` are reserved for
@@ -165,6 +168,15 @@ class ZhipuAIChatWrapper(ZhipuAIWrapperBase):
             **kwargs,
         )
 
+        if kwargs.get("stream", False):
+            return ModelResponse(
+                stream=self._stream_response(
+                    response,
+                    _parse_openai_chunk,
+                    {"model": self.model_name, "messages": messages, **kwargs},
+                ),
+            )
+
         # step4: record the api invocation if needed
         self._save_model_invocation(
             arguments={
@@ -241,9 +253,7 @@ class ZhipuAIChatWrapper(ZhipuAIWrapperBase):
                 )
             else:
                 # Merge all messages into a dialogue history prompt
-                dialogue.append(
-                    f"{unit.name}: {_convert_to_str(unit.content)}",
-                )
+                dialogue.append(self._format_dialogue_line(unit))
 
         dialogue_history = "\n".join(dialogue)
 
@@ -266,6 +276,8 @@ class ZhipuAIEmbeddingWrapper(ZhipuAIWrapperBase):
 
     model_type: str = "zhipuai_embedding"
 
+    deterministic: bool = True
+
     def __call__(
         self,
         texts: str,
@@ -325,7 +337,9 @@ class ZhipuAIEmbeddingWrapper(ZhipuAIWrapperBase):
         # step5: return response
         response_json = response.model_dump()
         return ModelResponse(
-            embedding=[_["embedding"] for _ in response_json["data"]],
+            embedding=self._format_embedding(
+                [_["embedding"] for _ in response_json["data"]],
+            ),
             raw=response_json,
         )
 
@@ -5,7 +5,7 @@ from enum import IntEnum
 
 from loguru import logger
 
-from agentscope.models import OpenAIWrapperBase, ModelWrapperBase
+from agentscope.models import ModelWrapperBase
 from agentscope.constants import ShrinkPolicy
 from agentscope.utils.tools import to_openai_dict, to_dialog_str
 
@@ -92,6 +92,8 @@ class PromptEngine:
         self.max_length = max_length
 
         if prompt_type is None:
+            from agentscope.models import OpenAIWrapperBase
+
             if isinstance(model, OpenAIWrapperBase):
                 self.prompt_type = PromptType.LIST
             else:
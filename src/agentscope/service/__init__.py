@@ -29,9 +29,20 @@ from .web.dblp import (
 from .service_response import ServiceResponse
 from .service_toolkit import ServiceToolkit
 from .service_toolkit import ServiceFactory
-from .retrieval.similarity import cos_sim
+from .retrieval.similarity import (
+    cos_sim,
+    batch_similarity,
+    prepare_corpus,
+    top_k_similarity,
+)
 from .text_processing.summarization import summarization
 from .retrieval.retrieval_from_list import retrieve_from_list
+from .retrieval.bm25 import BM25Index, bm25_search
+from .retrieval.hybrid import (
+    EmbeddingIndex,
+    hybrid_search,
+    reciprocal_rank_fusion,
+)
 from .service_status import ServiceExecStatus
 from .web.web_digest import digest_webpage, load_web, parse_html_to_text
 from .web.download import download_from_url
@@ -69,8 +80,16 @@ __all__ = [
     "query_sqlite",
     "query_mongodb",
     "cos_sim",
+    "batch_similarity",
+    "prepare_corpus",
+    "top_k_similarity",
     "summarization",
     "retrieve_from_list",
+    "BM25Index",
+    "bm25_search",
+    "EmbeddingIndex",
+    "hybrid_search",
+    "reciprocal_rank_fusion",
     "digest_webpage",
     "load_web",
     "parse_html_to_text",
@@ -0,0 +1,257 @@
+# -*- coding: utf-8 -*-
+"""Lexical retrieval with an inverted index scored by BM25."""
+import math
+import re
+from collections import Counter
+from typing import Callable, Hashable, Mapping, Optional, Sequence, Union
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+from agentscope.service.service_response import ServiceResponse
+from agentscope.service.service_status import ServiceExecStatus
+
+_TOKEN_PATTERN = re.compile(r"\w+")
+
+
+def _default_tokenizer(text: str) -> list[str]:
+    """Split the text into lowercase words."""
+    return _TOKEN_PATTERN.findall(text.lower())
+
+
+class BM25Index:
+    """An inverted index supporting incremental adding and removing of
+    documents, which scores the documents by Okapi BM25."""
+
+    def __init__(
+        self,
+        tokenizer: Optional[Callable[[str], Sequence[str]]] = None,
+        k1: float = 1.5,
+        b: float = 0.75,
+    ) -> None:
+        """Initialize the BM25 index.
+
+        Args:
+            tokenizer (`Optional[Callable[[str], Sequence[str]]]`, defaults \
+                to `None`):
+                The function to split a text into terms. If not provided,
+                the text is lowercased and split into words.
+            k1 (`float`, defaults to `1.5`):
+                The term frequency saturation parameter of BM25.
+            b (`float`, defaults to `0.75`):
+                The document length normalization parameter of BM25.
+        """
+        self.tokenizer = tokenizer or _default_tokenizer
+        self.k1 = k1
+        self.b = b
+
+        # documents are stored in integer slots, so that the postings can be
+        # scored by numpy in a batch
+        self._slots: dict[Hashable, int] = {}
+        self._slot_ids: list = []
+        self._free_slots: list[int] = []
+        self._doc_lens = np.zeros(16, dtype=np.float32)
+        self._docs: dict[Hashable, str] = {}
+        self._total_len = 0
+        self._next_id = 0
+
+        # term -> {slot: term frequency}
+        self._postings: dict[str, dict[int, int]] = {}
+        # term -> (slots, term frequencies) as arrays, built lazily on search
+        # and invalidated when the postings of the term change
+        self._posting_arrays: dict[str, tuple] = {}
+
+    def __len__(self) -> int:
+        return len(self._docs)
+
+    def __contains__(self, doc_id: Hashable) -> bool:
+        return doc_id in self._docs
+
+    def get(self, doc_id: Hashable) -> Optional[str]:
+        """Get the text of a document by its id."""
+        return self._docs.get(doc_id)
+
+    def add(self, text: str, doc_id: Optional[Hashable] = None) -> Hashable:
+        """Add a document to the index. If a document with the same id
+        exists, it will be replaced.
+
+        Args:
+            text (`str`):
+                The text of the document.
+            doc_id (`Optional[Hashable]`, defaults to `None`):
+                The id of the document. If not provided, an increasing
+                integer will be used.
+
+        Returns:
+            `Hashable`: The id of the document.
+        """
+        if doc_id is None:
+            while self._next_id in self._docs:
+                self._next_id += 1
+            doc_id = self._next_id
+            self._next_id += 1
+        elif doc_id in self._docs:
+            self.remove(doc_id)
+
+        if self._free_slots:
+            slot = self._free_slots.pop()
+            self._slot_ids[slot] = doc_id
+        else:
+            slot = len(self._slot_ids)
+            self._slot_ids.append(doc_id)
+            if slot >= len(self._doc_lens):
+                self._doc_lens = np.resize(self._doc_lens, 2 * slot)
+
+        terms = self.tokenizer(text)
+        for term, freq in Counter(terms).items():
+            postings = self._postings.get(term)
+            if postings is None:
+                self._postings[term] = {slot: freq}
+            else:
+                postings[slot] = freq
+                self._posting_arrays.pop(term, None)
+
+        self._slots[doc_id] = slot
+        self._docs[doc_id] = text
+        self._doc_lens[slot] = len(terms)
+        self._total_len += len(terms)
+        return doc_id
+
+    def add_documents(
+        self,
+        documents: Union[Mapping[Hashable, str], Sequence[str]],
+    ) -> list:
+        """Add multiple documents to the index.
+
+        Args:
+            documents (`Union[Mapping[Hashable, str], Sequence[str]]`):
+                A mapping from document ids to texts, or a list of texts
+                whose ids will be generated automatically.
+
+        Returns:
+            `list`: The ids of the added documents.
+        """
+        if isinstance(documents, Mapping):
+            return [
+                self.add(text, doc_id) for doc_id, text in documents.items()
+            ]
+        return [self.add(text) for text in documents]
+
+    def remove(self, doc_id: Hashable) -> bool:
+        """Remove a document from the index.
+
+        Args:
+            doc_id (`Hashable`):
+                The id of the document.
+
+        Returns:
+            `bool`: Whether the document exists and is removed.
+        """
+        text = self._docs.pop(doc_id, None)
+        if text is None:
+            return False
+
+        slot = self._slots.pop(doc_id)
+        for term in set(self.tokenizer(text)):
+            postings = self._postings.get(term)
+            if postings is None:
+                continue
+            postings.pop(slot, None)
+            self._posting_arrays.pop(term, None)
+            if len(postings) == 0:
+                del self._postings[term]
+
+        self._total_len -= int(self._doc_lens[slot])
+        self._slot_ids[slot] = None
+        self._free_slots.append(slot)
+        return True
+
+    def search(self, query: str, top_k: Optional[int] = 5) -> list[tuple]:
+        """Search the documents with the highest BM25 scores.
+
+        Args:
+            query (`str`):
+                The query text.
+            top_k (`Optional[int]`, defaults to `5`):
+                The number of returned documents. All matched documents are
+                returned if `None`.
+
+        Returns:
+            `list[tuple]`: A list of (score, doc_id) in descending order of
+            score. Documents sharing no terms with the query are skipped.
+        """
+        num_docs = len(self._docs)
+        if num_docs == 0:
+            return []
+
+        avg_len = self._total_len / num_docs or 1.0
+        k1, b = self.k1, self.b
+
+        all_slots, all_scores = [], []
+        for term in set(self.tokenizer(query)):
+            postings = self._postings.get(term)
+            if postings is None:
+                continue
+            arrays = self._posting_arrays.get(term)
+            if arrays is None:
+                arrays = (
+                    np.fromiter(postings.keys(), np.int64, len(postings)),
+                    np.fromiter(postings.values(), np.float32, len(postings)),
+                )
+                self._posting_arrays[term] = arrays
+            slots, freqs = arrays
+
+            df = len(postings)
+            idf = math.log(1 + (num_docs - df + 0.5) / (df + 0.5))
+            norms = k1 * (1 - b + b * self._doc_lens[slots] / avg_len)
+            all_slots.append(slots)
+            all_scores.append(idf * freqs * (k1 + 1) / (freqs + norms))
+
+        if len(all_slots) == 0:
+            return []
+
+        # sum up the scores of the same document
+        slots, inverse = np.unique(
+            np.concatenate(all_slots),
+            return_inverse=True,
+        )
+        scores = np.bincount(inverse, weights=np.concatenate(all_scores))
+
+        if top_k is None or top_k >= len(scores):
+            order = np.argsort(-scores, kind="stable")
+        else:
+            order = np.argpartition(-scores, top_k)[:top_k]
+            order = order[np.argsort(-scores[order], kind="stable")]
+
+        return [(float(scores[i]), self._slot_ids[slots[i]]) for i in order]
+
+
+def bm25_search(
+    query: str,
+    index: BM25Index,
+    top_k: int = 5,
+) -> ServiceResponse:
+    """Search the most relevant documents for the query by keywords.
+
+    Args:
+        query (`str`):
+            The keywords to search.
+        index (`BM25Index`):
+            The BM25 index of the documents.
+        top_k (`int`, defaults to `5`):
+            The number of returned documents.
+
+    Returns:
+        `ServiceResponse`: A list of dicts with `id`, `score` and `content`
+        of the retrieved documents in descending order of score.
+    """
+    results = index.search(query, top_k=top_k)
+    return ServiceResponse(
+        status=ServiceExecStatus.SUCCESS,
+        content=[
+            {"id": doc_id, "score": score, "content": index.get(doc_id)}
+            for score, doc_id in results
+        ],
+    )
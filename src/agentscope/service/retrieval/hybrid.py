@@ -0,0 +1,249 @@
+# -*- coding: utf-8 -*-
+"""Hybrid retrieval that fuses lexical and embedding-based rankings."""
+from typing import Hashable, Optional, Sequence, Union
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+from agentscope.constants import Embedding
+from agentscope.models import ModelWrapperBase
+from agentscope.service.retrieval.bm25 import BM25Index
+from agentscope.service.retrieval.similarity import (
+    prepare_corpus,
+    top_k_similarity,
+)
+from agentscope.service.service_response import ServiceResponse
+from agentscope.service.service_status import ServiceExecStatus
+
+
+class EmbeddingIndex:
+    """An index of document embeddings supporting incremental adding and
+    removing, which ranks the documents by cosine similarity."""
+
+    def __init__(
+        self,
+        dtype: Union[str, type] = "float32",
+        chunk_size: Optional[int] = None,
+    ) -> None:
+        """Initialize the embedding index.
+
+        Args:
+            dtype (`Union[str, type]`, defaults to `"float32"`):
+                The storage type of the embedding matrix, e.g. `"float16"`
+                to halve the memory footprint.
+            chunk_size (`Optional[int]`, defaults to `None`):
+                The number of embeddings scored at a time on search, which
+                bounds the memory of the intermediate results.
+        """
+        self.dtype = dtype
+        self.chunk_size = chunk_size
+        self._embeddings: dict[Hashable, Embedding] = {}
+        # the normalized embedding matrix is built lazily on search, and
+        # invalidated by any modification
+        self._ids: Optional[list] = None
+        self._matrix = None
+
+    def __len__(self) -> int:
+        return len(self._embeddings)
+
+    def __contains__(self, doc_id: Hashable) -> bool:
+        return doc_id in self._embeddings
+
+    def add(self, doc_id: Hashable, embedding: Embedding) -> None:
+        """Add (or replace) the embedding of a document.
+
+        Args:
+            doc_id (`Hashable`):
+                The id of the document.
+            embedding (`Embedding`):
+                The embedding of the document.
+        """
+        self._embeddings[doc_id] = embedding
+        self._matrix = None
+
+    def remove(self, doc_id: Hashable) -> bool:
+        """Remove the embedding of a document.
+
+        Args:
+            doc_id (`Hashable`):
+                The id of the document.
+
+        Returns:
+            `bool`: Whether the document exists and is removed.
+        """
+        if self._embeddings.pop(doc_id, None) is None:
+            return False
+        self._matrix = None
+        return True
+
+    def search(
+        self,
+        query_embedding: Embedding,
+        top_k: Optional[int] = 5,
+    ) -> list[tuple]:
+        """Search the documents with the highest cosine similarity.
+
+        Args:
+            query_embedding (`Embedding`):
+                The embedding of the query.
+            top_k (`Optional[int]`, defaults to `5`):
+                The number of returned documents. All documents are returned
+                if `None`.
+
+        Returns:
+            `list[tuple]`: A list of (score, doc_id) in descending order of
+            score.
+        """
+        return self.search_batch([query_embedding], top_k=top_k)[0]
+
+    def search_batch(
+        self,
+        query_embeddings: Sequence[Embedding],
+        top_k: Optional[int] = 5,
+    ) -> list[list[tuple]]:
+        """Search the documents for a batch of queries in one pass.
+
+        Args:
+            query_embeddings (`Sequence[Embedding]`):
+                The embeddings of the queries.
+            top_k (`Optional[int]`, defaults to `5`):
+                The number of returned documents for each query. All
+                documents are returned if `None`.
+
+        Returns:
+            `list[list[tuple]]`: A list of (score, doc_id) in descending
+            order of score for each query.
+        """
+        if len(self._embeddings) == 0:
+            return [[] for _ in query_embeddings]
+
+        if self._matrix is None:
+            self._ids = list(self._embeddings.keys())
+            self._matrix = prepare_corpus(
+                list(self._embeddings.values()),
+                metric="cosine",
+                dtype=self.dtype,
+            )
+
+        scores, indices = top_k_similarity(
+            query_embeddings,
+            self._matrix,
+            top_k=len(self._ids) if top_k is None else top_k,
+            metric="cosine",
+            chunk_size=self.chunk_size,
+            normalized=True,
+        )
+        return [
+            [(float(s), self._ids[i]) for s, i in zip(row_s, row_i)]
+            for row_s, row_i in zip(scores, indices)
+        ]
+
+
+def reciprocal_rank_fusion(
+    rankings: Sequence[Sequence[Hashable]],
+    k: int = 60,
+    weights: Optional[Sequence[float]] = None,
+) -> list[tuple]:
+    """Fuse multiple rankings by reciprocal rank fusion (RRF), where a
+    document scores `sum(weight / (k + rank))` over the rankings it
+    appears in.
+
+    Args:
+        rankings (`Sequence[Sequence[Hashable]]`):
+            The rankings of document ids, each in descending order of
+            relevance.
+        k (`int`, defaults to `60`):
+            The constant to dampen the impact of top ranks.
+        weights (`Optional[Sequence[float]]`, defaults to `None`):
+            The weights of the rankings. All rankings are weighted equally
+            if not provided.
+
+    Returns:
+        `list[tuple]`: A list of (score, doc_id) in descending order of
+        fused score.
+    """
+    if weights is None:
+        weights = [1.0] * len(rankings)
+
+    scores: dict[Hashable, float] = {}
+    for ranking, weight in zip(rankings, weights):
+        for rank, doc_id in enumerate(ranking, start=1):
+            scores[doc_id] = scores.get(doc_id, 0.0) + weight / (k + rank)
+
+    return sorted(
+        ((score, doc_id) for doc_id, score in scores.items()),
+        key=lambda x: x[0],
+        reverse=True,
+    )
+
+
+def hybrid_search(
+    query: str,
+    bm25_index: BM25Index,
+    embedding_index: EmbeddingIndex,
+    embedding_model: Optional[ModelWrapperBase] = None,
+    query_embedding: Optional[Embedding] = None,
+    top_k: int = 5,
+    num_candidates: int = 50,
+    rrf_k: int = 60,
+    weights: Optional[Sequence[float]] = None,
+) -> ServiceResponse:
+    """Search the most relevant documents for the query by both keywords
+    and semantics.
+
+    Args:
+        query (`str`):
+            The query to search.
+        bm25_index (`BM25Index`):
+            The BM25 index of the documents.
+        embedding_index (`EmbeddingIndex`):
+            The embedding index of the documents, sharing document ids with
+            `bm25_index`.
+        embedding_model (`Optional[ModelWrapperBase]`, defaults to `None`):
+            The model to embed the query if `query_embedding` is not given.
+        query_embedding (`Optional[Embedding]`, defaults to `None`):
+            The embedding of the query.
+        top_k (`int`, defaults to `5`):
+            The number of returned documents.
+        num_candidates (`int`, defaults to `50`):
+            The number of candidates retrieved by each retriever before
+            fusion.
+        rrf_k (`int`, defaults to `60`):
+            The constant of reciprocal rank fusion.
+        weights (`Optional[Sequence[float]]`, defaults to `None`):
+            The weights of the BM25 and embedding rankings in fusion.
+
+    Returns:
+        `ServiceResponse`: A list of dicts with `id`, `score` and `content`
+        of the retrieved documents in descending order of fused score.
+    """
+    if query_embedding is None:
+        if embedding_model is None:
+            return ServiceResponse(
+                status=ServiceExecStatus.ERROR,
+                content="Either embedding_model or query_embedding should be "
+                "provided for hybrid search.",
+            )
+        query_embedding = embedding_model(query).embedding
+        # the embedding wrappers may return a batch of embeddings
+        if np.ndim(query_embedding) == 2:
+            query_embedding = query_embedding[0]
+
+    lexical = bm25_index.search(query, top_k=num_candidates)
+    semantic = embedding_index.search(query_embedding, top_k=num_candidates)
+
+    fused = reciprocal_rank_fusion(
+        [[_[1] for _ in lexical], [_[1] for _ in semantic]],
+        k=rrf_k,
+        weights=weights,
+    )[:top_k]
+
+    return ServiceResponse(
+        status=ServiceExecStatus.SUCCESS,
+        content=[
+            {"id": doc_id, "score": score, "content": bm25_index.get(doc_id)}
+            for score, doc_id in fused
+        ],
+    )
@@ -1,8 +1,11 @@
 # -*- coding: utf-8 -*-
 """Retrieve service working with memory specially."""
-from typing import Callable, Optional, Any, Sequence
+from typing import Callable, Optional, Any, Sequence, Union
+
+import numpy as np
 from loguru import logger
 
+from agentscope.service.retrieval.similarity import batch_similarity
 from agentscope.service.service_response import ServiceResponse
 from agentscope.service.service_status import ServiceExecStatus
 from agentscope.models import ModelWrapperBase
@@ -10,8 +13,8 @@ from agentscope.models import ModelWrapperBase
 
 def retrieve_from_list(
     query: Any,
-    knowledge: Sequence,  # TODO: rename
-    score_func: Callable[[Any, Any], float],
+    knowledge: Union[Sequence, np.ndarray],  # TODO: rename
+    score_func: Union[Callable[[Any, Any], float], str],
     top_k: int = None,
     embedding_model: Optional[ModelWrapperBase] = None,
     preserve_order: bool = True,
@@ -25,13 +28,18 @@ def retrieve_from_list(
     HIGHEST scores. If the 'query' is a dict but has no embedding,
     we use the embedding model to embed the query.
 
+    If 'score_func' is a metric name ("cosine", "dot" or "l2"), the
+    'knowledge' is a batch of embeddings (e.g. an array in shape
+    [n, dim]), which are scored against the query embedding in one pass.
+
     Args:
         query (`Any`):
             A message to be retrieved.
-        knowledge (`Sequence`):
+        knowledge (`Union[Sequence, np.ndarray]`):
             Data/knowledge to be retrieved from.
-        score_func (`Callable[[Any, Any], float]`):
-            User-defined function for comparing two messages.
+        score_func (`Union[Callable[[Any, Any], float], str]`):
+            User-defined function for comparing two messages, or the name
+            of the similarity metric between embeddings.
         top_k (`int`, defaults to `None`):
             Maximum number of messages returned.
         embedding_model (`Optional[ModelWrapperBase]`, defaults to `None`):
@@ -56,9 +64,18 @@ def retrieve_from_list(
             )
 
     # (score, index, object)
-    scores = [
-        (score_func(query, msg), i, msg) for i, msg in enumerate(knowledge)
-    ]
+    if isinstance(score_func, str):
+        if isinstance(query, dict):
+            query = query["embedding"]
+        similarities = batch_similarity(query, knowledge, score_func)[0]
+        scores = [
+            (float(score), i, knowledge[i])
+            for i, score in enumerate(similarities)
+        ]
+    else:
+        scores = [
+            (score_func(query, msg), i, msg) for i, msg in enumerate(knowledge)
+        ]
 
     # ordered by score, and extract the top-k items with highest scores
     top_k = len(scores) if top_k is None else top_k
@@ -2,6 +2,8 @@
 """
 Similarity functions for retrieval
 """
+from typing import Any, Optional, Sequence, Tuple, Union
+
 try:
     import numpy as np
 except ImportError:
@@ -32,8 +34,212 @@ def cos_sim(
             ServiceExecStatus.ERROR,
             "embedding length not equal",
         )
-    a, b = np.array(a), np.array(b)
+    a, b = np.asarray(a), np.asarray(b)
     return ServiceResponse(
         ServiceExecStatus.SUCCESS,
         np.dot(a, b) / (np.linalg.norm(a) * np.linalg.norm(b)),
     )
+
+
+_METRICS = ("cosine", "dot", "l2")
+
+
+def _as_matrix(embeddings: Any, dtype: Any = None) -> "np.ndarray":
+    """Convert one or a batch of embeddings into a 2D array."""
+    matrix = np.asarray(embeddings, dtype=dtype)
+    if matrix.ndim == 1:
+        matrix = matrix[np.newaxis, :]
+    return matrix
+
+
+def _normalize(matrix: "np.ndarray") -> "np.ndarray":
+    """Normalize the rows of a matrix into unit length."""
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    return matrix / np.maximum(norms, 1e-12)
+
+
+def prepare_corpus(
+    corpus: Union[Sequence[Embedding], "np.ndarray"],
+    metric: str = "cosine",
+    dtype: Union[str, type] = "float32",
+) -> "np.ndarray":
+    """Convert the corpus embeddings into a matrix for repeated batched
+    similarity computation. For cosine similarity, the rows are normalized
+    ahead, so that the corpus can be scored by `metric="dot"` later.
+
+    Args:
+        corpus (`Union[Sequence[Embedding], np.ndarray]`):
+            The embeddings of the corpus.
+        metric (`str`, defaults to `"cosine"`):
+            The similarity metric, one of `"cosine"`, `"dot"` and `"l2"`.
+        dtype (`Union[str, type]`, defaults to `"float32"`):
+            The storage type of the matrix, e.g. `"float16"` to halve the
+            memory footprint.
+
+    Returns:
+        `np.ndarray`: The corpus matrix in shape (num_corpus, dim).
+    """
+    if metric not in _METRICS:
+        raise ValueError(
+            f"Unsupported metric [{metric}], expected one of {_METRICS}.",
+        )
+    matrix = _as_matrix(corpus, dtype=np.float32)
+    if metric == "cosine":
+        matrix = _normalize(matrix)
+    return matrix.astype(dtype, copy=False)
+
+
+def _score_chunk(
+    queries: "np.ndarray",
+    chunk: "np.ndarray",
+    metric: str,
+    normalized: bool,
+) -> "np.ndarray":
+    """Score a chunk of the corpus against the (prepared) queries."""
+    chunk = chunk.astype(np.float32, copy=False)
+    if metric == "cosine" and not normalized:
+        chunk = _normalize(chunk)
+    scores = queries @ chunk.T
+    if metric == "l2":
+        # -||q - c|| = -sqrt(|q|^2 + |c|^2 - 2 q.c)
+        squared = (
+            np.einsum("ij,ij->i", queries, queries)[:, np.newaxis]
+            + np.einsum("ij,ij->i", chunk, chunk)[np.newaxis, :]
+            - 2 * scores
+        )
+        scores = -np.sqrt(np.maximum(squared, 0.0))
+    return scores
+
+
+def batch_similarity(
+    queries: Union[Sequence[Embedding], "np.ndarray"],
+    corpus: Union[Sequence[Embedding], "np.ndarray"],
+    metric: str = "cosine",
+    chunk_size: Optional[int] = None,
+    normalized: bool = False,
+) -> "np.ndarray":
+    """Compute the similarities between a batch of queries and the corpus
+    in one pass.
+
+    Args:
+        queries (`Union[Sequence[Embedding], np.ndarray]`):
+            One or a batch of query embeddings.
+        corpus (`Union[Sequence[Embedding], np.ndarray]`):
+            The embeddings of the corpus. A `np.memmap` can be used for
+            corpora larger than the memory, together with `chunk_size`.
+        metric (`str`, defaults to `"cosine"`):
+            The similarity metric, one of `"cosine"`, `"dot"` and `"l2"`.
+            For `"l2"`, the negative Euclidean distance is returned, so
+            that higher scores always mean more similar.
+        chunk_size (`Optional[int]`, defaults to `None`):
+            The number of corpus rows evaluated at a time, which bounds the
+            memory of the intermediate results. The whole corpus is
+            evaluated at once if `None`.
+        normalized (`bool`, defaults to `False`):
+            Whether the corpus rows are already normalized, e.g. by
+            `prepare_corpus`, to skip the normalization for cosine
+            similarity.
+
+    Returns:
+        `np.ndarray`: The float32 similarity matrix in shape
+        (num_queries, num_corpus).
+    """
+    if metric not in _METRICS:
+        raise ValueError(
+            f"Unsupported metric [{metric}], expected one of {_METRICS}.",
+        )
+
+    queries = _as_matrix(queries, dtype=np.float32)
+    if metric == "cosine":
+        queries = _normalize(queries)
+    if not isinstance(corpus, np.ndarray):
+        corpus = _as_matrix(corpus, dtype=np.float32)
+
+    chunk_size = chunk_size or max(len(corpus), 1)
+    scores = np.empty((len(queries), len(corpus)), dtype=np.float32)
+    for start in range(0, len(corpus), chunk_size):
+        end = start + chunk_size
+        scores[:, start:end] = _score_chunk(
+            queries,
+            corpus[start:end],
+            metric,
+            normalized,
+        )
+    return scores
+
+
+def top_k_similarity(
+    queries: Union[Sequence[Embedding], "np.ndarray"],
+    corpus: Union[Sequence[Embedding], "np.ndarray"],
+    top_k: int = 5,
+    metric: str = "cosine",
+    chunk_size: Optional[int] = None,
+    normalized: bool = False,
+) -> Tuple["np.ndarray", "np.ndarray"]:
+    """Find the most similar corpus entries for a batch of queries in one
+    pass. When `chunk_size` is given, only the running top-k results are
+    kept between chunks, so that the full similarity matrix is never
+    materialized.
+
+    Args:
+        queries (`Union[Sequence[Embedding], np.ndarray]`):
+            One or a batch of query embeddings.
+        corpus (`Union[Sequence[Embedding], np.ndarray]`):
+            The embeddings of the corpus. A `np.memmap` can be used for
+            corpora larger than the memory, together with `chunk_size`.
+        top_k (`int`, defaults to `5`):
+            The number of returned entries for each query.
+        metric (`str`, defaults to `"cosine"`):
+            The similarity metric, one of `"cosine"`, `"dot"` and `"l2"`.
+        chunk_size (`Optional[int]`, defaults to `None`):
+            The number of corpus rows evaluated at a time.
+        normalized (`bool`, defaults to `False`):
+            Whether the corpus rows are already normalized.
+
+    Returns:
+        `Tuple[np.ndarray, np.ndarray]`: The scores and the corpus indices,
+        both in shape (num_queries, min(top_k, num_corpus)) and in
+        descending order of score.
+    """
+    if metric not in _METRICS:
+        raise ValueError(
+            f"Unsupported metric [{metric}], expected one of {_METRICS}.",
+        )
+
+    queries = _as_matrix(queries, dtype=np.float32)
+    if metric == "cosine":
+        queries = _normalize(queries)
+    if not isinstance(corpus, np.ndarray):
+        corpus = _as_matrix(corpus, dtype=np.float32)
+
+    num_queries = len(queries)
+    best_scores = np.empty((num_queries, 0), dtype=np.float32)
+    best_indices = np.empty((num_queries, 0), dtype=np.int64)
+
+    chunk_size = chunk_size or max(len(corpus), 1)
+    for start in range(0, len(corpus), chunk_size):
+        end = start + chunk_size
+        chunk_scores = _score_chunk(
+            queries,
+            corpus[start:end],
+            metric,
+            normalized,
+        )
+        chunk_indices = np.broadcast_to(
+            np.arange(start, start + chunk_scores.shape[1]),
+            chunk_scores.shape,
+        )
+        scores = np.concatenate([best_scores, chunk_scores], axis=1)
+        indices = np.concatenate([best_indices, chunk_indices], axis=1)
+
+        if scores.shape[1] > top_k:
+            part = np.argpartition(-scores, top_k - 1, axis=1)[:, :top_k]
+            scores = np.take_along_axis(scores, part, axis=1)
+            indices = np.take_along_axis(indices, part, axis=1)
+        best_scores, best_indices = scores, indices
+
+    order = np.argsort(-best_scores, axis=1, kind="stable")
+    return (
+        np.take_along_axis(best_scores, order, axis=1),
+        np.take_along_axis(best_indices, order, axis=1),
+    )
@@ -0,0 +1,122 @@
+# -*- coding: utf-8 -*-
+"""Dynamic batching, which collects the concurrent requests into batches to
+be processed together, e.g. by the generation of a local model."""
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from typing import Any, Callable, List, Optional
+
+from loguru import logger
+
+
+class DynamicBatcher:
+    """Collect the items submitted from multiple threads into batches, and
+    process each batch by `batch_func` in a background thread.
+
+    A batch is processed when it's full (`max_batch_size` items), or
+    `max_wait_ms` milliseconds after its first item arrives, whichever
+    comes first.
+    """
+
+    def __init__(
+        self,
+        batch_func: Callable[[List[Any]], List[Any]],
+        max_batch_size: int = 8,
+        max_wait_ms: float = 10.0,
+    ) -> None:
+        """Initialize the dynamic batcher.
+
+        Args:
+            batch_func (`Callable[[List[Any]], List[Any]]`):
+                The function processing a list of items, which returns the
+                results in the same order.
+            max_batch_size (`int`, defaults to `8`):
+                The maximum number of items in a batch.
+            max_wait_ms (`float`, defaults to `10.0`):
+                The maximum milliseconds to wait for more items after the
+                first item of a batch arrives.
+        """
+        self.batch_func = batch_func
+        self.max_batch_size = max_batch_size
+        self.max_wait_ms = max_wait_ms
+
+        self._queue: queue.Queue = queue.Queue()
+        self._closed = False
+        self._worker = threading.Thread(target=self._run, daemon=True)
+        self._worker.start()
+
+    def submit(self, item: Any) -> Future:
+        """Submit an item to be processed in a batch.
+
+        Args:
+            item (`Any`):
+                The item.
+
+        Returns:
+            `Future`: The future of the result of the item.
+        """
+        if self._closed:
+            raise RuntimeError("The batcher is closed.")
+        future: Future = Future()
+        self._queue.put((item, future))
+        return future
+
+    def __call__(self, item: Any, timeout: Optional[float] = None) -> Any:
+        """Submit an item and wait for its result."""
+        return self.submit(item).result(timeout=timeout)
+
+    def close(self) -> None:
+        """Stop the background thread after the submitted items are
+        processed."""
+        self._closed = True
+        self._queue.put(None)
+        self._worker.join()
+
+    def _collect(self) -> Optional[list]:
+        """Collect the next batch, or return `None` if closed."""
+        first = self._queue.get()
+        if first is None:
+            return None
+
+        batch = [first]
+        deadline = time.monotonic() + self.max_wait_ms / 1000
+        while len(batch) < self.max_batch_size:
+            timeout = deadline - time.monotonic()
+            try:
+                if timeout > 0:
+                    entry = self._queue.get(timeout=timeout)
+                else:
+                    entry = self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if entry is None:
+                # process the collected items before closing
+                self._queue.put(None)
+                break
+            batch.append(entry)
+        return batch
+
+    def _run(self) -> None:
+        """Process the batches until closed."""
+        while True:
+            batch = self._collect()
+            if batch is None:
+                return
+
+            items = [_[0] for _ in batch]
+            try:
+                results = self.batch_func(items)
+                if len(results) != len(items):
+                    raise ValueError(
+                        f"The batch function returns {len(results)} results "
+                        f"for {len(items)} items.",
+                    )
+            except Exception as e:  # pylint: disable=broad-except
+                logger.error(f"Failed to process a batch: {e}")
+                for _, future in batch:
+                    future.set_exception(e)
+                continue
+
+            for (_, future), result in zip(batch, results):
+                future.set_result(result)
@@ -12,6 +12,7 @@ from typing import Any, Generator, Optional, Union
 import requests
 
 from agentscope.service.service_response import ServiceResponse
+from agentscope.utils.http_utils import get_shared_session
 from agentscope.service.service_status import ServiceExecStatus
 
 
@@ -149,10 +150,12 @@ def requests_get(
     # Make the request
     try:
         # Check if headers are provided, and include them if they are not None
+        # reuse the pooled connections of the shared session
+        session = get_shared_session()
         if headers:
-            response = requests.get(url, params=params, headers=headers)
+            response = session.get(url, params=params, headers=headers)
         else:
-            response = requests.get(url, params=params)
+            response = session.get(url, params=params)
         # This will raise an exception for HTTP error codes
         response.raise_for_status()
     except requests.RequestException as e:
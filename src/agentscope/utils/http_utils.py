@@ -0,0 +1,85 @@
+# -*- coding: utf-8 -*-
+"""HTTP clients with connection pooling, which reuse the connections to the
+same host across requests."""
+import threading
+from typing import Any, Optional
+
+import requests
+from requests.adapters import HTTPAdapter
+
+try:
+    import httpx
+except ImportError:
+    httpx = None
+
+_DEFAULT_POOL_SIZE = 10
+
+_SHARED_SESSION: Optional[requests.Session] = None
+_SHARED_SESSION_LOCK = threading.Lock()
+
+
+def create_requests_session(
+    pool_size: int = _DEFAULT_POOL_SIZE,
+) -> requests.Session:
+    """Create a `requests.Session` that keeps up to `pool_size` connections
+    alive for each host.
+
+    Args:
+        pool_size (`int`, defaults to `10`):
+            The maximum number of connections kept for each host.
+
+    Returns:
+        `requests.Session`: The session with connection pooling.
+    """
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
+
+
+def create_httpx_client(
+    pool_size: int = _DEFAULT_POOL_SIZE,
+    keepalive_expiry: Optional[float] = 5.0,
+    http2: bool = False,
+    is_async: bool = False,
+) -> Any:
+    """Create a `httpx.Client` (or `httpx.AsyncClient`) with connection
+    pooling.
+
+    Args:
+        pool_size (`int`, defaults to `10`):
+            The maximum number of connections in the pool.
+        keepalive_expiry (`Optional[float]`, defaults to `5.0`):
+            The number of seconds an idle connection is kept alive.
+        http2 (`bool`, defaults to `False`):
+            Whether to enable HTTP/2, which requires the `h2` package.
+        is_async (`bool`, defaults to `False`):
+            Whether to create an async client.
+
+    Returns:
+        `Union[httpx.Client, httpx.AsyncClient]`: The client.
+    """
+    if httpx is None:
+        raise ImportError(
+            "Cannot find httpx package in current python environment.",
+        )
+
+    limits = httpx.Limits(
+        max_connections=pool_size,
+        max_keepalive_connections=pool_size,
+        keepalive_expiry=keepalive_expiry,
+    )
+    client_class = httpx.AsyncClient if is_async else httpx.Client
+    return client_class(limits=limits, http2=http2)
+
+
+def get_shared_session() -> requests.Session:
+    """Get the `requests.Session` shared by the module-level HTTP helpers,
+    e.g. `agentscope.utils.common.requests_get`, which is created on the
+    first use."""
+    global _SHARED_SESSION
+    with _SHARED_SESSION_LOCK:
+        if _SHARED_SESSION is None:
+            _SHARED_SESSION = create_requests_session()
+    return _SHARED_SESSION
@@ -0,0 +1,148 @@
+# -*- coding: utf-8 -*-
+"""The cache of the base64 data URIs of local images, so that the images
+in the dialogue history are not re-read and re-encoded every time the
+messages are formatted."""
+import base64
+import io
+import os
+import threading
+from collections import OrderedDict
+from typing import Optional, Tuple
+
+from loguru import logger
+
+# the formats to re-encode the downscaled images by extension
+_PIL_FORMATS = {
+    "jpg": "JPEG",
+    "jpeg": "JPEG",
+    "png": "PNG",
+    "webp": "WEBP",
+}
+
+
+class ImageCache:
+    """An LRU cache of the data URIs of local images bounded by the total
+    size of the cached URIs.
+
+    The entries are keyed by the absolute path, the modification time and
+    the size of the image file, so a modified image is re-encoded. If
+    `max_side` is set, the images larger than it are downscaled and
+    re-encoded before the base64 encoding to cap the payload size.
+    """
+
+    def __init__(
+        self,
+        max_bytes: int = 64 * 1024 * 1024,
+        max_side: Optional[int] = None,
+        quality: int = 85,
+    ) -> None:
+        """Initialize the cache.
+
+        Args:
+            max_bytes (`int`, defaults to `64 * 1024 * 1024`):
+                The maximum total size of the cached data URIs in bytes.
+                The URIs larger than it are not cached.
+            max_side (`Optional[int]`, defaults to `None`):
+                The maximum width and height of the images in pixels. The
+                larger images are downscaled keeping their aspect ratio.
+                The images are sent as they are if `None`.
+            quality (`int`, defaults to `85`):
+                The quality of the re-encoded JPEG and WEBP images.
+        """
+        self.max_bytes = max_bytes
+        self.max_side = max_side
+        self.quality = quality
+
+        self._entries: OrderedDict[Tuple, str] = OrderedDict()
+        self._num_bytes = 0
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    @property
+    def num_bytes(self) -> int:
+        """The total size of the cached data URIs in bytes."""
+        return self._num_bytes
+
+    def get_data_uri(self, path: str) -> str:
+        """Get the base64 data URI of a local image, which is encoded on
+        the first call and then replayed from the cache.
+
+        Args:
+            path (`str`):
+                The path to the image file.
+
+        Returns:
+            `str`: The data URI, e.g. "data:image/png;base64,...".
+        """
+        try:
+            stat = os.stat(path)
+        except OSError:
+            # not cacheable without the modification time
+            return self._encode(path)
+        key = (os.path.abspath(path), stat.st_mtime_ns, stat.st_size)
+
+        with self._lock:
+            data_uri = self._entries.get(key, None)
+            if data_uri is not None:
+                self._entries.move_to_end(key)
+                return data_uri
+
+        data_uri = self._encode(path)
+
+        with self._lock:
+            if key not in self._entries and len(data_uri) <= self.max_bytes:
+                self._entries[key] = data_uri
+                self._num_bytes += len(data_uri)
+                while self._num_bytes > self.max_bytes:
+                    _, evicted = self._entries.popitem(last=False)
+                    self._num_bytes -= len(evicted)
+        return data_uri
+
+    def clear(self) -> None:
+        """Clear the cache."""
+        with self._lock:
+            self._entries.clear()
+            self._num_bytes = 0
+
+    def _encode(self, path: str) -> str:
+        """Read, downscale if needed and encode the image into a data
+        URI."""
+        extension = path.lower().rsplit(".", 1)[-1]
+        with open(path, "rb") as image_file:
+            data = image_file.read()
+
+        if self.max_side is not None and extension in _PIL_FORMATS:
+            data = self._downscale(data, path, _PIL_FORMATS[extension])
+
+        base64_image = base64.b64encode(data).decode("utf-8")
+        return f"data:image/{extension};base64,{base64_image}"
+
+    def _downscale(self, data: bytes, path: str, image_format: str) -> bytes:
+        """Downscale the image to fit in `max_side`, or return the data
+        as it is if it already fits or cannot be processed."""
+        try:
+            from PIL import Image
+
+            with Image.open(io.BytesIO(data)) as image:
+                if max(image.size) <= self.max_side:
+                    return data
+                image.thumbnail((self.max_side, self.max_side))
+                if image_format == "JPEG" and image.mode not in ("RGB", "L"):
+                    image = image.convert("RGB")
+                buffer = io.BytesIO()
+                image.save(buffer, format=image_format, quality=self.quality)
+        except Exception as e:  # pylint: disable=broad-except
+            logger.warning(f"Failed to downscale the image {path}: {e}")
+            return data
+        return buffer.getvalue()
+
+
+_DEFAULT_IMAGE_CACHE = ImageCache()
+
+
+def get_image_cache() -> ImageCache:
+    """Get the image cache shared by the model wrappers without their own
+    cache."""
+    return _DEFAULT_IMAGE_CACHE
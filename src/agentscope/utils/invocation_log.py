@@ -0,0 +1,309 @@
+# -*- coding: utf-8 -*-
+"""The append-only log of the api invocations in JSON lines, optionally
+compressed by gzip or zstd, which is written by a background thread
+instead of one file per invocation on the calling thread."""
+import atexit
+import glob
+import gzip
+import io
+import json
+import os
+import queue
+import threading
+import time
+import zlib
+from functools import partial
+from typing import IO, Callable, Iterator, List, Optional, Tuple
+
+from loguru import logger
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+# the supported formats of the invocation log by extension
+INVOCATION_LOG_FORMATS = ["jsonl", "jsonl.gz", "jsonl.zst"]
+
+# the sentinel to stop the writer thread
+_STOP = object()
+
+# the size of the chunks read from the logs
+_CHUNK_SIZE = 1 << 16
+
+# the errors raised by the truncated compressed logs
+_TRUNCATION_ERRORS: tuple = (EOFError, zlib.error)
+if zstandard is not None:
+    _TRUNCATION_ERRORS += (zstandard.ZstdError,)
+
+
+def _get_compression(path: str) -> Optional[str]:
+    """Get the compression of the log by its extension."""
+    if path.endswith(".gz"):
+        return "gzip"
+    if path.endswith(".zst"):
+        return "zstd"
+    return None
+
+
+def _check_zstandard() -> None:
+    """Check the zstandard package is installed for the zstd logs."""
+    if zstandard is None:
+        raise ImportError(
+            "Cannot find zstandard package in current python environment, "
+            "please install it by `pip install zstandard`.",
+        )
+
+
+class InvocationLogWriter:
+    """Append the invocation records to a JSON lines file in a background
+    thread.
+
+    The records are serialized on the calling thread, so that they are not
+    affected by later changes of the arguments, and are written, compressed
+    and flushed in batches by the writer thread. The file is flushed and
+    synced to disk every `flush_interval` seconds and when the writer is
+    closed, which is also done at exit.
+
+    Compressed logs are appended as new gzip members or zstd frames for
+    each writer, so a log can be written by multiple runs in turn. Since
+    the compressed streams are not safe to be appended concurrently, each
+    process should write its own log.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        max_queue_size: int = 10000,
+        flush_interval: float = 1.0,
+        fsync: bool = True,
+    ) -> None:
+        """Initialize the writer and start the writer thread.
+
+        Args:
+            path (`str`):
+                The path to the log, which is compressed by gzip if it ends
+                with ".gz", and by zstd if it ends with ".zst".
+            max_queue_size (`int`, defaults to `10000`):
+                The maximum number of records waiting to be written. The
+                callers are blocked when the queue is full, instead of
+                dropping the records.
+            flush_interval (`float`, defaults to `1.0`):
+                The interval in seconds to flush the written records.
+            fsync (`bool`, defaults to `True`):
+                Whether to sync the file to disk after flushing.
+        """
+        self.path = path
+        self.compression = _get_compression(path)
+        if self.compression == "zstd":
+            _check_zstandard()
+        self.flush_interval = flush_interval
+        self.fsync = fsync
+
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._queue: queue.Queue = queue.Queue(maxsize=max_queue_size)
+        self._closed = False
+        self._error: Optional[BaseException] = None
+        self._thread = threading.Thread(
+            target=self._run,
+            name="InvocationLogWriter",
+            daemon=True,
+        )
+        self._thread.start()
+        atexit.register(self.close)
+
+    def write(self, record: dict) -> None:
+        """Append a record to the log.
+
+        Args:
+            record (`dict`):
+                The JSON serializable record.
+        """
+        if self._error is not None:
+            raise RuntimeError(
+                f"The writer of the invocation log {self.path} failed: "
+                f"{self._error}",
+            )
+        if self._closed:
+            raise RuntimeError(f"The invocation log {self.path} is closed.")
+        self._queue.put(json.dumps(record, ensure_ascii=False) + "\n")
+
+    def close(self) -> None:
+        """Write the remaining records, flush the log and stop the writer
+        thread."""
+        if self._closed:
+            return
+        self._closed = True
+        self._queue.put(_STOP)
+        self._thread.join()
+
+    def _open(self) -> Tuple[IO, IO, Callable[[], None]]:
+        """Open the log for appending, and return the text stream, the
+        underlying raw file, and the function to flush the compressed
+        block (if compressed)."""
+        raw = open(self.path, "ab")  # pylint: disable=consider-using-with
+        if self.compression == "gzip":
+            gzip_file: IO[bytes] = gzip.GzipFile(fileobj=raw, mode="ab")
+            return (
+                io.TextIOWrapper(gzip_file, encoding="utf-8"),
+                raw,
+                gzip_file.flush,
+            )
+        if self.compression == "zstd":
+            zstd_writer = zstandard.ZstdCompressor().stream_writer(
+                raw,
+                closefd=False,
+            )
+            return (
+                io.TextIOWrapper(zstd_writer, encoding="utf-8"),
+                raw,
+                partial(zstd_writer.flush, zstandard.FLUSH_BLOCK),
+            )
+        return io.TextIOWrapper(raw, encoding="utf-8"), raw, lambda: None
+
+    def _flush(
+        self,
+        stream: IO,
+        raw: IO,
+        flush_block: Callable[[], None],
+    ) -> None:
+        """Flush the compressed block and sync the file."""
+        stream.flush()
+        flush_block()
+        raw.flush()
+        if self.fsync:
+            os.fsync(raw.fileno())
+
+    def _drain(self, timeout: Optional[float]) -> Tuple[List[str], bool]:
+        """Wait for the next line up to `timeout` seconds, and take all the
+        queued lines in a batch.
+
+        Returns:
+            `Tuple[List[str], bool]`: The lines, and whether the writer is
+            asked to stop.
+        """
+        lines = []
+        try:
+            line = self._queue.get(timeout=timeout)
+        except queue.Empty:
+            return lines, False
+
+        while line is not _STOP:
+            lines.append(line)
+            try:
+                line = self._queue.get_nowait()
+            except queue.Empty:
+                return lines, False
+        return lines, True
+
+    def _run(self) -> None:
+        """The loop of the writer thread."""
+        stream, raw, flush_block = self._open()
+        last_flush = time.time()
+        dirty = False
+        try:
+            while True:
+                # wait for the next flush if there are unflushed records
+                timeout = None
+                if dirty:
+                    timeout = max(
+                        0.0,
+                        last_flush + self.flush_interval - time.time(),
+                    )
+                lines, stop = self._drain(timeout)
+
+                if lines:
+                    stream.write("".join(lines))
+                    dirty = True
+
+                if dirty and (
+                    stop or time.time() - last_flush >= self.flush_interval
+                ):
+                    self._flush(stream, raw, flush_block)
+                    last_flush = time.time()
+                    dirty = False
+                if stop:
+                    break
+        except Exception as e:  # pylint: disable=broad-except
+            logger.error(f"Failed to write the invocation log: {e}")
+            self._error = e
+        finally:
+            stream.close()
+            if self.compression is not None:
+                raw.close()
+
+
+def _read_chunks(path: str, raw: IO) -> Iterator[bytes]:
+    """Read the decompressed chunks of a log."""
+    compression = _get_compression(path)
+    if compression == "zstd":
+        _check_zstandard()
+        reader = zstandard.ZstdDecompressor().stream_reader(
+            raw,
+            read_across_frames=True,
+        )
+        yield from iter(partial(reader.read, _CHUNK_SIZE), b"")
+    elif compression == "gzip":
+        # decompress the gzip members incrementally, so that the records
+        # before a truncated end are all read
+        decompressor = zlib.decompressobj(wbits=31)
+        for data in iter(partial(raw.read, _CHUNK_SIZE), b""):
+            while data:
+                yield decompressor.decompress(data)
+                if decompressor.eof:
+                    data = decompressor.unused_data
+                    decompressor = zlib.decompressobj(wbits=31)
+                else:
+                    data = b""
+    else:
+        yield from iter(partial(raw.read, _CHUNK_SIZE), b"")
+
+
+def _read_lines(path: str) -> Iterator[str]:
+    """Read the lines of a log, which stops at the truncated end of a
+    compressed log, e.g. after a crash."""
+    with open(path, "rb") as raw:
+        buffer = b""
+        try:
+            for chunk in _read_chunks(path, raw):
+                buffer += chunk
+                *lines, buffer = buffer.split(b"\n")
+                for line in lines:
+                    yield line.decode("utf-8")
+        except _TRUNCATION_ERRORS:
+            logger.warning(f"The invocation log {path} is truncated.")
+        if buffer:
+            yield buffer.decode("utf-8", errors="replace")
+
+
+def read_invocations(path: str) -> Iterator[dict]:
+    """Read the invocation records for replay or analysis.
+
+    Args:
+        path (`str`):
+            The path to a log in JSON lines (optionally compressed), or to
+            the directory of the api invocations, where all the logs and
+            the records saved as separate JSON files are read.
+
+    Returns:
+        `Iterator[dict]`: The records, where the incomplete last line of a
+        log is skipped.
+    """
+    if os.path.isdir(path):
+        for file_path in sorted(glob.glob(os.path.join(path, "*"))):
+            if any(
+                file_path.endswith(f".{_}") for _ in INVOCATION_LOG_FORMATS
+            ):
+                yield from read_invocations(file_path)
+            elif file_path.endswith(".json"):
+                with open(file_path, "r", encoding="utf-8") as file:
+                    yield json.load(file)
+        return
+
+    for line in _read_lines(path):
+        if not line.strip():
+            continue
+        try:
+            yield json.loads(line)
+        except json.JSONDecodeError:
+            logger.warning(f"Skip the incomplete record in {path}.")
@@ -3,7 +3,9 @@
 import json
 import os
 import sys
+from collections.abc import Iterator
 from typing import Optional, Literal, Union, Any
+from uuid import uuid4
 
 from loguru import logger
 
@@ -80,8 +82,21 @@ def _chat(
             The message to be logged. If it is a string, it will be logged
             directly. If it's a dict, it should have "name"(or "role") and
             "content" keys, and the message will be logged as "<name/role>:
-            <content>".
+            <content>". If the content is an iterator of text deltas, e.g.
+            the `stream` of a `ModelResponse`, it will be printed
+            incrementally and then replaced by the whole text.
     """
+    if isinstance(message, dict) and isinstance(
+        message.get("content", None),
+        Iterator,
+    ):
+        _chat_stream(message, disable_studio=disable_studio, **kwargs)
+        logger.log(
+            LEVEL_CHAT_SAVE,
+            json.dumps(message, ensure_ascii=False, default=lambda _: None),
+        )
+        return
+
     # Save message into file, add default to ignore not serializable objects
     logger.log(
         LEVEL_CHAT_SAVE,
@@ -124,6 +139,52 @@ def _chat(
     logger.log(LEVEL_CHAT_LOG, message, *args, **kwargs)
 
 
+def _chat_stream(
+    message: dict,
+    disable_studio: bool = False,
+    **kwargs: Any,
+) -> None:
+    """Print a message whose content is an iterator of text deltas as the
+    deltas arrive, and replace the content by the whole text at last.
+
+    Args:
+        message (`dict`):
+            The message to be logged, which should have "name"(or "role")
+            and "content" keys.
+        disable_studio (`bool`, defaults to `False`):
+            Whether to skip sending the message to studio.
+    """
+    speaker = str(message.get("name", None) or message.get("role", None))
+    (m1, m2) = _get_speaker_color(speaker)
+
+    uid = getattr(thread_local_data, "uid", None)
+    if disable_studio:
+        uid = None
+    # the partial messages in studio are replaced by the one with same id
+    msg_id = message.get("id", None) or uuid4().hex
+    avatar = None
+    if uid:
+        avatar = kwargs.get("avatar", None) or generate_image_from_name(
+            speaker,
+        )
+
+    logger.opt(raw=True, colors=True).log(
+        LEVEL_CHAT_LOG,
+        f"{m1}<b>{speaker}</b>{m2}: ",
+    )
+    text = ""
+    for delta in message["content"]:
+        text += delta
+        logger.opt(raw=True).log(LEVEL_CHAT_LOG, delta)
+        if uid:
+            send_msg(text, role=speaker, uid=uid, avatar=avatar, msg_id=msg_id)
+    logger.opt(raw=True).log(LEVEL_CHAT_LOG, "\n")
+
+    message["content"] = text
+    if uid:
+        log_studio(message, uid, msg_id=msg_id, **kwargs)
+
+
 def log_studio(message: dict, uid: str, **kwargs: Any) -> None:
     """Send chat message to studio.
 
@@ -135,6 +196,7 @@ def log_studio(message: dict, uid: str, **kwargs: Any) -> None:
         uid (`str`):
             The local value 'uid' of the thread.
     """
+    msg_id = kwargs.pop("msg_id", None)
     if uid:
         get_reset_msg(uid=uid)
         name = message.get("name", "default") or message.get("role", "default")
@@ -177,6 +239,7 @@ def log_studio(message: dict, uid: str, **kwargs: Any) -> None:
             uid=uid,
             flushing=flushing,
             avatar=avatar,
+            msg_id=msg_id,
         )
 
 
@@ -0,0 +1,219 @@
+# -*- coding: utf-8 -*-
+"""The registry of model metadata, e.g. the context length, the prices per
+token and the tokenizer of the models, which is loaded from local files
+rather than hard-coded."""
+import json
+import os
+import re
+import threading
+from typing import Any, Dict, List, Optional
+
+from loguru import logger
+
+try:
+    import yaml
+except ImportError:
+    yaml = None
+
+# the metadata bundled with the package
+_BUILTIN_MODEL_METADATA_PATH = os.path.join(
+    os.path.dirname(os.path.abspath(__file__)),
+    "model_metadata.json",
+)
+
+# the user metadata loaded on top of the bundled one if exists
+_DEFAULT_MODEL_METADATA_PATH = os.path.join(
+    os.path.expanduser("~"),
+    ".cache",
+    "agentscope",
+    "model_metadata.json",
+)
+
+# the separators of the versions, sizes and tags in model names
+_MODEL_NAME_SEPARATORS = re.compile(r"[-:]")
+
+
+def _get_prefixes(model_name: str) -> List[str]:
+    """Get the prefixes of the model name ending at the separators, from
+    the shortest to the model name itself, e.g. "gpt-4", "gpt-4-0613" for
+    "gpt-4-0613". The provider before "/" is ignored, e.g. in
+    "openai/gpt-4"."""
+    name = model_name.rsplit("/", 1)[-1]
+    prefixes = [
+        name[: _.start()] for _ in _MODEL_NAME_SEPARATORS.finditer(name)
+    ]
+    prefixes.append(name)
+    if name != model_name:
+        prefixes.append(model_name)
+    return prefixes
+
+
+class ModelMetadataRegistry:
+    """The registry of model metadata.
+
+    The metadata of a model is a dict with the following optional fields:
+
+    .. code-block:: python
+
+        {
+            "max_length": 8192,
+            "tokenizer": "cl100k_base",
+            "pricing": {
+                "prompt_tokens": 0.00003,
+                "completion_tokens": 0.00006,
+            },
+        }
+
+    The lookup by model name merges the metadata registered for all its
+    prefixes ending at "-" or ":", where the longer ones take precedence.
+    So "gpt-4-0613" gets its context length from "gpt-4-0613" and its
+    prices from "gpt-4", while "gpt-4o" never matches "gpt-4". The merged
+    results are indexed by model name, so repeated lookups are dict
+    lookups.
+    """
+
+    def __init__(self) -> None:
+        """Initialize an empty registry."""
+        self._models: Dict[str, dict] = {}
+        self._index: Dict[str, dict] = {}
+        self._lock = threading.Lock()
+
+    def load(self, path: str) -> None:
+        """Load the metadata from a JSON or YAML file, which is a dict from
+        model names to metadata, optionally under the key "models".
+
+        Args:
+            path (`str`):
+                The path to the file.
+        """
+        with open(path, "r", encoding="utf-8") as file:
+            if path.endswith((".yaml", ".yml")):
+                if yaml is None:
+                    raise ImportError(
+                        "Cannot find yaml package in current python "
+                        "environment.",
+                    )
+                data = yaml.safe_load(file)
+            else:
+                data = json.load(file)
+
+        models = data.get("models", data)
+        for model_name, metadata in models.items():
+            if isinstance(metadata, dict):
+                self.register(model_name, **metadata)
+
+    def save(self, path: str) -> None:
+        """Save the registered metadata into a JSON file.
+
+        Args:
+            path (`str`):
+                The path to the file.
+        """
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        with open(path, "w", encoding="utf-8") as file:
+            json.dump({"models": self._models}, file, indent=4)
+
+    def register(self, model_name: str, **metadata: Any) -> None:
+        """Register the metadata of a model, which is merged into the
+        existing one.
+
+        Args:
+            model_name (`str`):
+                The model name, which also applies to the model names with
+                it as a prefix, e.g. "gpt-4" for "gpt-4-0613".
+            metadata (`Any`):
+                The metadata fields, e.g. `max_length`, `tokenizer` and
+                `pricing`.
+        """
+        with self._lock:
+            self._models.setdefault(model_name, {}).update(metadata)
+            self._index.clear()
+
+    def get(self, model_name: str) -> dict:
+        """Get the metadata of a model.
+
+        Args:
+            model_name (`str`):
+                The model name.
+
+        Returns:
+            `dict`: The metadata, which is empty if the model is unknown.
+        """
+        metadata = self._index.get(model_name, None)
+        if metadata is None:
+            metadata = {}
+            for prefix in _get_prefixes(model_name):
+                metadata.update(self._models.get(prefix, {}))
+            with self._lock:
+                self._index[model_name] = metadata
+        return metadata
+
+
+_REGISTRY: Optional[ModelMetadataRegistry] = None
+_REGISTRY_LOCK = threading.Lock()
+
+
+def get_model_metadata_registry() -> ModelMetadataRegistry:
+    """Get the global registry, which loads the bundled metadata and the
+    user metadata in `~/.cache/agentscope/model_metadata.json` on the first
+    call."""
+    global _REGISTRY
+    if _REGISTRY is None:
+        with _REGISTRY_LOCK:
+            if _REGISTRY is None:
+                registry = ModelMetadataRegistry()
+                for path in [
+                    _BUILTIN_MODEL_METADATA_PATH,
+                    _DEFAULT_MODEL_METADATA_PATH,
+                ]:
+                    if not os.path.exists(path):
+                        continue
+                    try:
+                        registry.load(path)
+                    except Exception as e:  # pylint: disable=broad-except
+                        logger.warning(
+                            f"Failed to load model metadata from {path}: {e}",
+                        )
+                _REGISTRY = registry
+    return _REGISTRY
+
+
+def load_model_metadata(path: str) -> None:
+    """Load the model metadata from a JSON or YAML file into the global
+    registry.
+
+    Args:
+        path (`str`):
+            The path to the file.
+    """
+    get_model_metadata_registry().load(path)
+
+
+def register_model_metadata(model_name: str, **metadata: Any) -> None:
+    """Register the metadata of a model into the global registry, e.g.
+
+    .. code-block:: python
+
+        register_model_metadata(
+            "my-model",
+            max_length=32768,
+            pricing={"prompt_tokens": 1e-6, "completion_tokens": 2e-6},
+        )
+    """
+    get_model_metadata_registry().register(model_name, **metadata)
+
+
+def get_model_metadata(model_name: str) -> dict:
+    """Get the metadata of a model from the global registry."""
+    return get_model_metadata_registry().get(model_name)
+
+
+def get_model_max_length(model_name: str) -> Optional[int]:
+    """Get the context length of a model, or `None` if unknown."""
+    return get_model_metadata(model_name).get("max_length", None)
+
+
+def get_model_pricing(model_name: str) -> Optional[dict]:
+    """Get the prices per token of a model, e.g. `{"prompt_tokens":
+    0.00003, "completion_tokens": 0.00006}`, or `None` if unknown."""
+    return get_model_metadata(model_name).get("pricing", None)
@@ -1,18 +1,21 @@
 # -*- coding: utf-8 -*-
 """ Monitor for agentscope """
 
+import os
 import re
 import sqlite3
+import threading
 from abc import ABC
 from abc import abstractmethod
 from contextlib import contextmanager
-from typing import Optional, Generator
+from typing import Optional, Generator, List, Tuple
 from loguru import logger
 
 from agentscope.constants import (
     _DEFAULT_MONITOR_TABLE_NAME,
     _DEFAULT_SQLITE_DB_PATH,
 )
+from agentscope.utils.model_metadata import get_model_pricing
 
 
 class MonitorBase(ABC):
@@ -342,7 +345,15 @@ class DummyMonitor(MonitorBase):
 
 
 class SqliteMonitor(MonitorBase):
-    """A monitor based on sqlite"""
+    """A monitor based on sqlite.
+
+    Each thread keeps a persistent connection to the database, instead of
+    connecting for every operation, and the database is journaled in WAL
+    mode with `synchronous=NORMAL`, so that the metrics can be read while
+    being updated, and a commit doesn't wait for syncing the database file
+    to disk. The connections of the exited threads are closed when a new
+    connection is opened, and all the connections are closed by `close`.
+    """
 
     def __init__(
         self,
@@ -362,14 +373,114 @@ class SqliteMonitor(MonitorBase):
         super().__init__()
         self.db_path = db_path
         self.table_name = table_name
+
+        # the statements are built once, so that the prepared statements
+        # are reused from the statement cache of the connections
+        self._exists_sql = f"SELECT 1 FROM {table_name} WHERE name = ? LIMIT 1"
+        self._get_metric_sql = (
+            f"SELECT value, quota, unit FROM {table_name} WHERE name = ?"
+        )
+        self._insert_sql = (
+            f"INSERT INTO {table_name} (name, value, quota, unit) "
+            "VALUES (?, ?, ?, ?)"
+        )
+        self._add_sql = (
+            f"UPDATE {table_name} SET value = value + ? WHERE name = ?"
+        )
+        self._set_quota_sql = (
+            f"UPDATE {table_name} SET quota = ? WHERE name = ?"
+        )
+        self._remove_sql = f"DELETE FROM {table_name} WHERE name = ?"
+
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._connections: List[Tuple[threading.Thread, sqlite3.Connection]]
+        self._connections = []
+        self._generation = 0
+        self._pid = os.getpid()
+
         self._create_monitor_table(drop_exists)
         logger.info(
             f"SqliteMonitor initialization completed at [{self.db_path}]",
         )
 
+    def _connect(self) -> sqlite3.Connection:
+        """Get the connection of the current thread, which is opened on the
+        first use, and again after `close` or in a forked process."""
+        key = (os.getpid(), self._generation)
+        if getattr(self._local, "key", None) == key:
+            return self._local.conn
+
+        # the connections are closed by other threads in `close`, and the
+        # transactions are managed explicitly
+        conn = sqlite3.connect(
+            self.db_path,
+            timeout=30.0,
+            isolation_level=None,
+            check_same_thread=False,
+        )
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+
+        with self._lock:
+            if self._pid != key[0]:
+                # the connections inherited from the parent process
+                # shouldn't be used or closed in the forked process
+                self._connections = []
+                self._pid = key[0]
+            alive = []
+            for thread, thread_conn in self._connections:
+                if thread.is_alive():
+                    alive.append((thread, thread_conn))
+                else:
+                    thread_conn.close()
+            alive.append((threading.current_thread(), conn))
+            self._connections = alive
+
+        self._local.conn, self._local.key = conn, key
+        return conn
+
+    @contextmanager
+    def _transaction(self) -> Generator:
+        """Get a cursor with a write transaction on the connection of the
+        current thread. The write lock is acquired at the beginning, so
+        that the transactions reading before writing wait for each other
+        by the timeout, instead of failing to upgrade their locks."""
+        conn = self._connect()
+        cursor = conn.cursor()
+        try:
+            cursor.execute("BEGIN IMMEDIATE")
+            yield cursor
+            cursor.execute("COMMIT")
+        except Exception as e:
+            if conn.in_transaction:
+                conn.execute("ROLLBACK")
+            raise e
+        finally:
+            cursor.close()
+
+    @contextmanager
+    def _cursor(self) -> Generator:
+        """Get a cursor on the connection of the current thread."""
+        cursor = self._connect().cursor()
+        try:
+            yield cursor
+        finally:
+            cursor.close()
+
+    def close(self) -> None:
+        """Close the connections of all threads. The monitor can still be
+        used after closing, where new connections are opened."""
+        with self._lock:
+            if self._pid == os.getpid():
+                for _, conn in self._connections:
+                    conn.close()
+            self._connections = []
+            self._generation += 1
+
     def _create_monitor_table(self, drop_exists: bool = False) -> None:
         """Internal method to create a table in sqlite3."""
-        with sqlite_transaction(self.db_path) as cursor:
+        with self._transaction() as cursor:
             if drop_exists:
                 cursor.execute(f"DROP TABLE IF EXISTS {self.table_name};")
             cursor.execute(
@@ -404,14 +515,11 @@ class SqliteMonitor(MonitorBase):
         metric_unit: Optional[str] = None,
         quota: Optional[float] = None,
     ) -> bool:
-        with sqlite_transaction(self.db_path) as cursor:
+        with self._transaction() as cursor:
             if self._exists(cursor, metric_name):
                 return False
             cursor.execute(
-                f"""
-                INSERT INTO {self.table_name} (name, value, quota, unit)
-                VALUES (?, ?, ?, ?)
-                """,
+                self._insert_sql,
                 (metric_name, 0.0, quota, metric_unit),
             )
             logger.info(
@@ -427,57 +535,33 @@ class SqliteMonitor(MonitorBase):
         value: float,
     ) -> None:
         try:
-            cursor.execute(
-                f"""
-                    UPDATE {self.table_name}
-                    SET value = value + ?
-                    WHERE name = ?
-                """,
-                (value, metric_name),
-            )
+            cursor.execute(self._add_sql, (value, metric_name))
         except sqlite3.IntegrityError as e:
             raise QuotaExceededError(metric_name) from e
 
     def add(self, metric_name: str, value: float) -> bool:
-        with sqlite_transaction(self.db_path) as cursor:
+        with self._transaction() as cursor:
             if not self._exists(cursor, metric_name):
                 return False
             self._add(cursor, metric_name, value)
             return True
 
     def clear(self, metric_name: str) -> bool:
-        with sqlite_transaction(self.db_path) as cursor:
+        with self._transaction() as cursor:
             if not self._exists(cursor, metric_name):
                 return False
-            cursor.execute(
-                f"""
-                UPDATE {self.table_name}
-                SET value = value + ?
-                WHERE name = ?
-            """,
-                (0.0, metric_name),
-            )
+            cursor.execute(self._add_sql, (0.0, metric_name))
             return True
 
     def remove(self, metric_name: str) -> bool:
-        with sqlite_transaction(self.db_path) as cursor:
+        with self._transaction() as cursor:
             if not self._exists(cursor, metric_name):
                 return False
-            cursor.execute(
-                f"""
-                DELETE FROM {self.table_name}
-                WHERE name = ?""",
-                (metric_name,),
-            )
+            cursor.execute(self._remove_sql, (metric_name,))
         return True
 
     def _get_metric(self, cursor: sqlite3.Cursor, metric_name: str) -> dict:
-        cursor.execute(
-            f"""
-            SELECT value, quota, unit FROM {self.table_name}
-            WHERE name = ?""",
-            (metric_name,),
-        )
+        cursor.execute(self._get_metric_sql, (metric_name,))
         row = cursor.fetchone()
         if row:
             value, quota, unit = row
@@ -490,48 +574,41 @@ class SqliteMonitor(MonitorBase):
             raise RuntimeError(f"Fail to get metric {metric_name}")
 
     def get_value(self, metric_name: str) -> Optional[float]:
-        with sqlite_cursor(self.db_path) as cursor:
+        with self._cursor() as cursor:
             if not self._exists(cursor, metric_name):
                 return None
             metric = self._get_metric(cursor, metric_name)
             return metric["value"]
 
     def get_quota(self, metric_name: str) -> Optional[float]:
-        with sqlite_cursor(self.db_path) as cursor:
+        with self._cursor() as cursor:
             if not self._exists(cursor, metric_name):
                 return None
             metric = self._get_metric(cursor, metric_name)
             return metric["quota"]
 
     def set_quota(self, metric_name: str, quota: float) -> bool:
-        with sqlite_transaction(self.db_path) as cursor:
+        with self._transaction() as cursor:
             if not self._exists(cursor, metric_name):
                 return False
-            cursor.execute(
-                f"""
-                UPDATE {self.table_name}
-                SET quota = ?
-                WHERE name = ?
-            """,
-                (quota, metric_name),
-            )
+            cursor.execute(self._set_quota_sql, (quota, metric_name))
             return True
 
     def get_unit(self, metric_name: str) -> Optional[str]:
-        with sqlite_cursor(self.db_path) as cursor:
+        with self._cursor() as cursor:
             if not self._exists(cursor, metric_name):
                 return None
             metric = self._get_metric(cursor, metric_name)
             return metric["unit"]
 
     def get_metric(self, metric_name: str) -> Optional[dict]:
-        with sqlite_cursor(self.db_path) as cursor:
+        with self._cursor() as cursor:
             if not self._exists(cursor, metric_name):
                 return None
             return self._get_metric(cursor, metric_name)
 
     def get_metrics(self, filter_regex: Optional[str] = None) -> dict:
-        with sqlite_cursor(self.db_path) as cursor:
+        with self._cursor() as cursor:
             cursor.execute(f"SELECT * FROM {self.table_name}")
             rows = cursor.fetchall()
             metrics = {
@@ -553,21 +630,15 @@ class SqliteMonitor(MonitorBase):
             }
 
     def _exists(self, cursor: sqlite3.Cursor, name: str) -> bool:
-        cursor.execute(
-            f"""
-            SELECT 1 FROM {self.table_name}
-            WHERE name = ? LIMIT 1
-        """,
-            (name,),
-        )
+        cursor.execute(self._exists_sql, (name,))
         return cursor.fetchone() is not None
 
     def exists(self, metric_name: str) -> bool:
-        with sqlite_cursor(self.db_path) as cursor:
+        with self._cursor() as cursor:
             return self._exists(cursor, metric_name)
 
     def update(self, values: dict, prefix: Optional[str] = None) -> None:
-        with sqlite_transaction(self.db_path) as cursor:
+        with self._transaction() as cursor:
             for metric_name, value in values.items():
                 self._add(
                     cursor,
@@ -584,7 +655,7 @@ class SqliteMonitor(MonitorBase):
         cost_metric: str,
         unit_price: float,
     ) -> None:
-        with sqlite_transaction(self.db_path) as cursor:
+        with self._transaction() as cursor:
             cursor.execute(
                 f"""
                 CREATE TRIGGER IF NOT EXISTS
@@ -607,8 +678,8 @@ class SqliteMonitor(MonitorBase):
         prefix: Optional[str] = None,
     ) -> bool:
         logger.info(f"set budget {value} to {model_name}")
-        pricing = _get_pricing()
-        if model_name in pricing:
+        pricing = get_model_pricing(model_name)
+        if pricing is not None:
             budget_metric_name = get_full_name(
                 name="cost",
                 prefix=prefix,
@@ -620,7 +691,7 @@ class SqliteMonitor(MonitorBase):
             )
             if not ok:
                 return False
-            for metric_name, unit_price in pricing[model_name].items():
+            for metric_name, unit_price in pricing.items():
                 token_metric_name = get_full_name(
                     name=metric_name,
                     prefix=prefix,
@@ -642,33 +713,6 @@ class SqliteMonitor(MonitorBase):
             return False
 
 
-def _get_pricing() -> dict:
-    """Get pricing as a dict
-
-    Returns:
-        `dict`: the dict with pricing information.
-    """
-    # TODO: get pricing from files
-    return {
-        "gpt-4-turbo": {
-            "prompt_tokens": 0.00001,
-            "completion_tokens": 0.00003,
-        },
-        "gpt-4": {
-            "prompt_tokens": 0.00003,
-            "completion_tokens": 0.00006,
-        },
-        "gpt-4-32k": {
-            "prompt_tokens": 0.00006,
-            "completion_tokens": 0.00012,
-        },
-        "gpt-3.5-turbo": {
-            "prompt_tokens": 0.000001,
-            "completion_tokens": 0.000002,
-        },
-    }
-
-
 class MonitorFactory:
     """Factory of Monitor.
 
@@ -713,4 +757,6 @@ class MonitorFactory:
         Only for unittest usage. Don't use this function in your code.
         Flush the monitor singleton.
         """
+        if isinstance(cls._instance, SqliteMonitor):
+            cls._instance.close()
         cls._instance = None
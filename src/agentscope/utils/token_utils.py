@@ -1,109 +1,82 @@
 # -*- coding: utf-8 -*-
 """Token utils."""
-from typing import Union
+import hashlib
+import json
+import math
+import threading
+from collections import OrderedDict
+from functools import lru_cache
+from typing import Any, Dict, List, Sequence, Tuple, Union
 from loguru import logger
 
+from .model_metadata import (
+    _DEFAULT_MODEL_METADATA_PATH,
+    get_model_max_length,
+    get_model_metadata,
+)
+
 try:
     import tiktoken
 except ImportError:
     tiktoken = None
 
-# TODO: obtain from web API and store it in `~/.cache`
-OPENAI_MAX_LENGTH = {
-    "update": 20231212,
-    # gpt-4
-    "gpt-4-1106-preview": 128000,
-    "gpt-4-vision-preview": 128000,
-    "gpt-4": 8192,
-    "gpt-4-32k": 32768,
-    "gpt-4-0613": 8192,
-    "gpt-4-32k-0613": 32768,
-    "gpt-4-0314": 8192,  # legacy
-    "gpt-4-32k-0314": 32768,  # legacy
-    # gpt-3.5
-    "gpt-3.5-turbo-1106": 16385,
-    "gpt-3.5-turbo": 4096,
-    "gpt-3.5-turbo-16k": 16385,
-    "gpt-3.5-turbo-instruct": 4096,
-    "gpt-3.5-turbo-0613": 4096,  # legacy
-    "gpt-3.5-turbo-16k-0613": 16385,  # deprecated on June 13th 2024
-    "gpt-3.5-turbo-0301": 4096,  # deprecated on June 13th 2024
-    "text-davinci-003": 4096,  # deprecated on Jan 4th 2024
-    "text-davinci-002": 4096,  # deprecated on Jan 4th 2024
-    "code-davinci-002": 4096,  # deprecated on Jan 4th 2024
+# the completion models, whose prompts are plain texts
+_COMPLETION_MODELS = [
+    "text-davinci-003",  # deprecated on Jan 4th 2024,
+    "text-davinci-002",  # deprecated on Jan 4th 2024
+    "code-davinci-002",  # deprecated on Jan 4th 2024
     # gpt-3 legacy
-    "text-curie-001": 2049,
-    "text-babbage-001": 2049,
-    "text-ada-001": 2049,
-    "davinci": 2049,
-    "curie": 2049,
-    "babbage": 2049,
-    "ada": 2049,
-}
+    "text-curie-001",
+    "text-babbage-001",
+    "text-ada-001",
+    "davinci",
+    "curie",
+    "babbage",
+    "ada",
+]
+
+# the maximum number of memoized token counts, which are keyed by the
+# digests of the texts, so that the memory they take (about 200 bytes
+# each) doesn't grow with the lengths of the texts
+_MAX_TOKEN_COUNTS = 100000
+
+# (encoding name, digest of text) -> the number of tokens, in LRU order
+_TOKEN_COUNTS: OrderedDict[Tuple[str, bytes], int] = OrderedDict()
+_TOKEN_COUNTS_LOCK = threading.Lock()
 
 
 def get_openai_max_length(model_name: str) -> int:
     """Get the max length of the OpenAi models."""
-    try:
-        return OPENAI_MAX_LENGTH[model_name]
-    except KeyError as exc:
+    max_length = get_model_max_length(model_name)
+    if max_length is None:
         raise KeyError(
-            f"Model [{model_name}] not found in OPENAI_MAX_LENGTH. "
-            f"The last updated date is {OPENAI_MAX_LENGTH['update']}",
-        ) from exc
-
-
-def count_openai_token(content: Union[str, list], model: str) -> int:
-    """Count token in format of OpenAI API"""
-    if isinstance(content, str):
-        content = [content]
-    try:
-        encoding = tiktoken.encoding_for_model(model)
-    except KeyError:
-        logger.warning(
-            "Warning: model not found. Using cl100k_base encoding.",
+            f"Model [{model_name}] not found in the model metadata. "
+            f"Register it by `register_model_metadata` or in "
+            f"{_DEFAULT_MODEL_METADATA_PATH}.",
         )
-        encoding = tiktoken.get_encoding("cl100k_base")
-
-    if model in [
-        "text-davinci-003",  # deprecated on Jan 4th 2024,
-        "text-davinci-002",  # deprecated on Jan 4th 2024
-        "code-davinci-002",  # deprecated on Jan 4th 2024
-        # gpt-3 legacy
-        "text-curie-001",
-        "text-babbage-001",
-        "text-ada-001",
-        "davinci",
-        "curie",
-        "babbage",
-        "ada",
-    ]:
-        num_tokens = 0
-        for message in content:
-            if isinstance(message, dict):
-                raise NotImplementedError(
-                    f"""count_openai_token() is not implemented for
-                    model {model}. See
-                    https://github.com/openai/openai-python for
-                    information on how messages are converted to tokens.""",
-                )
-            num_tokens += len(encoding.encode(message))
-        return num_tokens
-    return num_tokens_from_content(content, model)
+    return max_length
 
 
-def num_tokens_from_content(content: list, model: str) -> int:
-    """Count token in format of OpenAI Chat API"""
-    # modified from https://github.com/openai/openai-cookbook/blob/main
-    # /examples/How_to_count_tokens_with_tiktoken.ipynb
+@lru_cache(maxsize=None)
+def _get_encoding(model: str) -> Any:
+    """Get the tiktoken encoding of the model, which is cached since
+    loading it costs milliseconds or even a download."""
     try:
-        encoding = tiktoken.encoding_for_model(model)
+        return tiktoken.encoding_for_model(model)
     except KeyError:
+        tokenizer = get_model_metadata(model).get("tokenizer", None)
+        if tokenizer is not None:
+            return tiktoken.get_encoding(tokenizer)
         logger.warning(
             "Warning: model not found. Using cl100k_base encoding.",
         )
-        encoding = tiktoken.get_encoding("cl100k_base")
+        return tiktoken.get_encoding("cl100k_base")
 
+
+@lru_cache(maxsize=None)
+def _get_message_overhead(model: str) -> Tuple[int, int]:
+    """Get the numbers of tokens per message and per name in the OpenAI
+    Chat API for the model."""
     if model in {
         "gpt-3.5-turbo-0613",
         "gpt-3.5-turbo-16k-0613",
@@ -112,44 +85,220 @@ def num_tokens_from_content(content: list, model: str) -> int:
         "gpt-4-0613",
         "gpt-4-32k-0613",
     }:
-        tokens_per_message = 3
-        tokens_per_name = 1
+        return 3, 1
     elif model == "gpt-3.5-turbo-0301":
         # every message follows <|im_start|>{role/name}\n{
-        # content}<|im_end|>\n
-        tokens_per_message = 4
-        # if there's a name, the role is omitted
-        tokens_per_name = -1
+        # content}<|im_end|>\n, and if there's a name, the role is omitted
+        return 4, -1
     elif "gpt-3.5-turbo" in model:
         logger.warning(
             "Warning: gpt-3.5-turbo may update over time. "
             "Returning num tokens assuming "
             "gpt-3.5-turbo-0613.",
         )
-        return num_tokens_from_content(content, "gpt-3.5-turbo-0613")
+        return _get_message_overhead("gpt-3.5-turbo-0613")
     elif "gpt-4" in model:
         logger.warning(
             "Warning: gpt-4 may update over time. Returning "
             "num tokens assuming gpt-4-0613.",
         )
-        return num_tokens_from_content(content, "gpt-4-0613")
-    else:
-        raise NotImplementedError(
-            f"""num_tokens_from_content() is not implemented for model
-             {model}. See
-             https://github.com/openai/openai-python
-             for information on how messages are converted to tokens.""",
+        return _get_message_overhead("gpt-4-0613")
+    raise NotImplementedError(
+        f"""num_tokens_from_content() is not implemented for model
+         {model}. See
+         https://github.com/openai/openai-python
+         for information on how messages are converted to tokens.""",
+    )
+
+
+def _text_key(encoding: Any, text: str) -> Tuple[str, bytes]:
+    """The key of the memoized token count of a text."""
+    digest = hashlib.blake2b(text.encode("utf-8"), digest_size=16).digest()
+    return encoding.name, digest
+
+
+def _count_text_tokens(
+    encoding: Any,
+    texts: Sequence[str],
+    num_threads: int = 8,
+) -> List[int]:
+    """Count the tokens of the texts, where the counts are memoized by
+    encoding and text, and the new texts are encoded in a batch by
+    multiple threads."""
+    keys = [_text_key(encoding, _) for _ in texts]
+    counts: Dict[Tuple[str, bytes], int] = {}
+    with _TOKEN_COUNTS_LOCK:
+        for key in keys:
+            if key in _TOKEN_COUNTS:
+                _TOKEN_COUNTS.move_to_end(key)
+                counts[key] = _TOKEN_COUNTS[key]
+
+    # the distinct new texts are encoded outside the lock
+    missing = {
+        key: text for key, text in zip(keys, texts) if key not in counts
+    }
+    if missing:
+        if len(missing) == 1:
+            tokens = [encoding.encode(*missing.values())]
+        else:
+            tokens = encoding.encode_batch(
+                list(missing.values()),
+                num_threads=num_threads,
+            )
+        new_counts = {key: len(_) for key, _ in zip(missing, tokens)}
+        counts.update(new_counts)
+
+        with _TOKEN_COUNTS_LOCK:
+            _TOKEN_COUNTS.update(new_counts)
+            while len(_TOKEN_COUNTS) > _MAX_TOKEN_COUNTS:
+                _TOKEN_COUNTS.popitem(last=False)
+    return [counts[key] for key in keys]
+
+
+def count_openai_token(
+    content: Union[str, list],
+    model: str,
+    num_threads: int = 8,
+) -> int:
+    """Count token in format of OpenAI API"""
+    if isinstance(content, str):
+        content = [content]
+
+    if model in _COMPLETION_MODELS:
+        for message in content:
+            if isinstance(message, dict):
+                raise NotImplementedError(
+                    f"""count_openai_token() is not implemented for
+                    model {model}. See
+                    https://github.com/openai/openai-python for
+                    information on how messages are converted to tokens.""",
+                )
+        return sum(
+            _count_text_tokens(_get_encoding(model), content, num_threads),
         )
+    return num_tokens_from_content(content, model, num_threads)
+
+
+def num_tokens_from_content(
+    content: list,
+    model: str,
+    num_threads: int = 8,
+) -> int:
+    """Count token in format of OpenAI Chat API"""
+    # modified from https://github.com/openai/openai-cookbook/blob/main
+    # /examples/How_to_count_tokens_with_tiktoken.ipynb
+    tokens_per_message, tokens_per_name = _get_message_overhead(model)
+    encoding = _get_encoding(model)
+
     num_tokens = 0
+    texts = []
     for message in content:
         if isinstance(message, str):
-            num_tokens += len(encoding.encode(message))
+            texts.append(message)
         else:
             num_tokens += tokens_per_message
             for key, value in message.items():
-                num_tokens += len(encoding.encode(value))
+                texts.append(value)
                 if key == "name":
                     num_tokens += tokens_per_name
+    num_tokens += sum(_count_text_tokens(encoding, texts, num_threads))
     # every reply is primed with <|start|>assistant<|message|>
     num_tokens += 3
     return num_tokens
+
+
+def count_tokens(
+    messages: Union[str, Sequence[Union[str, dict]]],
+    model: str,
+    num_threads: int = 8,
+) -> int:
+    """Count the tokens of the messages for the model.
+
+    The tokens are counted exactly by tiktoken for the OpenAI models, where
+    the encodings are cached and the texts are encoded in a batch by
+    multiple threads, with the counts memoized by text. For the other
+    models, or if tiktoken is not installed, they're estimated by
+    `estimate_token_count`, which costs only microseconds.
+
+    Args:
+        messages (`Union[str, Sequence[Union[str, dict]]]`):
+            A string, or a list of strings or messages in the format of
+            OpenAI Chat API.
+        model (`str`):
+            The name of the model.
+        num_threads (`int`, defaults to `8`):
+            The number of threads to encode the new texts.
+
+    Returns:
+        `int`: The number of tokens.
+    """
+    if isinstance(messages, str):
+        messages = [messages]
+
+    if _is_openai_model(model):
+        return count_openai_token(list(messages), model, num_threads)
+
+    num_tokens = 0
+    for message in messages:
+        if isinstance(message, dict):
+            num_tokens += sum(
+                estimate_token_count(_) for _ in message.values()
+            )
+        else:
+            num_tokens += estimate_token_count(message)
+    return num_tokens
+
+
+def count_text_tokens(text: str, model: str) -> int:
+    """Count the tokens of a plain text for the model, without the overhead
+    of the chat messages. Like `count_tokens`, it's exact for the OpenAI
+    models and estimated for the others.
+
+    Args:
+        text (`str`):
+            The text.
+        model (`str`):
+            The name of the model.
+
+    Returns:
+        `int`: The number of tokens.
+    """
+    if _is_openai_model(model):
+        return _count_text_tokens(_get_encoding(model), [text])[0]
+    return estimate_token_count(text)
+
+
+@lru_cache(maxsize=None)
+def _is_openai_model(model: str) -> bool:
+    """Whether the model can be counted exactly by tiktoken."""
+    if tiktoken is None:
+        return False
+    try:
+        tiktoken.encoding_name_for_model(model)
+    except KeyError:
+        return False
+    try:
+        _get_message_overhead(model)
+    except NotImplementedError:
+        # the completion models
+        return model in _COMPLETION_MODELS
+    return True
+
+
+def estimate_token_count(content: Any, chars_per_token: float = 4.0) -> int:
+    """Estimate the number of tokens roughly by the length of the content,
+    which is much cheaper than encoding it and works for the models without
+    a public tokenizer, e.g. for rate limiting.
+
+    Args:
+        content (`Any`):
+            The content, which is serialized into JSON if it's not a string.
+        chars_per_token (`float`, defaults to `4.0`):
+            The average number of characters per token.
+
+    Returns:
+        `int`: The estimated number of tokens.
+    """
+    if not isinstance(content, str):
+        content = json.dumps(content, ensure_ascii=False, default=str)
+    return math.ceil(len(content) / chars_per_token)
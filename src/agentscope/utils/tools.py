@@ -1,18 +1,19 @@
 # -*- coding: utf-8 -*-
 """ Tools for agentscope """
-import base64
 import datetime
 import json
 import os.path
 import secrets
 import string
-from typing import Any, Literal, List
+from typing import Any, Literal, List, Optional
 
 from urllib.parse import urlparse
 
 import requests
 from loguru import logger
 
+from .image_cache import ImageCache, get_image_cache
+
 
 def _get_timestamp(
     format_: str = "%Y-%m-%d %H:%M:%S",
@@ -119,7 +120,10 @@ def _guess_type_by_extension(
         return "file"
 
 
-def _to_openai_image_url(url: str) -> str:
+def _to_openai_image_url(
+    url: str,
+    image_cache: Optional[ImageCache] = None,
+) -> str:
     """Convert an image url to openai format. If the given url is a local
     file, it will be converted to base64 format. Otherwise, it will be
     returned directly.
@@ -127,6 +131,9 @@ def _to_openai_image_url(url: str) -> str:
     Args:
         url (`str`):
             The local or public url of the image.
+        image_cache (`Optional[ImageCache]`, defaults to `None`):
+            The cache of the data URIs of local images. The shared cache
+            is used if `None`.
     """
     # See https://platform.openai.com/docs/guides/vision for details of
     # support image extensions.
@@ -150,13 +157,9 @@ def _to_openai_image_url(url: str) -> str:
     # Check if it is a local file
     elif os.path.exists(url) and os.path.isfile(url):
         if any(lower_url.endswith(_) for _ in support_image_extensions):
-            with open(url, "rb") as image_file:
-                base64_image = base64.b64encode(image_file.read()).decode(
-                    "utf-8",
-                )
-            extension = parsed_url.path.lower().split(".")[-1]
-            mime_type = f"image/{extension}"
-            return f"data:{mime_type};base64,{base64_image}"
+            if image_cache is None:
+                image_cache = get_image_cache()
+            return image_cache.get_data_uri(url)
 
     raise TypeError(f"{url} should be end with {support_image_extensions}.")
 
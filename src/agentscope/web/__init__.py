@@ -1,6 +1,18 @@
 # -*- coding: utf-8 -*-
 """Import all modules in the web ui package."""
 
-from ._app import init
+from typing import TYPE_CHECKING, Any
+
+if TYPE_CHECKING:
+    from ._app import init
 
 __all__ = ["init"]
+
+
+def __getattr__(name: str) -> Any:
+    """Import the web app (and flask) on first use of `init`."""
+    if name == "init":
+        from ._app import init
+
+        return init
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -56,6 +56,15 @@ def reset_glb_var(uid: str) -> None:
     glb_doing_signal_dict[uid] = init_uid_list()
 
 
+def _is_same_msg(history: list, line: list) -> bool:
+    """Check if the line updates the last message in the history, which
+    happens when the message is sent incrementally."""
+    if not history or not line[1] or not history[-1][1]:
+        return False
+    msg_id = line[1].get("id", None)
+    return msg_id is not None and history[-1][1].get("id", None) == msg_id
+
+
 def get_chat(uid: str) -> list[list]:
     """Retrieve chat messages for a given user ID."""
     uid = check_uuid(uid)
@@ -69,6 +78,10 @@ def get_chat(uid: str) -> list[list]:
         if line[1] and line[1]["text"] == _SPEAK:
             line[1]["text"] = ""
             glb_doing_signal_dict[uid] = line
+        elif _is_same_msg(glb_history_dict[uid], line):
+            # replace the partial message generated in stream mode
+            glb_history_dict[uid][-1] = line
+            glb_doing_signal_dict[uid] = []
         else:
             glb_history_dict[uid] += [line]
             glb_doing_signal_dict[uid] = []
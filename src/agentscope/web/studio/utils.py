@@ -10,8 +10,6 @@ from collections import defaultdict
 
 from PIL import Image
 
-from dashscope.audio.asr import RecognitionCallback, Recognition
-
 SYS_MSG_PREFIX = "【SYSTEM】"
 
 thread_local_data = threading.local()
@@ -174,6 +172,8 @@ def generate_image_from_name(name: str) -> str:
 
 def audio2text(audio_path: str) -> str:
     """Converts audio file at the given path to text using ASR."""
+    from dashscope.audio.asr import RecognitionCallback, Recognition
+
     # dashscope.api_key = ""
     callback = RecognitionCallback()
     rec = Recognition(
@@ -4,8 +4,18 @@ Unit tests for agent classes and functions
 """
 
 import unittest
+from typing import Any, AsyncGenerator, Iterator, List, Sequence, Union
+from unittest.mock import patch
 
 from agentscope.agents import AgentBase
+from agentscope.message import MessageBase
+from agentscope.models import (
+    ModelResponse,
+    ModelWrapperBase,
+    clear_model_configs,
+    read_model_configs,
+)
+from agentscope.models import _MODEL_REF_COUNTS  # pylint: disable=W0212
 
 
 class TestAgent(AgentBase):
@@ -36,6 +46,21 @@ class TestAgentCopy(TestAgent):
     """A copy of testagent"""
 
 
+class AgentModelWrapper(ModelWrapperBase):
+    """A model wrapper for test usage"""
+
+    model_type: str = "agent_test_model"
+
+    def __call__(self, *args: Any, **kwargs: Any) -> ModelResponse:
+        return ModelResponse(text="")
+
+    def format(
+        self,
+        *args: Union[MessageBase, Sequence[MessageBase]],
+    ) -> Union[List[dict], str]:
+        return ""
+
+
 class BasicAgentTest(unittest.TestCase):
     """Test cases for basic agents"""
 
@@ -81,3 +106,52 @@ class BasicAgentTest(unittest.TestCase):
         )
         a4._agent_id = "agent_id_for_d"  # pylint: disable=W0212
         self.assertEqual(a4.agent_id, "agent_id_for_d")
+
+    def test_agent_close(self) -> None:
+        """Test the agents release the shared model wrapper when closed."""
+        read_model_configs(
+            {"config_name": "shared", "model_type": "agent_test_model"},
+            clear_existing=True,
+        )
+        agents = [
+            TestAgent(
+                str(i),
+                model_config="shared",  # type: ignore[arg-type]
+            )
+            for i in range(3)
+        ]
+        self.assertIs(agents[0].model, agents[1].model)
+        self.assertEqual(_MODEL_REF_COUNTS["shared"], 3)
+
+        agents[0].close()
+        agents[0].close()
+        self.assertEqual(_MODEL_REF_COUNTS["shared"], 2)
+
+        for agent in agents[1:]:
+            agent.close()
+        self.assertNotIn("shared", _MODEL_REF_COUNTS)
+
+        clear_model_configs()
+
+    @patch("agentscope.agents.agent.logger")
+    def test_speak_stream(self, mock_logger: Any) -> None:
+        """Test speaking the streaming responses."""
+
+        def chunks() -> Iterator:
+            yield "Hello", None
+            yield " world", None
+            yield "", {"text": "Hello world"}
+
+        async def achunks() -> AsyncGenerator:
+            yield "Hello", None
+
+        agent = TestAgent("a")
+        agent.speak(ModelResponse(stream=chunks()))
+        msg = mock_logger.chat.call_args[0][0]
+        self.assertEqual(msg.name, "a")
+        self.assertEqual(list(msg.content), ["Hello", " world"])
+
+        mock_logger.reset_mock()
+        with self.assertRaises(TypeError):
+            agent.speak(ModelResponse(stream=achunks()))
+        mock_logger.chat.assert_not_called()
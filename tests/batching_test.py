@@ -0,0 +1,49 @@
+# -*- coding: utf-8 -*-
+"""Unit tests for the dynamic batcher."""
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+
+from agentscope.utils.batching import DynamicBatcher
+
+
+class DynamicBatcherTest(unittest.TestCase):
+    """Test cases for the dynamic batcher"""
+
+    def test_batching(self) -> None:
+        """Test the concurrent items are processed in batches."""
+        batches = []
+
+        def double(items: list) -> list:
+            batches.append(len(items))
+            return [_ * 2 for _ in items]
+
+        batcher = DynamicBatcher(double, max_batch_size=4, max_wait_ms=100)
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            results = list(executor.map(batcher, range(8)))
+        batcher.close()
+
+        self.assertEqual(results, [_ * 2 for _ in range(8)])
+        self.assertLess(len(batches), 8)
+        self.assertTrue(all(_ <= 4 for _ in batches))
+
+    def test_batch_failure(self) -> None:
+        """Test the exception is raised for all items in the batch."""
+
+        def fail(items: list) -> list:
+            raise ValueError("failed")
+
+        batcher = DynamicBatcher(fail)
+        with self.assertRaises(ValueError):
+            batcher(1)
+
+        # the batch function should return one result per item
+        batcher = DynamicBatcher(lambda items: [])
+        with self.assertRaises(ValueError):
+            batcher(1)
+        batcher.close()
+        with self.assertRaises(RuntimeError):
+            batcher.submit(1)
+
+
+if __name__ == "__main__":
+    unittest.main()
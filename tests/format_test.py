@@ -256,6 +256,33 @@ class ExampleTest(unittest.TestCase):
         with self.assertRaises(TypeError):
             model.format(*self.wrong_inputs)  # type: ignore[arg-type]
 
+    def test_incremental_format(self) -> None:
+        """Test the formatted lines of dialogue history are cached and
+        invalidated when the messages change."""
+        # pylint: disable=protected-access
+        model = OllamaGenerationWrapper(
+            config_name="",
+            model_name="llama2",
+        )
+        history = list(self.inputs[1])
+        model.format(self.inputs[0], history)
+        self.assertEqual(len(model._dialogue_lines), 2)
+
+        # the cached lines are reused for the same messages
+        with patch(
+            "agentscope.models.model._convert_to_str",
+        ) as mock_convert:
+            mock_convert.side_effect = str
+            history.append(Msg("user", {"city": "Paris"}, role="user"))
+            prompt = model.format(self.inputs[0], history)
+            mock_convert.assert_called_once_with({"city": "Paris"})
+        self.assertTrue(prompt.endswith("\nuser: {'city': 'Paris'}"))
+
+        # the reassigned content is formatted again
+        history[1].content = "It is rainy today"
+        prompt = model.format(self.inputs[0], history)
+        self.assertIn("\nassistant: It is rainy today\n", prompt)
+
     @patch("google.generativeai.configure")
     def test_gemini_chat(self, mock_configure: MagicMock) -> None:
         """Unit test for the format function in gemini chat api wrapper."""
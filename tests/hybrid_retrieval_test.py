@@ -0,0 +1,83 @@
+# -*- coding: utf-8 -*-
+"""Unit tests for BM25 and hybrid retrieval."""
+import unittest
+
+from agentscope.service import (
+    BM25Index,
+    EmbeddingIndex,
+    ServiceToolkit,
+    ServiceExecStatus,
+    bm25_search,
+    hybrid_search,
+    reciprocal_rank_fusion,
+)
+
+
+class HybridRetrievalTest(unittest.TestCase):
+    """Test cases for BM25 and hybrid retrieval."""
+
+    def setUp(self) -> None:
+        self.docs = {
+            "a": "The cat sits on the mat.",
+            "b": "Dogs and cats are friends.",
+            "c": "The stock market rises today.",
+        }
+        self.bm25_index = BM25Index()
+        self.bm25_index.add_documents(self.docs)
+
+        self.embedding_index = EmbeddingIndex()
+        self.embedding_index.add("a", [1.0, 0.0])
+        self.embedding_index.add("b", [0.8, 0.2])
+        self.embedding_index.add("c", [0.0, 1.0])
+
+    def test_bm25_search(self) -> None:
+        """Test BM25 search with incremental updates."""
+        results = self.bm25_index.search("cat mat")
+        self.assertEqual([_[1] for _ in results], ["a"])
+
+        results = bm25_search("market", self.bm25_index).content
+        self.assertEqual(results[0]["id"], "c")
+        self.assertEqual(results[0]["content"], self.docs["c"])
+
+        self.assertTrue(self.bm25_index.remove("c"))
+        self.assertFalse(self.bm25_index.remove("c"))
+        self.assertEqual(self.bm25_index.search("market"), [])
+
+        doc_id = self.bm25_index.add("A cat market")
+        self.assertEqual(len(self.bm25_index), 3)
+        self.assertEqual(self.bm25_index.search("market")[0][1], doc_id)
+
+    def test_reciprocal_rank_fusion(self) -> None:
+        """Test reciprocal rank fusion."""
+        fused = reciprocal_rank_fusion([["a", "b"], ["b", "c"]], k=1)
+        self.assertEqual([_[1] for _ in fused], ["b", "a", "c"])
+        self.assertAlmostEqual(fused[0][0], 1 / 3 + 1 / 2)
+
+    def test_hybrid_search(self) -> None:
+        """Test hybrid search through the service toolkit."""
+        toolkit = ServiceToolkit()
+        toolkit.add(
+            hybrid_search,
+            bm25_index=self.bm25_index,
+            embedding_index=self.embedding_index,
+            query_embedding=[0.0, 1.0],
+        )
+        schema = toolkit.json_schemas["hybrid_search"]["function"]
+        self.assertIn("query", schema["parameters"]["properties"])
+        self.assertNotIn("bm25_index", schema["parameters"]["properties"])
+
+        func = toolkit.service_funcs["hybrid_search"].processed_func
+        response = func(query="cat", top_k=2)
+        self.assertEqual(response.status, ServiceExecStatus.SUCCESS)
+        # "a" ranks first in BM25 and "c" ranks first in embedding
+        self.assertEqual(
+            sorted(_["id"] for _ in response.content),
+            ["a", "c"],
+        )
+
+        response = hybrid_search("cat", self.bm25_index, self.embedding_index)
+        self.assertEqual(response.status, ServiceExecStatus.ERROR)
+
+
+if __name__ == "__main__":
+    unittest.main()
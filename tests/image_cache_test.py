@@ -0,0 +1,78 @@
+# -*- coding: utf-8 -*-
+"""Unit tests for the cache of the encoded local images."""
+import base64
+import io
+import os
+import shutil
+import unittest
+from unittest.mock import patch
+
+from PIL import Image
+
+from agentscope.utils.image_cache import ImageCache
+from agentscope.utils.tools import _to_openai_image_url
+
+
+class ImageCacheTest(unittest.TestCase):
+    """Test cases for the image cache"""
+
+    def setUp(self) -> None:
+        """Init for ImageCacheTest."""
+        self.tmp_dir = "./tmp_image_cache"
+        os.makedirs(self.tmp_dir, exist_ok=True)
+        self.paths = []
+        for i, size in enumerate([(64, 32), (16, 16)]):
+            path = os.path.join(self.tmp_dir, f"image_{i}.png")
+            Image.new("RGB", size, color=(i * 100, 0, 0)).save(path)
+            self.paths.append(path)
+
+    def tearDown(self) -> None:
+        """Clean up the images."""
+        shutil.rmtree(self.tmp_dir)
+
+    def test_cache_hit_and_invalidation(self) -> None:
+        """Test the images are encoded once until they are modified."""
+        # pylint: disable=protected-access
+        cache = ImageCache()
+        with patch.object(cache, "_encode", wraps=cache._encode) as encode:
+            data_uri = cache.get_data_uri(self.paths[0])
+            self.assertIs(cache.get_data_uri(self.paths[0]), data_uri)
+            self.assertEqual(encode.call_count, 1)
+            self.assertTrue(data_uri.startswith("data:image/png;base64,"))
+
+            # the modified image is encoded again
+            Image.new("RGB", (8, 8)).save(self.paths[0])
+            self.assertNotEqual(cache.get_data_uri(self.paths[0]), data_uri)
+            self.assertEqual(encode.call_count, 2)
+
+    def test_byte_budget(self) -> None:
+        """Test the least recently used images are evicted."""
+        sizes = [len(ImageCache().get_data_uri(_)) for _ in self.paths]
+        cache = ImageCache(max_bytes=max(sizes))
+        for path in self.paths:
+            cache.get_data_uri(path)
+
+        self.assertEqual(len(cache), 1)
+        self.assertEqual(cache.num_bytes, sizes[1])
+
+        # the images exceeding the budget are not cached
+        cache = ImageCache(max_bytes=min(sizes) - 1)
+        cache.get_data_uri(self.paths[1])
+        self.assertEqual(len(cache), 0)
+
+    def test_downscale(self) -> None:
+        """Test the large images are downscaled."""
+        cache = ImageCache(max_side=16)
+        data_uri = _to_openai_image_url(self.paths[0], cache)
+        data = base64.b64decode(data_uri.split(",", 1)[1])
+        with Image.open(io.BytesIO(data)) as image:
+            self.assertEqual(image.size, (16, 8))
+
+        # the small images are sent as they are
+        with open(self.paths[1], "rb") as file:
+            expected = base64.b64encode(file.read()).decode("utf-8")
+        self.assertTrue(cache.get_data_uri(self.paths[1]).endswith(expected))
+
+
+if __name__ == "__main__":
+    unittest.main()
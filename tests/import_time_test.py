@@ -0,0 +1,142 @@
+# -*- coding: utf-8 -*-
+"""Unit tests for the import time of the package."""
+import importlib
+import json
+import os
+import subprocess
+import sys
+import unittest
+from unittest.mock import patch
+
+# the modules which shouldn't be imported by `import agentscope`
+_LAZY_MODULES = [
+    "openai",
+    "dashscope",
+    "ollama",
+    "google.generativeai",
+    "zhipuai",
+    "litellm",
+    "flask",
+    "gradio",
+]
+
+
+# the provider SDKs which shouldn't be imported by the unrelated wrappers
+_PROVIDER_MODULES = ["openai", "dashscope", "google.generativeai"]
+
+# the provider SDKs allowed to be imported by each wrapper module, i.e.
+# its own SDK and the ones its SDK is built on, e.g. litellm on openai
+_ALLOWED_SDKS = {
+    "openai_model": ["openai"],
+    "dashscope_model": ["dashscope"],
+    "gemini_model": ["google.generativeai"],
+    "litellm_model": ["openai"],
+}
+
+_CHECK_WRAPPER_SCRIPT = """
+import json, sys
+from agentscope.models import _get_model_wrapper
+_get_model_wrapper(sys.argv[1])
+print(json.dumps([_ for _ in json.loads(sys.argv[2]) if _ in sys.modules]))
+"""
+
+
+class ImportTimeTest(unittest.TestCase):
+    """Test cases for the import time of the package"""
+
+    def test_lazy_import(self) -> None:
+        """Test the SDKs of the providers and the web modules are not
+        imported with the package, as tracked by `python -X importtime`."""
+        result = subprocess.run(
+            [sys.executable, "-X", "importtime", "-c", "import agentscope"],
+            capture_output=True,
+            text=True,
+            check=True,
+        )
+        imported = {
+            line.rsplit("|", 1)[-1].strip()
+            for line in result.stderr.splitlines()
+            if line.startswith("import time:")
+        }
+        self.assertIn("agentscope", imported)
+        self.assertListEqual(
+            [_ for _ in _LAZY_MODULES if _ in imported],
+            [],
+        )
+
+    def test_lazy_wrapper(self) -> None:
+        """Test the model wrappers are imported on first use."""
+        from agentscope.models import (
+            OllamaChatWrapper,
+            _get_model_wrapper,
+        )
+
+        self.assertIs(_get_model_wrapper("ollama_chat"), OllamaChatWrapper)
+        self.assertEqual(
+            _get_model_wrapper("OpenAIChatWrapper").model_type,
+            "openai_chat",
+        )
+        with self.assertRaises(ImportError):
+            # pylint: disable=unused-import
+            from agentscope.models import NonExistingWrapper  # noqa: F401
+
+    def test_wrapper_isolation(self) -> None:
+        """Test loading a model wrapper doesn't import the SDKs of the
+        unrelated providers."""
+        from agentscope.models import _LAZY_WRAPPERS
+
+        # skip fetching the model prices of litellm from the network
+        env = dict(os.environ, LITELLM_LOCAL_MODEL_COST_MAP="True")
+        wrappers = {v: k for k, v in _LAZY_WRAPPERS.items()}
+        for module, wrapper in wrappers.items():
+            result = subprocess.run(
+                [
+                    sys.executable,
+                    "-c",
+                    _CHECK_WRAPPER_SCRIPT,
+                    wrapper,
+                    json.dumps(_PROVIDER_MODULES),
+                ],
+                capture_output=True,
+                text=True,
+                check=True,
+                env=env,
+            )
+            imported = json.loads(result.stdout.strip().splitlines()[-1])
+            allowed = _ALLOWED_SDKS.get(module, [])
+            unrelated = [_ for _ in imported if _ not in allowed]
+            self.assertListEqual(unrelated, [], f"Imported by {wrapper}")
+
+    def test_lazy_model_types(self) -> None:
+        """Test the model types of the lazy wrappers are consistent with the
+        ones registered after importing their modules."""
+        from agentscope.models import (
+            ModelWrapperBase,
+            _LAZY_MODEL_TYPES,
+            _LAZY_WRAPPERS,
+        )
+
+        modules = set(_LAZY_WRAPPERS.values())
+        with patch.dict(os.environ, {"LITELLM_LOCAL_MODEL_COST_MAP": "True"}):
+            for module in modules:
+                importlib.import_module(f"agentscope.models.{module}")
+
+        # pylint: disable=protected-access
+        registered = {}
+        for registry in [
+            ModelWrapperBase._type_registry,
+            ModelWrapperBase._deprecated_type_registry,
+        ]:
+            for model_type, cls in registry.items():
+                module = cls.__module__.rsplit(".", 1)[-1]
+                if module in modules:
+                    registered[model_type] = module
+        self.assertDictEqual(_LAZY_MODEL_TYPES, registered)
+
+        for name, module in _LAZY_WRAPPERS.items():
+            cls = ModelWrapperBase._registry[name]
+            self.assertEqual(cls.__module__.rsplit(".", 1)[-1], module)
+
+
+if __name__ == "__main__":
+    unittest.main()
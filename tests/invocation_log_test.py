@@ -0,0 +1,74 @@
+# -*- coding: utf-8 -*-
+"""Unit tests for the append-only log of api invocations."""
+import gzip
+import io
+import json
+import os
+import shutil
+import unittest
+
+from agentscope.utils.invocation_log import (
+    InvocationLogWriter,
+    read_invocations,
+)
+
+
+class InvocationLogTest(unittest.TestCase):
+    """Test cases for the invocation log"""
+
+    def setUp(self) -> None:
+        """Init for InvocationLogTest."""
+        self.tmp_dir = "./tmp_invocation_log"
+        os.makedirs(self.tmp_dir, exist_ok=True)
+
+    def tearDown(self) -> None:
+        """Clean up the logs."""
+        shutil.rmtree(self.tmp_dir)
+
+    def test_write_and_read(self) -> None:
+        """Test the records are appended by multiple writers in turn."""
+        for extension in ["jsonl", "jsonl.gz"]:
+            path = os.path.join(self.tmp_dir, f"log.{extension}")
+            for start in [0, 5]:
+                writer = InvocationLogWriter(path, flush_interval=0.01)
+                for i in range(start, start + 5):
+                    writer.write({"index": i, "text": "你好"})
+                writer.close()
+
+            self.assertEqual(
+                [_["index"] for _ in read_invocations(path)],
+                list(range(10)),
+            )
+            with self.assertRaises(RuntimeError):
+                writer.write({})
+
+    def test_read_incomplete_logs(self) -> None:
+        """Test reading the logs truncated by a crash, and the directory
+        with records in separate files."""
+        path = os.path.join(self.tmp_dir, "a.jsonl")
+        with open(path, "w", encoding="utf-8") as file:
+            file.write('{"index": 0}\n{"index": 1}\n{"ind')
+
+        # the gzip member without its end, which is flushed but not closed
+        buffer = io.BytesIO()
+        stream = gzip.GzipFile(fileobj=buffer, mode="wb")
+        stream.write(b'{"index": 2}\n{"index": 3}\n')
+        stream.flush()
+        with open(os.path.join(self.tmp_dir, "b.jsonl.gz"), "wb") as file:
+            file.write(buffer.getvalue())
+
+        with open(
+            os.path.join(self.tmp_dir, "c.json"),
+            "w",
+            encoding="utf-8",
+        ) as file:
+            json.dump({"index": 4}, file, indent=4)
+
+        self.assertEqual(
+            [_["index"] for _ in read_invocations(self.tmp_dir)],
+            [0, 1, 2, 3, 4],
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
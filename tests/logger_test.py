@@ -42,6 +42,11 @@ class LoggerTest(unittest.TestCase):
         # dict
         logger.chat({"abc": 1})
 
+        # dict with streamed content
+        msg = {"name": "Bob", "content": iter(["Hel", "lo", "!"])}
+        logger.chat(msg)
+        self.assertEqual(msg["content"], "Hello!")
+
         # To avoid that logging is not finished before the file is read
         time.sleep(3)
 
@@ -58,10 +63,19 @@ class LoggerTest(unittest.TestCase):
             '"}\n',
             '{"name": "Alice", "url": "https://xxx.png"}\n',
             '{"abc": 1}\n',
+            '{"name": "Bob", "content": "Hello!"}\n',
         ]
 
         self.assertListEqual(lines, ground_truth)
 
+        # the streamed content is printed in one line
+        with open(
+            os.path.join(self.run_dir, "logging.log"),
+            "r",
+            encoding="utf-8",
+        ) as file:
+            self.assertIn("Bob: Hello!\n", file.read())
+
     def tearDown(self) -> None:
         """Tear down for LoggerTest."""
         logger.stop()
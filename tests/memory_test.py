@@ -4,11 +4,14 @@ Unit tests for memory classes and functions
 """
 
 import os
+import threading
 import unittest
+from typing import Any
 from unittest.mock import patch, MagicMock
 
 from agentscope.message import Msg, Tht
-from agentscope.memory import TemporaryMemory
+from agentscope.memory import TemporaryMemory, SummaryMemory
+from agentscope.models import ModelResponse
 
 
 class TemporaryMemoryTest(unittest.TestCase):
@@ -74,6 +77,57 @@ class TemporaryMemoryTest(unittest.TestCase):
             "Skip delete operation for the invalid index [100]",
         )
 
+    def test_bulk_delete(self) -> None:
+        """Test bulk delete operations"""
+        self.memory.add([self.msg_1, self.msg_2, self.msg_3])
+
+        num_deleted = self.memory.delete_where(
+            lambda i, msg: msg.name == "user",
+        )
+        self.assertEqual(num_deleted, 2)
+        self.assertEqual(self.memory.get_memory(), [self.msg_2])
+
+        self.memory.clear()
+        self.memory.add([self.msg_1, self.msg_2, self.msg_3])
+        self.assertEqual(self.memory.delete_range(0, 2), 2)
+        self.assertEqual(self.memory.get_memory(), [self.msg_3])
+
+        # add the deleted memory again
+        self.memory.add(self.msg_1)
+        self.assertEqual(self.memory.get_memory(), [self.msg_3, self.msg_1])
+
+    def test_get_memory_by(self) -> None:
+        """Test retrieving memories by name and role"""
+        memory = TemporaryMemory(compaction_ratio=10)
+        memory.add([self.msg_1, self.msg_2, self.msg_3])
+
+        self.assertEqual(
+            memory.get_memory_by(name="user"),
+            [self.msg_1, self.msg_3],
+        )
+        self.assertEqual(
+            memory.get_memory_by(role="assistant"),
+            [self.msg_2, self.msg_3],
+        )
+        self.assertEqual(
+            memory.get_memory_by(name="user", role="assistant"),
+            [self.msg_3],
+        )
+        self.assertEqual(
+            memory.get_memory_by(name="user", recent_n=1),
+            [self.msg_3],
+        )
+
+        # deleted memories are skipped before the indices are compacted
+        memory.delete(0)
+        self.assertEqual(memory.get_memory_by(name="user"), [self.msg_3])
+        memory.add(self.msg_1)
+        self.assertEqual(
+            memory.get_memory_by(name="user"),
+            [self.msg_3, self.msg_1],
+        )
+        self.assertEqual(memory.get_memory_by(name="nobody"), [])
+
     def test_invalid(self) -> None:
         """Test invalid operations for memory"""
         # test invalid add
@@ -139,5 +193,111 @@ class TemporaryMemoryTest(unittest.TestCase):
         )
 
 
+class SummaryMemoryTest(unittest.TestCase):
+    """
+    Test cases for SummaryMemory
+    """
+
+    def test_rolling_summary(self) -> None:
+        """Test the evicted messages are summarized in background"""
+        model = MagicMock()
+        model.format.side_effect = lambda msgs: msgs
+        model.return_value = ModelResponse(text="A summary.")
+
+        memory = SummaryMemory(
+            model=model,
+            max_tokens=30,
+            keep_tokens=10,
+            token_counter=lambda _: 10,
+        )
+        sys_prompt = Msg("system", "You're a helpful assistant", "system")
+        msgs = [Msg("user", f"Hi {i}", role="user") for i in range(4)]
+        memory.add([sys_prompt, *msgs[:3]])
+        memory.flush()
+        model.assert_not_called()
+
+        memory.add(msgs[3])
+        memory.flush()
+        model.assert_called_once()
+        self.assertEqual(memory.summary, "A summary.")
+
+        memories = memory.get_memory()
+        self.assertEqual(len(memories), 3)
+        self.assertEqual(memories[0], sys_prompt)
+        self.assertIn("A summary.", memories[1].content)
+        self.assertEqual(memories[2], msgs[3])
+
+        memory.clear()
+        self.assertEqual(memory.get_memory(), [])
+
+    def test_delete_prunes_token_counts(self) -> None:
+        """Test deleting and loading drop the stale token counts"""
+        # pylint: disable=protected-access
+        model = MagicMock()
+        memory = SummaryMemory(
+            model=model,
+            max_tokens=100,
+            token_counter=lambda _: 10,
+        )
+        msgs = [Msg("user", f"Hi {i}", role="user") for i in range(5)]
+        memory.add(msgs)
+        self.assertEqual(len(memory._token_counts), 5)
+
+        memory.delete(0)
+        self.assertNotIn(msgs[0].id, memory._token_counts)
+
+        self.assertEqual(memory.delete_range(end=2), 2)
+        self.assertEqual(
+            set(memory._token_counts),
+            {msgs[3].id, msgs[4].id},
+        )
+
+        self.assertEqual(memory.delete_where(lambda i, _: i == 0), 1)
+        self.assertEqual(set(memory._token_counts), {msgs[4].id})
+
+        memory.load(msgs[:2], overwrite=True)
+        self.assertEqual(memory.get_memory(), msgs[:2])
+        self.assertEqual(
+            set(memory._token_counts),
+            {msgs[0].id, msgs[1].id},
+        )
+        model.assert_not_called()
+
+    def test_delete_during_summarization(self) -> None:
+        """Test deleting the messages being summarized in background"""
+        # pylint: disable=protected-access
+        started = threading.Event()
+        proceed = threading.Event()
+
+        def summarize(
+            *args: Any,  # pylint: disable=W0613
+            **kwargs: Any,  # pylint: disable=W0613
+        ) -> ModelResponse:
+            started.set()
+            proceed.wait(timeout=5)
+            return ModelResponse(text="A summary.")
+
+        model = MagicMock()
+        model.format.side_effect = lambda msgs: msgs
+        model.side_effect = summarize
+
+        memory = SummaryMemory(
+            model=model,
+            max_tokens=30,
+            keep_tokens=10,
+            token_counter=lambda _: 10,
+        )
+        msgs = [Msg("user", f"Hi {i}", role="user") for i in range(4)]
+        memory.add(msgs)
+        self.assertTrue(started.wait(timeout=5))
+
+        memory.delete_range(end=2)
+        proceed.set()
+        memory.flush()
+
+        self.assertEqual(memory.get_memory()[1:], [msgs[3]])
+        self.assertEqual(set(memory._token_counts), {msgs[3].id})
+
+
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,170 @@
+# -*- coding: utf-8 -*-
+"""Unit tests for the model response cache."""
+import asyncio
+import os
+import shutil
+import unittest
+from typing import Any, Union, List, Sequence
+from unittest.mock import MagicMock, patch
+
+import numpy as np
+
+from agentscope.exception import ResponseParsingError
+from agentscope.message import MessageBase
+from agentscope.models import (
+    ModelResponse,
+    ModelWrapperBase,
+    ResponseCache,
+    clear_model_configs,
+    load_model_by_config_name,
+    read_model_configs,
+)
+
+
+class CountingModelWrapper(ModelWrapperBase):
+    """A model wrapper counting the calls for test usage"""
+
+    model_type: str = "counting_model"
+
+    def __init__(self, config_name: str, **kwargs: Any) -> None:
+        super().__init__(config_name=config_name)
+        self.model_name = "counting"
+        self.generate_args = kwargs.get("generate_args", {})
+        self.num_calls = 0
+
+    def __call__(self, prompt: str, **kwargs: Any) -> ModelResponse:
+        self.num_calls += 1
+        return ModelResponse(
+            text=f"{prompt}-{self.num_calls}",
+            raw={"n": self.num_calls},
+        )
+
+    def format(
+        self,
+        *args: Union[MessageBase, Sequence[MessageBase]],
+    ) -> Union[List[dict], str]:
+        return ""
+
+
+class ModelCacheTest(unittest.TestCase):
+    """Test cases for the model response cache"""
+
+    def setUp(self) -> None:
+        """Init for ModelCacheTest."""
+        self.cache_dir = "./test_model_cache/"
+        self.path = os.path.join(self.cache_dir, "cache.db")
+
+    def test_response_cache(self) -> None:
+        """Test the LRU, TTL and disk tiers of the cache."""
+        cache = ResponseCache(max_size=2, path=self.path)
+        keys = [
+            cache.make_key("m", "n", {"prompt": i, "temperature": 0})
+            for i in range(3)
+        ]
+        for i, key in enumerate(keys):
+            cache.set(key, ModelResponse(text=str(i)))
+
+        # the least recently used one is evicted from memory
+        self.assertEqual(len(cache), 2)
+        self.assertNotIn(keys[0], cache._memory)  # pylint: disable=W0212
+
+        # but it's still on disk, also for a new cache
+        cache = ResponseCache(max_size=2, path=self.path)
+        self.assertEqual(cache.get(keys[0]).text, "0")
+        self.assertIsNone(cache.get("missing"))
+
+        # the canonical key ignores the order of arguments
+        self.assertEqual(
+            cache.make_key("m", "n", {"a": 1, "b": [1, 2], "temperature": 0}),
+            cache.make_key("m", "n", {"b": [1, 2], "temperature": 0, "a": 1}),
+        )
+
+        # non-deterministic calls bypass the cache unless forced, where a
+        # missing temperature defaults to a non-zero one of the provider
+        self.assertIsNone(cache.make_key("m", "n", {"temperature": 0.7}))
+        self.assertIsNone(cache.make_key("m", "n", {"prompt": "hi"}))
+        self.assertIsNotNone(
+            cache.make_key("m", "n", {"prompt": "hi"}, deterministic=True),
+        )
+        self.assertIsNone(cache.make_key("m", "n", {"stream": True}))
+        self.assertIsNotNone(cache.make_key("m", "n", {"temperature": 0}))
+        self.assertIsNotNone(
+            ResponseCache(force=True).make_key("m", "n", {"temperature": 1}),
+        )
+
+        # the embeddings in an array are restored with their data type
+        cache.set(
+            keys[1],
+            ModelResponse(embedding=np.ones((2, 3), dtype="float32")),
+        )
+        cache = ResponseCache(max_size=2, path=self.path)
+        embedding = cache.get(keys[1]).embedding
+        self.assertEqual(embedding.dtype, np.float32)
+        self.assertEqual(embedding.shape, (2, 3))
+
+        # expired responses are removed
+        with patch("time.time", return_value=0):
+            cache = ResponseCache(ttl=10)
+            cache.set(keys[0], ModelResponse(text="0"))
+        with patch("time.time", return_value=11):
+            self.assertIsNone(cache.get(keys[0]))
+
+    def test_model_with_cache(self) -> None:
+        """Test the cache configured in model config."""
+        read_model_configs(
+            {
+                "config_name": "counting",
+                "model_type": "counting_model",
+                "generate_args": {"temperature": 0},
+                "cache": {"path": self.path},
+            },
+            clear_existing=True,
+        )
+        model = load_model_by_config_name("counting")
+        model.update_monitor = MagicMock()
+
+        self.assertEqual(model("a").text, "a-1")
+        self.assertEqual(model("a").text, "a-1")
+        self.assertEqual(model("b").text, "b-2")
+        self.assertEqual(model("a", temperature=0.5).text, "a-3")
+        self.assertEqual(model.num_calls, 3)
+
+        # the hit and miss counters are updated
+        counts = [_.kwargs for _ in model.update_monitor.call_args_list]
+        self.assertEqual(counts.count({"cache_hit": 1}), 1)
+        self.assertEqual(counts.count({"cache_miss": 1}), 2)
+
+        # the models loaded from the same config share the cache
+        another = load_model_by_config_name("counting", shared=False)
+        self.assertEqual(another("b").text, "b-2")
+        self.assertEqual(asyncio.run(another.acall("a")).text, "a-1")
+        self.assertEqual(another.num_calls, 0)
+
+    @patch("agentscope.models.model._DEFAULT_RETRY_INTERVAL", 0)
+    def test_cache_with_parse_func(self) -> None:
+        """Test the cached response is skipped when parsing fails."""
+        model = CountingModelWrapper(
+            config_name="counting",
+            generate_args={"temperature": 0},
+        )
+        model.set_cache(ResponseCache())
+        model("a")
+
+        def parse_func(response: ModelResponse) -> str:
+            if response.raw["n"] < 2:
+                raise ResponseParsingError("invalid")
+            return response.text
+
+        self.assertEqual(model("a", parse_func=parse_func), "a-2")
+        # the new response replaces the invalid one
+        self.assertEqual(model("a").text, "a-2")
+
+    def tearDown(self) -> None:
+        """Clean up after each test."""
+        clear_model_configs()
+        if os.path.exists(self.cache_dir):
+            shutil.rmtree(self.cache_dir)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,123 @@
+# -*- coding: utf-8 -*-
+"""Unit tests for the coalescing of concurrent identical model calls."""
+import asyncio
+import threading
+import time
+import unittest
+from typing import Any, Union, List, Sequence
+from unittest.mock import MagicMock, call
+
+from agentscope.message import MessageBase
+from agentscope.models import (
+    ModelResponse,
+    ModelWrapperBase,
+    clear_model_configs,
+    load_model_by_config_name,
+    read_model_configs,
+)
+
+
+class BlockingModelWrapper(ModelWrapperBase):
+    """A model wrapper whose calls block until released for test usage"""
+
+    model_type: str = "blocking_model"
+
+    def __init__(self, config_name: str, **kwargs: Any) -> None:
+        super().__init__(config_name=config_name)
+        self.model_name = "blocking"
+        self.released = threading.Event()
+        self.num_calls = 0
+
+    def __call__(self, prompt: str, **kwargs: Any) -> ModelResponse:
+        self.num_calls += 1
+        self.released.wait()
+        return ModelResponse(text=prompt)
+
+    async def acall(self, prompt: str, **kwargs: Any) -> ModelResponse:
+        self.num_calls += 1
+        await asyncio.sleep(0.01)
+        if prompt == "error":
+            raise ValueError(prompt)
+        return ModelResponse(text=prompt)
+
+    def format(
+        self,
+        *args: Union[MessageBase, Sequence[MessageBase]],
+    ) -> Union[List[dict], str]:
+        return ""
+
+
+class ModelCoalescingTest(unittest.TestCase):
+    """Test cases for coalescing the concurrent identical calls"""
+
+    def setUp(self) -> None:
+        """Init for ModelCoalescingTest."""
+        read_model_configs(
+            {
+                "config_name": "blocking",
+                "model_type": "blocking_model",
+                "coalesce": True,
+            },
+            clear_existing=True,
+        )
+        self.model = load_model_by_config_name("blocking")
+        self.model.update_monitor = MagicMock()
+
+    def test_coalesce_threads(self) -> None:
+        """Test the identical calls from threads share one request."""
+        responses = []
+        threads = [
+            threading.Thread(
+                target=lambda: responses.append(self.model("a")),
+            )
+            for _ in range(5)
+        ]
+        for thread in threads:
+            thread.start()
+        time.sleep(0.1)
+        self.model.released.set()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(self.model.num_calls, 1)
+        self.assertEqual([_.text for _ in responses], ["a"] * 5)
+        self.assertEqual(
+            self.model.update_monitor.call_args_list.count(
+                call(coalesced_call=1),
+            ),
+            4,
+        )
+
+        # the finished calls are not coalesced
+        self.model("a")
+        self.assertEqual(self.model.num_calls, 2)
+
+    def test_coalesce_coroutines(self) -> None:
+        """Test the identical calls from coroutines share one request and
+        its exception."""
+
+        async def run(prompts: list, **kwargs: Any) -> list:
+            return await asyncio.gather(
+                *[self.model.acall(_, **kwargs) for _ in prompts],
+                return_exceptions=True,
+            )
+
+        responses = asyncio.run(run(["a", "a", "b", "a"]))
+        self.assertEqual([_.text for _ in responses], ["a", "a", "b", "a"])
+        self.assertEqual(self.model.num_calls, 2)
+
+        # the streaming calls are not coalesced
+        asyncio.run(run(["a", "a"], stream=True))
+        self.assertEqual(self.model.num_calls, 4)
+
+        errors = asyncio.run(run(["error"] * 3))
+        self.assertTrue(all(isinstance(_, ValueError) for _ in errors))
+        self.assertEqual(self.model.num_calls, 5)
+
+    def tearDown(self) -> None:
+        """Clean up after each test."""
+        clear_model_configs()
+
+
+if __name__ == "__main__":
+    unittest.main()
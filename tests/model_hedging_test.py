@@ -0,0 +1,159 @@
+# -*- coding: utf-8 -*-
+"""Unit tests for the hedged model calls."""
+import asyncio
+import threading
+import time
+import unittest
+from typing import Any, Union, List, Sequence
+from unittest.mock import MagicMock
+
+from agentscope.exception import ResponseParsingError
+from agentscope.message import MessageBase
+from agentscope.models import (
+    HedgingPolicy,
+    ModelResponse,
+    ModelWrapperBase,
+    clear_model_configs,
+    load_model_by_config_name,
+    read_model_configs,
+)
+
+
+class ScriptedModelWrapper(ModelWrapperBase):
+    """A model wrapper replying with the scripted (delay, text) pairs in
+    order for test usage"""
+
+    model_type: str = "scripted_model"
+
+    def __init__(self, config_name: str, **kwargs: Any) -> None:
+        super().__init__(config_name=config_name)
+        self.model_name = "scripted"
+        self.script: list = []
+        self._lock = threading.Lock()
+
+    def _next(self) -> tuple:
+        with self._lock:
+            delay, text = self.script.pop(0)
+        if isinstance(text, Exception):
+            raise text
+        return delay, text
+
+    def __call__(self, prompt: str, **kwargs: Any) -> ModelResponse:
+        delay, text = self._next()
+        time.sleep(delay)
+        return ModelResponse(text=text)
+
+    async def acall(
+        self,
+        prompt: str,  # pylint: disable=W0613
+        **kwargs: Any,
+    ) -> ModelResponse:
+        delay, text = self._next()
+        await asyncio.sleep(delay)
+        return ModelResponse(text=text)
+
+    def format(
+        self,
+        *args: Union[MessageBase, Sequence[MessageBase]],
+    ) -> Union[List[dict], str]:
+        return ""
+
+
+def parse_good(response: ModelResponse) -> str:
+    """Accept the "good" responses only for test usage."""
+    if not response.text.startswith("good"):
+        raise ResponseParsingError("Bad response", raw_response=response.text)
+    return response.text
+
+
+class ModelHedgingTest(unittest.TestCase):
+    """Test cases for the hedged model calls"""
+
+    def setUp(self) -> None:
+        """Init for ModelHedgingTest."""
+        read_model_configs(
+            {
+                "config_name": "scripted",
+                "model_type": "scripted_model",
+                "hedging": {"delay": 0.1},
+            },
+            clear_existing=True,
+        )
+        self.model = load_model_by_config_name("scripted", shared=False)
+        self.model.update_monitor = MagicMock()
+
+    def tearDown(self) -> None:
+        """Clean up the model configs."""
+        clear_model_configs()
+
+    def test_percentile_delay(self) -> None:
+        """Test the hedging delay by the percentile of latencies."""
+        policy = HedgingPolicy(percentile=50, min_samples=10)
+        for latency in range(1, 10):
+            policy.record_latency(latency)
+        self.assertIsNone(policy.get_delay())
+        policy.record_latency(10)
+        self.assertEqual(policy.get_delay(), 5)
+
+    def test_hedge_slow_attempt(self) -> None:
+        """Test another attempt is launched for the slow one."""
+        self.model.script = [(1.0, "good slow"), (0.0, "good fast")]
+        start = time.time()
+        result = self.model("hi", parse_func=parse_good)
+        self.assertEqual(result, "good fast")
+        self.assertLess(time.time() - start, 0.5)
+        self.model.update_monitor.assert_called_once_with(
+            hedged_call=1,
+            wasted_call=1,
+        )
+
+    def test_retry_unparseable_immediately(self) -> None:
+        """Test the unparseable responses are retried without waiting, and
+        handled by the fault handler after all attempts."""
+        self.model.hedging_policy.delay = None
+        self.model.script = [(0.0, "bad"), (0.0, "good")]
+        start = time.time()
+        self.assertEqual(self.model("hi", parse_func=parse_good), "good")
+        self.assertLess(time.time() - start, 0.5)
+
+        self.model.script = [(0.0, "bad")] * 2
+        result = self.model(
+            "hi",
+            parse_func=parse_good,
+            fault_handler=lambda _: "handled",
+            max_retries=2,
+        )
+        self.assertEqual(result, "handled")
+
+        self.model.script = [(0.0, "bad")]
+        with self.assertRaises(ResponseParsingError):
+            self.model("hi", parse_func=parse_good, max_retries=1)
+
+    def test_async_parallel_attempts(self) -> None:
+        """Test the parallel attempts up front in async calls."""
+        self.model.set_hedging_policy(HedgingPolicy(parallel=2))
+        self.model.script = [(0.5, "good first"), (0.0, "good second")]
+        result = asyncio.run(self.model.acall("hi", parse_func=parse_good))
+        self.assertEqual(result, "good second")
+        self.model.update_monitor.assert_called_once_with(
+            hedged_call=1,
+            wasted_call=1,
+        )
+
+    def test_attempt_error(self) -> None:
+        """Test the error of the last attempt failing without a response
+        is raised."""
+        self.model.hedging_policy.delay = None
+        self.model.script = [(0.0, "bad"), (0.0, RuntimeError("down"))]
+        with self.assertRaises(RuntimeError):
+            self.model("hi", parse_func=parse_good, max_retries=2)
+
+        self.model.script = [(0.0, RuntimeError("down"))]
+        with self.assertRaises(RuntimeError):
+            asyncio.run(
+                self.model.acall("hi", parse_func=parse_good, max_retries=1),
+            )
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,109 @@
+# -*- coding: utf-8 -*-
+"""Unit tests for the model metadata registry."""
+import json
+import os
+import shutil
+import unittest
+import uuid
+
+from agentscope.models import (
+    clear_model_configs,
+    load_model_by_config_name,
+    read_model_configs,
+)
+from agentscope.utils.model_metadata import (
+    ModelMetadataRegistry,
+    get_model_max_length,
+    get_model_pricing,
+)
+from agentscope.utils.monitor import SqliteMonitor
+
+
+class ModelMetadataTest(unittest.TestCase):
+    """Test cases for the model metadata registry"""
+
+    def setUp(self) -> None:
+        """Init for ModelMetadataTest."""
+        self.tmp_dir = "./tmp_model_metadata"
+        os.makedirs(self.tmp_dir, exist_ok=True)
+
+    def tearDown(self) -> None:
+        """Clean up the files."""
+        shutil.rmtree(self.tmp_dir)
+
+    def test_lookup_by_prefix(self) -> None:
+        """Test the metadata is merged from the prefixes of model name."""
+        registry = ModelMetadataRegistry()
+        registry.register("gpt-4", max_length=8192, tokenizer="cl100k_base")
+        registry.register("gpt-4-32k", max_length=32768)
+        registry.register("gpt-4o", max_length=128000)
+
+        self.assertEqual(
+            registry.get("gpt-4-32k-0613"),
+            {"max_length": 32768, "tokenizer": "cl100k_base"},
+        )
+        self.assertEqual(
+            registry.get("openai/gpt-4o-mini")["max_length"],
+            128000,
+        )
+        self.assertEqual(registry.get("gpt-3.5-turbo"), {})
+
+        # the index is refreshed after registration
+        registry.register("gpt-4-32k-0613", max_length=10)
+        self.assertEqual(registry.get("gpt-4-32k-0613")["max_length"], 10)
+
+    def test_load_and_save(self) -> None:
+        """Test loading the metadata from and saving it to files."""
+        path = os.path.join(self.tmp_dir, "metadata.json")
+        with open(path, "w", encoding="utf-8") as file:
+            json.dump({"my-model": {"max_length": 100}}, file)
+
+        registry = ModelMetadataRegistry()
+        registry.load(path)
+        self.assertEqual(registry.get("my-model-v2"), {"max_length": 100})
+
+        path = os.path.join(self.tmp_dir, "saved.json")
+        registry.save(path)
+        another_registry = ModelMetadataRegistry()
+        another_registry.load(path)
+        self.assertEqual(another_registry.get("my-model"), {"max_length": 100})
+
+    def test_builtin_metadata(self) -> None:
+        """Test the bundled metadata."""
+        self.assertEqual(get_model_max_length("gpt-4-0613"), 8192)
+        self.assertEqual(get_model_max_length("gpt-4o-2024-08-06"), 128000)
+        self.assertEqual(
+            get_model_pricing("gpt-4-0613"),
+            {"prompt_tokens": 0.00003, "completion_tokens": 0.00006},
+        )
+        self.assertIsNone(get_model_pricing("non-existing-model"))
+
+    def test_budget_by_config(self) -> None:
+        """Test the budget of the model with metadata in the config."""
+        db_path = os.path.join(self.tmp_dir, f"test-{uuid.uuid4()}.db")
+        monitor = SqliteMonitor(db_path)
+        self.assertFalse(monitor.register_budget("my-llm", 1, "my-llm"))
+
+        read_model_configs(
+            {
+                "config_name": "my_llm",
+                "model_type": "ollama_chat",
+                "model_name": "my-llm",
+                "metadata": {
+                    "max_length": 4096,
+                    "pricing": {
+                        "prompt_tokens": 0.001,
+                        "completion_tokens": 0.002,
+                    },
+                },
+            },
+            clear_existing=True,
+        )
+        model = load_model_by_config_name("my_llm", shared=False)
+        self.assertEqual(model.max_length, 4096)
+        self.assertTrue(monitor.register_budget("my-llm", 1, "my-llm"))
+        clear_model_configs()
+
+
+if __name__ == "__main__":
+    unittest.main()
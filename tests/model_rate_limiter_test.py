@@ -0,0 +1,201 @@
+# -*- coding: utf-8 -*-
+"""Unit tests for the client-side rate limiter of model calls."""
+import asyncio
+import gc
+import os
+import shutil
+import threading
+import time
+import unittest
+from typing import Any, AsyncGenerator, Union, List, Sequence
+from unittest.mock import MagicMock, patch
+
+from agentscope.message import MessageBase
+from agentscope.models import (
+    ModelResponse,
+    ModelWrapperBase,
+    RateLimiter,
+    clear_model_configs,
+    load_model_by_config_name,
+    read_model_configs,
+)
+
+
+class FakeClock:
+    """A clock whose sleep advances the time immediately"""
+
+    def __init__(self) -> None:
+        self.now = 1000.0
+
+    def time(self) -> float:
+        """Get the current time."""
+        return self.now
+
+    def sleep(self, seconds: float) -> None:
+        """Advance the time."""
+        self.now += seconds
+
+
+class SlowModelWrapper(ModelWrapperBase):
+    """A model wrapper recording the peak concurrency for test usage"""
+
+    model_type: str = "slow_model"
+
+    def __init__(self, config_name: str, **kwargs: Any) -> None:
+        super().__init__(config_name=config_name)
+        self.model_name = "slow"
+        self.in_flight = 0
+        self.peak = 0
+
+    def __call__(self, prompt: str, **kwargs: Any) -> ModelResponse:
+        if kwargs.get("stream", False):
+            return ModelResponse(stream=iter([(prompt, None), ("", {})]))
+        return ModelResponse(text=prompt)
+
+    async def acall(self, prompt: str, **kwargs: Any) -> ModelResponse:
+        if kwargs.get("stream", False):
+
+            async def stream() -> AsyncGenerator:
+                yield prompt, None
+                yield "", {}
+
+            return ModelResponse(stream=stream())
+        self.in_flight += 1
+        self.peak = max(self.peak, self.in_flight)
+        await asyncio.sleep(0.01)
+        self.in_flight -= 1
+        return ModelResponse(text=prompt)
+
+    def format(
+        self,
+        *args: Union[MessageBase, Sequence[MessageBase]],
+    ) -> Union[List[dict], str]:
+        return ""
+
+
+class RateLimiterTest(unittest.TestCase):
+    """Test cases for the rate limiter"""
+
+    def setUp(self) -> None:
+        """Init for RateLimiterTest."""
+        self.tmp_dir = "./test_rate_limiter/"
+
+    def test_token_bucket(self) -> None:
+        """Test the requests and tokens per minute."""
+        clock = FakeClock()
+        with patch("agentscope.models.rate_limiter.time", clock):
+            limiter = RateLimiter(requests_per_minute=2, tokens_per_minute=60)
+
+            # the full buckets allow a burst
+            self.assertEqual(limiter.acquire(10), 0)
+            self.assertEqual(limiter.acquire(10), 0)
+            # then wait for a request to be refilled
+            self.assertAlmostEqual(limiter.acquire(10), 30)
+            # and for the tokens, while a large request only waits for a
+            # full bucket
+            self.assertAlmostEqual(limiter.acquire(100), 30)
+
+    def test_max_concurrency(self) -> None:
+        """Test the in-flight requests are limited."""
+        limiter = RateLimiter(max_concurrency=1)
+        self.assertEqual(limiter.acquire(), 0)
+
+        # the queued request is woken up as soon as the slot is released
+        waited = []
+        thread = threading.Thread(
+            target=lambda: waited.append(limiter.acquire()),
+        )
+        thread.start()
+        thread.join(0.2)
+        self.assertTrue(thread.is_alive())
+        released = time.time()
+        limiter.release()
+        thread.join()
+        self.assertLess(time.time() - released, 0.04)
+        self.assertGreater(waited[0], 0.1)
+
+        # so is a coroutine, when the slot is released by another thread
+        threading.Timer(0.2, limiter.release).start()
+        self.assertGreater(asyncio.run(limiter.aacquire()), 0.1)
+        limiter.release()
+
+        model = SlowModelWrapper(config_name="slow")
+        model.set_rate_limiter(RateLimiter(max_concurrency=2))
+
+        async def run() -> list:
+            return await asyncio.gather(
+                *[model.acall(str(i)) for i in range(6)],
+            )
+
+        responses = asyncio.run(run())
+        self.assertEqual([_.text for _ in responses], list("012345"))
+        self.assertEqual(model.peak, 2)
+
+    def test_streaming_concurrency(self) -> None:
+        """Test a streaming request holds its slot until the stream is
+        exhausted, closed or dropped."""
+        limiter = RateLimiter(max_concurrency=1)
+        model = SlowModelWrapper(config_name="slow")
+        model.set_rate_limiter(limiter)
+
+        response = model("a", stream=True)
+        self.assertEqual(limiter._in_flight, 1)  # pylint: disable=W0212
+        self.assertEqual(response.text, "a")
+        self.assertEqual(limiter._in_flight, 0)  # pylint: disable=W0212
+
+        # a stream dropped without being consumed
+        model("a", stream=True)
+        gc.collect()
+        self.assertEqual(limiter._in_flight, 0)  # pylint: disable=W0212
+
+        async def consume() -> str:
+            response = await model.acall("b", stream=True)
+            self.assertEqual(limiter._in_flight, 1)  # pylint: disable=W0212
+            return "".join([_ async for _ in response.stream])
+
+        self.assertEqual(asyncio.run(consume()), "b")
+        self.assertEqual(limiter._in_flight, 0)  # pylint: disable=W0212
+
+    def test_shared_across_processes(self) -> None:
+        """Test the buckets shared through a file."""
+        path = os.path.join(self.tmp_dir, "limits.json")
+        with patch("agentscope.models.rate_limiter.time", FakeClock()):
+            first = RateLimiter(requests_per_minute=2, path=path)
+            second = RateLimiter(requests_per_minute=2, path=path)
+
+            self.assertEqual(first.acquire(), 0)
+            self.assertEqual(second.acquire(), 0)
+            self.assertAlmostEqual(first.acquire(), 30)
+
+    def test_model_with_rate_limit(self) -> None:
+        """Test the rate limiter configured in model config."""
+        read_model_configs(
+            {
+                "config_name": "slow",
+                "model_type": "slow_model",
+                "rate_limit": {"requests_per_minute": 60},
+            },
+            clear_existing=True,
+        )
+        model = load_model_by_config_name("slow")
+        another = load_model_by_config_name("slow", shared=False)
+        self.assertIs(model.rate_limiter, another.rate_limiter)
+
+        # the time waited is only recorded if any
+        model.update_monitor = MagicMock()
+        self.assertEqual(model("a").text, "a")
+        model.update_monitor.assert_not_called()
+
+        model.rate_limiter.acquire = MagicMock(return_value=0.5)
+        self.assertEqual(model("a").text, "a")
+        model.update_monitor.assert_called_once_with(rate_limit_wait=0.5)
+
+    def tearDown(self) -> None:
+        """Clean up after each test."""
+        clear_model_configs()
+        if os.path.exists(self.tmp_dir):
+            shutil.rmtree(self.tmp_dir)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,183 @@
+# -*- coding: utf-8 -*-
+"""Unit tests for the retry policy of model calls."""
+import asyncio
+import time
+import unittest
+from email.utils import formatdate
+from typing import Any, Union, List, Sequence
+from unittest.mock import MagicMock, call, patch
+
+from agentscope.message import MessageBase
+from agentscope.models import (
+    ModelResponse,
+    ModelWrapperBase,
+    PostAPIModelWrapperBase,
+    RetryPolicy,
+    clear_model_configs,
+    load_model_by_config_name,
+    read_model_configs,
+)
+from agentscope.models.retry import parse_retry_after
+
+
+class APIStatusError(Exception):
+    """An error with status code as raised by the SDKs"""
+
+    def __init__(self, status_code: int, headers: dict = None) -> None:
+        super().__init__(f"status code {status_code}")
+        self.status_code = status_code
+        self.response = MagicMock(headers=headers or {})
+
+
+class FlakyModelWrapper(ModelWrapperBase):
+    """A model wrapper failing for a number of times for test usage"""
+
+    model_type: str = "flaky_model"
+
+    def __init__(self, config_name: str, **kwargs: Any) -> None:
+        super().__init__(config_name=config_name)
+        self.model_name = "flaky"
+        self.errors: list = []
+        self.num_calls = 0
+
+    def __call__(self, prompt: str, **kwargs: Any) -> ModelResponse:
+        self.num_calls += 1
+        if self.errors:
+            raise self.errors.pop(0)
+        return ModelResponse(text=prompt)
+
+    def format(
+        self,
+        *args: Union[MessageBase, Sequence[MessageBase]],
+    ) -> Union[List[dict], str]:
+        return ""
+
+
+class RetryPolicyTest(unittest.TestCase):
+    """Test cases for the retry policy"""
+
+    def test_backoff(self) -> None:
+        """Test the exponential backoff with jitter."""
+        policy = RetryPolicy(base_delay=1, max_delay=5, jitter=False)
+        self.assertEqual(
+            [policy.backoff(i) for i in range(1, 5)],
+            [1, 2, 4, 5],
+        )
+
+        policy = RetryPolicy(base_delay=1, max_delay=5)
+        for i in range(1, 5):
+            self.assertTrue(0 <= policy.backoff(i) <= min(5, 2 ** (i - 1)))
+
+    def test_get_delay(self) -> None:
+        """Test the retryable errors, rules, Retry-After and deadline."""
+        policy = RetryPolicy(
+            max_retries=2,
+            jitter=False,
+            rules={
+                "AuthError": {"max_retries": 0},
+                "ValueError": {"retry": True, "base_delay": 3},
+            },
+        )
+        auth_error = type("AuthError", (ConnectionError,), {})
+
+        self.assertEqual(policy.get_delay(1, 0, APIStatusError(429)), 1)
+        self.assertEqual(policy.get_delay(2, 0, APIStatusError(503)), 2)
+        self.assertIsNone(policy.get_delay(3, 0, APIStatusError(503)))
+        self.assertIsNone(policy.get_delay(1, 0, APIStatusError(400)))
+        self.assertEqual(policy.get_delay(1, 0, TimeoutError()), 1)
+        self.assertIsNone(policy.get_delay(1, 0, auth_error()))
+        self.assertEqual(policy.get_delay(1, 0, ValueError()), 3)
+        self.assertIsNone(policy.get_delay(1, 0, KeyError()))
+
+        # the delay asked by the server
+        error = APIStatusError(429, {"retry-after": "7"})
+        self.assertEqual(policy.get_delay(1, 0, error), 7)
+        self.assertEqual(parse_retry_after({"retry-after-ms": "500"}), 0.5)
+        self.assertAlmostEqual(
+            parse_retry_after({"retry-after": formatdate(0)}),
+            0,
+        )
+        self.assertIsNone(parse_retry_after({"retry-after": "soon"}))
+
+        # the delays asked by the server longer than the maximum, e.g. an
+        # hour or a far future date, are not waited for
+        error = APIStatusError(429, {"retry-after": "3600"})
+        self.assertIsNone(policy.get_delay(1, 0, error))
+        error = APIStatusError(
+            429,
+            {"retry-after": formatdate(time.time() + 86400, usegmt=True)},
+        )
+        self.assertIsNone(policy.get_delay(1, 0, error))
+        policy.max_retry_after = 7200
+        self.assertEqual(policy.get_delay(1, 0, retry_after=3600), 3600)
+
+        # the retries exceeding the deadline are not made
+        policy = RetryPolicy(jitter=False, deadline=1.5)
+        with patch("time.time", return_value=100):
+            self.assertEqual(policy.get_delay(1, 100, TimeoutError()), 1)
+            self.assertIsNone(policy.get_delay(2, 99, TimeoutError()))
+
+    def test_model_with_retry(self) -> None:
+        """Test retrying the failed calls of model wrappers."""
+        read_model_configs(
+            {
+                "config_name": "flaky",
+                "model_type": "flaky_model",
+                "retry": {"base_delay": 0},
+            },
+            clear_existing=True,
+        )
+        model = load_model_by_config_name("flaky")
+        model.update_monitor = MagicMock()
+
+        model.errors = [ConnectionError(), APIStatusError(502)]
+        self.assertEqual(model("a").text, "a")
+        self.assertEqual(model.num_calls, 3)
+        self.assertEqual(
+            model.update_monitor.call_args_list.count(
+                call(retry=1, retry_backoff=0),
+            ),
+            2,
+        )
+
+        model.errors = [TimeoutError()]
+        self.assertEqual(asyncio.run(model.acall("b")).text, "b")
+
+        # the non-retryable errors are raised directly
+        model.errors = [APIStatusError(401)]
+        with self.assertRaises(APIStatusError):
+            model("a")
+        clear_model_configs()
+
+    @patch("requests.Session.post")
+    def test_post_api_retry(self, mock_post: MagicMock) -> None:
+        """Test the post api wrapper retries on the status codes."""
+
+        def response(status_code: int) -> MagicMock:
+            return MagicMock(
+                status_code=status_code,
+                headers={"retry-after": "0"},
+                json=MagicMock(return_value={"data": status_code}),
+            )
+
+        model = PostAPIModelWrapperBase(
+            config_name="my_post_api",
+            api_url="https://xxx",
+        )
+        mock_post.side_effect = [response(503), response(429), response(200)]
+        self.assertEqual(model("Hi").raw, {"data": 200})
+
+        # the client errors are not retried
+        mock_post.side_effect = [response(400), response(200)]
+        with self.assertRaises(RuntimeError):
+            model("Hi")
+
+        # at most max_retries attempts are made
+        mock_post.side_effect = [response(503)] * 4
+        with self.assertRaises(RuntimeError):
+            model("Hi")
+        self.assertEqual(mock_post.call_count, 3 + 1 + 3)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,145 @@
+# -*- coding: utf-8 -*-
+"""Unit tests for sampling multiple candidates from the model wrappers."""
+import threading
+import time
+import unittest
+from typing import Any, Union, List, Sequence
+from unittest.mock import MagicMock, patch
+
+from agentscope.exception import ResponseParsingError
+from agentscope.message import MessageBase
+from agentscope.models import (
+    ModelResponse,
+    ModelWrapperBase,
+    OpenAIChatWrapper,
+    ResponseCache,
+)
+
+
+class SamplingModelWrapper(ModelWrapperBase):
+    """A model wrapper numbering its slow calls for test usage"""
+
+    model_type: str = "sampling_model"
+
+    def __init__(self, config_name: str, **kwargs: Any) -> None:
+        super().__init__(config_name=config_name)
+        self.model_name = "sampling"
+        self.num_calls = 0
+        self._lock = threading.Lock()
+
+    def __call__(self, prompt: str, **kwargs: Any) -> ModelResponse:
+        with self._lock:
+            self.num_calls += 1
+            num_calls = self.num_calls
+        time.sleep(0.2)
+        return ModelResponse(text=str(num_calls))
+
+    def format(
+        self,
+        *args: Union[MessageBase, Sequence[MessageBase]],
+    ) -> Union[List[dict], str]:
+        return ""
+
+
+def parse_even(response: ModelResponse) -> int:
+    """Accept the even numbers only for test usage."""
+    number = int(response.text)
+    if number % 2 == 1:
+        raise ResponseParsingError("Odd number", raw_response=response.text)
+    return number
+
+
+class ModelSamplingTest(unittest.TestCase):
+    """Test cases for sampling multiple candidates"""
+
+    def test_concurrent_sampling(self) -> None:
+        """Test the candidates are drawn concurrently, and skip the
+        cache."""
+        model = SamplingModelWrapper("sampling")
+        model.cache = ResponseCache()
+
+        start = time.time()
+        responses = model.sample("hi", n=4)
+        self.assertLess(time.time() - start, 0.6)
+        self.assertEqual(
+            sorted(_.text for _ in responses),
+            ["1", "2", "3", "4"],
+        )
+
+        with self.assertRaises(ValueError):
+            model.sample("hi", n=0)
+
+    @patch("time.sleep")
+    def test_sampling_with_parse_func(self, mock_sleep: MagicMock) -> None:
+        """Test the candidates failing to be parsed are drawn again."""
+        model = SamplingModelWrapper("sampling")
+        mock_sleep.side_effect = lambda _: None
+
+        results = model.sample("hi", n=3, parse_func=parse_even)
+        self.assertEqual(len(results), 3)
+        self.assertTrue(all(_ % 2 == 0 for _ in results))
+
+        # the fault handler is called after the retries
+        results = model.sample(
+            "hi",
+            n=2,
+            parse_func=lambda _: parse_even(ModelResponse(text="1")),
+            fault_handler=lambda _: -1,
+            max_retries=2,
+        )
+        self.assertEqual(results, [-1, -1])
+
+    @patch("openai.OpenAI")
+    def test_openai_native_sampling(self, mock_client: MagicMock) -> None:
+        """Test the OpenAI chat wrapper draws the candidates in one call."""
+        response = MagicMock()
+        response.model_dump.return_value = {
+            "choices": [
+                {"index": i, "message": {"content": f"answer {i}"}}
+                for i in range(3)
+            ],
+            "usage": {"prompt_tokens": 5, "completion_tokens": 6},
+        }
+        response.choices[0].message.content = "answer 0"
+        response.usage.model_dump.return_value = {
+            "prompt_tokens": 5,
+            "completion_tokens": 6,
+        }
+        create = mock_client.return_value.chat.completions.create
+        create.return_value = response
+
+        model = OpenAIChatWrapper(config_name="", model_name="gpt-4o")
+        model.update_monitor = MagicMock()
+        messages = [{"role": "user", "content": "hi"}]
+        candidates = model.sample(messages, n=3, temperature=0.7)
+
+        create.assert_called_once_with(
+            model="gpt-4o",
+            messages=messages,
+            temperature=0.7,
+            n=3,
+        )
+        self.assertEqual(
+            [_.text for _ in candidates],
+            ["answer 0", "answer 1", "answer 2"],
+        )
+        self.assertEqual(len(candidates[1].raw["choices"]), 1)
+        model.update_monitor.assert_called_once_with(
+            call_counter=1,
+            prompt_tokens=5,
+            completion_tokens=6,
+        )
+
+        # the completions of all the candidates are charged to the limiter
+        model.rate_limiter = MagicMock()
+        model.rate_limiter.acquire.return_value = 0
+        model.sample(messages, n=3, max_tokens=100)
+        model.rate_limiter.acquire.assert_called_once()
+        self.assertGreaterEqual(
+            model.rate_limiter.acquire.call_args[0][0],
+            300,
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -3,10 +3,14 @@
 Unit tests for model wrapper classes and functions
 """
 
+import asyncio
+import threading
+import time
 from typing import Any, Union, List, Sequence
 import unittest
-from unittest.mock import patch, MagicMock
+from unittest.mock import patch, MagicMock, AsyncMock
 
+from agentscope.exception import ResponseParsingError
 from agentscope.message import MessageBase
 from agentscope.models import (
     ModelResponse,
@@ -17,6 +21,7 @@ from agentscope.models import (
     read_model_configs,
     load_model_by_config_name,
     clear_model_configs,
+    release_model,
 )
 
 
@@ -33,6 +38,32 @@ class TestModelWrapperSimple(ModelWrapperBase):
         return ""
 
 
+class SlowInitModelWrapper(ModelWrapperBase):
+    """A model wrapper whose constructor blocks until released for test
+    usage"""
+
+    model_type: str = "slow_init_model"
+
+    started = threading.Event()
+    proceed = threading.Event()
+    num_created = 0
+
+    def __init__(self, config_name: str, **kwargs: Any) -> None:
+        super().__init__(config_name=config_name)
+        SlowInitModelWrapper.num_created += 1
+        SlowInitModelWrapper.started.set()
+        SlowInitModelWrapper.proceed.wait(timeout=5)
+
+    def __call__(self, *args: Any, **kwargs: Any) -> ModelResponse:
+        return ModelResponse(text=self.config_name)
+
+    def format(
+        self,
+        *args: Union[MessageBase, Sequence[MessageBase]],
+    ) -> Union[List[dict], str]:
+        return ""
+
+
 class BasicModelTest(unittest.TestCase):
     """Test cases for basic model wrappers"""
 
@@ -114,3 +145,273 @@ class BasicModelTest(unittest.TestCase):
             load_model_by_config_name,
             "test_model_wrapper",
         )
+
+    def test_shared_model(self) -> None:
+        """Test the model wrappers shared by config name."""
+        read_model_configs(
+            configs=[
+                {
+                    "model_type": "TestModelWrapperSimple",
+                    "config_name": "shared",
+                },
+                {
+                    "model_type": "TestModelWrapperSimple",
+                    "config_name": "unshared",
+                    "shared": False,
+                },
+            ],
+            clear_existing=True,
+        )
+        model = load_model_by_config_name("shared")
+        self.assertIs(load_model_by_config_name("shared"), model)
+        self.assertIsNot(
+            load_model_by_config_name("shared", shared=False),
+            model,
+        )
+        self.assertIsNot(
+            load_model_by_config_name("unshared"),
+            load_model_by_config_name("unshared"),
+        )
+
+        # the shared model is removed after all references are released,
+        # which aren't released by the unshared model wrappers
+        self.assertFalse(
+            release_model(
+                "shared",
+                load_model_by_config_name("shared", shared=False),
+            ),
+        )
+        self.assertFalse(release_model("shared", model))
+        self.assertTrue(release_model("shared"))
+        self.assertIsNot(load_model_by_config_name("shared"), model)
+        clear_model_configs()
+
+    def test_concurrent_loading(self) -> None:
+        """Test a slow model wrapper constructor doesn't block loading the
+        other configs, and the shared wrapper is created once."""
+        read_model_configs(
+            configs=[
+                {"model_type": "slow_init_model", "config_name": "slow"},
+                {
+                    "model_type": "TestModelWrapperSimple",
+                    "config_name": "fast",
+                },
+            ],
+            clear_existing=True,
+        )
+        SlowInitModelWrapper.num_created = 0
+        SlowInitModelWrapper.started.clear()
+        SlowInitModelWrapper.proceed.clear()
+
+        models = []
+        threads = [
+            threading.Thread(
+                target=lambda: models.append(
+                    load_model_by_config_name("slow"),
+                ),
+            )
+            for _ in range(2)
+        ]
+        for thread in threads:
+            thread.start()
+        self.assertTrue(SlowInitModelWrapper.started.wait(timeout=5))
+
+        # loading another config isn't blocked by the slow constructor
+        start = time.time()
+        self.assertEqual(load_model_by_config_name("fast")().text, "fast")
+        self.assertLess(time.time() - start, 1)
+
+        SlowInitModelWrapper.proceed.set()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(SlowInitModelWrapper.num_created, 1)
+        self.assertIs(models[0], models[1])
+        clear_model_configs()
+
+    @patch("requests.Session.post")
+    def test_post_api_session(self, mock_post: MagicMock) -> None:
+        """Test the post api wrapper reuses the pooled session."""
+        mock_post.return_value.status_code = 200
+        mock_post.return_value.json.return_value = {"data": "xxx"}
+
+        model = PostAPIModelWrapperBase(
+            config_name="my_post_api",
+            api_url="https://xxx",
+            pool_size=4,
+        )
+        session = model.session
+        model("Hi")
+        model("Hello")
+
+        self.assertIs(model.session, session)
+        self.assertEqual(mock_post.call_count, 2)
+        adapter = session.get_adapter("https://xxx")
+        self.assertEqual(adapter._pool_maxsize, 4)  # pylint: disable=W0212
+
+        model = PostAPIModelWrapperBase(
+            config_name="my_post_api",
+            api_url="https://xxx",
+            http2=True,
+        )
+        self.assertEqual(type(model.session).__name__, "Client")
+
+
+class AsyncModelTest(unittest.TestCase):
+    """Test cases for the async model API"""
+
+    @patch("agentscope.models.model._DEFAULT_RETRY_INTERVAL", 0)
+    def test_acall_fallback(self) -> None:
+        """Test the thread-pool fallback of acall with response parsing."""
+        model = TestModelWrapperSimple(config_name="simple")
+
+        async def run() -> list:
+            return await asyncio.gather(
+                *[model.acall() for _ in range(8)],
+            )
+
+        responses = asyncio.run(run())
+        self.assertListEqual([_.text for _ in responses], ["simple"] * 8)
+
+        # the parse_func is retried, and fault_handler is called at last
+        parse_func = MagicMock(side_effect=ResponseParsingError("invalid"))
+        response = asyncio.run(
+            model.acall(
+                parse_func=parse_func,
+                fault_handler=lambda x: "fallback",
+                max_retries=2,
+            ),
+        )
+        self.assertEqual(response, "fallback")
+        self.assertEqual(parse_func.call_count, 2)
+
+    @patch("openai.AsyncOpenAI")
+    @patch("openai.OpenAI")
+    def test_openai_acall(
+        self,
+        mock_client: MagicMock,
+        mock_async_client: MagicMock,
+    ) -> None:
+        """Test the native async call of OpenAI chat wrapper."""
+        mock_response = MagicMock()
+        mock_response.choices[0].message.content = "Hello"
+        mock_response.model_dump.return_value = {}
+        mock_response.usage.model_dump.return_value = {}
+        create = mock_async_client.return_value.chat.completions.create
+        create.side_effect = AsyncMock(return_value=mock_response)
+
+        model = OpenAIChatWrapper(config_name="gpt-4", api_key="xxx")
+        response = asyncio.run(
+            model.acall(messages=[{"role": "user", "content": "Hi"}]),
+        )
+
+        self.assertEqual(response.text, "Hello")
+        mock_client.return_value.chat.completions.create.assert_not_called()
+        mock_async_client.assert_called_once()
+
+    @patch("httpx.AsyncClient")
+    def test_post_api_acall(self, mock_async_client: MagicMock) -> None:
+        """Test the native async call of post api wrapper."""
+        mock_response = MagicMock()
+        mock_response.status_code = 200
+        mock_response.json.return_value = {"data": "xxx"}
+        mock_async_client.return_value.post = AsyncMock(
+            return_value=mock_response,
+        )
+
+        model = PostAPIModelWrapperBase(
+            config_name="my_post_api",
+            api_url="https://xxx",
+        )
+        response = asyncio.run(model.acall("Hi"))
+
+        self.assertEqual(response.raw, {"data": "xxx"})
+        kwargs = mock_async_client.return_value.post.call_args.kwargs
+        self.assertEqual(kwargs["json"], {"inputs": "Hi"})
+
+
+def _openai_chunks(deltas: list) -> list:
+    """Mock the chunks of OpenAI chat completions API in stream mode."""
+    chunks = []
+    for delta in deltas:
+        chunk = MagicMock()
+        chunk.choices[0].delta.content = delta
+        chunk.usage = None
+        chunks.append(chunk)
+    # the last chunk contains the usage only
+    chunk = MagicMock()
+    chunk.choices = []
+    chunk.usage.model_dump.return_value = {"total_tokens": 10}
+    chunks.append(chunk)
+    return chunks
+
+
+class StreamModelTest(unittest.TestCase):
+    """Test cases for the stream mode of model wrappers"""
+
+    @patch("openai.OpenAI")
+    def test_openai_stream(self, mock_client: MagicMock) -> None:
+        """Test consuming the stream of OpenAI chat wrapper."""
+        create = mock_client.return_value.chat.completions.create
+        create.return_value = iter(_openai_chunks(["Hel", "lo", "!"]))
+
+        model = OpenAIChatWrapper(config_name="gpt-4", api_key="xxx")
+        model.update_monitor = MagicMock()
+        response = model(
+            messages=[{"role": "user", "content": "Hi"}],
+            stream=True,
+        )
+
+        self.assertTrue(response.is_stream)
+        self.assertListEqual(list(response.stream), ["Hel", "lo", "!"])
+        self.assertFalse(response.is_stream)
+        self.assertEqual(response.text, "Hello!")
+        self.assertDictEqual(response.raw["usage"], {"total_tokens": 10})
+        self.assertEqual(
+            create.call_args.kwargs["stream_options"],
+            {"include_usage": True},
+        )
+        model.update_monitor.assert_called_once_with(
+            call_counter=1,
+            total_tokens=10,
+        )
+
+        # the text field waits for the whole stream
+        create.return_value = iter(_openai_chunks(["Hi", "!"]))
+        response = model(
+            messages=[{"role": "user", "content": "Hi"}],
+            stream=True,
+        )
+        self.assertEqual(response.text, "Hi!")
+
+    @patch("openai.AsyncOpenAI")
+    @patch("openai.OpenAI")
+    def test_openai_async_stream(
+        self,
+        mock_client: MagicMock,
+        mock_async_client: MagicMock,
+    ) -> None:
+        """Test consuming the async stream of OpenAI chat wrapper."""
+
+        async def chunks() -> Any:
+            for chunk in _openai_chunks(["Hel", "lo"]):
+                yield chunk
+
+        create = mock_async_client.return_value.chat.completions.create
+        create.side_effect = AsyncMock(return_value=chunks())
+
+        model = OpenAIChatWrapper(config_name="gpt-4", api_key="xxx")
+
+        async def run() -> tuple:
+            response = await model.acall(
+                messages=[{"role": "user", "content": "Hi"}],
+                stream=True,
+            )
+            with self.assertRaises(RuntimeError):
+                _ = response.text
+            deltas = [_ async for _ in response.stream]
+            return deltas, response.text
+
+        deltas, text = asyncio.run(run())
+        self.assertListEqual(deltas, ["Hel", "lo"])
+        self.assertEqual(text, "Hello")
+        mock_client.return_value.chat.completions.create.assert_not_called()
@@ -0,0 +1,139 @@
+# -*- coding: utf-8 -*-
+"""Unit tests for the truncation of prompts exceeding the context
+window."""
+import asyncio
+import unittest
+from typing import Any, Union, List, Sequence
+from unittest.mock import MagicMock, patch
+
+from agentscope.message import MessageBase
+from agentscope.models import (
+    ContextTruncator,
+    ModelResponse,
+    ModelWrapperBase,
+    clear_model_configs,
+    load_model_by_config_name,
+    read_model_configs,
+)
+
+
+def count_words(text: str) -> int:
+    """Count the words as tokens for test usage."""
+    return len(text.split())
+
+
+class EchoModelWrapper(ModelWrapperBase):
+    """A model wrapper recording the prompts for test usage"""
+
+    model_type: str = "echo_model"
+
+    def __init__(self, config_name: str, **kwargs: Any) -> None:
+        super().__init__(config_name=config_name)
+        self.model_name = "echo"
+        self.max_length = 8
+        self.prompts: list = []
+
+    def __call__(self, messages: list, **kwargs: Any) -> ModelResponse:
+        self.prompts.append(messages)
+        return ModelResponse(text=str(len(messages)))
+
+    def format(
+        self,
+        *args: Union[MessageBase, Sequence[MessageBase]],
+    ) -> Union[List[dict], str]:
+        return ""
+
+
+class ContextTruncatorTest(unittest.TestCase):
+    """Test cases for the context truncator"""
+
+    def setUp(self) -> None:
+        """Init for ContextTruncatorTest."""
+        self.messages = [
+            {"role": "system", "content": "you are a bot"},
+            {"role": "user", "content": "one two\nthree"},
+            {"role": "assistant", "content": "four five"},
+            {"role": "user", "content": "six"},
+        ]
+
+    def test_drop_oldest(self) -> None:
+        """Test dropping the oldest non-system messages."""
+        truncator = ContextTruncator()
+        messages, trimmed = truncator.truncate(self.messages, 7, count_words)
+        self.assertEqual(trimmed, 3)
+        self.assertEqual(
+            [_["content"] for _ in messages],
+            ["you are a bot", "four five", "six"],
+        )
+
+        # the prompt fitting in the window is not changed
+        messages, trimmed = truncator.truncate(self.messages, 10, count_words)
+        self.assertEqual(trimmed, 0)
+        self.assertIs(messages, self.messages)
+
+    def test_condense(self) -> None:
+        """Test dropping the oldest lines of the messages."""
+        truncator = ContextTruncator(strategy="condense")
+        messages, trimmed = truncator.truncate(self.messages, 7, count_words)
+        self.assertEqual(trimmed, 2)
+        self.assertEqual(messages[1]["content"], "three")
+        self.assertEqual(self.messages[1]["content"], "one two\nthree")
+
+        # the dialogue history merged into one message
+        messages = [
+            {"role": "system", "content": "you are a bot"},
+            {
+                "role": "user",
+                "content": (
+                    "## Dialogue History\nuser: hi\nbot: hello\nuser: ?"
+                ),
+            },
+        ]
+        messages, trimmed = truncator.truncate(messages, 9, count_words)
+        self.assertEqual(trimmed, 4)
+        self.assertEqual(
+            messages[1]["content"],
+            "## Dialogue History\nuser: ?",
+        )
+
+        with self.assertRaises(ValueError):
+            ContextTruncator(strategy="unknown")
+
+    def test_model_with_truncation(self) -> None:
+        """Test the prompts are truncated before the model calls."""
+        read_model_configs(
+            {
+                "config_name": "echo",
+                "model_type": "echo_model",
+                "truncation": {"reserved_tokens": 1},
+            },
+            clear_existing=True,
+        )
+        model = load_model_by_config_name("echo", shared=False)
+        model.update_monitor = MagicMock()
+
+        # each message is estimated as 3 tokens
+        messages = [{"role": "user", "content": "x" * 12}] * 3
+        self.assertEqual(model(messages).text, "2")
+        model.update_monitor.assert_called_once_with(truncated_tokens=3)
+
+        self.assertEqual(asyncio.run(model.acall(messages=messages)).text, "2")
+        self.assertEqual(len(model.prompts[-1]), 2)
+        clear_model_configs()
+
+    @patch("agentscope.models.truncation.count_text_tokens")
+    def test_count_tokens_fallback(self, mock_count: MagicMock) -> None:
+        """Test the tokens are estimated once the tokenizer fails."""
+        mock_count.side_effect = RuntimeError("offline")
+        model = EchoModelWrapper("echo")
+
+        # pylint: disable=protected-access
+        self.assertEqual(model._count_tokens("x" * 12), 3)
+        self.assertEqual(model._count_tokens("x" * 12), 3)
+        mock_count.assert_called_once()
+        self.assertFalse(model._exact_token_count)
+        self.assertTrue(EchoModelWrapper("echo")._exact_token_count)
+
+
+if __name__ == "__main__":
+    unittest.main()
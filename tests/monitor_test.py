@@ -7,6 +7,8 @@ import unittest
 import uuid
 import os
 import shutil
+import sqlite3
+import threading
 from loguru import logger
 
 import agentscope
@@ -46,7 +48,7 @@ class MonitorFactoryTest(unittest.TestCase):
         self.assertTrue(isinstance(monitor, SqliteMonitor))
 
     def tearDown(self) -> None:
-        MonitorFactory._instance = None  # pylint: disable=W0212
+        MonitorFactory.flush()
         os.remove(self.db_path)
 
 
@@ -230,8 +232,42 @@ class SqliteMonitorTest(MonitorTestBase):
         return SqliteMonitor(self.db_path)
 
     def tearDown(self) -> None:
+        self.monitor.close()  # type: ignore[attr-defined]
         os.remove(self.db_path)
 
+    def test_concurrent_update(self) -> None:
+        """Test the metrics updated from multiple threads with persistent
+        connections in WAL mode."""
+        self.monitor.register("calls", quota=1000)
+        self.monitor.register("tokens")
+
+        def work() -> None:
+            for _ in range(50):
+                self.monitor.update({"calls": 1, "tokens": 10})
+
+        threads = [threading.Thread(target=work) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(self.monitor.get_value("calls"), 400)
+        self.assertEqual(self.monitor.get_value("tokens"), 4000)
+        conn = sqlite3.connect(self.db_path)
+        journal_mode = conn.execute("PRAGMA journal_mode").fetchone()
+        conn.close()
+        self.assertEqual(journal_mode[0], "wal")
+
+        # the failed update is rolled back as a whole
+        with self.assertRaises(QuotaExceededError):
+            self.monitor.update({"tokens": 10, "calls": 1000})
+        self.assertEqual(self.monitor.get_value("tokens"), 4000)
+
+        # the monitor reconnects after closing
+        self.monitor.close()  # type: ignore[attr-defined]
+        self.assertTrue(self.monitor.add("calls", 1))
+        self.assertEqual(self.monitor.get_value("calls"), 401)
+
     def test_register_budget(self) -> None:
         """Test register_budget method of monitor"""
         self.assertTrue(
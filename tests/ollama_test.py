@@ -1,7 +1,8 @@
 # -*- coding: utf-8 -*-
 """Unit test for Ollama model APIs."""
+import asyncio
 import unittest
-from unittest.mock import patch, MagicMock
+from unittest.mock import patch, MagicMock, AsyncMock
 import agentscope
 from agentscope.models import load_model_by_config_name
 from agentscope._runtime import _Runtime
@@ -164,6 +165,72 @@ class OllamaModelWrapperTest(unittest.TestCase):
 
         self.assertEqual(response.raw, self.dummy_generate)
 
+    @patch("ollama.AsyncClient")
+    def test_ollama_chat_acall(self, mock_async_client: MagicMock) -> None:
+        """Unit test for the async call of ollama chat API."""
+        # prepare the mock
+        mock_async_client.return_value.chat = AsyncMock(
+            return_value=self.dummy_response,
+        )
+
+        # run test
+        agentscope.init(
+            model_configs={
+                "config_name": "my_ollama_chat",
+                "model_type": "ollama_chat",
+                "model_name": "llama2",
+                "options": {
+                    "temperature": 0.5,
+                },
+                "keep_alive": "5m",
+            },
+        )
+
+        model = load_model_by_config_name("my_ollama_chat")
+        response = asyncio.run(
+            model.acall(messages=[{"role": "user", "content": "Hi!"}]),
+        )
+
+        self.assertEqual(response.raw, self.dummy_response)
+        kwargs = mock_async_client.return_value.chat.call_args.kwargs
+        self.assertEqual(kwargs["options"], {"temperature": 0.5})
+
+    @patch("ollama.chat")
+    def test_ollama_chat_stream(self, mock_chat: MagicMock) -> None:
+        """Unit test for ollama chat API in stream mode."""
+        # prepare the mock
+        mock_chat.return_value = iter(
+            [
+                {"message": {"content": "Hello"}, "done": False},
+                {
+                    "message": {"content": "!"},
+                    "done": True,
+                    "prompt_eval_count": 22,
+                    "eval_count": 2,
+                },
+            ],
+        )
+
+        # run test
+        agentscope.init(
+            model_configs={
+                "config_name": "my_ollama_chat",
+                "model_type": "ollama_chat",
+                "model_name": "llama2",
+                "options": {},
+            },
+        )
+
+        model = load_model_by_config_name("my_ollama_chat")
+        response = model(
+            messages=[{"role": "user", "content": "Hi!"}],
+            stream=True,
+        )
+
+        self.assertListEqual(list(response.stream), ["Hello", "!"])
+        self.assertEqual(response.text, "Hello!")
+        self.assertEqual(response.raw["usage"]["total_tokens"], 24)
+
     def tearDown(self) -> None:
         """Clean up after each test."""
         flush()
@@ -9,6 +9,7 @@ import agentscope
 from agentscope.models import OpenAIChatWrapper
 from agentscope._runtime import _Runtime
 from agentscope.file_manager import _FileManager, file_manager
+from agentscope.utils.invocation_log import read_invocations
 from agentscope.utils.monitor import MonitorFactory
 
 
@@ -65,6 +66,40 @@ class RecordApiInvocation(unittest.TestCase):
         # assert
         self.assert_invocation_record()
 
+    @patch("openai.OpenAI")
+    def test_record_model_invocation_in_log(
+        self,
+        mock_client: MagicMock,
+    ) -> None:
+        """Test record model invocations in a compressed log."""
+        mock_response = MagicMock()
+        mock_response.model_dump.return_value = self.dummy_response
+        mock_response.usage.model_dump.return_value = {}
+        mock_openai_instance = mock_client.return_value
+        mock_openai_instance.chat.completions.create.return_value = (
+            mock_response
+        )
+
+        agentscope.init(save_api_invoke="jsonl.gz")
+        model = OpenAIChatWrapper(
+            config_name="gpt-4",
+            api_key="xxx",
+            organization="xxx",
+        )
+        for _ in range(3):
+            model(messages=[])
+        file_manager.close_invocation_log()
+
+        dir_invoke = os.path.join(file_manager.dir_root, "invoke")
+        self.assertEqual(
+            os.listdir(dir_invoke),
+            [f"invocations_{os.getpid()}.jsonl.gz"],
+        )
+        records = list(read_invocations(dir_invoke))
+        self.assertEqual(len(records), 3)
+        self.assertEqual(records[0]["response"], self.dummy_response)
+        self.assertEqual(records[0]["arguments"]["model"], "gpt-4")
+
     def assert_invocation_record(self) -> None:
         """Assert invocation record."""
         run_dir = file_manager.dir_root
@@ -4,6 +4,8 @@ from datetime import datetime
 import unittest
 from typing import Any
 
+import numpy as np
+
 from agentscope.service import retrieve_from_list, cos_sim
 from agentscope.service.service_status import ServiceExecStatus
 from agentscope.message import MessageBase, Msg, Tht
@@ -81,6 +83,56 @@ class TestRetrieval(unittest.TestCase):
         self.assertEqual(retrieved.content[0][2], m2)
         self.assertEqual(retrieved.content[1][2], m3)
 
+    def test_retrieval_by_metric(self) -> None:
+        """test memory retrieval by a metric over the stacked embeddings"""
+        memory = TemporaryMemory(config={})
+        for embedding in [[1, 0], [0.5, 0.5], [0.2, 0.8]]:
+            msg = Msg(name="env", content="test", role="assistant")
+            msg.embedding = embedding
+            memory.add(msg)
+
+        embeddings = memory.get_embeddings(as_array=True)
+        self.assertIsInstance(embeddings, np.ndarray)
+        self.assertEqual(embeddings.shape, (3, 2))
+
+        retrieved = memory.retrieve_by_embedding(
+            [0, 1],
+            "cosine",
+            top_k=2,
+            preserve_order=False,
+        )
+        self.assertEqual([_["index"] for _ in retrieved], [2, 1])
+        self.assertAlmostEqual(
+            retrieved[0]["score"],
+            cos_sim([0, 1], [0.2, 0.8]).content,
+            places=5,
+        )
+
+    def test_embedding_matrix_cache(self) -> None:
+        """test the stacked embeddings are cached until memory changes"""
+        memory = TemporaryMemory(config={})
+        for embedding in [[1, 0], [0.5, 0.5]]:
+            msg = Msg(name="env", content="test", role="assistant")
+            msg.embedding = embedding
+            memory.add(msg)
+
+        embeddings = memory.get_embeddings(as_array=True)
+        self.assertIs(memory.get_embeddings(as_array=True), embeddings)
+        self.assertFalse(embeddings.flags.writeable)
+
+        msg = Msg(name="env", content="test", role="assistant")
+        msg.embedding = [0.2, 0.8]
+        memory.add(msg)
+        embeddings = memory.get_embeddings(as_array=True)
+        self.assertEqual(embeddings.shape, (3, 2))
+
+        memory.delete(0)
+        embeddings = memory.get_embeddings(as_array=True)
+        np.testing.assert_array_equal(embeddings, [[0.5, 0.5], [0.2, 0.8]])
+
+        memory.clear()
+        self.assertEqual(memory.get_embeddings(as_array=True).shape, (0, 0))
+
 
 # This allows the tests to be run from the command line
 if __name__ == "__main__":
@@ -0,0 +1,179 @@
+# -*- coding: utf-8 -*-
+"""Unit tests for the router model wrapper."""
+import asyncio
+import time
+import unittest
+from typing import Any, Union, List, Sequence
+
+from agentscope.message import MessageBase
+from agentscope.models import (
+    ModelResponse,
+    ModelWrapperBase,
+    RouterModelWrapper,
+    clear_model_configs,
+    load_model_by_config_name,
+    read_model_configs,
+)
+
+
+class BackendModelWrapper(ModelWrapperBase):
+    """A backend model wrapper with configurable delay and failures for
+    test usage"""
+
+    model_type: str = "backend_model"
+
+    def __init__(
+        self,
+        config_name: str,
+        delay: float = 0.0,
+        fail: bool = False,
+        **kwargs: Any,
+    ) -> None:
+        super().__init__(config_name=config_name)
+        self.delay = delay
+        self.fail = fail
+        self.num_calls = 0
+
+    def __call__(self, prompt: str, **kwargs: Any) -> ModelResponse:
+        self.num_calls += 1
+        time.sleep(self.delay)
+        if self.fail:
+            raise ValueError(f"{self.config_name} failed")
+        return ModelResponse(text=self.config_name)
+
+    def format(
+        self,
+        *args: Union[MessageBase, Sequence[MessageBase]],
+    ) -> Union[List[dict], str]:
+        return self.config_name
+
+
+class RouterModelTest(unittest.TestCase):
+    """Test cases for the router model wrapper"""
+
+    def setUp(self) -> None:
+        """Init for RouterModelTest."""
+        read_model_configs(
+            [
+                {
+                    "config_name": "broken",
+                    "model_type": "backend_model",
+                    "fail": True,
+                },
+                {
+                    "config_name": "slow",
+                    "model_type": "backend_model",
+                    "delay": 0.2,
+                },
+                {"config_name": "fast", "model_type": "backend_model"},
+            ],
+            clear_existing=True,
+        )
+
+    def _router(self, **kwargs: Any) -> RouterModelWrapper:
+        return RouterModelWrapper(
+            config_name="router",
+            backends=["broken", "slow", "fast"],
+            **kwargs,
+        )
+
+    def test_failover(self) -> None:
+        """Test retrying on the next backend."""
+        router = self._router(policy="failover")
+        self.assertEqual(router("hi").text, "slow")
+        self.assertEqual(router.format(), "broken")
+
+        stats = router.stats
+        self.assertEqual(stats["broken"]["num_errors"], 1)
+        self.assertEqual(stats["slow"]["num_calls"], 1)
+        self.assertEqual(stats["fast"]["num_calls"], 0)
+
+        # all backends fail
+        router = RouterModelWrapper(config_name="router", backends=["broken"])
+        with self.assertRaises(RuntimeError):
+            router("hi")
+
+    def test_latency(self) -> None:
+        """Test routing to the backend with the lowest latency."""
+        router = self._router()
+        for _ in range(3):
+            router("hi")
+
+        # the unobserved backends are explored first, and then the broken
+        # one is deprioritized and the fast one is preferred
+        self.assertEqual(router("hi").text, "fast")
+        order = router._route()  # pylint: disable=W0212
+        self.assertEqual(order, ["fast", "slow", "broken"])
+
+    def test_failed_backend_recovery(self) -> None:
+        """Test the backends never succeeded are tried last, and probed
+        again after the cooldown."""
+        router = self._router(cooldown=0.3)
+        broken = router._get_model("broken")  # pylint: disable=W0212
+        for _ in range(5):
+            router("hi")
+        self.assertEqual(router.stats["broken"]["num_calls"], 1)
+        order = router._route()  # pylint: disable=W0212
+        self.assertEqual(order[-1], "broken")
+
+        # the backend comes back, and is probed after the cooldown
+        broken.fail = False
+        time.sleep(0.3)
+        self.assertEqual(router("hi").text, "broken")
+        self.assertEqual(router.stats["broken"]["num_calls"], 2)
+
+        # a backend above the max error rate recovers by a probe
+        router = self._router(
+            policy="least_in_flight",
+            alpha=1.0,
+            cooldown=0.3,
+        )
+        self.assertEqual(router("hi").text, "broken")
+        broken.fail = True
+        self.assertEqual(router("hi").text, "slow")
+        self.assertEqual(router.stats["broken"]["error_rate"], 1.0)
+        self.assertEqual(router("hi").text, "slow")
+        self.assertEqual(router.stats["broken"]["num_calls"], 2)
+
+        broken.fail = False
+        time.sleep(0.3)
+        self.assertEqual(router("hi").text, "broken")
+        self.assertEqual(router.stats["broken"]["error_rate"], 0.0)
+
+    def test_timeout(self) -> None:
+        """Test failing over when a backend times out."""
+        router = RouterModelWrapper(
+            config_name="router",
+            backends=["slow", "fast"],
+            policy="failover",
+            timeout=0.05,
+        )
+        self.assertEqual(router("hi").text, "fast")
+        self.assertEqual(asyncio.run(router.acall("hi")).text, "fast")
+        self.assertEqual(router.stats["slow"]["num_errors"], 2)
+
+    def test_load_router(self) -> None:
+        """Test loading the router from model config."""
+        read_model_configs(
+            {
+                "config_name": "router",
+                "model_type": "router",
+                "backends": ["fast", "slow"],
+                "policy": "weighted",
+                "weights": [1.0, 0.0],
+            },
+        )
+        router = load_model_by_config_name("router")
+        self.assertIsInstance(router, RouterModelWrapper)
+        self.assertEqual(router("hi").text, "fast")
+
+        with self.assertRaises(ValueError):
+            self._router(policy="random")
+
+    def tearDown(self) -> None:
+        """Clean up after each test."""
+        clear_model_configs()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -9,8 +9,10 @@ from loguru import logger
 
 import agentscope
 from agentscope.agents import AgentBase, DistConf
-from agentscope.agents.rpc_agent import RpcAgentServerLauncher
+from agentscope.agents.rpc_agent import AgentPlatform, RpcAgentServerLauncher
 from agentscope.message import Msg
+from agentscope.models import read_model_configs
+from agentscope.models import _MODEL_REF_COUNTS  # pylint: disable=W0212
 from agentscope.message import PlaceholderMessage
 from agentscope.message import deserialize
 from agentscope.msghub import msghub
@@ -545,6 +547,38 @@ class BasicRpcAgentTest(unittest.TestCase):
         x = agent()
         self.assertRaises(RuntimeError, x.__getattr__, "content")
 
+    def test_delete_agent(self) -> None:
+        """Test the agents deleted by the server release the shared model
+        wrapper."""
+        read_model_configs(
+            {
+                "config_name": "rpc_shared",
+                "model_type": "post_api_chat",
+                "api_url": "http://localhost:12010",
+            },
+        )
+        platform = AgentPlatform(
+            host="localhost",
+            port=12010,
+            max_pool_size=1,
+            max_timeout_seconds=1,
+        )
+        agents = [
+            DemoRpcAgent(name=str(i), model_config_name="rpc_shared")
+            for i in range(2)
+        ]
+        for agent in agents:
+            platform.agent_pool[agent.agent_id] = agent
+        self.assertEqual(_MODEL_REF_COUNTS["rpc_shared"], 2)
+
+        platform.check_and_delete_agent(agents[0].agent_id)
+        self.assertEqual(_MODEL_REF_COUNTS["rpc_shared"], 1)
+
+        # the remaining agents are closed when the server stops
+        platform.close()
+        self.assertNotIn("rpc_shared", _MODEL_REF_COUNTS)
+        self.assertEqual(len(platform.agent_pool), 0)
+
     def test_agent_nesting(self) -> None:
         """Test agent nesting"""
         host = "localhost"
@@ -0,0 +1,97 @@
+# -*- coding: utf-8 -*-
+"""Unit test for the batched similarity functions."""
+import unittest
+
+import numpy as np
+
+from agentscope.service import (
+    EmbeddingIndex,
+    batch_similarity,
+    cos_sim,
+    prepare_corpus,
+    top_k_similarity,
+)
+
+
+class SimilarityTest(unittest.TestCase):
+    """Test cases for the batched similarity functions."""
+
+    def setUp(self) -> None:
+        """Init for SimilarityTest."""
+        rng = np.random.default_rng(0)
+        self.queries = rng.normal(size=(3, 8))
+        self.corpus = rng.normal(size=(50, 8))
+
+    def test_batch_similarity(self) -> None:
+        """Test the batched scores against the pairwise definitions."""
+        q, c = self.queries[1], self.corpus[7]
+
+        cosine = batch_similarity(self.queries, self.corpus)
+        self.assertEqual(cosine.shape, (3, 50))
+        self.assertAlmostEqual(cosine[1, 7], cos_sim(q, c).content, 5)
+
+        dot = batch_similarity(self.queries, self.corpus, metric="dot")
+        self.assertAlmostEqual(dot[1, 7], float(q @ c), 4)
+
+        l2 = batch_similarity(self.queries, self.corpus, metric="l2")
+        self.assertAlmostEqual(l2[1, 7], -np.linalg.norm(q - c), 4)
+
+        # chunked evaluation gives the same results
+        chunked = batch_similarity(
+            self.queries,
+            self.corpus,
+            metric="l2",
+            chunk_size=7,
+        )
+        np.testing.assert_allclose(chunked, l2, rtol=1e-5)
+
+        with self.assertRaises(ValueError):
+            batch_similarity(self.queries, self.corpus, metric="jaccard")
+
+    def test_top_k_similarity(self) -> None:
+        """Test the chunked top-k search and the float16 storage."""
+        expected = np.argsort(
+            -batch_similarity(self.queries, self.corpus),
+            axis=1,
+        )[:, :5]
+
+        scores, indices = top_k_similarity(
+            self.queries,
+            self.corpus,
+            top_k=5,
+            chunk_size=4,
+        )
+        np.testing.assert_array_equal(indices, expected)
+        self.assertTrue(np.all(np.diff(scores, axis=1) <= 0))
+
+        # a single query and top_k larger than the corpus
+        scores, indices = top_k_similarity(self.queries[0], self.corpus[:3], 5)
+        self.assertEqual(indices.shape, (1, 3))
+
+        corpus = prepare_corpus(self.corpus, dtype="float16")
+        self.assertEqual(corpus.dtype, np.float16)
+        _, indices = top_k_similarity(
+            self.queries,
+            corpus,
+            top_k=1,
+            normalized=True,
+        )
+        np.testing.assert_array_equal(indices[:, 0], expected[:, 0])
+
+    def test_embedding_index_search_batch(self) -> None:
+        """Test searching the embedding index for multiple queries."""
+        index = EmbeddingIndex(dtype="float16", chunk_size=16)
+        for i, emb in enumerate(self.corpus):
+            index.add(f"doc{i}", emb.tolist())
+
+        results = index.search_batch(self.queries.tolist(), top_k=2)
+        self.assertEqual(len(results), 3)
+        self.assertListEqual(
+            [_[1] for _ in results[0]],
+            [_[1] for _ in index.search(self.queries[0], top_k=2)],
+        )
+        self.assertEqual(len(index.search(self.queries[0], top_k=None)), 50)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,8 +1,34 @@
 # -*- coding: utf-8 -*-
 """ Unit test for token_utils."""
 import unittest
+from unittest.mock import MagicMock, patch
+
+from agentscope.utils import token_utils
 from agentscope.utils.token_utils import get_openai_max_length
 from agentscope.utils.token_utils import count_openai_token
+from agentscope.utils.token_utils import count_tokens
+
+
+class FakeEncoding:
+    """An encoding splitting the text by whitespace for test usage"""
+
+    name = "fake"
+
+    def __init__(self) -> None:
+        self.num_encoded = 0
+
+    def encode(self, text: str) -> list:
+        """Encode a text."""
+        self.num_encoded += 1
+        return text.split()
+
+    def encode_batch(
+        self,
+        texts: list,
+        num_threads: int = 8,  # pylint: disable=W0613
+    ) -> list:
+        """Encode a batch of texts."""
+        return [self.encode(_) for _ in texts]
 
 
 class TokenUtilsTest(unittest.TestCase):
@@ -47,6 +73,60 @@ class TokenUtilsTest(unittest.TestCase):
         with self.assertRaises(NotImplementedError):
             count_openai_token(test_content_str, unsupported_model)
 
+    def test_count_tokens(self) -> None:
+        """Test the cached encodings and memoized token counts."""
+        encoding = FakeEncoding()
+        token_utils._get_encoding.cache_clear()  # pylint: disable=W0212
+        token_utils._TOKEN_COUNTS.clear()  # pylint: disable=W0212
+        messages = [
+            {"role": "system", "content": "a b c"},
+            {"role": "user", "name": "bob", "content": "d e"},
+        ]
+        with patch.object(
+            token_utils.tiktoken,
+            "encoding_for_model",
+            MagicMock(return_value=encoding),
+        ) as mock_encoding_for_model:
+            # 2 messages * 3 + 1 name + 3 priming + 8 tokens
+            self.assertEqual(count_tokens(messages, "gpt-4"), 18)
+            self.assertEqual(encoding.num_encoded, 5)
+
+            # only the new texts are encoded
+            messages.append({"role": "user", "content": "d e"})
+            self.assertEqual(count_tokens(messages, "gpt-4"), 24)
+            self.assertEqual(encoding.num_encoded, 5)
+            mock_encoding_for_model.assert_called_once_with("gpt-4")
+
+        # the other models are estimated by the length
+        self.assertEqual(count_tokens("a" * 10, "qwen-max"), 3)
+        self.assertEqual(
+            count_tokens([{"role": "user", "content": "a" * 8}], "qwen"),
+            3,
+        )
+        token_utils._get_encoding.cache_clear()  # pylint: disable=W0212
+        token_utils._TOKEN_COUNTS.clear()  # pylint: disable=W0212
+
+    @patch("agentscope.utils.token_utils._MAX_TOKEN_COUNTS", 2)
+    def test_token_counts_eviction(self) -> None:
+        """Test the least recently used token counts are evicted."""
+        encoding = FakeEncoding()
+        # pylint: disable=protected-access
+        token_utils._TOKEN_COUNTS.clear()
+        count = token_utils._count_text_tokens
+
+        self.assertEqual(count(encoding, ["a", "b b", "a"]), [1, 2, 1])
+        self.assertEqual(encoding.num_encoded, 2)
+
+        # "a" is used more recently than "b b", which is evicted
+        self.assertEqual(count(encoding, ["a"]), [1])
+        self.assertEqual(count(encoding, ["c c c"]), [3])
+        self.assertEqual(len(token_utils._TOKEN_COUNTS), 2)
+        self.assertEqual(count(encoding, ["a", "c c c"]), [1, 3])
+        self.assertEqual(encoding.num_encoded, 3)
+        self.assertEqual(count(encoding, ["b b"]), [2])
+        self.assertEqual(encoding.num_encoded, 4)
+        token_utils._TOKEN_COUNTS.clear()
+
 
 if __name__ == "__main__":
     unittest.main()
@@ -12,7 +12,7 @@ from agentscope.service.web.arxiv import _reformat_query
 class TestWebSearches(unittest.TestCase):
     """ExampleTest for a unit test."""
 
-    @patch("agentscope.utils.common.requests.get")
+    @patch("requests.Session.get")
     def test_search_bing(self, mock_get: MagicMock) -> None:
         """test bing search"""
         # Set up the mock response
@@ -68,7 +68,7 @@ class TestWebSearches(unittest.TestCase):
             expected_result,
         )
 
-    @patch("agentscope.utils.common.requests.get")
+    @patch("requests.Session.get")
     def test_search_google(self, mock_get: MagicMock) -> None:
         """test google search"""
         # Set up the mock response
@@ -3,6 +3,8 @@
 import unittest
 from unittest.mock import patch, MagicMock
 
+import numpy as np
+
 import agentscope
 from agentscope.models import load_model_by_config_name
 
@@ -111,6 +113,40 @@ class TestZhipuAIEmbeddingWrapper(unittest.TestCase):
             **{},
         )
 
+    @patch("agentscope.models.zhipu_model.zhipuai")
+    def test_embedding_as_array(self, mock_zhipuai: MagicMock) -> None:
+        """Test the embeddings returned as an array"""
+        mock_embedding_response = MagicMock()
+        mock_embedding_response.model_dump.return_value = {
+            "data": [
+                {"embedding": [0.1, 0.2, 0.3]},
+                {"embedding": [0.4, 0.5, 0.6]},
+            ],
+            "usage": {"prompt_tokens": 10, "total_tokens": 10},
+        }
+        mock_zhipuai_client = MagicMock()
+        mock_zhipuai.ZhipuAI.return_value = mock_zhipuai_client
+        mock_zhipuai_client.embeddings.create.return_value = (
+            mock_embedding_response
+        )
+
+        agentscope.init(
+            model_configs={
+                "config_name": "test_embedding_array",
+                "model_type": "zhipuai_embedding",
+                "model_name": self.model_name,
+                "api_key": self.api_key,
+                "embedding_dtype": "float32",
+            },
+        )
+        model = load_model_by_config_name("test_embedding_array")
+        embedding = model(["a", "b"]).embedding
+
+        self.assertIsInstance(embedding, np.ndarray)
+        self.assertEqual(embedding.dtype, np.float32)
+        self.assertEqual(embedding.shape, (2, 3))
+        self.assertTrue(embedding.flags["C_CONTIGUOUS"])
+
 
 if __name__ == "__main__":
     unittest.main()